@@ -10,6 +10,7 @@ import keyboard
 import subprocess
 from text_processing import ecrire_texte_avec_accents
 from window_manager import basculer_vers_application
+from command_dispatch import declencheurs
 
 # Configuration de la grille vocale pour la navigation précise
 GRID_SIZE = 9  # Grille 9x9 pour la navigation précise
@@ -169,6 +170,12 @@ def activer_mode_lecture_ecran():
     except Exception as e:
         return f"Erreur lors de l'activation du mode de lecture d'écran: {str(e)}"
 
+@declencheurs(
+    mots_cles=("grill", "clic", "click", "cliqu", "tape", "appui", "appuy", "bouton", "presse",
+               "menu contextuel", "défil", "scroll", "page", "lecture", "narrateur", "écran",
+               "contenu", "dict", "écri", "saisi", "ouvr", "lance", "démarr", "va sur", "aller sur",
+               "navigu", "affich"),
+    motifs=(r"^(grille |grill |zone |position |case |cellule |numéro |emplacement |)([1-9])$",))
 def executer_commande_accessibilite(texte):
     """Traite les commandes d'accessibilité"""
     texte_lower = texte.lower().strip()
@@ -0,0 +1,309 @@
+"""
+Cache acoustique persistant des transcriptions pour Whisp Assistant
+Associe une empreinte log-mel de l'audio au texte reconnu, afin d'éviter le
+décodage (ou l'appel API payant) pour les commandes courtes répétées.
+Les entrées sont stockées dans la base SQLite et survivent aux redémarrages
+"""
+import time
+import hashlib
+import logging
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    try:
+        from whisp_assistant.database_manager import (
+            find_stt_cache_candidates, save_stt_cache_entry, update_stt_cache_entry,
+            purge_stt_cache, get_stt_cache_count
+        )
+    except ImportError:
+        from database_manager import (
+            find_stt_cache_candidates, save_stt_cache_entry, update_stt_cache_entry,
+            purge_stt_cache, get_stt_cache_count
+        )
+    DATABASE_AVAILABLE = True
+except ImportError:
+    DATABASE_AVAILABLE = False
+
+# Paramètres de l'empreinte
+N_MELS = 24
+N_TIME_BINS = 16
+N_FFT = 512
+FRAME_MS = 25
+HOP_MS = 10
+# Trames plus faibles que le maximum moins cet écart (log naturel, ~17 dB) considérées comme silence
+SILENCE_LOG_DROP = 4.0
+# Tolérance relative sur la durée de parole pour qu'une entrée soit comparée
+DURATION_TOLERANCE = 0.2
+
+_mel_filterbanks = {}
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+def _mel_filterbank(sample_rate: int) -> np.ndarray:
+    """Banc de filtres triangulaires mel (mis en cache par taux d'échantillonnage)."""
+    fb = _mel_filterbanks.get(sample_rate)
+    if fb is not None:
+        return fb
+
+    mel_points = np.linspace(_hz_to_mel(60.0), _hz_to_mel(min(7600.0, sample_rate / 2)), N_MELS + 2)
+    bins = np.floor((N_FFT + 1) * _mel_to_hz(mel_points) / sample_rate).astype(int)
+    fb = np.zeros((N_MELS, N_FFT // 2 + 1), dtype=np.float32)
+    for m in range(1, N_MELS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    _mel_filterbanks[sample_rate] = fb
+    return fb
+
+
+def _as_float32(audio: Union[bytes, np.ndarray]) -> np.ndarray:
+    """Convertit un audio int16 (bytes ou tableau) ou float32 en float32 normalisé."""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32, copy=False).ravel()
+
+
+def calculer_log_mel(audio: Union[bytes, np.ndarray], sample_rate: int = 16000):
+    """
+    Calcule le log-mel trame par trame (fenêtres de 25 ms, pas de 10 ms).
+
+    Args:
+        audio: Audio int16 (bytes ou tableau) ou float32
+        sample_rate: Taux d'échantillonnage
+
+    Returns:
+        Tuple (log-mel (trames, N_MELS), log-énergie par trame), ou (None, None) si l'audio est trop court
+    """
+    samples = _as_float32(audio)
+    frame = int(sample_rate * FRAME_MS / 1000)
+    hop = int(sample_rate * HOP_MS / 1000)
+    if len(samples) < frame * 4:
+        return None, None
+
+    samples = np.ascontiguousarray(samples)
+    n_frames = 1 + (len(samples) - frame) // hop
+    frames = np.lib.stride_tricks.as_strided(
+        samples, shape=(n_frames, frame), strides=(samples.strides[0] * hop, samples.strides[0])
+    ) * np.hanning(frame).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, n=N_FFT)) ** 2
+    log_mel = np.log(power @ _mel_filterbank(sample_rate).T + 1e-10)
+    return log_mel, np.log(power.sum(axis=1) + 1e-10)
+
+
+def calculer_empreinte(audio: Union[bytes, np.ndarray], sample_rate: int = 16000):
+    """
+    Calcule l'empreinte acoustique d'un énoncé.
+
+    Le log-mel est recadré sur la parole (silences de début et de fin
+    retirés), moyenné sur une grille temporelle fixe, centré par bande puis
+    normalisé : deux prononciations proches d'une même commande donnent des
+    empreintes de forte similarité cosinus.
+
+    Args:
+        audio: Audio int16 (bytes ou tableau) ou float32
+        sample_rate: Taux d'échantillonnage
+
+    Returns:
+        Tuple (empreinte float32 normalisée, durée de parole en ms), ou (None, 0)
+    """
+    log_mel, frame_energy = calculer_log_mel(audio, sample_rate)
+    if log_mel is None:
+        return None, 0
+
+    # Recadrer sur la parole
+    voiced = np.nonzero(frame_energy > frame_energy.max() - SILENCE_LOG_DROP)[0]
+    log_mel = log_mel[voiced[0]:voiced[-1] + 1]
+    if len(log_mel) < N_TIME_BINS:
+        return None, 0
+    speech_ms = int(len(log_mel) * HOP_MS)
+
+    pooled = np.stack([chunk.mean(axis=0) for chunk in np.array_split(log_mel, N_TIME_BINS)])
+    pooled -= pooled.mean(axis=0, keepdims=True)
+    vector = pooled.ravel()
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return None, 0
+    return (vector / norm).astype(np.float32), speech_ms
+
+
+def hacher_empreinte(empreinte: np.ndarray, duration_ms: int) -> str:
+    """Hachage d'une empreinte quantifiée et de sa durée (déduplication des entrées)."""
+    quantized = np.clip(np.round(empreinte * 127.0), -127, 127).astype(np.int8)
+    digest = hashlib.sha256(quantized.tobytes())
+    digest.update(int(duration_ms // 50).to_bytes(4, "little"))
+    return digest.hexdigest()
+
+
+class AcousticCache:
+    """
+    Cache persistant empreinte acoustique -> texte.
+
+    Une entrée n'est réutilisée que si sa durée est voisine et que la
+    similarité cosinus des empreintes complètes dépasse le seuil : un simple
+    hachage ne suffit jamais à produire une correspondance.
+    """
+
+    def __init__(self, similarity: float = 0.97, ttl_days: float = 30.0, max_entries: int = 500,
+                 max_duration_s: float = 4.0, sample_rate: int = 16000):
+        """
+        Args:
+            similarity: Similarité cosinus minimale pour réutiliser une entrée
+            ttl_days: Durée de validité des entrées (jours)
+            max_entries: Nombre maximal d'entrées par moteur
+            max_duration_s: Durée maximale des énoncés mis en cache
+            sample_rate: Taux d'échantillonnage par défaut
+        """
+        self.similarity = similarity
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.max_duration_s = max_duration_s
+        self.sample_rate = sample_rate
+        self.enabled = DATABASE_AVAILABLE
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.lookup_time_ms = 0.0
+
+    def configure(self, settings: dict) -> None:
+        """Applique les paramètres stt_cache_* de la configuration STT."""
+        self.enabled = DATABASE_AVAILABLE and bool(settings.get("stt_cache_enabled", True))
+        self.similarity = float(settings.get("stt_cache_similarity", self.similarity))
+        self.ttl_days = float(settings.get("stt_cache_ttl_days", self.ttl_days))
+        self.max_entries = int(settings.get("stt_cache_max_entries", self.max_entries))
+        self.max_duration_s = float(settings.get("stt_cache_max_duration", self.max_duration_s))
+
+    def _min_created_at(self) -> float:
+        return time.time() - self.ttl_days * 86400
+
+    def _eligible(self, samples: np.ndarray, sample_rate: int) -> bool:
+        return self.enabled and 0 < len(samples) <= self.max_duration_s * sample_rate
+
+    def _lookup(self, empreinte: np.ndarray, duration_ms: int, engine: str):
+        """Retourne (id, texte, similarité) de la meilleure entrée, ou None."""
+        tolerance = max(100, int(duration_ms * DURATION_TOLERANCE))
+        candidates = find_stt_cache_candidates(
+            engine, duration_ms - tolerance, duration_ms + tolerance, self._min_created_at()
+        )
+        best = None
+        for entry_id, _, blob, text in candidates:
+            stored = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+            if stored.shape != empreinte.shape:
+                continue
+            score = float(np.dot(stored, empreinte))
+            if score >= self.similarity and (best is None or score > best[2]):
+                best = (entry_id, text, score)
+        return best
+
+    def get(self, audio: Union[bytes, np.ndarray], engine: str, sample_rate: Optional[int] = None) -> Optional[str]:
+        """
+        Recherche le texte d'un énoncé déjà reconnu.
+
+        Args:
+            audio: Audio int16 (bytes ou tableau) ou float32
+            engine: Moteur STT
+            sample_rate: Taux d'échantillonnage (défaut du cache sinon)
+
+        Returns:
+            Texte mis en cache ou None
+        """
+        sample_rate = sample_rate or self.sample_rate
+        samples = _as_float32(audio)
+        if not self._eligible(samples, sample_rate):
+            return None
+
+        start = time.time()
+        try:
+            empreinte, duration_ms = calculer_empreinte(samples, sample_rate)
+            if empreinte is None:
+                return None
+            best = self._lookup(empreinte, duration_ms, engine)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la recherche dans le cache acoustique: {e}")
+            return None
+        finally:
+            self.lookup_time_ms += (time.time() - start) * 1000
+
+        if best is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            update_stt_cache_entry(best[0])
+        except Exception as e:
+            logger.warning(f"Erreur lors de la mise à jour du cache acoustique: {e}")
+        logger.info(f"Cache acoustique ({engine}): '{best[1]}' (similarité {best[2]:.3f})")
+        return best[1]
+
+    def set(self, audio: Union[bytes, np.ndarray], text: str, engine: str, sample_rate: Optional[int] = None) -> None:
+        """
+        Enregistre le texte reconnu pour un énoncé.
+
+        Args:
+            audio: Audio int16 (bytes ou tableau) ou float32
+            text: Texte reconnu
+            engine: Moteur STT
+            sample_rate: Taux d'échantillonnage (défaut du cache sinon)
+        """
+        sample_rate = sample_rate or self.sample_rate
+        samples = _as_float32(audio)
+        if not text or not text.strip() or not self._eligible(samples, sample_rate):
+            return
+
+        try:
+            empreinte, duration_ms = calculer_empreinte(samples, sample_rate)
+            if empreinte is None:
+                return
+            # Un énoncé équivalent déjà présent est mis à jour plutôt que dupliqué
+            best = self._lookup(empreinte, duration_ms, engine)
+            if best is not None:
+                if best[1] != text:
+                    update_stt_cache_entry(best[0], text_content=text)
+                return
+            save_stt_cache_entry(
+                engine, hacher_empreinte(empreinte, duration_ms), duration_ms,
+                empreinte.astype(np.float16).tobytes(), text, self.max_entries
+            )
+            self.stores += 1
+        except Exception as e:
+            logger.warning(f"Erreur lors de l'enregistrement dans le cache acoustique: {e}")
+
+    def purge(self, expired_only: bool = True) -> int:
+        """Supprime les entrées expirées (ou toutes les entrées)."""
+        if not DATABASE_AVAILABLE:
+            return 0
+        return purge_stt_cache(self._min_created_at() if expired_only else None)
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs du cache."""
+        lookups = self.hits + self.misses
+        try:
+            entries = get_stt_cache_count() if DATABASE_AVAILABLE else 0
+        except Exception:
+            entries = 0
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "avg_lookup_ms": self.lookup_time_ms / lookups if lookups else 0.0,
+        }
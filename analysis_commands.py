@@ -11,6 +11,7 @@ from tts_module import ajouter_texte_a_lire
 from text_processing import ecrire_texte_avec_accents
 from config import (set_translation_mode, get_translation_mode, get_translation_text,
                    get_target_language, append_translation_text, get_mistral_api_key)
+from command_dispatch import declencheurs
 
 # Constantes API
 MISTRAL_API_URL = "https://api.mistral.ai/v1/chat/completions"
@@ -93,73 +94,75 @@ def appeler_api_mistral(prompt):
     except requests.exceptions.RequestException as e:
         return f"Erreur lors de la communication avec l'API Mistral: {str(e)}"
 
+# Expressions déclenchant une commande d'analyse (questions et demandes d'explication)
+DECLENCHEURS_ANALYSE = [
+    # Commandes directes
+    r"^analyse\s+",
+    r"^explique[\s-]moi\s+",
+    r"^dis[\s-]moi\s+",
+    r"^parle[\s-]moi de\s+",
+    r"^raconte[\s-]moi\s+",
+    r"^informe[\s-]moi sur\s+",
+    r"^renseigne[\s-]moi sur\s+",
+    r"^donne[\s-]moi des infos sur\s+",
+    r"^je veux savoir\s+",
+    r"^j'aimerais savoir\s+",
+    r"^peux-tu me dire\s+",
+    r"^pourrais-tu me dire\s+",
+    r"^peux-tu m'expliquer\s+",
+    r"^pourrais-tu m'expliquer\s+",
+    
+    # Pronoms et adverbes interrogatifs
+    r"^qu['e]est[\s-]ce que\s+",
+    r"^qu['e]est[\s-]ce qu['e]\s+",
+    r"^qui est\s+",
+    r"^qui sont\s+",
+    r"^comment\s+",
+    r"^pourquoi\s+",
+    r"^quand\s+",
+    r"^où\s+",
+    r"^d'où\s+",
+    r"^lequel\s+",
+    r"^laquelle\s+",
+    r"^lesquels\s+",
+    r"^lesquelles\s+",
+    r"^quel\s+",
+    r"^quelle\s+",
+    r"^quels\s+",
+    r"^quelles\s+",
+    r"^combien\s+",
+    
+    # Questions indirectes
+    r"^je me demande\s+",
+    r"^je voudrais savoir\s+",
+    r"^j'aimerais comprendre\s+",
+    r"^peux-tu m'aider à comprendre\s+",
+    r"^aide-moi à comprendre\s+",
+    
+    # Demandes d'information spécifiques
+    r"^définis\s+",
+    r"^défini\s+",
+    r"^définition de\s+",
+    r"^qu'est-ce qu'un\s+",
+    r"^qu'est-ce qu'une\s+",
+    r"^c'est quoi\s+",
+    r"^signification de\s+",
+    r"^sens de\s+",
+    r"^explique le concept de\s+",
+    r"^explique la notion de\s+"
+]
+
 def est_commande_analyse(texte):
     """
     Détermine si le texte est une commande d'analyse
     """
-    declencheurs = [
-        # Commandes directes
-        r"^analyse\s+",
-        r"^explique[\s-]moi\s+",
-        r"^dis[\s-]moi\s+",
-        r"^parle[\s-]moi de\s+",
-        r"^raconte[\s-]moi\s+",
-        r"^informe[\s-]moi sur\s+",
-        r"^renseigne[\s-]moi sur\s+",
-        r"^donne[\s-]moi des infos sur\s+",
-        r"^je veux savoir\s+",
-        r"^j'aimerais savoir\s+",
-        r"^peux-tu me dire\s+",
-        r"^pourrais-tu me dire\s+",
-        r"^peux-tu m'expliquer\s+",
-        r"^pourrais-tu m'expliquer\s+",
-        
-        # Pronoms et adverbes interrogatifs
-        r"^qu['e]est[\s-]ce que\s+",
-        r"^qu['e]est[\s-]ce qu['e]\s+",
-        r"^qui est\s+",
-        r"^qui sont\s+",
-        r"^comment\s+",
-        r"^pourquoi\s+",
-        r"^quand\s+",
-        r"^où\s+",
-        r"^d'où\s+",
-        r"^lequel\s+",
-        r"^laquelle\s+",
-        r"^lesquels\s+",
-        r"^lesquelles\s+",
-        r"^quel\s+",
-        r"^quelle\s+",
-        r"^quels\s+",
-        r"^quelles\s+",
-        r"^combien\s+",
-        
-        # Questions indirectes
-        r"^je me demande\s+",
-        r"^je voudrais savoir\s+",
-        r"^j'aimerais comprendre\s+",
-        r"^peux-tu m'aider à comprendre\s+",
-        r"^aide-moi à comprendre\s+",
-        
-        # Demandes d'information spécifiques
-        r"^définis\s+",
-        r"^défini\s+",
-        r"^définition de\s+",
-        r"^qu'est-ce qu'un\s+",
-        r"^qu'est-ce qu'une\s+",
-        r"^c'est quoi\s+",
-        r"^signification de\s+",
-        r"^sens de\s+",
-        r"^explique le concept de\s+",
-        r"^explique la notion de\s+"
-    ]
-    
-    for pattern in declencheurs:
+    for pattern in DECLENCHEURS_ANALYSE:
         if re.search(pattern, texte.lower()):
             return True
     
     return False
 
+@declencheurs(motifs=DECLENCHEURS_ANALYSE)
 def executer_commande_analyse(texte):
     """
     Exécute une commande d'analyse en utilisant l'API Mistral
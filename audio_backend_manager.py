@@ -137,13 +137,17 @@ class AudioBackendManager:
         import sounddevice as sd
         import numpy as np
 
+        from audio_capture import CaptureRingBuffer
+
         class SoundDeviceMicrophone:
             def __init__(self):
                 self.sample_rate = 16000
                 self.channels = 1
                 self.dtype = np.int16
                 self.recording = False
-                self.audio_queue = []
+                # Le callback écrit dans un tampon préalloué, sans liste ni copie par bloc
+                self.capture = CaptureRingBuffer(self.sample_rate, self.channels, name="backend_sounddevice")
+                self.last_capture_time = None
 
             def __enter__(self):
                 return self
@@ -153,17 +157,13 @@ class AudioBackendManager:
 
             def start_recording(self):
                 self.recording = True
-                self.audio_queue = []
-
-                def audio_callback(indata, frames, time, status):
-                    if self.recording:
-                        self.audio_queue.append(indata.copy())
+                self.capture.lire_disponible()
 
                 self.stream = sd.InputStream(
                     samplerate=self.sample_rate,
                     channels=self.channels,
                     dtype=self.dtype,
-                    callback=audio_callback
+                    callback=self.capture.callback
                 )
                 self.stream.start()
 
@@ -174,11 +174,8 @@ class AudioBackendManager:
                 self.recording = False
 
             def read_audio(self):
-                if self.audio_queue:
-                    audio_data = np.concatenate(self.audio_queue)
-                    self.audio_queue = []
-                    return audio_data.tobytes()
-                return b''
+                audio_data, self.last_capture_time = self.capture.lire_disponible()
+                return audio_data.tobytes()
 
         recognizer = sr.Recognizer()
         microphone = SoundDeviceMicrophone()
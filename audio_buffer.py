@@ -0,0 +1,316 @@
+"""
+Tampon circulaire préalloué pour l'accumulation des énoncés audio
+Évite les listes de chunks bytes, les b''.join et les conversions répétées
+en float32 dans les boucles d'écoute de Whisp Assistant
+"""
+import logging
+from typing import Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Facteur de conversion int16 -> float32 normalisé
+INT16_SCALE = 1.0 / 32768.0
+
+
+class AudioRingBuffer:
+    """
+    Tampon circulaire int16/float32 réutilisable d'un énoncé à l'autre.
+
+    Chaque chunk est écrit une seule fois dans deux tableaux préalloués
+    (int16 pour la sauvegarde, float32 normalisé pour le décodeur). La somme
+    des carrés est tenue à jour à chaque ajout, ce qui rend le calcul de
+    l'énergie globale et de l'énergie de fin d'énoncé immédiat.
+
+    Quand la capacité est dépassée, les chunks les plus anciens sont
+    écrasés (comptés dans overflow_chunks).
+    """
+
+    def __init__(self, capacity_samples: int, max_chunks: int = 4096):
+        """
+        Args:
+            capacity_samples: Nombre maximal d'échantillons conservés
+            max_chunks: Nombre maximal de chunks suivis
+        """
+        self.capacity = int(capacity_samples)
+        self.max_chunks = int(max_chunks)
+
+        self._int16 = np.zeros(self.capacity, dtype=np.int16)
+        self._float32 = np.zeros(self.capacity, dtype=np.float32)
+        # Tampons de travail pour remettre les données à plat sans allocation
+        self._int16_scratch = np.zeros(self.capacity, dtype=np.int16)
+        self._float32_scratch = np.zeros(self.capacity, dtype=np.float32)
+
+        # Métadonnées par chunk (circulaires également)
+        self._chunk_len = np.zeros(self.max_chunks, dtype=np.int64)
+        self._chunk_sumsq = np.zeros(self.max_chunks, dtype=np.float64)
+
+        self.overflow_chunks = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Vide le tampon sans libérer la mémoire."""
+        self._head = 0          # Index du premier échantillon
+        self._length = 0        # Nombre d'échantillons valides
+        self._chunk_head = 0    # Index du premier chunk
+        self._chunk_count = 0   # Nombre de chunks valides
+        self._sumsq = 0.0       # Somme des carrés (valeurs normalisées)
+
+    @property
+    def num_samples(self) -> int:
+        """Nombre d'échantillons actuellement stockés."""
+        return self._length
+
+    @property
+    def num_chunks(self) -> int:
+        """Nombre de chunks actuellement stockés."""
+        return self._chunk_count
+
+    def duration(self, sample_rate: int) -> float:
+        """Durée de l'audio stocké en secondes."""
+        return self._length / float(sample_rate)
+
+    @staticmethod
+    def _as_int16(chunk: Union[bytes, bytearray, memoryview, np.ndarray]) -> np.ndarray:
+        """Vue int16 à plat d'un chunk, sans copie quand c'est possible."""
+        if isinstance(chunk, np.ndarray):
+            if chunk.dtype != np.int16:
+                if np.issubdtype(chunk.dtype, np.floating):
+                    return (np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16).reshape(-1)
+                return chunk.astype(np.int16).reshape(-1)
+            return chunk.reshape(-1)
+        return np.frombuffer(chunk, dtype=np.int16)
+
+    def _drop_oldest_chunk(self) -> None:
+        """Retire le chunk le plus ancien."""
+        n = int(self._chunk_len[self._chunk_head])
+        self._sumsq -= self._chunk_sumsq[self._chunk_head]
+        self._head = (self._head + n) % self.capacity
+        self._length -= n
+        self._chunk_head = (self._chunk_head + 1) % self.max_chunks
+        self._chunk_count -= 1
+        self.overflow_chunks += 1
+        if self._chunk_count == 0:
+            self._sumsq = 0.0
+
+    def append(self, chunk: Union[bytes, bytearray, memoryview, np.ndarray]) -> float:
+        """
+        Ajoute un chunk au tampon.
+
+        Args:
+            chunk: Chunk audio int16 (bytes ou numpy array)
+
+        Returns:
+            Énergie RMS normalisée du chunk ajouté
+        """
+        samples = self._as_int16(chunk)
+        n = len(samples)
+        if n == 0:
+            return 0.0
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        # Libérer de la place si nécessaire
+        while self._chunk_count > 0 and (self._length + n > self.capacity or self._chunk_count >= self.max_chunks):
+            self._drop_oldest_chunk()
+
+        # Écriture (éventuellement en deux morceaux si on passe la fin du tableau)
+        start = (self._head + self._length) % self.capacity
+        first = min(n, self.capacity - start)
+        self._int16[start:start + first] = samples[:first]
+        np.multiply(samples[:first], INT16_SCALE, out=self._float32[start:start + first], casting='unsafe')
+        if first < n:
+            rest = n - first
+            self._int16[:rest] = samples[first:]
+            np.multiply(samples[first:], INT16_SCALE, out=self._float32[:rest], casting='unsafe')
+
+        # Énergie du chunk calculée sur la région déjà convertie
+        if first == n:
+            written = self._float32[start:start + n]
+            chunk_sumsq = float(np.dot(written, written))
+        else:
+            part1 = self._float32[start:]
+            part2 = self._float32[:n - first]
+            chunk_sumsq = float(np.dot(part1, part1) + np.dot(part2, part2))
+
+        idx = (self._chunk_head + self._chunk_count) % self.max_chunks
+        self._chunk_len[idx] = n
+        self._chunk_sumsq[idx] = chunk_sumsq
+        self._chunk_count += 1
+        self._length += n
+        self._sumsq += chunk_sumsq
+
+        return float(np.sqrt(chunk_sumsq / n))
+
+    def energy(self) -> float:
+        """Énergie RMS normalisée de tout l'audio stocké."""
+        if self._length == 0:
+            return 0.0
+        return float(np.sqrt(max(self._sumsq, 0.0) / self._length))
+
+    def tail_energy(self, n_chunks: int) -> float:
+        """
+        Énergie RMS normalisée des n derniers chunks.
+
+        Args:
+            n_chunks: Nombre de chunks de fin à considérer
+        """
+        n_chunks = min(int(n_chunks), self._chunk_count)
+        if n_chunks <= 0:
+            return 0.0
+        total_sumsq = 0.0
+        total_len = 0
+        for i in range(self._chunk_count - n_chunks, self._chunk_count):
+            idx = (self._chunk_head + i) % self.max_chunks
+            total_sumsq += self._chunk_sumsq[idx]
+            total_len += self._chunk_len[idx]
+        if total_len == 0:
+            return 0.0
+        return float(np.sqrt(total_sumsq / total_len))
+
+    def _linearize(self) -> None:
+        """Remet les données à plat en début de tableau (sans allocation)."""
+        if self._head == 0:
+            return
+        n = self._length
+        end = self._head + n
+        if end <= self.capacity:
+            # Données contiguës : simple décalage
+            self._int16[:n] = self._int16[self._head:end]
+            self._float32[:n] = self._float32[self._head:end]
+        else:
+            first = self.capacity - self._head
+            self._int16_scratch[:first] = self._int16[self._head:]
+            self._int16_scratch[first:n] = self._int16[:n - first]
+            self._float32_scratch[:first] = self._float32[self._head:]
+            self._float32_scratch[first:n] = self._float32[:n - first]
+            self._int16, self._int16_scratch = self._int16_scratch, self._int16
+            self._float32, self._float32_scratch = self._float32_scratch, self._float32
+        self._head = 0
+
+    def float32_view(self) -> np.ndarray:
+        """
+        Vue float32 normalisée ([-1, 1]) de l'audio stocké, prête pour le décodeur.
+
+        La vue reste valide jusqu'au prochain append() ou reset().
+        """
+        self._linearize()
+        return self._float32[:self._length]
+
+    def int16_view(self) -> np.ndarray:
+        """Vue int16 de l'audio stocké (pour la sauvegarde WAV)."""
+        self._linearize()
+        return self._int16[:self._length]
+
+    def to_bytes(self) -> bytes:
+        """Copie de l'audio stocké en bytes PCM 16 bits."""
+        return self.int16_view().tobytes()
+
+    def quietest_chunk(self, window_chunks: int) -> int:
+        """
+        Index (depuis le début) du chunk le moins énergétique parmi les derniers.
+
+        Args:
+            window_chunks: Nombre de chunks de fin à examiner
+
+        Returns:
+            Index du chunk, ou -1 si le tampon est vide
+        """
+        if self._chunk_count == 0:
+            return -1
+        first = max(0, self._chunk_count - int(window_chunks))
+        best_index = first
+        best_energy = None
+        for i in range(first, self._chunk_count):
+            idx = (self._chunk_head + i) % self.max_chunks
+            length = self._chunk_len[idx]
+            energy = self._chunk_sumsq[idx] / length if length else 0.0
+            if best_energy is None or energy < best_energy:
+                best_energy = energy
+                best_index = i
+        return best_index
+
+    def pop_head(self, n_chunks: int, overlap_chunks: int = 0) -> np.ndarray:
+        """
+        Extrait les n premiers chunks (copie float32) et les retire du tampon.
+
+        Les overlap_chunks derniers chunks extraits restent en tête du tampon,
+        pour que le segment suivant recouvre légèrement le précédent.
+
+        Args:
+            n_chunks: Nombre de chunks à extraire
+            overlap_chunks: Nombre de chunks extraits à conserver
+
+        Returns:
+            Copie float32 de l'audio extrait
+        """
+        n_chunks = min(max(0, int(n_chunks)), self._chunk_count)
+        overlap_chunks = min(max(0, int(overlap_chunks)), n_chunks)
+        if n_chunks == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        self._linearize()
+
+        head_samples = 0
+        remove_samples = 0
+        remove_sumsq = 0.0
+        remove = n_chunks - overlap_chunks
+        for i in range(n_chunks):
+            idx = (self._chunk_head + i) % self.max_chunks
+            head_samples += int(self._chunk_len[idx])
+            if i < remove:
+                remove_samples += int(self._chunk_len[idx])
+                remove_sumsq += self._chunk_sumsq[idx]
+
+        segment = self._float32[:head_samples].copy()
+
+        if remove_samples:
+            remaining = self._length - remove_samples
+            self._int16[:remaining] = self._int16[remove_samples:self._length]
+            self._float32[:remaining] = self._float32[remove_samples:self._length]
+            self._length = remaining
+            self._sumsq = max(self._sumsq - remove_sumsq, 0.0)
+            self._chunk_head = (self._chunk_head + remove) % self.max_chunks
+            self._chunk_count -= remove
+
+        return segment
+
+    def keep_chunks(self, head_chunks: int, tail_chunks: int = 0) -> None:
+        """
+        Ne conserve que les premiers et derniers chunks (troncature en place).
+
+        Args:
+            head_chunks: Nombre de chunks à garder au début
+            tail_chunks: Nombre de chunks à garder à la fin
+        """
+        head_chunks = max(0, int(head_chunks))
+        tail_chunks = max(0, int(tail_chunks))
+        if head_chunks + tail_chunks >= self._chunk_count:
+            return
+
+        self._linearize()
+
+        lengths = [int(self._chunk_len[(self._chunk_head + i) % self.max_chunks]) for i in range(self._chunk_count)]
+        sums = [float(self._chunk_sumsq[(self._chunk_head + i) % self.max_chunks]) for i in range(self._chunk_count)]
+
+        head_samples = sum(lengths[:head_chunks])
+        tail_lengths = lengths[self._chunk_count - tail_chunks:] if tail_chunks else []
+        tail_sums = sums[self._chunk_count - tail_chunks:] if tail_chunks else []
+        tail_samples = sum(tail_lengths)
+
+        if tail_samples:
+            src = self._length - tail_samples
+            self._int16[head_samples:head_samples + tail_samples] = self._int16[src:self._length]
+            self._float32[head_samples:head_samples + tail_samples] = self._float32[src:self._length]
+
+        kept_lengths = lengths[:head_chunks] + tail_lengths
+        kept_sums = sums[:head_chunks] + tail_sums
+        self._chunk_head = 0
+        self._chunk_count = len(kept_lengths)
+        for i, (n, s) in enumerate(zip(kept_lengths, kept_sums)):
+            self._chunk_len[i] = n
+            self._chunk_sumsq[i] = s
+        self._length = head_samples + tail_samples
+        self._sumsq = float(sum(kept_sums))
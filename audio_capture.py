@@ -0,0 +1,189 @@
+"""
+Capture audio en mode callback pour Whisp Assistant
+Le callback PortAudio (sounddevice) copie chaque bloc dans un tampon circulaire
+préalloué ; le thread consommateur lit ce tampon sans verrou. La capture ne
+dépend plus de l'ordonnancement du thread consommateur : un processus occupé
+retarde la lecture, pas l'acquisition
+"""
+import time
+import logging
+import threading
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tampons de capture actifs, par nom (pour les statistiques)
+_captures: Dict[str, "CaptureRingBuffer"] = {}
+_captures_lock = threading.Lock()
+
+# Intervalle d'attente du consommateur, en fraction de la durée demandée
+POLL_FRACTION = 0.25
+
+
+class CaptureRingBuffer:
+    """
+    Tampon circulaire à un producteur (callback PortAudio) et un consommateur.
+
+    Le producteur n'avance que le compteur d'écriture, le consommateur que le
+    compteur de lecture : aucun verrou n'est nécessaire. Le callback se limite
+    à une ou deux copies dans le tableau préalloué et à la mise à jour des
+    compteurs, sans allocation de tableau ni de liste.
+
+    Si le consommateur prend plus de capacity_s de retard, les échantillons les
+    plus anciens sont écrasés (overruns). Une lecture qui expire avant d'avoir
+    reçu assez d'échantillons est complétée par du silence (underruns).
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, capacity_s: float = 2.0,
+                 name: str = "capture"):
+        """
+        Args:
+            sample_rate: Taux d'échantillonnage
+            channels: Nombre de canaux du flux (seul le premier est conservé)
+            capacity_s: Durée conservée en attendant le consommateur
+            name: Nom du tampon
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.capacity = int(capacity_s * sample_rate)
+        self.name = name
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+
+        # Compteurs monotones (en échantillons) : seul le callback écrit _written
+        self._written = 0
+        self._read = 0
+        # Horodatage (time.monotonic) de la fin du dernier bloc reçu
+        self._stamp = np.zeros(2, dtype=np.float64)
+
+        self.blocks = 0
+        self.overruns = 0
+        self.overrun_samples = 0
+        self.underruns = 0
+        self.device_overflows = 0
+        self.device_underflows = 0
+        self.reads = 0
+        self.timed_reads = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+
+        with _captures_lock:
+            _captures[self.name] = self
+
+    def callback(self, indata, frames, time_info, status) -> None:
+        """Callback PortAudio : copie du bloc dans le tampon."""
+        if status:
+            if status.input_overflow:
+                self.device_overflows += 1
+            if status.input_underflow:
+                self.device_underflows += 1
+
+        source = indata[:, 0] if indata.ndim > 1 else indata
+        written = self._written
+        if written + frames - self._read > self.capacity:
+            self.overruns += 1
+            self.overrun_samples += written + frames - self._read - self.capacity
+
+        start = written % self.capacity
+        first = min(frames, self.capacity - start)
+        self._data[start:start + first] = source[:first]
+        if first < frames:
+            self._data[:frames - first] = source[first:frames]
+
+        self._stamp[0] = written + frames
+        self._stamp[1] = time.monotonic()
+        self.blocks += 1
+        # Publier les échantillons en dernier : le consommateur ne lit que des données copiées
+        self._written = written + frames
+
+    def disponible(self) -> int:
+        """Nombre d'échantillons en attente de lecture."""
+        return min(self._written - self._read, self.capacity)
+
+    def horodatage(self, position: int) -> float:
+        """Instant de capture (time.monotonic) de l'échantillon à la position donnée."""
+        return self._stamp[1] - (self._stamp[0] - position) / self.sample_rate
+
+    def lire(self, n_samples: int, timeout: float = 1.0) -> tuple:
+        """
+        Lit n_samples échantillons, en attendant qu'ils soient capturés.
+
+        Args:
+            n_samples: Nombre d'échantillons demandés
+            timeout: Attente maximale en secondes
+
+        Returns:
+            Tuple (audio int16, instant de capture du premier échantillon)
+        """
+        deadline = time.monotonic() + timeout
+        poll = max(0.001, POLL_FRACTION * n_samples / self.sample_rate)
+        while self._written - self._read < n_samples:
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(poll)
+        return self._consommer(n_samples, pad=True)
+
+    def lire_disponible(self) -> tuple:
+        """Lit tous les échantillons en attente, sans attendre."""
+        return self._consommer(self.disponible(), pad=False)
+
+    def _consommer(self, n_samples: int, pad: bool) -> tuple:
+        written = self._written
+        # Données écrasées pendant le retard du consommateur
+        if written - self._read > self.capacity:
+            self._read = written - self.capacity
+
+        available = min(written - self._read, n_samples)
+        out = np.zeros(n_samples if pad else available, dtype=np.int16)
+        start = self._read % self.capacity
+        first = min(available, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        if first < available:
+            out[first:available] = self._data[:available - first]
+
+        position = self._read
+        self._read += available
+        self.reads += 1
+        if pad and available < n_samples:
+            self.underruns += 1
+
+        if available:
+            capture_time = self.horodatage(position)
+            latency_ms = (time.monotonic() - self.horodatage(position + available)) * 1000
+            self.timed_reads += 1
+            self.latency_total_ms += latency_ms
+            self.latency_max_ms = max(self.latency_max_ms, latency_ms)
+        else:
+            capture_time = time.monotonic()
+        return out, capture_time
+
+    def fermer(self) -> None:
+        """Retire le tampon des statistiques."""
+        with _captures_lock:
+            if _captures.get(self.name) is self:
+                del _captures[self.name]
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de la capture."""
+        return {
+            "sample_rate": self.sample_rate,
+            "capacity_s": self.capacity / self.sample_rate,
+            "blocks": self.blocks,
+            "pending_ms": self.disponible() * 1000.0 / self.sample_rate,
+            "overruns": self.overruns,
+            "overrun_samples": self.overrun_samples,
+            "underruns": self.underruns,
+            "device_overflows": self.device_overflows,
+            "device_underflows": self.device_underflows,
+            "reads": self.reads,
+            "avg_latency_ms": self.latency_total_ms / self.timed_reads if self.timed_reads else 0.0,
+            "max_latency_ms": self.latency_max_ms,
+        }
+
+
+def get_capture_stats() -> dict:
+    """Retourne les statistiques de tous les tampons de capture actifs."""
+    with _captures_lock:
+        captures = dict(_captures)
+    return {name: capture.get_stats() for name, capture in captures.items()}
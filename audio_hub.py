@@ -0,0 +1,423 @@
+"""
+Hub audio de Whisp Assistant : un seul flux micro partagé par plusieurs consommateurs
+Le périphérique est ouvert et calibré une seule fois ; chaque frame capturée est
+horodatée puis distribuée aux abonnés (moteur STT actif, vumètre, enregistreur,
+moteur fantôme pour l'évaluation A/B). Chaque abonné a sa propre file bornée et
+sa politique d'abandon : un consommateur lent ne bloque jamais la capture.
+Le périphérique peut être ouvert à son taux natif : chaque abonné reçoit alors
+le flux converti à son propre taux, dans son propre thread
+"""
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+try:
+    from whisp_assistant.resampling import PolyphaseResampler
+except ImportError:
+    from resampling import PolyphaseResampler
+
+logger = logging.getLogger(__name__)
+
+# Taille des frames lues sur le périphérique (en échantillons)
+HUB_CHUNK_SIZE = 512
+# Politiques d'abandon lorsque la file d'un abonné est pleine
+DROP_POLICIES = ("drop_oldest", "drop_newest")
+
+# Hubs actifs, par taux d'échantillonnage
+_hubs: Dict[int, "AudioHub"] = {}
+_hubs_lock = threading.Lock()
+
+
+class Frame:
+    """Frame audio horodatée."""
+
+    __slots__ = ("data", "timestamp", "sequence")
+
+    def __init__(self, data: bytes, timestamp: float, sequence: int):
+        self.data = data
+        self.timestamp = timestamp
+        self.sequence = sequence
+
+
+class Subscriber:
+    """
+    Abonné au hub audio, avec sa file bornée.
+
+    read() reproduit l'interface d'un flux PyAudio (nombre d'échantillons
+    demandé, bytes int16 en retour) : un abonné peut remplacer audio_stream
+    dans les boucles d'écoute existantes.
+
+    Si sample_rate diffère du taux du hub, les frames sont converties à la
+    lecture (convertisseur polyphase à état propre à l'abonné).
+    """
+
+    def __init__(self, hub: "AudioHub", name: str, max_frames: int = 256, policy: str = "drop_oldest",
+                 sample_rate: Optional[int] = None):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Politique d'abandon inconnue: {policy}")
+        self.hub = hub
+        self.name = name
+        self.policy = policy
+        self.sample_rate = sample_rate or hub.sample_rate
+        self.resampler = None
+        if self.sample_rate != hub.sample_rate:
+            self.resampler = PolyphaseResampler(hub.sample_rate, self.sample_rate)
+        self.frames = queue.Queue(maxsize=max_frames)
+        self._pending = b""
+        self.last_timestamp = None
+        self.closed = False
+
+        self.delivered = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+
+    def _push(self, frame: Frame) -> None:
+        """Dépose une frame (appelé par le thread de capture, jamais bloquant)."""
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.frames.put_nowait(frame)
+            except queue.Full:
+                return
+        self.delivered += 1
+        depth = self.frames.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def read_frame(self, timeout: float = 0.1) -> Optional[Frame]:
+        """Prochaine frame horodatée, ou None si aucune frame n'arrive avant le délai."""
+        try:
+            frame = self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.last_timestamp = frame.timestamp
+        if self.resampler is not None:
+            return Frame(self.resampler.process_int16(frame.data), frame.timestamp, frame.sequence)
+        return frame
+
+    def read(self, n_samples: int, exception_on_overflow: bool = False) -> bytes:
+        """
+        Lit n_samples échantillons int16, en regroupant ou découpant les frames du hub.
+
+        Lève RuntimeError si le hub est arrêté ou l'abonné désabonné.
+        """
+        needed = n_samples * 2
+        parts = [self._pending]
+        size = len(self._pending)
+        while size < needed:
+            if self.closed or not self.hub.running:
+                raise RuntimeError("Abonnement au hub audio fermé")
+            frame = self.read_frame(timeout=0.5)
+            if frame is None:
+                continue
+            parts.append(frame.data)
+            size += len(frame.data)
+        data = b"".join(parts)
+        self._pending = data[needed:]
+        return data[:needed]
+
+    def close(self) -> None:
+        """Se désabonne du hub."""
+        self.closed = True
+        self.hub.unsubscribe(self.name)
+
+    def get_stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "queue_depth": self.frames.qsize(),
+            "queue_capacity": self.frames.maxsize,
+            "max_queue_depth": self.max_queue_depth,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "resampling": self.resampler.get_stats() if self.resampler is not None else None,
+        }
+
+
+class HubMicrophone:
+    """
+    Microphone adossé au hub, utilisable à la place de sr.Microphone.
+
+    Entrer dans le contexte abonne le moteur au hub ; en sortir le désabonne
+    sans fermer le périphérique, qui reste ouvert pour le moteur suivant.
+    """
+
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, hub: "AudioHub", name: str, max_frames: int = 256, sample_rate: Optional[int] = None):
+        self.hub = hub
+        self.name = name
+        self.max_frames = max_frames
+        self.SAMPLE_RATE = sample_rate or hub.sample_rate
+        self.CHUNK = HUB_CHUNK_SIZE
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = self.hub.subscribe(self.name, max_frames=self.max_frames, sample_rate=self.SAMPLE_RATE)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+class LevelMeter:
+    """Vumètre abonné au hub : niveaux RMS et crête en dBFS."""
+
+    def __init__(self, hub: "AudioHub", name: str = "level_meter", decay: float = 0.9):
+        self.subscriber = hub.subscribe(name, max_frames=8, policy="drop_oldest")
+        self.decay = decay
+        self.rms_dbfs = -96.0
+        self.peak_dbfs = -96.0
+        self._thread = threading.Thread(target=self._loop, daemon=True, name=f"{name}_thread")
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while self.subscriber.hub.running:
+            frame = self.subscriber.read_frame(timeout=0.5)
+            if frame is None:
+                continue
+            samples = np.frombuffer(frame.data, dtype=np.int16).astype(np.float32) / 32768.0
+            if not len(samples):
+                continue
+            rms = 20 * np.log10(max(float(np.sqrt(np.mean(samples * samples))), 1e-5))
+            peak = 20 * np.log10(max(float(np.abs(samples).max()), 1e-5))
+            self.rms_dbfs = rms
+            # La crête redescend progressivement pour rester lisible
+            self.peak_dbfs = max(peak, self.peak_dbfs * self.decay + peak * (1 - self.decay))
+
+    def get_stats(self) -> dict:
+        return {"rms_dbfs": round(self.rms_dbfs, 1), "peak_dbfs": round(self.peak_dbfs, 1)}
+
+
+class AudioHub:
+    """
+    Capture unique du microphone, distribuée aux abonnés.
+
+    Le périphérique est ouvert au premier abonnement et reste ouvert jusqu'à
+    stop() : changer de moteur STT ne rouvre ni ne recalibre le micro.
+    """
+
+    def __init__(self, open_func: Callable, sample_rate: int = 16000, chunk_size: int = HUB_CHUNK_SIZE):
+        """
+        Args:
+            open_func: Fonction créant le microphone (context manager exposant stream.read)
+            sample_rate: Taux d'échantillonnage
+            chunk_size: Échantillons lus par frame
+        """
+        self.open_func = open_func
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.running = False
+        # Seuil d'énergie mesuré au premier calibrage, réutilisé par les moteurs suivants
+        self.energy_threshold = None
+
+        self._subscribers: Dict[str, Subscriber] = {}
+        # Copie lue par le thread de capture sans verrou, remplacée à chaque (dés)abonnement
+        self._fanout = ()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._microphone = None
+        self.level_meter: Optional[LevelMeter] = None
+
+        self.frames_captured = 0
+        self.capture_errors = 0
+        self.opened_at = 0.0
+
+    def start(self) -> None:
+        """Ouvre le périphérique et démarre le thread de capture."""
+        with self._lock:
+            if self.running:
+                return
+            self._microphone = self.open_func()
+            if self._microphone is None:
+                raise RuntimeError("Aucun microphone disponible pour le hub audio")
+            stream = self._microphone.__enter__().stream
+            self.running = True
+            self.opened_at = time.time()
+            self._thread = threading.Thread(target=self._capture_loop, args=(stream,), daemon=True,
+                                            name=f"audio_hub_{self.sample_rate}")
+            self._thread.start()
+        self.level_meter = LevelMeter(self)
+        logger.info(f"Hub audio démarré ({self.sample_rate} Hz)")
+
+    def _capture_loop(self, stream) -> None:
+        sequence = 0
+        while self.running:
+            try:
+                data = stream.read(self.chunk_size)
+            except Exception as e:
+                self.capture_errors += 1
+                if not self.running:
+                    break
+                logger.warning(f"Erreur de capture du hub audio: {e}")
+                time.sleep(0.01)
+                continue
+
+            frame = Frame(bytes(data), time.monotonic(), sequence)
+            sequence += 1
+            self.frames_captured += 1
+            for subscriber in self._fanout:
+                subscriber._push(frame)
+
+    def subscribe(self, name: str, max_frames: int = 256, policy: str = "drop_oldest",
+                  sample_rate: Optional[int] = None) -> Subscriber:
+        """
+        Abonne un consommateur (démarre le hub si nécessaire).
+
+        Args:
+            name: Nom unique de l'abonné (remplace un abonné de même nom)
+            max_frames: Capacité de sa file
+            policy: drop_oldest (temps réel) ou drop_newest (enregistrement contigu)
+            sample_rate: Taux voulu par l'abonné (taux du hub par défaut)
+
+        Returns:
+            Subscriber
+        """
+        if not self.running:
+            self.start()
+        subscriber = Subscriber(self, name, max_frames, policy, sample_rate)
+        with self._lock:
+            self._subscribers[name] = subscriber
+            self._fanout = tuple(self._subscribers.values())
+        return subscriber
+
+    def unsubscribe(self, name: str) -> None:
+        with self._lock:
+            self._subscribers.pop(name, None)
+            self._fanout = tuple(self._subscribers.values())
+
+    def microphone(self, name: str, max_frames: int = 256, sample_rate: Optional[int] = None) -> HubMicrophone:
+        """Microphone compatible sr.Microphone pour un moteur STT, au taux demandé."""
+        return HubMicrophone(self, name, max_frames, sample_rate)
+
+    def stop(self) -> None:
+        """Arrête la capture et ferme le périphérique."""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            self._subscribers.clear()
+            self._fanout = ()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        try:
+            self._microphone.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la fermeture du microphone du hub: {e}")
+        self._microphone = None
+        self.level_meter = None
+
+    def get_stats(self) -> dict:
+        """Retourne l'état du hub et de ses abonnés."""
+        with self._lock:
+            subscribers = dict(self._subscribers)
+        return {
+            "running": self.running,
+            "sample_rate": self.sample_rate,
+            "frames_captured": self.frames_captured,
+            "capture_errors": self.capture_errors,
+            "calibrated": self.energy_threshold is not None,
+            "uptime": time.time() - self.opened_at if self.running else 0.0,
+            "levels": self.level_meter.get_stats() if self.level_meter is not None else None,
+            "subscribers": {name: subscriber.get_stats() for name, subscriber in subscribers.items()},
+        }
+
+
+def _ajuster_sur_hub(recognizer, source: HubMicrophone, duration: float) -> None:
+    """
+    Ajuste le seuil d'énergie sur les frames du hub.
+
+    Reprend le calcul de Recognizer.adjust_for_ambient_noise, dont l'assertion
+    sur sr.AudioSource refuse un HubMicrophone.
+    """
+    seconds_per_buffer = source.CHUNK / source.SAMPLE_RATE
+    damping = getattr(recognizer, "dynamic_energy_adjustment_damping", 0.15) ** seconds_per_buffer
+    ratio = getattr(recognizer, "dynamic_energy_ratio", 1.5)
+    elapsed = 0.0
+    while elapsed < duration:
+        samples = np.frombuffer(source.stream.read(source.CHUNK), dtype=np.int16).astype(np.float32)
+        elapsed += seconds_per_buffer
+        energy = float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+        recognizer.energy_threshold = recognizer.energy_threshold * damping + energy * ratio * (1 - damping)
+
+
+def calibrer_microphone(recognizer, source, duration: float = 1.0) -> None:
+    """
+    Calibre le seuil d'énergie du recognizer.
+
+    Avec un microphone du hub, seul le premier calibrage écoute le bruit
+    ambiant ; les suivants reprennent le seuil mesuré. Un échec de calibrage
+    n'empêche pas l'écoute : le seuil courant est conservé.
+    """
+    try:
+        if isinstance(source, HubMicrophone):
+            if source.hub.energy_threshold is not None:
+                recognizer.energy_threshold = source.hub.energy_threshold
+                return
+            _ajuster_sur_hub(recognizer, source, duration)
+            source.hub.energy_threshold = recognizer.energy_threshold
+            return
+        recognizer.adjust_for_ambient_noise(source, duration=duration)
+    except Exception as e:
+        logger.warning(f"Calibrage du bruit ambiant impossible, seuil conservé: {e}")
+
+
+def taux_natif_entree(defaut: int = 16000) -> int:
+    """Taux d'échantillonnage natif du périphérique d'entrée par défaut."""
+    try:
+        import sounddevice as sd
+        return int(sd.query_devices(kind="input")["default_samplerate"])
+    except Exception as e:
+        logger.warning(f"Taux natif du micro inconnu, utilisation de {defaut} Hz: {e}")
+        return defaut
+
+
+def get_audio_hub(sample_rate: int, open_func: Callable) -> AudioHub:
+    """
+    Retourne le hub d'un taux d'échantillonnage (créé au premier appel).
+
+    Args:
+        sample_rate: Taux d'échantillonnage
+        open_func: Fonction créant le microphone, utilisée à la création du hub
+    """
+    with _hubs_lock:
+        hub = _hubs.get(sample_rate)
+        if hub is None:
+            hub = AudioHub(open_func, sample_rate)
+            _hubs[sample_rate] = hub
+        return hub
+
+
+def stop_all_hubs(keep_rate: Optional[int] = None) -> None:
+    """
+    Ferme les hubs audio.
+
+    Args:
+        keep_rate: Taux du hub à garder ouvert (None pour tout fermer)
+    """
+    with _hubs_lock:
+        hubs = [hub for rate, hub in _hubs.items() if rate != keep_rate]
+        for hub in hubs:
+            del _hubs[hub.sample_rate]
+    for hub in hubs:
+        hub.stop()
+
+
+def get_audio_hub_stats() -> dict:
+    """Retourne les statistiques de tous les hubs audio."""
+    with _hubs_lock:
+        hubs = dict(_hubs)
+    return {str(rate): hub.get_stats() for rate, hub in hubs.items()}
@@ -2,9 +2,13 @@
 Module d'optimisation des performances audio avec Numba JIT
 Contient les fonctions de traitement audio optimisées pour Whisp Assistant
 """
+import math
+import time
+import threading
 import numpy as np
 from numba import jit, prange, float32, int32
 import logging
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -214,6 +218,119 @@ def calculate_audio_features_numba(audio_data: np.ndarray, sample_rate: float =
 
     return (rms, zcr, spectral_centroid)
 
+@jit(nopython=True, cache=True, fastmath=True)
+def dtw_subsequence_numba(distances: np.ndarray) -> tuple:
+    """
+    Alignement DTW d'un modèle court sur une portion quelconque d'une séquence.
+
+    Pas autorisés : (1, 1), (1, 2) et (2, 1), soit une pente entre 1/2 et 2.
+    Le début et la fin de l'alignement sont libres dans la séquence.
+
+    Args:
+        distances: Matrice des distances locales (trames du modèle x trames de la séquence)
+
+    Returns:
+        Tuple (coût moyen par trame du modèle, indice de la dernière trame alignée)
+    """
+    n_rows, n_cols = distances.shape
+    inf = np.inf
+    cost = np.full((n_rows, n_cols), inf, dtype=np.float64)
+
+    for j in range(n_cols):
+        cost[0, j] = distances[0, j]
+
+    for i in range(1, n_rows):
+        for j in range(1, n_cols):
+            best = cost[i - 1, j - 1]
+            if j >= 2 and cost[i - 1, j - 2] < best:
+                best = cost[i - 1, j - 2]
+            if i >= 2 and cost[i - 2, j - 1] < best:
+                best = cost[i - 2, j - 1]
+            if best < inf:
+                cost[i, j] = best + distances[i, j]
+
+    end = 0
+    for j in range(1, n_cols):
+        if cost[n_rows - 1, j] < cost[n_rows - 1, end]:
+            end = j
+    return (cost[n_rows - 1, end] / n_rows, end)
+
+@jit(nopython=True, cache=True, fastmath=True)
+def biquad_inplace_numba(audio_data: np.ndarray, coeffs: np.ndarray, state: np.ndarray) -> None:
+    """
+    Filtre biquadratique (forme directe II transposée) appliqué sur place.
+
+    Args:
+        audio_data: Données audio, modifiées sur place
+        coeffs: Coefficients normalisés (b0, b1, b2, a1, a2)
+        state: Lignes à retard (z1, z2), conservées d'un bloc à l'autre
+    """
+    b0, b1, b2, a1, a2 = coeffs[0], coeffs[1], coeffs[2], coeffs[3], coeffs[4]
+    z1, z2 = state[0], state[1]
+    for i in range(len(audio_data)):
+        x = audio_data[i]
+        y = b0 * x + z1
+        z1 = b1 * x - a1 * y + z2
+        z2 = b2 * x - a2 * y
+        audio_data[i] = y
+    state[0] = z1
+    state[1] = z2
+
+@jit(nopython=True, cache=True, fastmath=True)
+def noise_gate_inplace_numba(audio_data: np.ndarray, params: np.ndarray, state: np.ndarray) -> None:
+    """
+    Porte de bruit à enveloppe, appliquée sur place.
+
+    Args:
+        audio_data: Données audio, modifiées sur place
+        params: (seuil, coef. attaque, coef. relâchement, gain fermé, coef. lissage, maintien en échantillons)
+        state: (enveloppe, gain courant, maintien restant), conservés d'un bloc à l'autre
+    """
+    threshold, attack, release, floor_gain, smooth, hold = (
+        params[0], params[1], params[2], params[3], params[4], params[5])
+    env, gain, remaining = state[0], state[1], state[2]
+    for i in range(len(audio_data)):
+        level = abs(audio_data[i])
+        coef = attack if level > env else release
+        env = coef * env + (1.0 - coef) * level
+        if env > threshold:
+            remaining = hold
+            target = 1.0
+        elif remaining > 0:
+            remaining -= 1
+            target = 1.0
+        else:
+            target = floor_gain
+        gain = smooth * gain + (1.0 - smooth) * target
+        audio_data[i] *= gain
+    state[0] = env
+    state[1] = gain
+    state[2] = remaining
+
+@jit(nopython=True, cache=True, fastmath=True)
+def gain_ramp_inplace_numba(audio_data: np.ndarray, start_gain: float, end_gain: float) -> None:
+    """
+    Applique sur place un gain variant linéairement sur le bloc (sans saut audible), écrêté à [-1, 1].
+
+    Args:
+        audio_data: Données audio, modifiées sur place
+        start_gain: Gain au premier échantillon
+        end_gain: Gain au dernier échantillon
+    """
+    n = len(audio_data)
+    if n == 0:
+        return
+    step = (end_gain - start_gain) / n
+    gain = start_gain
+    for i in range(n):
+        gain += step
+        y = audio_data[i] * gain
+        if y > 1.0:
+            y = 1.0
+        elif y < -1.0:
+            y = -1.0
+        audio_data[i] = y
+
 # Classe d'optimisation audio
 class AudioOptimizer:
     """Classe principale pour l'optimisation des traitements audio avec Numba."""
@@ -225,7 +342,10 @@ class AudioOptimizer:
 
     def process_audio_chunk(self, audio_data: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
         """
-        Pipeline complet de traitement audio optimisé.
+        Pipeline complet de traitement audio optimisé, pour un énoncé complet.
+
+        Les étages repartent de zéro à chaque appel : pour un flux découpé en
+        blocs, utiliser create_stream().
 
         Args:
             audio_data: Données audio brutes
@@ -259,6 +379,19 @@ class AudioOptimizer:
             logger.warning(f"Erreur optimisation audio: {e}")
             return audio_data
 
+    def create_stream(self, stages: List, sample_rate: int = 16000, chunk_size: int = 1024,
+                      name: str = "stt") -> "StreamingDSPChain":
+        """
+        Crée une chaîne de traitement en flux (état conservé d'un bloc à l'autre).
+
+        Args:
+            stages: Étages de la chaîne (voir create_dsp_stage)
+            sample_rate: Taux d'échantillonnage
+            chunk_size: Taille habituelle des blocs
+            name: Nom du moteur
+        """
+        return StreamingDSPChain(stages, sample_rate, chunk_size, name)
+
     def is_speech_detected(self, audio_data: np.ndarray, threshold: float = 0.01) -> bool:
         """
         Détection optimisée de parole dans l'audio.
@@ -299,10 +432,279 @@ class AudioOptimizer:
                 'detect_silence_numba',
                 'resample_audio_numba',
                 'apply_high_pass_filter_numba',
-                'calculate_audio_features_numba'
+                'calculate_audio_features_numba',
+                'dtw_subsequence_numba',
+                'biquad_inplace_numba',
+                'noise_gate_inplace_numba',
+                'gain_ramp_inplace_numba'
             ]
         }
 
+# Étages disponibles pour la chaîne de traitement en flux
+DSP_STAGES = ("highpass", "noise_gate", "agc")
+
+# Chaînes de traitement actives, par moteur (pour les statistiques)
+_dsp_chains: Dict[str, "StreamingDSPChain"] = {}
+_dsp_chains_lock = threading.Lock()
+
+
+def _coef_lissage(time_s: float, sample_rate: int) -> float:
+    """Coefficient d'un lissage exponentiel de constante de temps time_s."""
+    return math.exp(-1.0 / max(time_s * sample_rate, 1.0))
+
+
+class HighPassStage:
+    """Passe-haut de Butterworth d'ordre 2 ; les lignes à retard suivent le flux."""
+
+    name = "highpass"
+
+    def __init__(self, sample_rate: int, cutoff_hz: float = 80.0):
+        w0 = 2.0 * math.pi * cutoff_hz / sample_rate
+        alpha = math.sin(w0) / (2.0 * math.sqrt(0.5))
+        cos_w0 = math.cos(w0)
+        a0 = 1.0 + alpha
+        self.coeffs = np.array([
+            (1.0 + cos_w0) / 2.0 / a0,
+            -(1.0 + cos_w0) / a0,
+            (1.0 + cos_w0) / 2.0 / a0,
+            -2.0 * cos_w0 / a0,
+            (1.0 - alpha) / a0,
+        ], dtype=np.float64)
+        self.state = np.zeros(2, dtype=np.float64)
+
+    def process(self, buffer: np.ndarray) -> None:
+        biquad_inplace_numba(buffer, self.coeffs, self.state)
+
+    def reset(self) -> None:
+        self.state[:] = 0.0
+
+    def get_state(self) -> dict:
+        return {}
+
+
+class NoiseGateStage:
+    """
+    Porte de bruit à enveloppe : atténue (sans couper net) le signal sous le seuil.
+
+    Le maintien garde la porte ouverte entre deux syllabes ; l'enveloppe et le
+    gain suivent le flux d'un bloc à l'autre.
+    """
+
+    name = "noise_gate"
+
+    def __init__(self, sample_rate: int, threshold: float = 0.01, floor_db: float = -20.0,
+                 attack_s: float = 0.002, release_s: float = 0.05, hold_s: float = 0.2):
+        self.params = np.array([
+            threshold,
+            _coef_lissage(attack_s, sample_rate),
+            _coef_lissage(release_s, sample_rate),
+            10 ** (floor_db / 20.0),
+            _coef_lissage(0.005, sample_rate),
+            hold_s * sample_rate,
+        ], dtype=np.float64)
+        self.state = np.zeros(3, dtype=np.float64)
+        self.reset()
+
+    def process(self, buffer: np.ndarray) -> None:
+        noise_gate_inplace_numba(buffer, self.params, self.state)
+
+    def reset(self) -> None:
+        self.state[:] = (0.0, self.params[3], 0.0)
+
+    def get_state(self) -> dict:
+        return {"gain": round(float(self.state[1]), 3), "envelope": round(float(self.state[0]), 5)}
+
+
+class AGCStage:
+    """
+    Contrôle automatique de gain à gain courant.
+
+    Le gain visé est mis à jour une fois par bloc, seulement si le bloc contient
+    du signal (le silence n'est pas amplifié), puis appliqué en rampe sur le
+    bloc suivant pour éviter les sauts de niveau.
+    """
+
+    name = "agc"
+
+    def __init__(self, sample_rate: int, target_rms: float = 0.1, max_gain: float = 10.0,
+                 min_rms: float = 0.01, attack_s: float = 0.05, release_s: float = 1.0):
+        self.sample_rate = sample_rate
+        self.target_rms = target_rms
+        self.max_gain = max_gain
+        self.min_rms = min_rms
+        self.attack_s = attack_s
+        self.release_s = release_s
+        self.gain = 1.0
+
+    def process(self, buffer: np.ndarray) -> None:
+        n = len(buffer)
+        if n == 0:
+            return
+        rms = float(np.sqrt(np.dot(buffer, buffer) / n))
+        new_gain = self.gain
+        if rms * self.gain > self.min_rms:
+            desired = min(self.target_rms / max(rms, 1e-6), self.max_gain)
+            # Réduction rapide (saturation), remontée lente (pas de pompage)
+            time_s = self.attack_s if desired < self.gain else self.release_s
+            coef = _coef_lissage(time_s, self.sample_rate / n)
+            new_gain = coef * self.gain + (1.0 - coef) * desired
+        gain_ramp_inplace_numba(buffer, self.gain, new_gain)
+        self.gain = new_gain
+
+    def reset(self) -> None:
+        self.gain = 1.0
+
+    def get_state(self) -> dict:
+        return {"gain": round(self.gain, 3)}
+
+
+class StreamingDSPChain:
+    """
+    Chaîne de traitement audio en flux, étage par étage.
+
+    Contrairement à AudioOptimizer.process_audio_chunk (pensé pour un énoncé
+    complet), chaque étage garde son état d'un bloc à l'autre : un flux découpé
+    en blocs est traité comme un signal continu, sans artefact aux jonctions ni
+    fenêtrage des blocs. Les étages travaillent sur place dans un tampon
+    float32 préalloué.
+    """
+
+    def __init__(self, stages: List, sample_rate: int = 16000, chunk_size: int = 1024, name: str = "stt"):
+        """
+        Args:
+            stages: Étages (objets exposant process(buffer) sur place, reset() et get_state())
+            sample_rate: Taux d'échantillonnage
+            chunk_size: Taille habituelle des blocs (le tampon s'agrandit si besoin)
+            name: Nom du moteur
+        """
+        self.stages = list(stages)
+        self.sample_rate = sample_rate
+        self.name = name
+        self._buffer = np.zeros(chunk_size, dtype=np.float32)
+        self._pcm = np.zeros(chunk_size, dtype=np.int16)
+
+        self.reset_stats()
+
+        with _dsp_chains_lock:
+            _dsp_chains[self.name] = self
+
+    def process(self, chunk) -> bytes:
+        """
+        Traite un bloc PCM int16.
+
+        Args:
+            chunk: Bloc int16 (bytes ou numpy array)
+
+        Returns:
+            Bloc traité, en bytes int16 (nouvel objet : le tampon interne est réutilisé)
+        """
+        pcm_in = chunk if isinstance(chunk, np.ndarray) else np.frombuffer(chunk, dtype=np.int16)
+        n = len(pcm_in)
+        if n > len(self._buffer):
+            self._buffer = np.zeros(n, dtype=np.float32)
+            self._pcm = np.zeros(n, dtype=np.int16)
+        buffer = self._buffer[:n]
+
+        start = time.perf_counter()
+        np.multiply(pcm_in, 1.0 / 32768.0, out=buffer, casting="unsafe")
+        for stage in self.stages:
+            stage_start = time.perf_counter()
+            stage.process(buffer)
+            self.stage_time[stage.name] += time.perf_counter() - stage_start
+        np.clip(buffer, -1.0, 32767.0 / 32768.0, out=buffer)
+        np.multiply(buffer, 32768.0, out=buffer)
+        pcm_out = self._pcm[:n]
+        np.copyto(pcm_out, buffer, casting="unsafe")
+        self.total_time += time.perf_counter() - start
+
+        self.chunks += 1
+        self.samples += n
+        return pcm_out.tobytes()
+
+    def reset(self) -> None:
+        """Remet l'état des étages à zéro (nouveau flux)."""
+        for stage in self.stages:
+            stage.reset()
+
+    def reset_stats(self) -> None:
+        """Remet les compteurs à zéro."""
+        self.chunks = 0
+        self.samples = 0
+        self.stage_time = {stage.name: 0.0 for stage in self.stages}
+        self.total_time = 0.0
+
+    def stop(self) -> None:
+        """Retire la chaîne des statistiques."""
+        with _dsp_chains_lock:
+            if _dsp_chains.get(self.name) is self:
+                del _dsp_chains[self.name]
+
+    def get_stats(self) -> dict:
+        """Retourne les temps par étage et l'état courant des étages."""
+        audio_s = self.samples / self.sample_rate if self.sample_rate else 0.0
+        return {
+            "stages": [stage.name for stage in self.stages],
+            "chunks": self.chunks,
+            "audio_seconds": round(audio_s, 1),
+            "avg_chunk_us": self.total_time / self.chunks * 1e6 if self.chunks else 0.0,
+            "realtime_factor": self.total_time / audio_s if audio_s else 0.0,
+            "stage_avg_us": {name: total / self.chunks * 1e6 if self.chunks else 0.0
+                             for name, total in self.stage_time.items()},
+            "stage_state": {stage.name: stage.get_state() for stage in self.stages},
+        }
+
+
+def create_dsp_stage(name: str, settings: dict, sample_rate: int):
+    """
+    Crée un étage de la chaîne à partir des paramètres STT.
+
+    Args:
+        name: Nom de l'étage (voir DSP_STAGES)
+        settings: Paramètres STT (stt_settings)
+        sample_rate: Taux d'échantillonnage
+    """
+    if name == "highpass":
+        return HighPassStage(sample_rate, settings.get("audio_dsp_highpass_hz", 80.0))
+    if name == "noise_gate":
+        return NoiseGateStage(sample_rate, threshold=settings.get("audio_dsp_gate_threshold", 0.01),
+                              floor_db=settings.get("audio_dsp_gate_floor_db", -20.0))
+    if name == "agc":
+        return AGCStage(sample_rate, target_rms=settings.get("audio_dsp_agc_target_rms", 0.1),
+                        max_gain=settings.get("audio_dsp_agc_max_gain", 10.0))
+    raise ValueError(f"Étage DSP inconnu: {name} (disponibles: {', '.join(DSP_STAGES)})")
+
+
+def create_dsp_chain(settings: dict, sample_rate: int, chunk_size: int, name: str = "stt") -> Optional[StreamingDSPChain]:
+    """
+    Crée la chaîne de traitement d'un moteur STT à partir des paramètres STT.
+
+    Args:
+        settings: Paramètres STT (stt_settings)
+        sample_rate: Taux d'échantillonnage du moteur
+        chunk_size: Taille des blocs lus par le moteur
+        name: Nom du moteur
+
+    Returns:
+        StreamingDSPChain, ou None si la chaîne est désactivée
+    """
+    if not settings.get("audio_dsp_chain", False):
+        return None
+    stages = [create_dsp_stage(stage, settings, sample_rate)
+              for stage in settings.get("audio_dsp_stages", list(DSP_STAGES))]
+    chain = StreamingDSPChain(stages, sample_rate, chunk_size, name)
+    # Compiler les noyaux Numba maintenant plutôt qu'au premier énoncé
+    chain.process(np.zeros(chunk_size, dtype=np.int16))
+    chain.reset()
+    chain.reset_stats()
+    return chain
+
+
+def get_dsp_chain_stats() -> dict:
+    """Retourne les statistiques de toutes les chaînes de traitement actives."""
+    with _dsp_chains_lock:
+        chains = dict(_dsp_chains)
+    return {name: chain.get_stats() for name, chain in chains.items()}
+
 # Instance globale pour l'optimisation audio
 audio_optimizer = AudioOptimizer()
 
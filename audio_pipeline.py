@@ -0,0 +1,247 @@
+"""
+Pipeline audio producteur/consommateur pour Whisp Assistant
+Sépare la capture du microphone, l'inférence STT et l'exécution des commandes
+dans des threads distincts reliés par des files bornées.
+"""
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Taille par défaut de la file de frames (en chunks audio)
+DEFAULT_MAX_FRAMES = 256
+# Taille par défaut de la file de commandes
+DEFAULT_MAX_COMMANDS = 32
+
+# Registre des pipelines actifs, indexé par nom de moteur
+_pipelines: Dict[str, "AudioPipeline"] = {}
+_pipelines_lock = threading.Lock()
+
+
+class AudioPipeline:
+    """
+    Pipeline à trois étages pour un moteur STT.
+
+    - Le thread de capture ne fait que lire le flux audio et pousser les
+      frames dans une file bornée (aucun calcul, aucun appel bloquant long).
+    - Le worker d'inférence (le thread appelant) consomme les frames via
+      read_frame() pour la VAD et le décodage.
+    - Le worker de commandes exécute les callbacks soumis via submit_command()
+      dans l'ordre, sans bloquer l'inférence.
+
+    Quand la file de frames est pleine, la frame la plus ancienne est
+    abandonnée et comptée comme débordement : la capture n'est jamais bloquée.
+    """
+
+    def __init__(self, name: str, max_frames: int = DEFAULT_MAX_FRAMES,
+                 max_commands: int = DEFAULT_MAX_COMMANDS):
+        self.name = name
+        self.frames = queue.Queue(maxsize=max_frames)
+        self.commands = queue.Queue(maxsize=max_commands)
+        self.running = False
+
+        self._capture_thread: Optional[threading.Thread] = None
+        self._command_thread: Optional[threading.Thread] = None
+
+        # Compteurs
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.max_queue_depth = 0
+        self.capture_errors = 0
+        self.commands_submitted = 0
+        self.commands_executed = 0
+        self.commands_dropped = 0
+        self.max_command_depth = 0
+        self.started_at = 0.0
+
+    def start(self, read_func: Callable[[int], Any], chunk_size: int) -> None:
+        """
+        Démarre le thread de capture et le worker de commandes.
+
+        Args:
+            read_func: Fonction de lecture du flux (ex: audio_stream.read)
+            chunk_size: Nombre d'échantillons à lire par appel
+        """
+        self.running = True
+        self.started_at = time.time()
+
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            args=(read_func, chunk_size),
+            daemon=True,
+            name=f"{self.name}_capture_thread"
+        )
+        self._command_thread = threading.Thread(
+            target=self._command_loop,
+            daemon=True,
+            name=f"{self.name}_command_thread"
+        )
+        self._capture_thread.start()
+        self._command_thread.start()
+
+        with _pipelines_lock:
+            _pipelines[self.name] = self
+
+    def stop(self, wait: bool = False, timeout: float = 1.0) -> None:
+        """
+        Arrête la capture et le worker de commandes.
+
+        Args:
+            wait: Attendre la fin des threads
+            timeout: Délai maximal d'attente par thread (secondes)
+        """
+        self.running = False
+
+        # Débloquer le worker de commandes
+        try:
+            self.commands.put_nowait(None)
+        except queue.Full:
+            pass
+
+        if wait:
+            for thread in (self._capture_thread, self._command_thread):
+                if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+                    thread.join(timeout=timeout)
+
+        with _pipelines_lock:
+            if _pipelines.get(self.name) is self:
+                del _pipelines[self.name]
+
+    def _capture_loop(self, read_func: Callable[[int], Any], chunk_size: int) -> None:
+        """Boucle de capture : lecture du flux et dépôt dans la file de frames."""
+        logger.info(f"Thread de capture {self.name} démarré")
+        while self.running:
+            try:
+                frame = read_func(chunk_size)
+            except Exception as e:
+                self.capture_errors += 1
+                if not self.running:
+                    break
+                logger.warning(f"Erreur de capture {self.name}: {e}")
+                time.sleep(0.01)
+                continue
+
+            self.frames_captured += 1
+            try:
+                self.frames.put_nowait(frame)
+            except queue.Full:
+                # Abandonner la frame la plus ancienne plutôt que de bloquer la capture
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+                self.frames_dropped += 1
+                try:
+                    self.frames.put_nowait(frame)
+                except queue.Full:
+                    self.frames_dropped += 1
+
+            depth = self.frames.qsize()
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+        logger.info(f"Thread de capture {self.name} arrêté")
+
+    def _command_loop(self) -> None:
+        """Boucle d'exécution des commandes soumises par le worker d'inférence."""
+        while self.running or not self.commands.empty():
+            try:
+                item = self.commands.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is None:
+                if not self.running:
+                    break
+                continue
+
+            func, args, kwargs = item
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'exécution d'une commande ({self.name}): {e}")
+            finally:
+                self.commands_executed += 1
+
+    def read_frame(self, timeout: float = 0.1) -> Optional[Any]:
+        """
+        Récupère la prochaine frame capturée.
+
+        Args:
+            timeout: Délai d'attente maximal (secondes)
+
+        Returns:
+            La frame audio, ou None si aucune frame n'est disponible
+        """
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def submit_command(self, func: Callable, *args, **kwargs) -> bool:
+        """
+        Confie l'exécution d'une commande au worker de commandes.
+
+        Args:
+            func: Fonction à exécuter (ex: command_processor.process_command)
+
+        Returns:
+            True si la commande a été mise en file, False sinon
+        """
+        try:
+            self.commands.put_nowait((func, args, kwargs))
+        except queue.Full:
+            self.commands_dropped += 1
+            logger.warning(f"File de commandes {self.name} pleine, commande ignorée")
+            return False
+
+        self.commands_submitted += 1
+        depth = self.commands.qsize()
+        if depth > self.max_command_depth:
+            self.max_command_depth = depth
+        return True
+
+    def get_stats(self) -> dict:
+        """
+        Retourne les compteurs du pipeline.
+
+        Returns:
+            Dictionnaire des statistiques (profondeur des files, débordements...)
+        """
+        return {
+            "running": self.running,
+            "queue_depth": self.frames.qsize(),
+            "queue_capacity": self.frames.maxsize,
+            "max_queue_depth": self.max_queue_depth,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "capture_errors": self.capture_errors,
+            "command_queue_depth": self.commands.qsize(),
+            "max_command_depth": self.max_command_depth,
+            "commands_submitted": self.commands_submitted,
+            "commands_executed": self.commands_executed,
+            "commands_dropped": self.commands_dropped,
+            "uptime": time.time() - self.started_at if self.started_at else 0.0,
+        }
+
+
+def get_pipeline(name: str) -> Optional[AudioPipeline]:
+    """Retourne le pipeline actif pour un moteur donné, s'il existe."""
+    with _pipelines_lock:
+        return _pipelines.get(name)
+
+
+def stop_all_pipelines(wait: bool = False) -> None:
+    """Arrête tous les pipelines actifs."""
+    with _pipelines_lock:
+        pipelines = list(_pipelines.values())
+    for pipeline in pipelines:
+        pipeline.stop(wait=wait)
+
+
+def get_pipeline_stats() -> dict:
+    """Retourne les statistiques de tous les pipelines actifs."""
+    with _pipelines_lock:
+        pipelines = dict(_pipelines)
+    return {name: pipeline.get_stats() for name, pipeline in pipelines.items()}
@@ -0,0 +1,265 @@
+"""
+Décodage par lots (micro-batching) des énoncés Whisper CT2 pour Whisp Assistant
+Regroupe les segments en attente pendant quelques millisecondes, ou jusqu'à
+une taille de lot, et les décode en une seule passe avec le pipeline batché
+de faster-whisper. Chaque appelant récupère son texte via un Future, dans
+l'ordre de soumission
+"""
+import time
+import queue
+import bisect
+import logging
+import threading
+import concurrent.futures
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from faster_whisper import BatchedInferencePipeline
+    BATCHED_PIPELINE_AVAILABLE = True
+except ImportError:
+    BATCHED_PIPELINE_AVAILABLE = False
+
+# Options de transcribe() reprises par le pipeline batché (les autres, propres au
+# décodage séquentiel comme vad_filter ou condition_on_previous_text, sont ignorées)
+BATCH_OPTIONS = ("language", "beam_size", "temperature", "initial_prompt", "word_timestamps")
+
+# Durée maximale d'un énoncé dans un lot : au-delà, Whisper tronquerait l'audio
+MAX_CLIP_DURATION_S = 30.0
+
+_STOP = object()
+
+# Décodeurs par lots actifs, par nom (pour les statistiques)
+_transcribers: Dict[str, "BatchedTranscriber"] = {}
+_transcribers_lock = threading.Lock()
+
+
+class _Item:
+    """Énoncé en attente de décodage."""
+
+    __slots__ = ("samples", "options", "key", "future", "submitted_at")
+
+    def __init__(self, samples: np.ndarray, options: dict):
+        self.samples = samples
+        self.options = options
+        self.key = repr(sorted(options.items()))
+        self.future = concurrent.futures.Future()
+        self.submitted_at = time.time()
+
+
+class BatchedTranscriber:
+    """
+    Planificateur de décodage par lots pour un modèle faster-whisper.
+
+    Un worker unique prend le premier énoncé en attente, attend au plus
+    max_wait_ms d'autres énoncés ayant les mêmes options (dans la limite de
+    max_batch), puis décode le lot. Les énoncés sont traités dans l'ordre de
+    soumission ; si le pipeline batché n'est pas disponible (ancienne version
+    de faster-whisper, modèle servi par un processus d'inférence), ils sont
+    décodés un par un.
+    """
+
+    def __init__(self, model, max_batch: int = 8, max_wait_ms: float = 50.0, sample_rate: int = 16000,
+                 name: str = "whisper_ct2_batch"):
+        """
+        Args:
+            model: Modèle faster-whisper (WhisperModel ou RemoteWhisperModel)
+            max_batch: Nombre maximal d'énoncés par lot
+            max_wait_ms: Attente maximale pour compléter un lot
+            sample_rate: Taux d'échantillonnage de l'audio soumis
+            name: Nom du worker
+        """
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.sample_rate = sample_rate
+        self.name = name
+        self._pipeline = None
+        if BATCHED_PIPELINE_AVAILABLE and hasattr(model, "feature_extractor"):
+            self._pipeline = BatchedInferencePipeline(model=model)
+
+        self._queue = queue.Queue()
+        self._deferred: Optional[_Item] = None
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.batched_items = 0
+        self.decode_time_ms = 0.0
+        self.queue_time_ms = 0.0
+
+        with _transcribers_lock:
+            _transcribers[self.name] = self
+
+    @property
+    def batching(self) -> bool:
+        """Indique si les lots sont décodés en une seule passe."""
+        return self._pipeline is not None and self.max_batch > 1
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._worker_loop, daemon=True, name=self.name)
+                self._worker.start()
+
+    def submit(self, samples: np.ndarray, **options) -> concurrent.futures.Future:
+        """
+        Place un énoncé dans la file de décodage.
+
+        Args:
+            samples: Audio float32 de l'énoncé
+            **options: Paramètres de transcribe()
+
+        Returns:
+            Future résolu avec le texte brut reconnu
+        """
+        item = _Item(samples, options)
+        self._ensure_worker()
+        self._queue.put(item)
+        return item.future
+
+    def transcrire(self, samples: np.ndarray, **options) -> str:
+        """Décode un énoncé et attend son texte."""
+        return self.submit(samples, **options).result()
+
+    def transcrire_lot(self, samples_list: List[np.ndarray], **options) -> List[str]:
+        """
+        Décode une liste d'énoncés (re-transcription en masse).
+
+        Args:
+            samples_list: Audios float32
+            **options: Paramètres de transcribe()
+
+        Returns:
+            Textes bruts, dans l'ordre des audios
+        """
+        futures = [self.submit(samples, **options) for samples in samples_list]
+        return [future.result() for future in futures]
+
+    def _next(self, timeout: Optional[float] = None):
+        """Prochain élément de la file (None si le délai expire)."""
+        if self._deferred is not None:
+            item, self._deferred = self._deferred, None
+            return item
+        try:
+            if timeout is None:
+                return self._queue.get()
+            if timeout <= 0:
+                return self._queue.get_nowait()
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _batchable(self, item: _Item) -> bool:
+        return len(item.samples) <= MAX_CLIP_DURATION_S * self.sample_rate
+
+    def _worker_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._next()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            if self.batching and self._batchable(first):
+                deadline = time.time() + self.max_wait_ms / 1000.0
+                while len(batch) < self.max_batch:
+                    item = self._next(deadline - time.time())
+                    if item is None:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    # Un énoncé incompatible ouvre le lot suivant, l'ordre est conservé
+                    if item.key != first.key or not self._batchable(item):
+                        self._deferred = item
+                        break
+                    batch.append(item)
+
+            self._decode(batch)
+
+    def _decode(self, batch: List[_Item]) -> None:
+        start = time.time()
+        for item in batch:
+            self.queue_time_ms += (start - item.submitted_at) * 1000
+
+        texts = None
+        if len(batch) > 1:
+            try:
+                texts = self._decode_batched(batch)
+            except Exception as e:
+                logger.warning(f"Échec du décodage par lot, décodage séquentiel: {e}")
+
+        if texts is not None:
+            for item, text in zip(batch, texts):
+                item.future.set_result(text)
+            self.batched_items += len(batch)
+        else:
+            for item in batch:
+                try:
+                    segments, _ = self.model.transcribe(item.samples, **item.options)
+                    item.future.set_result(" ".join(segment.text for segment in segments))
+                except Exception as e:
+                    item.future.set_exception(e)
+
+        self.batches += 1
+        self.items += len(batch)
+        self.decode_time_ms += (time.time() - start) * 1000
+
+    def _decode_batched(self, batch: List[_Item]) -> List[str]:
+        """Décode un lot en une passe : les énoncés sont concaténés et délimités par clip_timestamps."""
+        starts = []
+        clips = []
+        offset = 0
+        for item in batch:
+            starts.append(offset / self.sample_rate)
+            clips.append({"start": offset, "end": offset + len(item.samples)})
+            offset += len(item.samples)
+        audio = np.concatenate([item.samples for item in batch]).astype(np.float32, copy=False)
+
+        options = {key: value for key, value in batch[0].options.items() if key in BATCH_OPTIONS}
+        segments, _ = self._pipeline.transcribe(
+            audio,
+            clip_timestamps=clips,
+            batch_size=len(batch),
+            without_timestamps=True,
+            **options
+        )
+
+        # Chaque segment commence dans l'énoncé dont il est issu
+        texts = [[] for _ in batch]
+        for segment in segments:
+            index = max(0, bisect.bisect_right(starts, segment.start + 1e-3) - 1)
+            texts[index].append(segment.text)
+        return [" ".join(parts) for parts in texts]
+
+    def stop(self) -> None:
+        """Arrête le worker après les énoncés en attente."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(_STOP)
+        with _transcribers_lock:
+            if _transcribers.get(self.name) is self:
+                del _transcribers[self.name]
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs du décodage par lots."""
+        return {
+            "batching": self.batching,
+            "batches": self.batches,
+            "items": self.items,
+            "batched_items": self.batched_items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "avg_decode_ms_per_item": self.decode_time_ms / self.items if self.items else 0.0,
+            "avg_queue_ms": self.queue_time_ms / self.items if self.items else 0.0,
+        }
+
+
+def get_batched_transcription_stats() -> dict:
+    """Retourne les statistiques de tous les décodeurs par lots actifs."""
+    with _transcribers_lock:
+        transcribers = dict(_transcribers)
+    return {name: transcriber.get_stats() for name, transcriber in transcribers.items()}
@@ -1,6 +1,8 @@
 """
 Module de gestion des alias de commandes pour l'assistant Whisp
 """
+from collections import OrderedDict
+
 try:
     # Essayer d'abord l'import en tant que package
     from whisp_assistant.database_manager import (
@@ -16,6 +18,87 @@ except ImportError:
         remove_command_alias as db_remove_alias
     )
 
+try:
+    from whisp_assistant.fuzzy_index import create_fuzzy_index
+except ImportError:
+    from fuzzy_index import create_fuzzy_index
+
+# Nombre de textes dont le résultat de recherche approximative est mémorisé
+FUZZY_CACHE_SIZE = 64
+
+class AliasTrie:
+    """
+    Arbre de préfixes des alias, mot par mot.
+
+    Un alias se terminant par une espace ("va sur ") est partiel : il
+    correspond à tout texte qui commence par lui, le reste du texte étant le
+    paramètre. Un seul parcours du texte donne l'alias le plus long et ce reste,
+    quel que soit le nombre d'alias.
+    """
+
+    __slots__ = ("root", "size")
+
+    def __init__(self, command_lookup=None):
+        # Nœud : [enfants par mot, alias complet se terminant ici, alias partiel se terminant ici]
+        self.root = [{}, None, None]
+        self.size = 0
+        for alias in (command_lookup or {}):
+            self.insert(alias)
+
+    def insert(self, alias):
+        """Ajoute un alias"""
+        partial = alias.endswith(" ")
+        node = self.root
+        for token in (alias[:-1] if partial else alias).lower().split(" "):
+            node = node[0].setdefault(token, [{}, None, None])
+        node[2 if partial else 1] = alias
+        self.size += 1
+
+    def match_prefix(self, text, accept=None):
+        """
+        Cherche l'alias le plus long qui préfixe le texte et en est séparé par une espace.
+
+        Args:
+            text (str): Texte de la commande
+            accept (callable): Filtre optionnel sur l'alias ; par défaut, seuls
+                les alias partiels (terminés par une espace) sont retenus
+
+        Returns:
+            tuple: (alias, reste du texte après l'alias) ou (None, None)
+        """
+        tokens = text.lower().split(" ")
+        node = self.root
+        pos = 0
+        best = (None, None)
+        for i, token in enumerate(tokens[:-1]):
+            node = node[0].get(token)
+            if node is None:
+                break
+            pos += len(token) + 1
+            # Il reste au moins un mot : le texte commence par "<alias> "
+            for alias in (node[2], node[1]):
+                if alias is not None and (accept(alias) if accept else alias is node[2]):
+                    best = (alias, text[pos:])
+                    break
+        return best
+
+    def has_longer(self, text):
+        """
+        Indique si le texte forme les premiers mots d'un alias plus long.
+
+        Args:
+            text (str): Texte de la commande
+
+        Returns:
+            bool: True si un autre alias commence par ce texte suivi d'une espace
+        """
+        node = self.root
+        for token in text.lower().split(" "):
+            node = node[0].get(token)
+            if node is None:
+                return False
+        return bool(node[0]) or node[2] is not None
+
 class CommandAliases:
     """Classe pour gérer les alias de commandes"""
     
@@ -24,6 +107,13 @@ class CommandAliases:
         # Dictionnaire principal des alias par catégorie
         self.aliases = {}
         self.command_lookup = {}
+        self.alias_trie = AliasTrie()
+        # Incrémenté à chaque reconstruction des index (suivi par les index de répartition)
+        self.version = 0
+        # Index approximatif, construit à la première requête qui le nécessite
+        self.fuzzy_enabled = True
+        self._fuzzy_index = None
+        self._fuzzy_cache = OrderedDict()
         
         # Charger les alias depuis la base de données
         self._load_and_initialize()
@@ -46,6 +136,7 @@ class CommandAliases:
             for command, alias_list in self.aliases.items():
                 for alias in alias_list:
                     self.command_lookup[alias] = command
+            self._build_alias_indexes()
                     
             print(f"Initialisation des alias terminée: {len(self.aliases)} commandes, {len(self.command_lookup)} alias")
         except Exception as e:
@@ -56,6 +147,42 @@ class CommandAliases:
             for command, alias_list in self.aliases.items():
                 for alias in alias_list:
                     self.command_lookup[alias] = command
+            self._build_alias_indexes()
+    
+    def _build_alias_indexes(self):
+        """Reconstruit les index de recherche à partir du dictionnaire inversé"""
+        self.version += 1
+        self.alias_trie = AliasTrie(self.command_lookup)
+        self._fuzzy_index = None
+        self._fuzzy_cache.clear()
+    
+    def fuzzy_match(self, text):
+        """
+        Cherche l'alias complet le plus proche d'un texte mal transcrit
+        
+        Args:
+            text (str): Le texte à vérifier
+            
+        Returns:
+            dict or None: phrase, value (commande), distance, confidence, elapsed_us, complete
+        """
+        if text in self._fuzzy_cache:
+            self._fuzzy_cache.move_to_end(text)
+            return self._fuzzy_cache[text]
+        
+        if self._fuzzy_index is None:
+            # Les alias partiels ("va sur ") attendent un paramètre : seul l'arbre de préfixes les traite
+            self._fuzzy_index = create_fuzzy_index(
+                ((alias, command) for alias, command in self.command_lookup.items() if not alias.endswith(" ")),
+                "aliases"
+            )
+        match = self._fuzzy_index.search(text)
+        
+        # Un même texte est souvent vérifié plusieurs fois pour une seule commande
+        self._fuzzy_cache[text] = match
+        if len(self._fuzzy_cache) > FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.popitem(last=False)
+        return match
     
     def _get_default_aliases(self):
         """Retourne les alias par défaut"""
@@ -349,12 +476,31 @@ class CommandAliases:
             return self.command_lookup[text]
             
         # Vérifier les correspondances partielles (pour les commandes comme "va sur X")
-        for alias in self.command_lookup:
-            if alias.endswith(" ") and text.startswith(alias):
-                return self.command_lookup[alias]
+        alias, _ = self.alias_trie.match_prefix(text)
+        if alias is not None:
+            return self.command_lookup[alias]
+        
+        # En dernier recours, tolérer les erreurs de transcription (distance d'édition bornée)
+        if self.fuzzy_enabled and text:
+            match = self.fuzzy_match(text)
+            if match is not None:
+                return match["value"]
         
         return None
     
+    def match_command_prefix(self, text, command):
+        """
+        Cherche l'alias le plus long de la commande qui préfixe le texte
+        
+        Args:
+            text (str): Le texte complet de la commande
+            command (str): La commande normalisée
+            
+        Returns:
+            tuple: (alias, paramètre restant) ou (None, None) si aucun alias ne correspond
+        """
+        return self.alias_trie.match_prefix(text, lambda alias: self.command_lookup.get(alias) == command)
+    
     def get_aliases_for_command(self, command):
         """
         Récupère tous les alias pour une commande donnée
@@ -397,6 +543,7 @@ class CommandAliases:
                     self.aliases[command] = [alias]
                     
                 self.command_lookup[alias] = command
+                self._build_alias_indexes()
                 return True
             return False
         except Exception as e:
@@ -423,6 +570,7 @@ class CommandAliases:
                     if command in self.aliases and alias in self.aliases[command]:
                         self.aliases[command].remove(alias)
                     del self.command_lookup[alias]
+                    self._build_alias_indexes()
                     return True
                 return False
             except Exception as e:
@@ -460,6 +608,7 @@ class CommandAliases:
             for command, alias_list in self.aliases.items():
                 for alias in alias_list:
                     self.command_lookup[alias] = command
+            self._build_alias_indexes()
                     
             print(f"Rechargement des alias depuis la base de données: {len(self.aliases)} commandes, {len(self.command_lookup)} alias")
             return True
@@ -512,40 +661,31 @@ def extract_command_parameters(text, command_type):
     # Traitement spécifique selon le type de commande
     if command_type == "go_to_website":
         # Extraire le nom du site web
-        for prefix in command_aliases.get_aliases_for_command("go_to_website"):
-            if text.lower().startswith(prefix.lower() + " "):
-                params["website"] = text[len(prefix) + 1:].strip()
-                break
+        alias, reste = command_aliases.match_command_prefix(text, "go_to_website")
+        if alias is not None:
+            params["website"] = reste.strip()
     
     elif command_type == "screen_read_from":
         # Extraire l'élément à partir duquel lire
-        for prefix in command_aliases.get_aliases_for_command("screen_read_from"):
-            if text.lower().startswith(prefix.lower() + " "):
-                params["element"] = text[len(prefix) + 1:].strip()
-                break
-            
-            # Gestion des cas où le préfixe se termine par "de" ou "depuis"
-            if prefix.endswith(" de") or prefix.endswith(" depuis"):
-                if text.lower().startswith(prefix.lower() + " "):
-                    params["element"] = text[len(prefix) + 1:].strip()
-                    break
+        alias, reste = command_aliases.match_command_prefix(text, "screen_read_from")
+        if alias is not None:
+            params["element"] = reste.strip()
     
     elif command_type == "start_dictation":
         # Extraire le texte initial pour la dictée
-        for prefix in command_aliases.get_aliases_for_command("start_dictation"):
-            if text.lower().startswith(prefix.lower() + " "):
-                initial_text = text[len(prefix) + 1:].strip()
-                
-                # Enlever les préfixes courants dans le langage naturel
-                prefixes_a_supprimer = [
-                    "le texte", "le message", "ceci", "ça", "s'il te plait",
-                    "s'il vous plait", "pour moi", "ce qui suit", ":"
-                ]
-                for prefixe in prefixes_a_supprimer:
-                    if initial_text.startswith(prefixe):
-                        initial_text = initial_text[len(prefixe):].strip()
-                
-                params["initial_text"] = initial_text
-                break
+        alias, reste = command_aliases.match_command_prefix(text, "start_dictation")
+        if alias is not None:
+            initial_text = reste.strip()
+            
+            # Enlever les préfixes courants dans le langage naturel
+            prefixes_a_supprimer = [
+                "le texte", "le message", "ceci", "ça", "s'il te plait",
+                "s'il vous plait", "pour moi", "ce qui suit", ":"
+            ]
+            for prefixe in prefixes_a_supprimer:
+                if initial_text.startswith(prefixe):
+                    initial_text = initial_text[len(prefixe):].strip()
+            
+            params["initial_text"] = initial_text
     
     return params
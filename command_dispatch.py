@@ -0,0 +1,276 @@
+"""
+Index de répartition compilé pour le processeur de commandes de Whisp
+Chaque module de commandes déclare une fois, par le décorateur
+@declencheurs, les mots-clés et expressions régulières sans lesquels son
+gestionnaire ne peut pas répondre. Ces déclarations sont compilées en un
+automate d'Aho-Corasick (mots-clés littéraux) et une seule expression
+régulière combinée : un passage sur le texte suffit à désigner les
+gestionnaires candidats, appelés ensuite dans l'ordre de priorité habituel.
+Un gestionnaire sans déclaration reste toujours candidat.
+"""
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from text_processing import nettoyer_commande
+
+
+def declencheurs(mots_cles: Iterable[str] = (), motifs: Iterable[str] = (),
+                 commandes: Iterable[str] = ()):
+    """
+    Décorateur déclarant les conditions nécessaires d'un gestionnaire.
+
+    Les déclarations doivent couvrir tous les textes auxquels le gestionnaire
+    peut répondre (un radical suffit : "cliqu" couvre "clique" et "cliquer") ;
+    un mot-clé de trop ne coûte qu'un appel inutile, un mot-clé manquant
+    rendrait la commande inaccessible.
+
+    Args:
+        mots_cles: Sous-chaînes recherchées dans le texte en minuscules
+        motifs: Expressions régulières recherchées dans le texte nettoyé
+            (sans drapeaux en ligne ni références arrière numérotées)
+        commandes: Commandes normalisées dont les alias (command_aliases)
+            servent aussi de mots-clés
+
+    Returns:
+        Le décorateur, qui renvoie la fonction inchangée
+    """
+    def decorateur(fonction):
+        fonction.declencheurs_mots_cles = tuple(m.lower() for m in mots_cles)
+        fonction.declencheurs_motifs = tuple(motifs)
+        fonction.declencheurs_commandes = tuple(commandes)
+        return fonction
+    return decorateur
+
+
+def _nom_gestionnaire(handler: Callable) -> str:
+    return getattr(handler, "__name__", None) or str(handler)
+
+
+class AhoCorasick:
+    """
+    Automate d'Aho-Corasick : recherche simultanée de tous les mots-clés en
+    un seul parcours du texte. Chaque mot-clé porte un masque de bits (un bit
+    par gestionnaire) ; le parcours renvoie l'union des masques rencontrés.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [0]
+        self.keywords = 0
+
+    def add(self, mot: str, masque: int) -> None:
+        """Ajoute un mot-clé (à appeler avant build)."""
+        if not mot:
+            return
+        node = 0
+        for c in mot:
+            nxt = self._goto[node].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+                self._goto[node][c] = nxt
+            node = nxt
+        self._out[node] |= masque
+        self.keywords += 1
+
+    def build(self) -> None:
+        """Calcule les liens d'échec (parcours en largeur)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        file = list(goto[0].values())
+        for node in file:
+            fail[node] = 0
+        i = 0
+        while i < len(file):
+            u = file[i]
+            i += 1
+            for c, v in goto[u].items():
+                f = fail[u]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[v] = goto[f].get(c, 0)
+                out[v] |= out[fail[v]]
+                file.append(v)
+
+    def scan(self, texte: str) -> int:
+        """Retourne l'union des masques des mots-clés présents dans le texte."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        found = 0
+        for c in texte:
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            found |= out[node]
+        return found
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+
+# Gestionnaire d'alias, importé à la première utilisation (False si indisponible)
+_command_aliases = None
+
+
+def _alias_lookup() -> Tuple[int, Dict[str, str]]:
+    """
+    Version et table alias -> commande normalisée des alias de commandes.
+
+    La version change à chaque ajout, suppression ou rechargement d'alias
+    ((0, {}) si les alias sont indisponibles).
+    """
+    global _command_aliases
+    if _command_aliases is None:
+        try:
+            from whisp_assistant.command_aliases import command_aliases
+        except ImportError:
+            try:
+                from command_aliases import command_aliases
+            except ImportError:
+                command_aliases = False
+        _command_aliases = command_aliases
+    if not _command_aliases:
+        return 0, {}
+    return _command_aliases.version, _command_aliases.command_lookup
+
+
+class DispatchIndex:
+    """
+    Index compilé d'une liste ordonnée de gestionnaires de commandes.
+
+    candidats() renvoie, dans l'ordre de la liste, les gestionnaires dont une
+    condition déclarée est satisfaite, plus ceux qui n'ont rien déclaré.
+    L'index est reconstruit automatiquement quand la table des alias change.
+    """
+
+    def __init__(self, handlers: Sequence[Callable], name: str = "commandes"):
+        self.name = name
+        self.handlers = list(handlers)
+        self._alias_version = None
+        self.rebuilds = 0
+        self.reset_stats()
+        self._construire()
+
+    def _construire(self) -> None:
+        self._alias_version, lookup = _alias_lookup()
+
+        automate = AhoCorasick()
+        toujours = 0
+        parties = []
+        groupes = {}
+        for i, handler in enumerate(self.handlers):
+            bit = 1 << i
+            mots_cles = getattr(handler, "declencheurs_mots_cles", None)
+            if mots_cles is None:
+                toujours |= bit
+                continue
+            for mot in mots_cles:
+                automate.add(mot, bit)
+            commandes = getattr(handler, "declencheurs_commandes", ())
+            if commandes:
+                for alias, commande in lookup.items():
+                    if commande in commandes:
+                        automate.add(alias.lower(), bit)
+            motifs = getattr(handler, "declencheurs_motifs", ())
+            if motifs:
+                groupe = f"h{i}"
+                alternatives = "|".join(f"(?:{m})" for m in motifs)
+                # Anticipation facultative : le groupe est renseigné si un des motifs
+                # apparaît quelque part, sans consommer le texte pour les suivants
+                parties.append(f"(?:(?=.*?(?P<{groupe}>{alternatives})))?")
+                groupes[groupe] = bit
+        automate.build()
+
+        self._automate = automate
+        self._toujours = toujours
+        self._groupes = groupes
+        self._regex = re.compile("".join(parties), re.DOTALL) if parties else None
+        self.rebuilds += 1
+
+    def reconstruire(self) -> None:
+        """Recompile l'index (après modification des déclarations ou des alias)."""
+        self._construire()
+
+    def _masque(self, texte: str) -> int:
+        if _alias_lookup()[0] != self._alias_version:
+            self._construire()
+
+        texte_bas = texte.lower()
+        masque = self._toujours | self._automate.scan(texte_bas)
+        if self._regex is not None:
+            texte_nettoye = nettoyer_commande(texte)
+            cibles = (texte_nettoye,) if texte_nettoye == texte_bas else (texte_nettoye, texte_bas)
+            for cible in cibles:
+                for groupe, valeur in self._regex.match(cible).groupdict().items():
+                    if valeur is not None:
+                        masque |= self._groupes[groupe]
+        return masque
+
+    def candidats(self, texte: str) -> List[Callable]:
+        """
+        Gestionnaires à essayer pour ce texte, dans l'ordre de priorité.
+
+        Args:
+            texte: Texte de la commande
+
+        Returns:
+            Liste ordonnée des gestionnaires candidats
+        """
+        start = time.perf_counter()
+        masque = self._masque(texte)
+        resultat = [h for i, h in enumerate(self.handlers) if masque >> i & 1]
+        self.scan_time += time.perf_counter() - start
+        self.utterances += 1
+        self.candidates_total += len(resultat)
+        return resultat
+
+    def reset_stats(self) -> None:
+        """Remet les compteurs à zéro."""
+        self.utterances = 0
+        self.candidates_total = 0
+        self.scan_time = 0.0
+
+    def get_stats(self) -> dict:
+        """Retourne la taille de l'index et les compteurs de répartition."""
+        n = max(self.utterances, 1)
+        return {
+            "handlers": len(self.handlers),
+            "always_probed": [_nom_gestionnaire(h) for i, h in enumerate(self.handlers)
+                              if self._toujours >> i & 1],
+            "keywords": self._automate.keywords,
+            "automaton_states": self._automate.states,
+            "patterns": len(self._groupes),
+            "rebuilds": self.rebuilds,
+            "utterances": self.utterances,
+            "avg_candidates": round(self.candidates_total / n, 2),
+            "avg_scan_us": round(self.scan_time / n * 1e6, 1),
+        }
+
+
+# Index créés, par nom
+_dispatch_indexes: Dict[str, DispatchIndex] = {}
+
+
+def create_dispatch_index(handlers: Sequence[Callable], name: str = "commandes") -> DispatchIndex:
+    """
+    Compile un index de répartition et l'enregistre pour les statistiques.
+
+    Args:
+        handlers: Gestionnaires dans l'ordre de priorité
+        name: Nom de l'index (remplace un index existant du même nom)
+
+    Returns:
+        L'index compilé
+    """
+    index = DispatchIndex(handlers, name)
+    _dispatch_indexes[name] = index
+    return index
+
+
+def get_dispatch_stats() -> Dict[str, dict]:
+    """Statistiques de tous les index de répartition."""
+    return {name: index.get_stats() for name, index in _dispatch_indexes.items()}
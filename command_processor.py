@@ -15,7 +15,7 @@ except ImportError:
     web_interface_available = False
     print("Interface web non disponible")
 from config import get_dictation_mode, get_dictated_text, get_translation_mode
-from text_processing import ecrire_texte_avec_accents, nettoyer_commande, normaliser_commande
+from text_processing import ecrire_texte_avec_accents, nettoyer_commande, normaliser_commande, nettoyer_reponse_stt
 
 # Import des optimisations Numba
 try:
@@ -24,7 +24,7 @@ try:
 except ImportError as e:
     print(f"Numba math non disponible, utilisation des fonctions standards: {e}")
     NUMBA_MATH_AVAILABLE = False
-from command_aliases import is_command_alias
+from command_aliases import is_command_alias, command_aliases
 
 # Helper functions pour l'interface web
 def _log_command_to_web(command_text):
@@ -62,6 +62,7 @@ from screen_reader import lire_ecran_intelligemment
 from screen_reader_commands import est_commande_lecture_ecran, executer_commande_lecture_ecran
 from shortcuts_database import executer_raccourci_personnalise
 from error_handler import get_error_handler, ErrorCategory, ErrorSeverity, catch_errors
+from command_dispatch import create_dispatch_index
 
 # Obtenir l'instance du gestionnaire d'erreurs
 error_handler = get_error_handler()
@@ -73,6 +74,44 @@ class CommandProcessor:
         """Initialisation du processeur de commandes"""
         # Démarrer le vérificateur de rappels
         start_reminder_checker()
+        # Index compilé des déclencheurs des gestionnaires de commandes
+        self.dispatch_index = create_dispatch_index(self.gestionnaires_commandes(), "command_processor")
+
+    def gestionnaires_commandes(self):
+        """
+        Gestionnaires de commandes, dans l'ordre de priorité.
+
+        Returns:
+            list: Fonctions acceptant le texte et renvoyant un résultat ou None
+        """
+        return [
+            # Priorité aux commandes d'accessibilité pour les personnes à mobilité réduite
+            executer_commande_accessibilite,
+            # Commandes de traduction (prioritaires pour éviter les conflits)
+            executer_commande_traduction,
+            # Commandes d'analyse (prioritaires pour éviter les conflits)
+            executer_commande_analyse,
+            # Commandes de navigateur (prioritaires pour les opérations sur les onglets et sites web)
+            executer_commande_navigateur,
+            # Commandes de fenêtre (pour la navigation entre applications)
+            self.executer_commande_fenetre_wrapper,
+            # Commandes de souris (prioritaires pour les clics)
+            executer_commande_souris,
+            # Commandes de recherche (prioritaires pour une meilleure expérience utilisateur)
+            executer_commande_recherche,
+            # Commandes de lecture d'écran (après les autres commandes prioritaires)
+            executer_commande_lecture_ecran,
+            executer_commande_clavier,
+            executer_commande_systeme,
+            executer_commande_productivite,
+            executer_commande_git,
+            executer_commande_dev,
+            executer_commande_projet,
+            executer_commande_web_dev,
+            executer_commande_database,
+            executer_commande_rappel,
+            executer_commande_fichier
+        ]
     
     @catch_errors(category=ErrorCategory.COMMAND_PROCESSING, severity=ErrorSeverity.HIGH)
     def process_command(self, texte):
@@ -309,35 +348,9 @@ class CommandProcessor:
                 )
                 # Continuer avec les autres types de commandes
             
-            # Essayer les différents types de commandes dans l'ordre
-            commandes = [
-                # Priorité aux commandes d'accessibilité pour les personnes à mobilité réduite
-                executer_commande_accessibilite,
-                # Commandes de traduction (prioritaires pour éviter les conflits)
-                executer_commande_traduction,
-                # Commandes d'analyse (prioritaires pour éviter les conflits)
-                executer_commande_analyse,
-                # Commandes de navigateur (prioritaires pour les opérations sur les onglets et sites web)
-                executer_commande_navigateur,
-                # Commandes de fenêtre (pour la navigation entre applications)
-                self.executer_commande_fenetre_wrapper,
-                # Commandes de souris (prioritaires pour les clics)
-                executer_commande_souris,
-                # Commandes de recherche (prioritaires pour une meilleure expérience utilisateur)
-                executer_commande_recherche,
-                # Commandes de lecture d'écran (après les autres commandes prioritaires)
-                executer_commande_lecture_ecran,
-                executer_commande_clavier,
-                executer_commande_systeme,
-                executer_commande_productivite,
-                executer_commande_git,
-                executer_commande_dev,
-                executer_commande_projet,
-                executer_commande_web_dev,
-                executer_commande_database,
-                executer_commande_rappel,
-                executer_commande_fichier
-            ]
+            # Essayer, dans l'ordre de priorité, les seuls gestionnaires dont un
+            # déclencheur apparaît dans le texte (les autres ne peuvent pas répondre)
+            commandes = self.dispatch_index.candidats(texte)
             
             # Liste pour suivre les erreurs rencontrées
             erreurs_commandes = []
@@ -428,6 +441,53 @@ class CommandProcessor:
             
             return error_response
             
+    def est_commande_complete(self, texte):
+        """
+        Indique, sans rien exécuter, si le texte correspond exactement à une
+        commande connue (alias ou raccourci personnalisé) qui ne peut plus
+        être prolongée : "fermer" n'est pas complet tant que "fermer la
+        fenêtre" reste possible.
+
+        Utilisé par la transcription en continu pour déclencher une commande
+        dès que le préfixe validé est complet.
+
+        Args:
+            texte (str): Texte partiel reconnu
+
+        Returns:
+            bool: True si le texte est une commande complète
+        """
+        if not texte or not texte.strip():
+            return False
+
+        # Les commandes qui attendent un paramètre ne sont jamais complètes à ce stade
+        commandes_parametrees = {"go_to_website", "screen_read_from", "start_dictation", "start_translation"}
+
+        try:
+            texte_nettoye = nettoyer_reponse_stt(texte, "whisper_ct2")
+            # La suite de la parole peut encore former un autre alias
+            if command_aliases.alias_trie.has_longer(texte_nettoye):
+                return False
+
+            commande = command_aliases.command_lookup.get(texte_nettoye)
+            if commande is not None:
+                return commande not in commandes_parametrees
+
+            try:
+                from whisp_assistant.database_manager import get_custom_shortcut_by_command
+            except ImportError:
+                from database_manager import get_custom_shortcut_by_command
+            return bool(get_custom_shortcut_by_command(texte_nettoye))
+        except Exception as e:
+            error_handler.handle_error(
+                e,
+                category=ErrorCategory.COMMAND_PROCESSING,
+                severity=ErrorSeverity.LOW,
+                notify_user=False,
+                context={"action": "vérification de commande complète", "texte": texte}
+            )
+            return False
+
     def executer_commande_fenetre_wrapper(self, texte):
         """Wrapper pour executer_commande_fenetre qui gère le cas spécial des sites web"""
         # Vérification préalable pour les sites web courants
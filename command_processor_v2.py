@@ -14,7 +14,7 @@ from command_router import CommandDispatcher, create_command_modules
 
 # Imports essentiels
 from config import get_dictation_mode, get_translation_mode
-from text_processing import ecrire_texte_avec_accents, nettoyer_commande
+from text_processing import ecrire_texte_avec_accents, nettoyer_commande, normaliser_commande
 from error_handler import get_error_handler, ErrorCategory, ErrorSeverity, catch_errors
 
 # Importer les fonctions de l'interface web
@@ -42,11 +42,10 @@ class CommandProcessorV2:
         
         # Ajouter les pré-processeurs
         self.dispatcher.add_pre_processor(self._log_command)
-        self.dispatcher.add_pre_processor(self._check_exit_confirmation)
         self.dispatcher.add_pre_processor(self._check_tts_stop)
         
-        # Ajouter les handlers prioritaires
-        self._register_priority_handlers()
+        # Ajouter les handlers des phases de routage
+        self._register_phase_handlers()
         
         # Créer et enregistrer tous les modules
         self._register_command_modules()
@@ -57,32 +56,28 @@ class CommandProcessorV2:
         # Ajouter les post-processeurs
         self.dispatcher.add_post_processor(self._log_response)
     
-    def _register_priority_handlers(self):
-        """Enregistre les handlers qui doivent être vérifiés en priorité"""
+    def _register_phase_handlers(self):
+        """Enregistre les handlers des phases qui précèdent les modules"""
+        router = self.dispatcher.router
         
-        # Mode traduction
-        self.dispatcher.router.register_priority_handler(
-            r'.*',  # Toutes les commandes
-            self._check_translation_mode
-        )
-        
-        # Mode dictée
-        self.dispatcher.router.register_priority_handler(
-            r'.*',  # Toutes les commandes
-            self._check_dictation_mode
-        )
+        # Phase modale : ignorée d'un bloc hors des modes traduction et dictée
+        router.set_phase_guard("modal", lambda: get_translation_mode() or get_dictation_mode())
+        router.add_phase_handler("modal", self._check_translation_mode, guard=get_translation_mode)
+        router.add_phase_handler("modal", self._check_dictation_mode, guard=get_dictation_mode)
         
-        # Commandes de sortie
-        self.dispatcher.router.register_priority_handler(
-            r'^(?:quitte?r?|arr[êe]te?r?|ferme?r?|stop|exit|bye|au revoir|salut|à plus|goodbye)',
-            self._handle_exit_command
+        # Confirmation de sortie en cours, puis commandes de sortie
+        router.add_phase_handler("exit", self._handle_exit_confirmation, guard=self._confirmation_en_cours)
+        router.add_phase_handler(
+            "exit",
+            self._handle_exit_command,
+            pattern=r'^(?:quitte?r?|arr[êe]te?r?|ferme?r?|stop|exit|bye|au revoir|salut|à plus|goodbye)'
         )
         
-        # Commandes d'aide
-        self.dispatcher.router.register_priority_handler(
-            r'^aide(?:\s+(.+))?$',
-            self._handle_help_command
-        )
+        # Commandes normalisées par les alias (normalisation calculée une seule fois)
+        router.set_alias_normalizer(lambda command: normaliser_commande(command)[0])
+        router.add_phase_handler("alias", self._handle_help_command, pattern=r'^aide(?:\s+(.+))?$')
+        router.add_phase_handler("alias", self._handle_select_all, commands=("select_all",))
+        router.add_phase_handler("alias", self._handle_screen_context, commands=("screen_context",))
     
     def _register_command_modules(self):
         """Enregistre tous les modules de commandes"""
@@ -115,6 +110,23 @@ class CommandProcessorV2:
         """
         return self.dispatcher.process(texte)
     
+    def explain_command(self, texte: str) -> dict:
+        """
+        Traite une commande et explique son routage
+        
+        Args:
+            texte: La commande vocale à traiter
+            
+        Returns:
+            Résultat, phase et handler qui ont traité la commande, et durée de
+            chaque phase parcourue (en ms)
+        """
+        return self.dispatcher.explain(texte)
+    
+    def get_routing_stats(self) -> dict:
+        """Retourne les compteurs de routage par phase et par module"""
+        return self.dispatcher.router.get_stats()
+    
     # === Pré-processeurs ===
     
     def _log_command(self, command: str) -> str:
@@ -123,17 +135,6 @@ class CommandProcessorV2:
             command_to_web(command)
         return command
     
-    def _check_exit_confirmation(self, command: str) -> str:
-        """Vérifie si une confirmation de sortie est en cours"""
-        exit_module = safe_import('exit_commands')
-        if exit_module:
-            confirmation_en_cours = getattr(exit_module, 'confirmation_en_cours', False)
-            if confirmation_en_cours:
-                traiter_reponse = get_function('exit_commands', 'traiter_reponse_confirmation')
-                if traiter_reponse and traiter_reponse(command):
-                    return None  # Stopper le traitement
-        return command
-    
     def _check_tts_stop(self, command: str) -> str:
         """Vérifie si c'est une commande d'arrêt du TTS"""
         tts_module = safe_import('tts_module')
@@ -146,13 +147,10 @@ class CommandProcessorV2:
                 return None  # Stopper le traitement
         return command
     
-    # === Handlers prioritaires ===
+    # === Handlers des phases de routage ===
     
     def _check_translation_mode(self, command: str) -> Optional[str]:
-        """Vérifie et traite le mode traduction"""
-        if not get_translation_mode():
-            return None
-        
+        """Traite la commande en mode traduction (phase modale)"""
         try:
             analysis_module = safe_import('analysis_commands')
             if analysis_module:
@@ -171,10 +169,7 @@ class CommandProcessorV2:
         return None
     
     def _check_dictation_mode(self, command: str) -> Optional[str]:
-        """Vérifie et traite le mode dictée"""
-        if not get_dictation_mode():
-            return None
-        
+        """Traite la commande en mode dictée (phase modale)"""
         dictation_module = safe_import('dictation_mode')
         if dictation_module:
             traiter_dictee = get_function('dictation_mode', 'traiter_dictee')
@@ -183,6 +178,18 @@ class CommandProcessorV2:
         
         return None
     
+    def _confirmation_en_cours(self) -> bool:
+        """Indique si une confirmation de sortie est en attente"""
+        exit_module = safe_import('exit_commands')
+        return bool(exit_module and getattr(exit_module, 'confirmation_en_cours', False))
+    
+    def _handle_exit_confirmation(self, command: str) -> Optional[str]:
+        """Traite la réponse à une confirmation de sortie"""
+        traiter_reponse = get_function('exit_commands', 'traiter_reponse_confirmation')
+        if traiter_reponse and traiter_reponse(command):
+            return "Traitement de la confirmation de sortie"
+        return None
+    
     def _handle_exit_command(self, command: str) -> Optional[str]:
         """Gère les commandes de sortie"""
         exit_module = safe_import('exit_commands')
@@ -211,9 +218,23 @@ class CommandProcessorV2:
         else:
             return self._get_module_help(help_topic)
     
+    def _handle_select_all(self, command: str) -> Optional[str]:
+        """Gère les alias de « tout sélectionner »"""
+        executer_clavier = get_function('keyboard_commands', 'executer_commande_clavier')
+        if executer_clavier:
+            return executer_clavier("sélectionner tout")
+        return None
+    
+    def _handle_screen_context(self, command: str) -> Optional[str]:
+        """Gère les alias de description du contexte de l'écran"""
+        decrire_contexte = get_function('screen_context', 'decrire_contexte_ecran')
+        if decrire_contexte:
+            return decrire_contexte()
+        return None
+    
     def _get_general_help(self) -> str:
         """Retourne l'aide générale"""
-        return \"\"\"
+        return """
 Commandes générales disponibles:
 - Dictée : "écris [texte]" ou "dictée" puis "fin de dictée"
 - Souris : "clic gauche", "double clic", "souris en haut à gauche"
@@ -224,11 +245,11 @@ Commandes générales disponibles:
 - Aide : "aide développeur" pour les commandes de développement
 
 Dites "quitte l'assistant" pour arrêter.
-\"\"\"
+"""
     
     def _get_developer_help(self) -> str:
-        \"\"\"Retourne l'aide développeur\"\"\"
-        return \"\"\"
+        """Retourne l'aide développeur"""
+        return """
 Commandes développeur disponibles:
 - Git : "git status", "git add tout", "git commit avec message [msg]"
 - IDE : "ouvre vs code", "vs code palette de commandes"
@@ -236,11 +257,11 @@ Commandes développeur disponibles:
 - Tests : "lance les tests", "exécute pytest"
 - Docker : "docker status", "lance conteneur [nom]"
 - Projets : "crée projet python [nom]", "ajoute tâche [description]"
-\"\"\"
+"""
     
     def _get_productivity_help(self) -> str:
-        \"\"\"Retourne l'aide productivité\"\"\"
-        return \"\"\"
+        """Retourne l'aide productivité"""
+        return """
 Commandes productivité disponibles:
 - Office : "ouvre word", "ouvre excel", "nouveau document"
 - Formatage : "mets en gras", "centre le texte", "souligne"
@@ -248,10 +269,10 @@ Commandes productivité disponibles:
 - Réunions : "active le micro", "partage mon écran"
 - Notes : "note rapide [texte]", "affiche mes notes"
 - Minuteur : "démarre un minuteur", "démarre un pomodoro de 25 minutes"
-\"\"\"
+"""
     
     def _get_module_help(self, module_name: str) -> str:
-        \"\"\"Retourne l'aide pour un module spécifique\"\"\"
+        """Retourne l'aide pour un module spécifique"""
         modules_disponibles = {
             "system": "Commandes système: 'éteins l'ordinateur', 'redémarre', 'verrouille'",
             "browser": "Navigation web: 'ouvre google', 'nouvel onglet', 'ferme l'onglet'",
@@ -269,7 +290,7 @@ Commandes productivité disponibles:
     # === Handler par défaut ===
     
     def _handle_unknown_command(self, command: str) -> str:
-        \"\"\"Gère les commandes non reconnues\"\"\"
+        """Gère les commandes non reconnues"""
         # Vérifier si c'est un raccourci personnalisé
         shortcuts_module = safe_import('shortcuts_database')
         if shortcuts_module:
@@ -281,12 +302,12 @@ Commandes productivité disponibles:
         
         # Si ce n'est pas un raccourci, écrire le texte
         ecrire_texte_avec_accents(command)
-        return f\"Texte écrit: {command}\"
+        return f"Texte écrit: {command}"
     
     # === Post-processeurs ===
     
     def _log_response(self, response: str) -> str:
-        \"\"\"Log la réponse\"\"\"
+        """Log la réponse"""
         if web_interface_available and response:
             response_to_web(response)
         return response
@@ -295,7 +316,7 @@ Commandes productivité disponibles:
 command_processor = None
 
 def get_command_processor() -> CommandProcessorV2:
-    \"\"\"Obtient l'instance globale du processeur de commandes\"\"\"
+    """Obtient l'instance globale du processeur de commandes"""
     global command_processor
     if command_processor is None:
         command_processor = CommandProcessorV2()
@@ -4,24 +4,71 @@ Module de routage des commandes pour réduire la complexité du processeur princ
 
 from typing import Dict, List, Tuple, Callable, Optional
 import re
+import time
 from base_command_module import BaseCommandModule
+from text_processing import nettoyer_commande
+
+# Phases de routage, dans l'ordre : modes modaux (traduction, dictée), sortie et
+# confirmation, commandes normalisées par les alias, index des modules, défaut
+ROUTING_PHASES = ("modal", "exit", "alias", "modules", "fallback")
+
+class PhaseHandler:
+    """Handler d'une phase de routage, avec ses conditions d'appel"""
+    
+    def __init__(self, handler: Callable, pattern: Optional[str] = None,
+                 guard: Optional[Callable[[], bool]] = None, commands: Tuple[str, ...] = ()):
+        self.handler = handler
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.guard = guard
+        self.commands = tuple(commands)
+        self.name = getattr(handler, "__name__", str(handler))
 
 class CommandRouter:
     """Routeur pour diriger les commandes vers les bons modules"""
     
     def __init__(self):
         self.modules: List[BaseCommandModule] = []
-        self.priority_handlers: List[Tuple[re.Pattern, Callable]] = []
+        self.phase_handlers: Dict[str, List[PhaseHandler]] = {phase: [] for phase in ROUTING_PHASES}
+        self.phase_guards: Dict[str, Callable[[], bool]] = {}
+        self.alias_normalizer: Optional[Callable[[str], Optional[str]]] = None
         self.fallback_handler: Optional[Callable] = None
+        self.last_route: Optional[Dict] = None
+        self.reset_stats()
     
     def register_module(self, module: BaseCommandModule):
         """Enregistre un module de commandes"""
         self.modules.append(module)
+        self.module_stats.setdefault(module.module_name, self._nouveaux_compteurs())
+    
+    def add_phase_handler(self, phase: str, handler: Callable, pattern: Optional[str] = None,
+                          guard: Optional[Callable[[], bool]] = None, commands: Tuple[str, ...] = ()):
+        """
+        Enregistre un handler dans une phase de routage
+        
+        Args:
+            phase: Phase (voir ROUTING_PHASES, hors "modules" et "fallback")
+            handler: Fonction recevant la commande, renvoyant un résultat ou None
+            pattern: Expression que la commande doit satisfaire (re.match)
+            guard: Condition d'état sans argument, évaluée avant tout le reste
+            commands: Commandes normalisées (alias) auxquelles le handler répond
+        """
+        if phase not in self.phase_handlers or phase in ("modules", "fallback"):
+            raise ValueError(f"Phase de routage invalide: {phase}")
+        self.phase_handlers[phase].append(PhaseHandler(handler, pattern, guard, commands))
+    
+    def set_phase_guard(self, phase: str, guard: Callable[[], bool]):
+        """Définit une condition d'état qui court-circuite toute la phase quand elle est fausse"""
+        if phase not in self.phase_handlers:
+            raise ValueError(f"Phase de routage invalide: {phase}")
+        self.phase_guards[phase] = guard
+    
+    def set_alias_normalizer(self, normalizer: Callable[[str], Optional[str]]):
+        """Définit la fonction qui ramène une commande à sa commande normalisée (phase "alias")"""
+        self.alias_normalizer = normalizer
     
     def register_priority_handler(self, pattern: str, handler: Callable):
-        """Enregistre un handler prioritaire qui sera vérifié avant les modules"""
-        compiled_pattern = re.compile(pattern, re.IGNORECASE)
-        self.priority_handlers.append((compiled_pattern, handler))
+        """Enregistre un handler prioritaire qui sera vérifié avant les modules (phase "alias")"""
+        self.add_phase_handler("alias", handler, pattern=pattern)
     
     def set_fallback_handler(self, handler: Callable):
         """Définit le handler par défaut si aucune commande ne correspond"""
@@ -34,25 +81,125 @@ class CommandRouter:
         Returns:
             Le résultat du traitement ou None si aucun handler n'a pu traiter la commande
         """
-        # Vérifier d'abord les handlers prioritaires
-        for pattern, handler in self.priority_handlers:
-            if pattern.match(command):
-                result = handler(command)
-                if result is not None:
-                    return result
+        result, _ = self._route(command)
+        return result
+    
+    def explain_route(self, command: str) -> Dict:
+        """
+        Route une commande et explique le routage
         
-        # Ensuite vérifier les modules enregistrés
+        Returns:
+            Dictionnaire : résultat, phase et handler qui ont traité la commande,
+            et pour chaque phase parcourue le nombre de handlers essayés et la durée
+        """
+        result, trace = self._route(command)
+        return {**trace, "result": result}
+    
+    def _route(self, command: str) -> Tuple[Optional[str], Dict]:
+        self.stats["routed"] += 1
+        trace = {"command": command, "phase": None, "handler": None, "phases": []}
+        # Commande normalisée, calculée au plus une fois et seulement si nécessaire
+        normalized = {}
+        result = None
+        
+        for phase in ROUTING_PHASES:
+            start = time.perf_counter()
+            guard = self.phase_guards.get(phase)
+            if guard is not None and not guard():
+                trace["phases"].append({"phase": phase, "skipped": True, "tried": 0,
+                                        "ms": round((time.perf_counter() - start) * 1000, 3)})
+                continue
+            
+            if phase == "modules":
+                result, name, tried = self._route_modules(command)
+            elif phase == "fallback":
+                name, tried = None, 0
+                if self.fallback_handler:
+                    self.stats["fallbacks"] += 1
+                    name, tried = getattr(self.fallback_handler, "__name__", "fallback"), 1
+                    result = self.fallback_handler(command)
+            else:
+                result, name, tried = self._route_phase(phase, command, normalized)
+            
+            elapsed = time.perf_counter() - start
+            compteurs = self.phase_stats[phase]
+            compteurs["entered"] += 1
+            compteurs["time_ms"] += elapsed * 1000
+            trace["phases"].append({"phase": phase, "skipped": False, "tried": tried,
+                                    "ms": round(elapsed * 1000, 3)})
+            if result is not None:
+                compteurs["handled"] += 1
+                trace["phase"], trace["handler"] = phase, name
+                break
+        
+        self.last_route = trace
+        return result, trace
+    
+    def _route_phase(self, phase: str, command: str, normalized: Dict) -> Tuple[Optional[str], Optional[str], int]:
+        tried = 0
+        for entry in self.phase_handlers[phase]:
+            if entry.guard is not None and not entry.guard():
+                continue
+            if entry.pattern is not None and not entry.pattern.match(command):
+                continue
+            if entry.commands:
+                if "value" not in normalized:
+                    normalized["value"] = self.alias_normalizer(command) if self.alias_normalizer else None
+                if normalized["value"] not in entry.commands:
+                    continue
+            tried += 1
+            result = entry.handler(command)
+            if result is not None:
+                return result, entry.name, tried
+        return None, None, tried
+    
+    def _route_modules(self, command: str) -> Tuple[Optional[str], Optional[str], int]:
+        # can_handle ne fait qu'une correspondance de motifs, seul un module
+        # retenu est exécuté (une fois)
+        tried = 0
         for module in self.modules:
+            compteurs = self.module_stats.setdefault(module.module_name, self._nouveaux_compteurs())
+            compteurs["match_checks"] += 1
             if module.can_handle(command):
+                tried += 1
+                compteurs["matches"] += 1
+                compteurs["executions"] += 1
                 result = module.process_command(command)
                 if result is not None:
-                    return result
-        
-        # Si aucun module ne peut traiter, utiliser le fallback
-        if self.fallback_handler:
-            return self.fallback_handler(command)
+                    compteurs["handled"] += 1
+                    self.stats["handled"] += 1
+                    return result, module.module_name, tried
+        return None, None, tried
+    
+    @staticmethod
+    def _nouveaux_compteurs() -> Dict[str, int]:
+        return {"match_checks": 0, "matches": 0, "executions": 0, "handled": 0}
+    
+    def reset_stats(self):
+        """Remet à zéro les compteurs de routage"""
+        self.stats = {"routed": 0, "handled": 0, "fallbacks": 0}
+        self.module_stats: Dict[str, Dict[str, int]] = {
+            module.module_name: self._nouveaux_compteurs() for module in self.modules
+        }
+        self.phase_stats: Dict[str, Dict[str, float]] = {
+            phase: {"entered": 0, "handled": 0, "time_ms": 0.0} for phase in ROUTING_PHASES
+        }
+    
+    def get_stats(self) -> Dict:
+        """
+        Retourne les compteurs de routage.
         
-        return None
+        Pour chaque module, executions == matches : une commande n'est jamais
+        exécutée pour savoir si elle correspond, ni exécutée deux fois.
+        """
+        return {
+            **self.stats,
+            "executions": sum(c["executions"] for c in self.module_stats.values()),
+            "modules": {nom: dict(c) for nom, c in self.module_stats.items()},
+            "phases": {
+                phase: {**c, "time_ms": round(c["time_ms"], 3)} for phase, c in self.phase_stats.items()
+            },
+        }
     
     def get_all_commands_help(self) -> Dict[str, Dict[str, List[str]]]:
         """Récupère l'aide de tous les modules"""
@@ -84,21 +231,34 @@ class CommandDispatcher:
         """
         Traite une commande en appliquant les pré/post processeurs et le routage
         """
+        result, _ = self._process(command)
+        return result
+    
+    def explain(self, command: str) -> Dict:
+        """
+        Traite une commande et explique son routage (voir CommandRouter.explain_route)
+        """
+        result, trace = self._process(command)
+        return {**trace, "result": result}
+    
+    def _process(self, command: str) -> Tuple[Optional[str], Dict]:
         # Appliquer les pré-processeurs
         for processor in self.pre_processors:
             command = processor(command)
             if command is None:
-                return None
+                name = getattr(processor, "__name__", str(processor))
+                return None, {"command": None, "phase": "pre_processor", "handler": name, "phases": []}
         
         # Router la commande
-        result = self.router.route_command(command)
+        trace = self.router.explain_route(command)
+        result = trace.pop("result")
         
         # Appliquer les post-processeurs
         if result is not None:
             for processor in self.post_processors:
                 result = processor(result)
         
-        return result
+        return result, trace
 
 def create_command_modules() -> Dict[str, BaseCommandModule]:
     """
@@ -108,26 +268,26 @@ def create_command_modules() -> Dict[str, BaseCommandModule]:
     
     # Importer et créer les modules de manière paresseuse
     module_configs = [
-        ('keyboard', 'keyboard_commands', 'KeyboardCommands'),
-        ('mouse', 'mouse_commands', 'MouseCommands'),
-        ('system', 'system_commands', 'SystemCommands'),
-        ('browser', 'browser_commands', 'BrowserCommands'),
-        ('productivity', 'productivity_commands', 'ProductivityCommands'),
-        ('window', 'window_manager', 'WindowCommands'),
-        ('git', 'git_commands', 'GitCommands'),
-        ('dev', 'dev_environment_commands', 'DevCommands'),
-        ('project', 'project_management_commands', 'ProjectCommands'),
-        ('web_dev', 'web_dev_commands', 'WebDevCommands'),
-        ('database', 'database_commands', 'DatabaseCommands'),
-        ('reminder', 'reminder_commands', 'ReminderCommands'),
-        ('search', 'search_commands', 'SearchCommands'),
-        ('file', 'file_commands', 'FileCommands'),
-        ('accessibility', 'accessibility_commands', 'AccessibilityCommands'),
-        ('analysis', 'analysis_commands', 'AnalysisCommands'),
-        ('screen_reader', 'screen_reader_commands', 'ScreenReaderCommands'),
+        ('keyboard', 'keyboard_commands', 'KeyboardCommands', 'executer_commande_clavier'),
+        ('mouse', 'mouse_commands', 'MouseCommands', 'executer_commande_souris'),
+        ('system', 'system_commands', 'SystemCommands', 'executer_commande_systeme'),
+        ('browser', 'browser_commands', 'BrowserCommands', 'executer_commande_navigateur'),
+        ('productivity', 'productivity_commands', 'ProductivityCommands', 'executer_commande_productivite'),
+        ('window', 'window_manager', 'WindowCommands', 'executer_commande_fenetre'),
+        ('git', 'git_commands', 'GitCommands', 'executer_commande_git'),
+        ('dev', 'dev_environment_commands', 'DevCommands', 'executer_commande_dev'),
+        ('project', 'project_management_commands', 'ProjectCommands', 'executer_commande_projet'),
+        ('web_dev', 'web_dev_commands', 'WebDevCommands', 'executer_commande_web_dev'),
+        ('database', 'database_commands', 'DatabaseCommands', 'executer_commande_database'),
+        ('reminder', 'reminder_commands', 'ReminderCommands', 'executer_commande_rappel'),
+        ('search', 'search_commands', 'SearchCommands', 'executer_commande_recherche'),
+        ('file', 'file_commands', 'FileCommands', 'executer_commande_fichier'),
+        ('accessibility', 'accessibility_commands', 'AccessibilityCommands', 'executer_commande_accessibilite'),
+        ('analysis', 'analysis_commands', 'AnalysisCommands', 'executer_commande_analyse'),
+        ('screen_reader', 'screen_reader_commands', 'ScreenReaderCommands', 'executer_commande_lecture_ecran'),
     ]
     
-    for module_name, module_file, class_name in module_configs:
+    for module_name, module_file, class_name, legacy_function in module_configs:
         try:
             # Import dynamique du module
             module = __import__(module_file, fromlist=[class_name])
@@ -138,7 +298,7 @@ def create_command_modules() -> Dict[str, BaseCommandModule]:
                 modules[module_name] = command_class()
             else:
                 # Sinon, créer un wrapper pour l'ancien module
-                modules[module_name] = create_legacy_wrapper(module_name, module)
+                modules[module_name] = create_legacy_wrapper(module_name, module, legacy_function)
                 
         except ImportError as e:
             print(f"Impossible d'importer le module {module_file}: {e}")
@@ -147,47 +307,110 @@ def create_command_modules() -> Dict[str, BaseCommandModule]:
     
     return modules
 
-def create_legacy_wrapper(module_name: str, module) -> BaseCommandModule:
+def _version_alias() -> int:
+    """Version de la table des alias, incrémentée à chaque modification (0 si indisponible)"""
+    try:
+        from whisp_assistant.command_aliases import command_aliases
+    except ImportError:
+        try:
+            from command_aliases import command_aliases
+        except ImportError:
+            return 0
+    return command_aliases.version
+
+def _alias_commandes(commandes) -> List[str]:
+    """Alias actuels des commandes normalisées données"""
+    try:
+        from whisp_assistant.command_aliases import command_aliases
+    except ImportError:
+        try:
+            from command_aliases import command_aliases
+        except ImportError:
+            return []
+    return [alias for alias, commande in command_aliases.command_lookup.items() if commande in commandes]
+
+def create_legacy_wrapper(module_name: str, module, function_name: Optional[str] = None) -> BaseCommandModule:
     """
     Crée un wrapper pour les modules qui n'utilisent pas encore BaseCommandModule
+    
+    Les déclencheurs déclarés par la fonction du module (@declencheurs, voir
+    command_dispatch) sont enregistrés comme motifs : can_handle se limite à une
+    correspondance de motifs et la fonction n'est exécutée que pour traiter la
+    commande. Un module sans déclaration reste candidat pour toute commande.
     """
     from base_command_module import BaseCommandModule
     
+    # Chercher la fonction de traitement appropriée dans le module
+    process_func_names = [
+        function_name,
+        f'executer_commande_{module_name}',
+        f'traiter_commande_{module_name}',
+        f'process_{module_name}_command',
+        'process_command',
+        'execute_command'
+    ]
+    process_func = next((getattr(module, name) for name in process_func_names
+                         if name and hasattr(module, name)), None)
+    
     class LegacyWrapper(BaseCommandModule):
         def __init__(self):
-            super().__init__()
             self.module = module
+            self.function = process_func
+            self.declared = False
+            # Version des alias lus dans les motifs (None si le module n'en déclare pas)
+            self.alias_version = None
+            super().__init__()
             self.module_name = module_name
         
         def _initialize_patterns(self):
-            # Pour les modules legacy, on n'initialise pas de patterns
-            # car ils ont leur propre logique de traitement
-            pass
+            # Motifs extraits des déclencheurs déclarés par le module
+            fonction = self.function
+            if fonction is None or not hasattr(fonction, 'declencheurs_mots_cles'):
+                return
+            self.declared = True
+            
+            mots_cles = list(fonction.declencheurs_mots_cles)
+            if fonction.declencheurs_commandes:
+                # Motifs recompilés par can_handle quand la table des alias change
+                self.alias_version = _version_alias()
+                mots_cles += [alias.lower() for alias in _alias_commandes(fonction.declencheurs_commandes)]
+            if mots_cles:
+                # Les plus longs d'abord, pour une aide lisible
+                alternatives = "|".join(re.escape(m) for m in sorted(set(mots_cles), key=len, reverse=True))
+                self.add_command_pattern(f".*?(?:{alternatives})", self.executer_legacy,
+                                         flags=re.IGNORECASE | re.DOTALL)
+            if fonction.declencheurs_motifs:
+                alternatives = "|".join(f"(?:{m})" for m in fonction.declencheurs_motifs)
+                self.add_command_pattern(f".*?(?:{alternatives})", self.executer_legacy,
+                                         flags=re.IGNORECASE | re.DOTALL)
+        
+        def _clean_command(self, command: str) -> str:
+            # Même nettoyage que les modules legacy (ponctuation finale retirée)
+            return nettoyer_commande(command)
+        
+        def executer_legacy(self, match, command: str) -> Optional[str]:
+            """Exécute la fonction du module sur le texte de la commande"""
+            if self.function is None:
+                return None
+            try:
+                return self.function(command)
+            except Exception:
+                return None
         
         def process_command(self, command: str) -> Optional[str]:
-            # Chercher la fonction de traitement appropriée dans le module
-            process_func_names = [
-                f'executer_commande_{module_name}',
-                f'traiter_commande_{module_name}',
-                f'process_{module_name}_command',
-                'process_command',
-                'execute_command'
-            ]
-            
-            for func_name in process_func_names:
-                if hasattr(self.module, func_name):
-                    func = getattr(self.module, func_name)
-                    try:
-                        return func(command)
-                    except Exception:
-                        return None
-            
-            return None
+            # Le texte d'origine est transmis tel quel (casse comprise)
+            return self.executer_legacy(None, command)
         
         def can_handle(self, command: str) -> bool:
-            # Pour les modules legacy, on essaie de traiter et on voit si ça marche
-            # C'est moins efficace mais permet la compatibilité
-            result = self.process_command(command)
-            return result is not None
+            # Sans déclencheurs déclarés, impossible de décider sans exécuter :
+            # le module reste candidat et le routeur l'exécute une seule fois
+            if self.function is None:
+                return False
+            if not self.declared:
+                return True
+            if self.alias_version is not None and _version_alias() != self.alias_version:
+                self.command_patterns = []
+                self._initialize_patterns()
+            return super().can_handle(command)
     
-    return LegacyWrapper()
\ No newline at end of file
+    return LegacyWrapper()
@@ -9,7 +9,9 @@ import re
 import time
 import sqlite3
 from text_processing import ecrire_texte_avec_accents
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=("sqlite", "mysql", "script sql", "mongodb", "base de données"))
 def executer_commande_database(texte):
     """Exécute des commandes liées aux bases de données"""
     texte = texte.lower()
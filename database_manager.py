@@ -170,6 +170,25 @@ def initialize_database():
         )
         ''')
         
+        # Table pour le cache acoustique STT (empreinte log-mel -> texte)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stt_cache (
+            id INTEGER PRIMARY KEY,
+            engine TEXT NOT NULL,
+            fingerprint_hash TEXT NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            fingerprint BLOB NOT NULL,
+            text_content TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_hit REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            UNIQUE(engine, fingerprint_hash)
+        )
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_stt_cache_lookup ON stt_cache (engine, duration_ms)
+        ''')
+        
         conn.commit()
         conn.close()
         print(f"Base de données initialisée: {DB_PATH}")
@@ -878,6 +897,127 @@ def get_tts_cache(conn, hash_key, engine):
     
     return None
 
+@ensure_connection
+def find_stt_cache_candidates(conn, engine, min_duration_ms, max_duration_ms, min_created_at, limit=50):
+    """
+    Récupère les entrées du cache acoustique de durée voisine
+    
+    Args:
+        conn: Connexion à la base de données
+        engine: Moteur STT
+        min_duration_ms: Durée minimale de l'audio
+        max_duration_ms: Durée maximale de l'audio
+        min_created_at: Horodatage minimal (entrées plus anciennes expirées)
+        limit: Nombre maximal de candidats
+        
+    Returns:
+        list: Liste de tuples (id, duration_ms, fingerprint, text_content)
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, duration_ms, fingerprint, text_content FROM stt_cache "
+        "WHERE engine = ? AND duration_ms BETWEEN ? AND ? AND created_at >= ? "
+        "ORDER BY last_hit DESC LIMIT ?",
+        (engine, min_duration_ms, max_duration_ms, min_created_at, limit)
+    )
+    return [tuple(row) for row in cursor.fetchall()]
+
+@ensure_connection
+def save_stt_cache_entry(conn, engine, fingerprint_hash, duration_ms, fingerprint, text_content, max_entries=500):
+    """
+    Sauvegarde une entrée dans le cache acoustique STT
+    
+    Args:
+        conn: Connexion à la base de données
+        engine: Moteur STT
+        fingerprint_hash: Hachage de l'empreinte quantifiée
+        duration_ms: Durée de l'audio
+        fingerprint: Empreinte log-mel sérialisée
+        text_content: Texte reconnu
+        max_entries: Nombre maximal d'entrées conservées par moteur
+    """
+    import time
+    now = time.time()
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT OR REPLACE INTO stt_cache (engine, fingerprint_hash, duration_ms, fingerprint, text_content, created_at, last_hit, hits) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+        (engine, fingerprint_hash, duration_ms, fingerprint, text_content, now, now)
+    )
+    
+    # Limiter la taille du cache (garder les entrées les plus récemment utilisées par moteur)
+    cursor.execute(
+        "DELETE FROM stt_cache WHERE engine = ? AND id NOT IN (SELECT id FROM stt_cache WHERE engine = ? ORDER BY last_hit DESC LIMIT ?)",
+        (engine, engine, max_entries)
+    )
+    conn.commit()
+
+@ensure_connection
+def update_stt_cache_entry(conn, entry_id, text_content=None):
+    """
+    Marque une entrée du cache acoustique comme utilisée
+    
+    Args:
+        conn: Connexion à la base de données
+        entry_id: ID de l'entrée
+        text_content: Nouveau texte (optionnel)
+    """
+    import time
+    cursor = conn.cursor()
+    if text_content is None:
+        cursor.execute("UPDATE stt_cache SET last_hit = ?, hits = hits + 1 WHERE id = ?", (time.time(), entry_id))
+    else:
+        cursor.execute(
+            "UPDATE stt_cache SET last_hit = ?, created_at = ?, text_content = ? WHERE id = ?",
+            (time.time(), time.time(), text_content, entry_id)
+        )
+    conn.commit()
+
+@ensure_connection
+def purge_stt_cache(conn, min_created_at=None, engine=None):
+    """
+    Supprime les entrées expirées (ou toutes) du cache acoustique STT
+    
+    Args:
+        conn: Connexion à la base de données
+        min_created_at: Horodatage minimal conservé (None pour tout supprimer)
+        engine: Moteur STT (optionnel)
+        
+    Returns:
+        int: Nombre d'entrées supprimées
+    """
+    cursor = conn.cursor()
+    query = "DELETE FROM stt_cache WHERE 1 = 1"
+    params = []
+    if min_created_at is not None:
+        query += " AND created_at < ?"
+        params.append(min_created_at)
+    if engine:
+        query += " AND engine = ?"
+        params.append(engine)
+    cursor.execute(query, params)
+    conn.commit()
+    return cursor.rowcount
+
+@ensure_connection
+def get_stt_cache_count(conn, engine=None):
+    """
+    Compte les entrées du cache acoustique STT
+    
+    Args:
+        conn: Connexion à la base de données
+        engine: Moteur STT (optionnel)
+        
+    Returns:
+        int: Nombre d'entrées
+    """
+    cursor = conn.cursor()
+    if engine:
+        cursor.execute("SELECT COUNT(*) FROM stt_cache WHERE engine = ?", (engine,))
+    else:
+        cursor.execute("SELECT COUNT(*) FROM stt_cache")
+    return cursor.fetchone()[0]
+
 @ensure_connection
 def save_custom_shortcut(conn, name, voice_command, action_type, action_data):
     """
@@ -0,0 +1,118 @@
+"""
+Profils de décodage Whisper CT2 pour Whisp Assistant
+Choisit les paramètres de transcribe() selon le mode et la durée de l'énoncé :
+décodage glouton sans VAD interne pour les commandes courtes, recherche en
+faisceau pour la dictée, et relance avec un faisceau plus large uniquement
+lorsque la confiance du premier décodage est faible
+"""
+from typing import Iterable, Optional
+
+# Paramètres de transcribe() propres à chaque profil
+DECODE_PROFILES = {
+    # Commandes courtes : une seule hypothèse, pas de VAD interne (l'énoncé est déjà découpé)
+    "commande_rapide": {
+        "beam_size": 1,
+        "vad_filter": False,
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+        "temperature": 0.0,
+    },
+    # Commandes plus longues, où la VAD interne retire les hésitations
+    "commande": {
+        "beam_size": 5,
+        "vad_filter": True,
+        "vad_parameters": {"min_silence_duration_ms": 300},
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+        "temperature": 0.0,
+    },
+    # Dictée : recherche en faisceau et contexte du texte précédent
+    "dictee": {
+        "beam_size": 5,
+        "vad_filter": True,
+        "vad_parameters": {"min_silence_duration_ms": 300},
+        "condition_on_previous_text": True,
+        "temperature": 0.0,
+    },
+}
+
+PROMPTS = {
+    "commande_rapide": "Transcription en français. Commandes vocales courtes.",
+    "commande": "Transcription en français. Commandes vocales courtes.",
+    "dictee": "Transcription en français. Dictée de texte.",
+}
+
+
+def choisir_profil(dictation: bool, duration_s: float, fast_max_s: float = 2.0) -> str:
+    """
+    Choisit le profil de décodage d'un énoncé.
+
+    Args:
+        dictation: True en mode dictée
+        duration_s: Durée de l'énoncé en secondes
+        fast_max_s: Durée maximale d'une commande décodée en mode glouton
+
+    Returns:
+        Nom du profil
+    """
+    if dictation:
+        return "dictee"
+    return "commande_rapide" if duration_s <= fast_max_s else "commande"
+
+
+def options_profil(profil: str, language: str, initial_prompt: Optional[str] = None, **overrides) -> dict:
+    """
+    Construit les paramètres de transcribe() d'un profil.
+
+    Args:
+        profil: Nom du profil
+        language: Langue de l'audio
+        initial_prompt: Prompt initial (celui du profil par défaut)
+        **overrides: Paramètres remplaçant ceux du profil
+
+    Returns:
+        Paramètres de transcribe()
+    """
+    options = dict(DECODE_PROFILES[profil])
+    options["language"] = language
+    options["initial_prompt"] = initial_prompt if initial_prompt is not None else PROMPTS[profil]
+    options.update(overrides)
+    return options
+
+
+def confiance(segments: Iterable) -> tuple:
+    """
+    Confiance d'un décodage.
+
+    Args:
+        segments: Segments faster-whisper
+
+    Returns:
+        Tuple (avg_logprob moyen pondéré par la longueur, no_speech_prob maximal)
+    """
+    total = 0.0
+    poids = 0
+    no_speech = 0.0
+    for segment in segments:
+        n = max(1, len(getattr(segment, "tokens", None) or segment.text.split()))
+        total += getattr(segment, "avg_logprob", 0.0) * n
+        poids += n
+        no_speech = max(no_speech, getattr(segment, "no_speech_prob", 0.0))
+    return (total / poids if poids else 0.0), no_speech
+
+
+def confiance_insuffisante(segments: Iterable, min_avg_logprob: float = -0.8,
+                           max_no_speech_prob: float = 0.6) -> bool:
+    """Indique si un décodage doit être relancé avec un faisceau plus large."""
+    segments = list(segments)
+    if not segments:
+        return False
+    avg_logprob, no_speech = confiance(segments)
+    return avg_logprob < min_avg_logprob or no_speech > max_no_speech_prob
+
+
+def options_escalade(options: dict, beam_size: int) -> dict:
+    """Paramètres de la relance : faisceau élargi, autres paramètres inchangés."""
+    escalade = dict(options)
+    escalade["beam_size"] = beam_size
+    return escalade
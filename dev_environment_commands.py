@@ -8,7 +8,12 @@ import pyautogui
 import re
 import time
 from text_processing import ecrire_texte_avec_accents
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=(
+    "vs code", "visual studio code", "pycharm", "docker", "environnement virtuel", "venv",
+    "installe package", "installe module", "pip install", "liste des packages", "pip list", "npm",
+    "script python", "les tests", "formate le code", "vérifie le code", "lint le code"))
 def executer_commande_dev(texte):
     """Exécute des commandes liées aux environnements de développement"""
     texte = texte.lower()
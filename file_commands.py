@@ -11,7 +11,9 @@ import zipfile
 import pyautogui
 import pyperclip
 import subprocess
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=("dossier", "fichier", "zip"))
 def executer_commande_fichier(texte):
     """Exécute des commandes de gestion de fichiers"""
     texte = texte.lower()
@@ -208,6 +208,29 @@ def export_dataset():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@finetune_api.route('/api/finetune/retranscribe', methods=['POST'])
+def retranscribe_samples():
+    """Re-transcrit par lots les échantillons avec Whisper CT2 (sans modifier les fichiers)"""
+    try:
+        data = request.json or {}
+        
+        from speech_recognition_module import retranscrire_enregistrements
+        results = retranscrire_enregistrements(
+            engine=data.get('engine'),
+            split=data.get('split', 'train'),
+            limit=data.get('limit')
+        )
+        
+        return jsonify({
+            "success": True,
+            "count": len(results),
+            "changed": sum(1 for r in results if r["new_text"] != r["old_text"]),
+            "results": results
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 def regenerate_dataset():
     """Régénère le fichier metadata.jsonl à partir des échantillons"""
     try:
@@ -0,0 +1,273 @@
+"""
+Index de recherche approximative pour Whisp Assistant
+Retrouve la phrase connue (alias, raccourci personnalisé) la plus proche d'un
+texte mal transcrit (« nouvelle longlet » -> « nouvel onglet »), à distance
+d'édition bornée. Méthode SymSpell : les suppressions de caractères du début de
+chaque phrase sont précalculées ; une requête ne génère que ses propres
+suppressions, puis vérifie quelques candidats par une distance de Levenshtein
+bornée. Un budget de latence, en microsecondes, arrête la recherche pour
+qu'elle puisse rester sur le chemin critique des commandes
+"""
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Distance d'édition maximale acceptée
+FUZZY_MAX_DISTANCE = 2
+# Nombre de caractères de tête indexés (compromis mémoire / candidats à vérifier)
+FUZZY_PREFIX_LENGTH = 7
+# Confiance minimale : 1 - distance / longueur de la plus longue des deux phrases
+FUZZY_MIN_CONFIDENCE = 0.8
+# Longueur en deçà de laquelle seule la correspondance exacte est acceptée : une
+# édition sur un mot court en fait un autre mot courant (« montre » -> « monte »)
+FUZZY_MIN_LENGTH = 7
+# Budget de latence d'une requête, en microsecondes
+FUZZY_BUDGET_US = 500
+# Écart de distance en deçà duquel deux phrases de valeurs différentes rendent la
+# requête ambiguë (0 : rejet des seules égalités, « coupier » entre copier et couper)
+FUZZY_AMBIGUITY_MARGIN = 0
+
+
+def levenshtein_borne(a: str, b: str, max_distance: int) -> int:
+    """
+    Distance de Levenshtein limitée à une bande de largeur max_distance.
+
+    Returns:
+        La distance si elle est <= max_distance, sinon max_distance + 1
+    """
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    big = max_distance + 1
+    if abs(la - lb) > max_distance:
+        return big
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+
+    previous = [j if j <= max_distance else big for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        current = [big] * (lb + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(max(1, i - max_distance), min(lb, i + max_distance) + 1):
+            v = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < v:
+                v = previous[j] + 1
+            if current[j - 1] + 1 < v:
+                v = current[j - 1] + 1
+            current[j] = v if v < big else big
+            if v < row_min:
+                row_min = v
+        if row_min > max_distance:
+            return big
+        previous = current
+    return min(previous[lb], big)
+
+
+def _suppressions(mot: str, distance: int) -> List[str]:
+    """Chaînes obtenues par 0 à `distance` suppressions, par nombre de suppressions croissant."""
+    resultats = [mot]
+    vus = {mot}
+    niveau = [mot]
+    for _ in range(distance):
+        suivant = []
+        for m in niveau:
+            for i in range(len(m)):
+                s = m[:i] + m[i + 1:]
+                if s not in vus:
+                    vus.add(s)
+                    suivant.append(s)
+        resultats.extend(suivant)
+        niveau = suivant
+    return resultats
+
+
+def normaliser_phrase(texte: str) -> str:
+    """Minuscules, ponctuation finale retirée, espaces réduits."""
+    texte = " ".join(texte.lower().split())
+    if texte.endswith((".", "!", "?")):
+        texte = texte[:-1].rstrip()
+    return texte
+
+
+class FuzzyIndex:
+    """
+    Index SymSpell de phrases, chacune associée à une valeur (commande, raccourci...).
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, Any]] = (), max_distance: int = FUZZY_MAX_DISTANCE,
+                 prefix_length: int = FUZZY_PREFIX_LENGTH, min_confidence: float = FUZZY_MIN_CONFIDENCE,
+                 budget_us: float = FUZZY_BUDGET_US, ambiguity_margin: int = FUZZY_AMBIGUITY_MARGIN,
+                 min_length: int = FUZZY_MIN_LENGTH, name: str = "fuzzy"):
+        """
+        Args:
+            phrases: Couples (phrase, valeur)
+            max_distance: Distance d'édition maximale
+            prefix_length: Caractères de tête indexés
+            min_confidence: Confiance minimale d'un résultat
+            budget_us: Budget de latence par requête (microsecondes)
+            ambiguity_margin: Écart de distance minimal avec la meilleure phrase
+                d'une autre valeur pour que le résultat soit retenu
+            min_length: Longueur minimale d'une requête approximative (plus
+                courte, seule la correspondance exacte est retenue)
+            name: Nom de l'index (statistiques)
+        """
+        self.name = name
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.min_confidence = min_confidence
+        self.budget_us = budget_us
+        self.ambiguity_margin = ambiguity_margin
+        self.min_length = min_length
+        self._values: Dict[str, Any] = {}
+        self._deletes: Dict[str, List[str]] = {}
+        self.reset_stats()
+        for phrase, value in phrases:
+            self.add(phrase, value)
+
+    def add(self, phrase: str, value: Any) -> None:
+        """Ajoute une phrase (la première valeur enregistrée pour une phrase est conservée)."""
+        phrase = normaliser_phrase(phrase)
+        if not phrase or phrase in self._values:
+            return
+        self._values[phrase] = value
+        for s in _suppressions(phrase[:self.prefix_length], self.max_distance):
+            self._deletes.setdefault(s, []).append(phrase)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def search(self, texte: str, max_distance: Optional[int] = None,
+               min_confidence: Optional[float] = None, budget_us: Optional[float] = None) -> Optional[dict]:
+        """
+        Cherche la phrase la plus proche.
+
+        Une requête presque aussi proche d'une phrase d'une autre valeur (écart
+        d'au plus ambiguity_margin) est ambiguë : aucun résultat n'est retenu.
+
+        Args:
+            texte: Texte à rapprocher
+            max_distance: Distance maximale (au plus celle de l'index)
+            min_confidence: Confiance minimale
+            budget_us: Budget de latence (microsecondes)
+
+        Returns:
+            dict (phrase, value, distance, confidence, elapsed_us, complete) ou None
+        """
+        start = time.perf_counter()
+        k = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        min_confidence = self.min_confidence if min_confidence is None else min_confidence
+        budget_us = self.budget_us if budget_us is None else budget_us
+        deadline = start + budget_us / 1e6
+        self.queries += 1
+
+        texte = normaliser_phrase(texte)
+        best = None
+        # Phrases assez proches pour départager (ou rendre ambiguë) la meilleure
+        proches = []
+        complete = True
+        if texte in self._values:
+            best = (texte, 0)
+        elif len(texte) >= self.min_length:
+            # Distance au-delà de laquelle la confiance minimale ne peut plus être atteinte
+            k = min(k, int((1.0 - min_confidence) * (len(texte) + k)))
+            seuil = k
+            marge = self.ambiguity_margin
+            vus = set()
+            for s in _suppressions(texte[:self.prefix_length], k):
+                for phrase in self._deletes.get(s, ()):
+                    if phrase in vus:
+                        continue
+                    vus.add(phrase)
+                    d = levenshtein_borne(texte, phrase, seuil)
+                    if d > seuil:
+                        continue
+                    proches.append((phrase, d))
+                    if best is None or d < best[1] or (d == best[1] and len(phrase) > len(best[0])):
+                        best = (phrase, d)
+                        # Les candidats suivants doivent faire au moins aussi bien, à la marge près
+                        seuil = min(seuil, d + marge)
+                if time.perf_counter() > deadline:
+                    complete = False
+                    break
+                if best is not None and best[1] == 0:
+                    break
+
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        self.total_us += elapsed_us
+        if not complete:
+            self.timeouts += 1
+
+        if best is not None and best[1] > 0:
+            valeur = self._values[best[0]]
+            if any(self._values[p] != valeur and dp <= best[1] + self.ambiguity_margin for p, dp in proches):
+                self.ambiguous += 1
+                best = None
+
+        result = None
+        if best is not None:
+            phrase, d = best
+            confidence = 1.0 - d / max(len(texte), len(phrase))
+            if confidence >= min_confidence:
+                result = {
+                    "phrase": phrase,
+                    "value": self._values[phrase],
+                    "distance": d,
+                    "confidence": round(confidence, 3),
+                    "elapsed_us": round(elapsed_us, 1),
+                    "complete": complete,
+                }
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def reset_stats(self) -> None:
+        """Remet les compteurs à zéro."""
+        self.queries = 0
+        self.hits = 0
+        self.timeouts = 0
+        self.ambiguous = 0
+        self.total_us = 0.0
+
+    def get_stats(self) -> dict:
+        """Retourne la taille de l'index et les compteurs de recherche."""
+        return {
+            "phrases": len(self._values),
+            "delete_keys": len(self._deletes),
+            "max_distance": self.max_distance,
+            "min_confidence": self.min_confidence,
+            "min_length": self.min_length,
+            "budget_us": self.budget_us,
+            "queries": self.queries,
+            "hits": self.hits,
+            "timeouts": self.timeouts,
+            "ambiguous": self.ambiguous,
+            "avg_us": round(self.total_us / max(self.queries, 1), 1),
+        }
+
+
+# Index enregistrés, par nom
+_fuzzy_indexes: Dict[str, FuzzyIndex] = {}
+
+
+def create_fuzzy_index(phrases: Iterable[Tuple[str, Any]], name: str, **kwargs) -> FuzzyIndex:
+    """
+    Construit un index et l'enregistre pour les statistiques.
+
+    Args:
+        phrases: Couples (phrase, valeur)
+        name: Nom de l'index (remplace un index existant du même nom)
+        **kwargs: Paramètres de FuzzyIndex
+
+    Returns:
+        L'index construit
+    """
+    index = FuzzyIndex(phrases, name=name, **kwargs)
+    _fuzzy_indexes[name] = index
+    return index
+
+
+def get_fuzzy_index_stats() -> Dict[str, dict]:
+    """Statistiques de tous les index approximatifs."""
+    return {name: index.get_stats() for name, index in _fuzzy_indexes.items()}
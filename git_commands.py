@@ -7,7 +7,9 @@ import os
 import pyautogui
 import re
 from text_processing import ecrire_texte_avec_accents
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=("git", "commit conventionnel"))
 def executer_commande_git(texte):
     """Exécute des commandes Git en fonction du texte transcrit"""
     texte = texte.lower()
@@ -0,0 +1,561 @@
+"""
+Serveur d'inférence STT dans un processus séparé pour Whisp Assistant
+Le décodage (faster-whisper, Vosk) tourne dans un processus enfant afin de
+ne plus partager le GIL avec la capture audio, le serveur web et la synthèse
+vocale. L'audio transite par des emplacements en mémoire partagée
+(multiprocessing.shared_memory) : seules de petites requêtes sont sérialisées
+"""
+import time
+import queue
+import atexit
+import itertools
+import threading
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Moteurs pouvant être décodés dans le processus enfant
+SUPPORTED_ENGINES = ("whisper_ct2", "whisper_french", "vosk")
+
+# Nombre d'échecs de démarrage consécutifs avant abandon des redémarrages automatiques
+MAX_FAILED_STARTS = 3
+
+
+class InferenceServerError(Exception):
+    """Erreur de communication avec le processus d'inférence."""
+
+
+# ---------------------------------------------------------------------------
+# Côté processus enfant
+# ---------------------------------------------------------------------------
+
+def _charger_modele(engine: str, config: Dict[str, Any]):
+    """Charge le modèle dans le processus enfant (import paresseux des bibliothèques)."""
+    if engine == "vosk":
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        return Model(config["model_path"])
+
+    from faster_whisper import WhisperModel
+    kwargs = {
+        "model_size_or_path": config["model"],
+        "device": config.get("device", "auto"),
+        "compute_type": config.get("compute_type", "float32"),
+        "cpu_threads": config.get("cpu_threads", 4),
+    }
+    if config.get("download_root"):
+        kwargs["download_root"] = config["download_root"]
+    try:
+        return WhisperModel(**kwargs)
+    except Exception as e:
+        # Même repli que dans le processus principal : CPU en float32
+        if kwargs["device"] == "cpu":
+            raise
+        print(f"Processus d'inférence: échec sur {kwargs['device']} ({e}), repli sur CPU")
+        kwargs.update(device="cpu", compute_type="float32", cpu_threads=8)
+        return WhisperModel(**kwargs)
+
+
+def _worker_main(engine: str, config: Dict[str, Any], shm_name: str, n_slots: int, slot_samples: int,
+                 requests: "mp.Queue", results: "mp.Queue") -> None:
+    """Boucle du processus d'inférence."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((n_slots, slot_samples), dtype=np.float32, buffer=shm.buf)
+    try:
+        try:
+            model = _charger_modele(engine, config)
+        except Exception as e:
+            results.put((0, "error", f"Chargement du modèle impossible: {e}"))
+            return
+        results.put((0, "ready", None))
+
+        # Recognizers Vosk, par identifiant choisi par le processus principal
+        recognizers: Dict[int, Any] = {}
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            request_id, op, slot, n_samples, options = request
+            try:
+                if op == "ping":
+                    result = "pong"
+                elif op == "transcribe":
+                    # La tranche reste valide : l'emplacement n'est libéré qu'après la réponse
+                    segments, info = model.transcribe(slots[slot, :n_samples], **options)
+                    result = {
+                        "segments": [
+                            {
+                                "text": s.text,
+                                "start": s.start,
+                                "end": s.end,
+                                "avg_logprob": getattr(s, "avg_logprob", 0.0),
+                                "no_speech_prob": getattr(s, "no_speech_prob", 0.0),
+                            }
+                            for s in segments
+                        ],
+                        "language": getattr(info, "language", None),
+                        "language_probability": getattr(info, "language_probability", 0.0),
+                        "duration": getattr(info, "duration", n_samples / config.get("sample_rate", 16000)),
+                    }
+                elif op == "vosk_reset":
+                    from vosk import KaldiRecognizer
+                    if options.get("grammar"):
+                        recognizer = KaldiRecognizer(model, config.get("sample_rate", 16000), options["grammar"])
+                    else:
+                        recognizer = KaldiRecognizer(model, config.get("sample_rate", 16000))
+                    recognizers[options["recognizer_id"]] = recognizer
+                    result = True
+                elif op == "vosk_free":
+                    result = recognizers.pop(options["recognizer_id"], None) is not None
+                elif op == "vosk_accept":
+                    recognizer = recognizers.get(options["recognizer_id"])
+                    if recognizer is None:
+                        raise KeyError(f"Recognizer Vosk inconnu: {options['recognizer_id']}")
+                    pcm = (slots[slot, :n_samples] * 32768.0).astype(np.int16).tobytes()
+                    result = bool(recognizer.AcceptWaveform(pcm))
+                elif op in ("vosk_result", "vosk_final_result", "vosk_partial_result"):
+                    recognizer = recognizers.get(options["recognizer_id"])
+                    if recognizer is None:
+                        result = '{"text": ""}' if op != "vosk_partial_result" else '{"partial": ""}'
+                    elif op == "vosk_result":
+                        result = recognizer.Result()
+                    elif op == "vosk_final_result":
+                        result = recognizer.FinalResult()
+                    else:
+                        result = recognizer.PartialResult()
+                else:
+                    raise ValueError(f"Opération inconnue: {op}")
+                results.put((request_id, "ok", result))
+            except Exception as e:
+                results.put((request_id, "error", str(e)))
+    finally:
+        del slots
+        shm.close()
+
+
+# ---------------------------------------------------------------------------
+# Côté processus principal
+# ---------------------------------------------------------------------------
+
+class InferenceServer:
+    """
+    Processus d'inférence avec emplacements audio en mémoire partagée.
+
+    Chaque requête réserve un emplacement, y copie l'audio, puis envoie
+    uniquement (opération, emplacement, longueur) au processus enfant. Un
+    thread de surveillance vérifie périodiquement la santé du processus et le
+    redémarre s'il est mort ou ne répond plus.
+    """
+
+    def __init__(self, engine: str, config: Dict[str, Any], n_slots: int = 4, slot_seconds: float = 60.0,
+                 sample_rate: int = 16000, request_timeout: float = 60.0, health_interval: float = 5.0):
+        """
+        Args:
+            engine: Moteur STT (whisper_ct2, whisper_french, vosk)
+            config: Paramètres de chargement du modèle dans le processus enfant
+            n_slots: Nombre d'emplacements audio partagés
+            slot_seconds: Durée maximale d'audio par emplacement
+            sample_rate: Taux d'échantillonnage de l'audio
+            request_timeout: Délai maximal d'une requête avant redémarrage du processus
+            health_interval: Intervalle entre deux vérifications de santé (secondes)
+        """
+        if engine not in SUPPORTED_ENGINES:
+            raise ValueError(f"Moteur non supporté par le serveur d'inférence: {engine}")
+        self.engine = engine
+        self.config = dict(config, sample_rate=sample_rate)
+        self.n_slots = n_slots
+        self.slot_samples = int(slot_seconds * sample_rate)
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+
+        self._ctx = mp.get_context("spawn")
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._slots: Optional[np.ndarray] = None
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._pending: Dict[int, list] = {}
+        self._pending_lock = threading.Lock()
+        # Emplacements d'une requête expirée, encore lus par le processus enfant
+        self._quarantined: Dict[int, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._running = False
+        self._generation = 0
+
+        self._failed_starts = 0
+
+        self.requests_sent = 0
+        self.errors = 0
+        self.restarts = 0
+        self.total_latency_ms = 0.0
+
+    # -- cycle de vie ---------------------------------------------------------
+
+    @property
+    def generation(self) -> int:
+        """Numéro du processus enfant courant (incrémenté à chaque redémarrage)."""
+        return self._generation
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive() and self._ready.is_set()
+
+    def start(self, timeout: float = 300.0) -> bool:
+        """
+        Démarre le processus d'inférence et attend le chargement du modèle.
+
+        Args:
+            timeout: Délai maximal de chargement du modèle (secondes)
+
+        Returns:
+            True si le processus est prêt
+        """
+        with self._lock:
+            if self.is_alive:
+                return True
+            self._running = True
+            if self._shm is None:
+                self._shm = shared_memory.SharedMemory(create=True, size=self.n_slots * self.slot_samples * 4)
+                self._slots = np.ndarray((self.n_slots, self.slot_samples), dtype=np.float32, buffer=self._shm.buf)
+            self._spawn()
+            threading.Thread(target=self._monitor_loop, args=(self._generation,), daemon=True,
+                             name=f"inference_{self.engine}_monitor").start()
+
+        if not self._ready.wait(timeout):
+            logger.error(f"Le processus d'inférence {self.engine} n'est pas prêt après {timeout}s")
+            return False
+        return self.is_alive
+
+    def _spawn(self) -> None:
+        """Lance un nouveau processus enfant (appelé sous self._lock)."""
+        self._generation += 1
+        self._ready.clear()
+        self._fail_pending("Processus d'inférence redémarré")
+        self._free_slots = queue.Queue()
+        for slot in range(self.n_slots):
+            self._free_slots.put(slot)
+
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.engine, self.config, self._shm.name, self.n_slots, self.slot_samples,
+                  self._requests, self._results),
+            daemon=True,
+            name=f"inference_{self.engine}",
+        )
+        self._process.start()
+        threading.Thread(target=self._dispatch_loop, args=(self._results, self._generation), daemon=True,
+                         name=f"inference_{self.engine}_results").start()
+        print(f"Processus d'inférence {self.engine} lancé (pid {self._process.pid})")
+
+    def restart(self, reason: str = "") -> None:
+        """Redémarre le processus d'inférence."""
+        with self._lock:
+            if not self._running:
+                return
+            print(f"Redémarrage du processus d'inférence {self.engine}: {reason}")
+            self.restarts += 1
+            self._terminate_process()
+            self._spawn()
+            generation = self._generation
+        threading.Thread(target=self._monitor_loop, args=(generation,), daemon=True,
+                         name=f"inference_{self.engine}_monitor").start()
+
+    def _terminate_process(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            try:
+                self._requests.put(None)
+                self._process.join(timeout=2.0)
+            except Exception:
+                pass
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout=2.0)
+
+    def stop(self) -> None:
+        """Arrête le processus d'inférence et libère la mémoire partagée."""
+        with self._lock:
+            self._running = False
+            self._generation += 1
+            self._terminate_process()
+            self._process = None
+            self._ready.clear()
+            self._fail_pending("Processus d'inférence arrêté")
+            if self._shm is not None:
+                self._slots = None
+                try:
+                    self._shm.close()
+                    self._shm.unlink()
+                except Exception:
+                    pass
+                self._shm = None
+
+    # -- échanges ---------------------------------------------------------------
+
+    def _fail_pending(self, message: str) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            # Les emplacements en quarantaine reviennent avec la nouvelle génération
+            self._quarantined = {}
+        for box in pending.values():
+            box[1] = ("error", message)
+            box[0].set()
+
+    def _dispatch_loop(self, results, generation: int) -> None:
+        """Répartit les réponses du processus enfant vers les requêtes en attente."""
+        while self._running and generation == self._generation:
+            try:
+                request_id, status, payload = results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if request_id == 0:
+                if status == "ready":
+                    self._failed_starts = 0
+                    self._ready.set()
+                    print(f"Processus d'inférence {self.engine} prêt")
+                else:
+                    logger.error(f"Processus d'inférence {self.engine}: {payload}")
+                continue
+            with self._pending_lock:
+                box = self._pending.pop(request_id, None)
+                slot = self._quarantined.pop(request_id, None) if box is None else None
+            if slot is not None and generation == self._generation:
+                # Réponse tardive : le processus enfant n'utilise plus l'emplacement
+                self._free_slots.put(slot)
+            if box is not None:
+                box[1] = (status, payload)
+                box[0].set()
+
+    def _monitor_loop(self, generation: int) -> None:
+        """Vérifie la santé du processus et le redémarre si nécessaire."""
+        while self._running and generation == self._generation:
+            time.sleep(self.health_interval)
+            if not self._running or generation != self._generation:
+                break
+            if self._process is None or not self._process.is_alive():
+                if not self._ready.is_set():
+                    self._failed_starts += 1
+                    if self._failed_starts >= MAX_FAILED_STARTS:
+                        logger.error(f"Le processus d'inférence {self.engine} ne démarre pas, abandon")
+                        self._running = False
+                        break
+                self.restart("processus terminé")
+                break
+            if not self._ready.is_set():
+                continue
+            try:
+                # La requête passe après un éventuel décodage en cours
+                self.request("ping", timeout=self.request_timeout)
+            except InferenceServerError as e:
+                if generation == self._generation:
+                    self.restart(f"absence de réponse ({e})")
+                break
+
+    def request(self, op: str, samples: Optional[np.ndarray] = None, timeout: Optional[float] = None,
+                **options) -> Any:
+        """
+        Envoie une requête au processus d'inférence et attend la réponse.
+
+        Args:
+            op: Opération (transcribe, ping, vosk_*)
+            samples: Audio float32 à placer en mémoire partagée
+            timeout: Délai maximal de la requête
+            **options: Paramètres de l'opération
+
+        Returns:
+            Résultat de l'opération
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        if not self._ready.wait(timeout):
+            raise InferenceServerError(f"Processus d'inférence {self.engine} indisponible")
+
+        slot, n_samples = -1, 0
+        generation = self._generation
+        if samples is not None:
+            samples = np.asarray(samples, dtype=np.float32).ravel()
+            n_samples = min(len(samples), self.slot_samples)
+            if n_samples < len(samples):
+                logger.warning(f"Audio tronqué à {self.slot_samples} échantillons pour le processus d'inférence")
+            try:
+                slot = self._free_slots.get(timeout=timeout)
+            except queue.Empty:
+                raise InferenceServerError("Aucun emplacement audio partagé disponible")
+            self._slots[slot, :n_samples] = samples[:n_samples]
+
+        request_id = next(self._ids)
+        box = [threading.Event(), None]
+        with self._pending_lock:
+            self._pending[request_id] = box
+
+        start = time.time()
+        rendre_slot = True
+        try:
+            self._requests.put((request_id, op, slot, n_samples, options))
+            if not box[0].wait(timeout):
+                with self._pending_lock:
+                    expire = self._pending.pop(request_id, None) is not None
+                    if expire and slot >= 0:
+                        # Le processus enfant lit peut-être encore l'emplacement : il n'est
+                        # rendu qu'à sa réponse, ou au redémarrage du processus
+                        self._quarantined[request_id] = slot
+                if expire:
+                    rendre_slot = False
+                    self.errors += 1
+                    raise InferenceServerError(f"Délai dépassé pour '{op}' ({timeout}s)")
+                # La réponse est arrivée pendant l'expiration du délai
+                box[0].wait()
+        finally:
+            # Un emplacement n'est rendu qu'à la génération de processus qui l'a fourni
+            if rendre_slot and slot >= 0 and generation == self._generation:
+                self._free_slots.put(slot)
+
+        status, payload = box[1]
+        if status != "ok":
+            self.errors += 1
+            raise InferenceServerError(payload)
+        if op != "ping":
+            self.requests_sent += 1
+            self.total_latency_ms += (time.time() - start) * 1000
+        return payload
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs du processus d'inférence."""
+        return {
+            "engine": self.engine,
+            "alive": self.is_alive,
+            "pid": self._process.pid if self._process is not None else None,
+            "requests": self.requests_sent,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "avg_latency_ms": self.total_latency_ms / self.requests_sent if self.requests_sent else 0.0,
+            "free_slots": self._free_slots.qsize(),
+            "quarantined_slots": len(self._quarantined),
+        }
+
+
+class RemoteWhisperModel:
+    """Adaptateur exposant transcribe() comme faster_whisper.WhisperModel."""
+
+    def __init__(self, server: InferenceServer):
+        self.server = server
+
+    def transcribe(self, audio, **options):
+        result = self.server.request("transcribe", audio, **options)
+        segments = [SimpleNamespace(**segment) for segment in result["segments"]]
+        info = SimpleNamespace(
+            language=result["language"],
+            language_probability=result["language_probability"],
+            duration=result["duration"],
+        )
+        return iter(segments), info
+
+
+class RemoteKaldiRecognizer:
+    """
+    Adaptateur exposant l'API de vosk.KaldiRecognizer via le processus d'inférence.
+
+    Chaque instance possède son propre recognizer dans le processus enfant,
+    désigné par un identifiant : plusieurs instances (grammaire de commandes,
+    décodage libre...) coexistent sans s'écraser. Après un redémarrage du
+    processus enfant, le recognizer est recréé à la requête suivante.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, server: InferenceServer, grammar: Optional[str] = None):
+        self.server = server
+        self.grammar = grammar
+        self.recognizer_id = next(self._ids)
+        self._generation = None
+        self.Reset()
+
+    def _request(self, op: str, samples: Optional[np.ndarray] = None) -> Any:
+        if self._generation != self.server.generation:
+            # Processus enfant redémarré : son recognizer a disparu avec lui
+            self.Reset()
+        return self.server.request(op, samples, recognizer_id=self.recognizer_id)
+
+    def AcceptWaveform(self, data) -> bool:
+        if isinstance(data, np.ndarray):
+            samples = data.astype(np.float32).ravel() / 32768.0
+        else:
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        return self._request("vosk_accept", samples)
+
+    def Result(self) -> str:
+        return self._request("vosk_result")
+
+    def FinalResult(self) -> str:
+        return self._request("vosk_final_result")
+
+    def PartialResult(self) -> str:
+        return self._request("vosk_partial_result")
+
+    def Reset(self) -> None:
+        generation = self.server.generation
+        self.server.request("vosk_reset", grammar=self.grammar, recognizer_id=self.recognizer_id)
+        self._generation = generation
+
+    def close(self) -> None:
+        """Libère le recognizer dans le processus enfant."""
+        if self._generation is not None and self._generation == self.server.generation:
+            try:
+                self.server.request("vosk_free", recognizer_id=self.recognizer_id)
+            except InferenceServerError:
+                pass
+        self._generation = None
+
+
+# Un serveur par moteur, partagé par les threads de reconnaissance
+_servers: Dict[str, InferenceServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_inference_server(engine: str, config: Dict[str, Any], **kwargs) -> InferenceServer:
+    """
+    Retourne le serveur d'inférence d'un moteur (créé au premier appel).
+
+    Args:
+        engine: Moteur STT
+        config: Paramètres de chargement du modèle
+        **kwargs: Options de InferenceServer
+
+    Returns:
+        InferenceServer du moteur
+    """
+    with _servers_lock:
+        server = _servers.get(engine)
+        if server is None:
+            server = InferenceServer(engine, config, **kwargs)
+            _servers[engine] = server
+        return server
+
+
+def stop_all_inference_servers() -> None:
+    """Arrête tous les processus d'inférence."""
+    with _servers_lock:
+        servers = list(_servers.values())
+        _servers.clear()
+    for server in servers:
+        server.stop()
+
+
+atexit.register(stop_all_inference_servers)
+
+
+def get_inference_server_stats() -> dict:
+    """Retourne l'état des processus d'inférence par moteur."""
+    with _servers_lock:
+        return {engine: server.get_stats() for engine, server in _servers.items()}
@@ -0,0 +1,370 @@
+"""
+Porte d'activation (mot-clé ou push-to-talk) devant la reconnaissance vocale de Whisp Assistant
+Un détecteur de mot-clé léger compare le log-mel de chaque énoncé aux
+enregistrements de la phrase d'activation (alignement DTW). Tant que la porte
+est fermée, les énoncés ne sont ni décodés ni sauvegardés : la télévision, les
+collègues ou le clavier ne coûtent plus de décodage ni d'écriture disque
+"""
+import os
+import time
+import logging
+import threading
+from typing import Optional, Union
+
+import numpy as np
+
+from acoustic_cache import calculer_log_mel, HOP_MS
+
+logger = logging.getLogger(__name__)
+
+try:
+    from audio_optimization import dtw_subsequence_numba
+    NUMBA_DTW_AVAILABLE = True
+except ImportError:
+    NUMBA_DTW_AVAILABLE = False
+
+GATE_MODES = ("off", "wake_word", "push_to_talk")
+
+# Modèles de la phrase d'activation, à côté de la base de données
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wake_word_templates.npz")
+
+# Un rejet dont le score est à moins de NEAR_MISS_RATIO du seuil, suivi d'une
+# activation dans les RETRY_WINDOW_S secondes, est compté comme faux rejet
+NEAR_MISS_RATIO = 1.25
+RETRY_WINDOW_S = 5.0
+# Audio minimal restant après la phrase d'activation pour être transmis au STT
+MIN_REMAINDER_S = 0.4
+# Écart de log-énergie délimitant la parole dans un enregistrement de la phrase d'activation
+SILENCE_LOG_DROP = 4.0
+
+
+def caracteristiques_kws(audio: Union[bytes, np.ndarray], sample_rate: int = 16000) -> Optional[np.ndarray]:
+    """
+    Caractéristiques de détection : forme spectrale de chaque trame (log-mel centré et
+    normalisé par trame, donc indépendant du volume).
+
+    Args:
+        audio: Audio int16 (bytes ou tableau) ou float32
+        sample_rate: Taux d'échantillonnage
+
+    Returns:
+        Tableau (trames, bandes) ou None si l'audio est trop court
+    """
+    log_mel, _ = calculer_log_mel(audio, sample_rate)
+    if log_mel is None:
+        return None
+    features = log_mel - log_mel.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return (features / np.maximum(norms, 1e-6)).astype(np.float32)
+
+
+def _dtw_subsequence_numpy(distances: np.ndarray) -> tuple:
+    """Même alignement que dtw_subsequence_numba, vectorisé sur les trames de la séquence."""
+    n_rows, n_cols = distances.shape
+    cost = np.full((n_rows, n_cols), np.inf)
+    cost[0] = distances[0]
+    for i in range(1, n_rows):
+        best = np.full(n_cols, np.inf)
+        best[1:] = cost[i - 1, :-1]
+        best[2:] = np.minimum(best[2:], cost[i - 1, :-2])
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], cost[i - 2, :-1])
+        cost[i] = best + distances[i]
+    end = int(np.argmin(cost[-1]))
+    return cost[-1, end] / n_rows, end
+
+
+def aligner(template: np.ndarray, features: np.ndarray) -> tuple:
+    """
+    Aligne un modèle de la phrase d'activation sur un énoncé.
+
+    Args:
+        template: Caractéristiques du modèle
+        features: Caractéristiques de l'énoncé
+
+    Returns:
+        Tuple (distance moyenne, indice de la dernière trame alignée)
+    """
+    distances = (1.0 - features @ template.T).T.astype(np.float64)
+    if NUMBA_DTW_AVAILABLE:
+        score, end = dtw_subsequence_numba(np.ascontiguousarray(distances))
+        return float(score), int(end)
+    return _dtw_subsequence_numpy(distances)
+
+
+class KeywordSpotter:
+    """
+    Détection de la phrase d'activation par comparaison à des enregistrements.
+
+    Aucun modèle acoustique n'est nécessaire : l'utilisateur enregistre
+    quelques fois sa phrase d'activation, et chaque énoncé est accepté si son
+    meilleur alignement sur l'un des modèles est assez proche.
+    """
+
+    def __init__(self, sample_rate: int = 16000, threshold: float = 0.25, path: str = TEMPLATES_PATH):
+        """
+        Args:
+            sample_rate: Taux d'échantillonnage
+            threshold: Distance moyenne maximale pour accepter la phrase d'activation
+            path: Fichier des modèles enregistrés
+        """
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.path = path
+        self.templates = []
+        self._lock = threading.Lock()
+        self.detection_time_ms = 0.0
+        self.detections = 0
+        self.charger()
+
+    def charger(self) -> None:
+        """Charge les modèles enregistrés."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.templates = [data[key] for key in sorted(data.files)]
+            logger.info(f"{len(self.templates)} modèles de phrase d'activation chargés")
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des modèles de phrase d'activation: {e}")
+
+    def _sauvegarder(self) -> None:
+        np.savez(self.path, **{f"t{i:02d}": t for i, t in enumerate(self.templates)})
+
+    def enroler(self, audio: Union[bytes, np.ndarray], sample_rate: Optional[int] = None) -> int:
+        """
+        Ajoute un enregistrement de la phrase d'activation.
+
+        Args:
+            audio: Enregistrement de la phrase seule
+            sample_rate: Taux d'échantillonnage (celui du détecteur sinon)
+
+        Returns:
+            Nombre de modèles enregistrés
+        """
+        sample_rate = sample_rate or self.sample_rate
+        log_mel, energy = calculer_log_mel(audio, sample_rate)
+        if log_mel is None:
+            raise ValueError("Enregistrement trop court pour la phrase d'activation")
+
+        # Ne garder que la parole pour que l'alignement ne dépende pas des silences
+        voiced = np.nonzero(energy > energy.max() - SILENCE_LOG_DROP)[0]
+        start = voiced[0] * HOP_MS * sample_rate // 1000
+        end = (voiced[-1] + 3) * HOP_MS * sample_rate // 1000
+        samples = np.asarray(audio if not isinstance(audio, (bytes, bytearray)) else np.frombuffer(audio, dtype=np.int16))
+        template = caracteristiques_kws(samples[start:end], sample_rate)
+        if template is None:
+            raise ValueError("Enregistrement trop court pour la phrase d'activation")
+
+        with self._lock:
+            self.templates.append(template)
+            self._sauvegarder()
+            return len(self.templates)
+
+    def effacer(self) -> None:
+        """Supprime tous les modèles enregistrés."""
+        with self._lock:
+            self.templates = []
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def score(self, audio: Union[bytes, np.ndarray], sample_rate: Optional[int] = None) -> tuple:
+        """
+        Meilleur alignement d'un énoncé sur les modèles.
+
+        Returns:
+            Tuple (distance, fin de la phrase d'activation en secondes), (inf, 0) sans modèle
+        """
+        sample_rate = sample_rate or self.sample_rate
+        features = caracteristiques_kws(audio, sample_rate)
+        if features is None or not self.templates:
+            return float("inf"), 0.0
+
+        start = time.time()
+        best, best_end = float("inf"), 0
+        for template in list(self.templates):
+            if len(features) < len(template) // 2:
+                continue
+            distance, end = aligner(template, features)
+            if distance < best:
+                best, best_end = distance, end
+        self.detection_time_ms += (time.time() - start) * 1000
+        self.detections += 1
+        return best, (best_end + 1) * HOP_MS / 1000.0
+
+
+class WakeGate:
+    """
+    Porte ouverte par la phrase d'activation ou par un appui push-to-talk.
+
+    Une fois ouverte, la porte laisse passer les énoncés pendant session_s
+    secondes, durée prolongée à chaque énoncé transmis.
+    """
+
+    def __init__(self, spotter: Optional[KeywordSpotter] = None, mode: str = "off", session_s: float = 8.0):
+        """
+        Args:
+            spotter: Détecteur de la phrase d'activation
+            mode: off, wake_word ou push_to_talk
+            session_s: Durée d'ouverture de la porte
+        """
+        self.spotter = spotter or KeywordSpotter()
+        self.mode = mode
+        self.session_s = session_s
+        self._open_until = 0.0
+        self._opened_by_wake = False
+        self._session_useful = False
+        self._last_near_miss = 0.0
+        self._enroll_remaining = 0
+        self._lock = threading.Lock()
+
+        self.accepted = 0
+        self.rejected = 0
+        self.wake_detections = 0
+        self.push_to_talk_events = 0
+        self.false_accepts = 0
+        self.false_rejects = 0
+        self.reported_false_accepts = 0
+        self.reported_false_rejects = 0
+
+    def configure(self, settings: dict) -> None:
+        """Applique les paramètres stt_gate_* / stt_wake_* de la configuration STT."""
+        mode = settings.get("stt_gate_mode", self.mode)
+        self.mode = mode if mode in GATE_MODES else "off"
+        self.session_s = float(settings.get("stt_wake_session_s", self.session_s))
+        self.spotter.threshold = float(settings.get("stt_wake_threshold", self.spotter.threshold))
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def enrolement_en_cours(self) -> bool:
+        """Des énoncés restent à enregistrer comme modèles, même porte désactivée."""
+        return self._enroll_remaining > 0
+
+    def est_ouverte(self) -> bool:
+        return time.time() < self._open_until
+
+    def _cloturer_session(self) -> None:
+        """Une session ouverte par la phrase d'activation sans aucun résultat reconnu est un faux déclenchement."""
+        if self._opened_by_wake and not self._session_useful and self._open_until:
+            self.false_accepts += 1
+        self._opened_by_wake = False
+        self._session_useful = False
+
+    def ouvrir(self, source: str = "push_to_talk") -> None:
+        """
+        Ouvre la porte pour une session.
+
+        Args:
+            source: push_to_talk ou wake_word
+        """
+        with self._lock:
+            if not self.est_ouverte():
+                self._cloturer_session()
+            self._open_until = time.time() + self.session_s
+            if source == "wake_word":
+                self._opened_by_wake = True
+            else:
+                self.push_to_talk_events += 1
+        logger.info(f"Porte STT ouverte ({source}) pour {self.session_s:.0f}s")
+
+    def fermer(self) -> None:
+        """Ferme la porte immédiatement."""
+        with self._lock:
+            self._cloturer_session()
+            self._open_until = 0.0
+
+    def enroler_prochains(self, count: int = 3) -> None:
+        """Les count prochains énoncés sont enregistrés comme modèles de la phrase d'activation."""
+        self._enroll_remaining = max(0, int(count))
+
+    def filtrer(self, audio: Union[bytes, np.ndarray], sample_rate: int = 16000):
+        """
+        Décide si un énoncé doit être transmis à la reconnaissance vocale.
+
+        Args:
+            audio: Audio int16 (bytes ou tableau) ou float32 de l'énoncé
+            sample_rate: Taux d'échantillonnage
+
+        Returns:
+            Audio à décoder (éventuellement amputé de la phrase d'activation), ou None
+        """
+        if self._enroll_remaining > 0:
+            self._enroll_remaining -= 1
+            try:
+                count = self.spotter.enroler(audio, sample_rate)
+                print(f"Phrase d'activation enregistrée ({count} modèles)")
+            except ValueError as e:
+                print(f"Enregistrement de la phrase d'activation ignoré: {e}")
+            return None
+
+        if not self.active or self.est_ouverte():
+            if self.active:
+                with self._lock:
+                    self._open_until = time.time() + self.session_s
+            self.accepted += 1
+            return audio
+
+        if self.mode == "wake_word":
+            distance, end_s = self.spotter.score(audio, sample_rate)
+            if distance <= self.spotter.threshold:
+                self.wake_detections += 1
+                if time.time() - self._last_near_miss < RETRY_WINDOW_S:
+                    # L'utilisateur a dû répéter la phrase d'activation
+                    self.false_rejects += 1
+                self._last_near_miss = 0.0
+                self.ouvrir("wake_word")
+                print(f"Phrase d'activation détectée (distance {distance:.3f})")
+
+                # La commande prononcée dans la foulée est transmise sans la phrase d'activation
+                n_samples = len(audio) // 2 if isinstance(audio, (bytes, bytearray)) else len(audio)
+                cut = int(end_s * sample_rate)
+                if n_samples - cut >= MIN_REMAINDER_S * sample_rate:
+                    self.accepted += 1
+                    return audio[cut * 2:] if isinstance(audio, (bytes, bytearray)) else audio[cut:]
+                return None
+            if distance <= self.spotter.threshold * NEAR_MISS_RATIO:
+                self._last_near_miss = time.time()
+
+        self.rejected += 1
+        return None
+
+    def signaler_resultat(self, reconnu: bool) -> None:
+        """Indique qu'un énoncé transmis a produit (ou non) un texte exploitable."""
+        if reconnu:
+            self._session_useful = True
+
+    def signaler_erreur(self, kind: str) -> None:
+        """
+        Enregistre une erreur signalée par l'utilisateur.
+
+        Args:
+            kind: false_accept ou false_reject
+        """
+        if kind == "false_accept":
+            self.reported_false_accepts += 1
+            self.fermer()
+        elif kind == "false_reject":
+            self.reported_false_rejects += 1
+        else:
+            raise ValueError(f"Type d'erreur inconnu: {kind}")
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de la porte."""
+        return {
+            "mode": self.mode,
+            "open": self.est_ouverte(),
+            "templates": len(self.spotter.templates),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "wake_detections": self.wake_detections,
+            "push_to_talk_events": self.push_to_talk_events,
+            "false_accepts": self.false_accepts + self.reported_false_accepts,
+            "false_rejects": self.false_rejects + self.reported_false_rejects,
+            "reported_false_accepts": self.reported_false_accepts,
+            "reported_false_rejects": self.reported_false_rejects,
+            "avg_detection_ms": (self.spotter.detection_time_ms / self.spotter.detections
+                                 if self.spotter.detections else 0.0),
+        }
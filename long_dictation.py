@@ -0,0 +1,177 @@
+"""
+Dictée longue par segments pour Whisp Assistant
+Découpe les longues dictées aux pauses détectées par la VAD, transcrit les
+segments en arrière-plan avec un léger recouvrement et recolle le texte en
+supprimant les mots dupliqués dans la zone de recouvrement
+"""
+import re
+import time
+import queue
+import concurrent.futures
+import threading
+import logging
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de mots recherchés dans la zone de recouvrement
+MAX_OVERLAP_WORDS = 8
+
+_PUNCTUATION_RE = re.compile(r"[^\w'’-]+", re.UNICODE)
+
+
+def _normaliser_mot(mot: str) -> str:
+    """Forme de comparaison d'un mot (minuscules, sans ponctuation)."""
+    return _PUNCTUATION_RE.sub("", mot.lower())
+
+
+def assembler_segments(texte_precedent: str, texte: str, max_mots: int = MAX_OVERLAP_WORDS) -> str:
+    """
+    Retire du début de texte les mots qui répètent la fin de texte_precedent.
+
+    Args:
+        texte_precedent: Transcription brute du segment précédent
+        texte: Transcription brute du segment courant
+        max_mots: Taille maximale du recouvrement recherché
+
+    Returns:
+        Texte du segment courant sans le recouvrement
+    """
+    mots = texte.split()
+    if not texte_precedent or not mots:
+        return texte.strip()
+
+    fin = [_normaliser_mot(m) for m in texte_precedent.split()[-max_mots:]]
+    debut = [_normaliser_mot(m) for m in mots[:max_mots]]
+
+    # Plus long suffixe du segment précédent qui est aussi un préfixe du segment courant
+    for k in range(min(len(fin), len(debut)), 0, -1):
+        if fin[-k:] == debut[:k]:
+            return " ".join(mots[k:])
+    return texte.strip()
+
+
+class LongDictationChunker:
+    """
+    Transcription des segments de dictée longue en arrière-plan.
+
+    Les segments sont décodés dans l'ordre par un worker dédié, pendant que le
+    thread d'inférence continue de consommer l'audio. Chaque texte recollé est
+    transmis à on_text dès qu'il est disponible, ce qui permet d'envoyer le
+    premier segment à la dictée avant la fin de l'énoncé.
+    """
+
+    def __init__(self, decode_func: Callable[[np.ndarray], str],
+                 on_text: Callable[[str, np.ndarray, str, float], None], name: str = "long_dictation",
+                 submit_func: Optional[Callable[[np.ndarray], concurrent.futures.Future]] = None):
+        """
+        Args:
+            decode_func: Fonction de décodage (audio float32 -> texte)
+            on_text: Callback (texte recollé, audio du segment, texte brut, latence en ms)
+            name: Nom du worker
+            submit_func: Soumission non bloquante à un décodeur par lots (audio -> Future du texte).
+                Les segments sont alors décodés ensemble et le worker ne fait que les recoller dans l'ordre
+        """
+        self.decode_func = decode_func
+        self.submit_func = submit_func
+        self.on_text = on_text
+        self.name = name
+        self._queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.segments_submitted = 0
+        self.segments_decoded = 0
+        self.decode_time_ms = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Oublie le texte du segment précédent (nouvel énoncé)."""
+        with self._lock:
+            self._texte_precedent = ""
+        self.active = False
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._worker_loop, daemon=True, name=f"{self.name}_worker")
+            self._worker.start()
+
+    def submit(self, samples: np.ndarray) -> None:
+        """
+        Confie un segment au worker de décodage.
+
+        Args:
+            samples: Audio float32 du segment (copie, recouvrement inclus)
+        """
+        self.active = True
+        self.segments_submitted += 1
+        self._ensure_worker()
+        future = self.submit_func(samples) if self.submit_func is not None else None
+        self._queue.put((samples, future, time.time()))
+
+    def _worker_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            samples, future, submitted_at = item
+            try:
+                if future is not None:
+                    texte_brut = future.result()
+                    latency_ms = (time.time() - submitted_at) * 1000
+                else:
+                    start = time.time()
+                    texte_brut = self.decode_func(samples)
+                    latency_ms = (time.time() - start) * 1000
+                self.decode_time_ms += latency_ms
+                self.segments_decoded += 1
+
+                texte = self.assembler(texte_brut)
+                if texte:
+                    self.on_text(texte, samples, texte_brut, latency_ms)
+            except Exception as e:
+                logger.error(f"Erreur lors du décodage d'un segment de dictée: {e}")
+            finally:
+                self._queue.task_done()
+
+    def assembler(self, texte_brut: str) -> str:
+        """
+        Recolle un texte brut à la suite du segment précédent.
+
+        Args:
+            texte_brut: Transcription brute du segment
+
+        Returns:
+            Texte sans le recouvrement avec le segment précédent
+        """
+        with self._lock:
+            texte = assembler_segments(self._texte_precedent, texte_brut)
+            if texte_brut.strip():
+                self._texte_precedent = texte_brut
+        return texte
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Attend que tous les segments soumis aient été décodés."""
+        if timeout is None:
+            self._queue.join()
+            return
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """Arrête le worker après les segments en attente."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de la dictée longue."""
+        return {
+            "segments_submitted": self.segments_submitted,
+            "segments_decoded": self.segments_decoded,
+            "avg_decode_ms": self.decode_time_ms / self.segments_decoded if self.segments_decoded else 0.0,
+        }
+
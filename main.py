@@ -225,7 +225,7 @@ def assistant_vocal():
         
         # Forcer l'arrêt des threads de reconnaissance vocale
         try:
-            arreter_threads_reconnaissance()
+            arreter_threads_reconnaissance(fermer_micro=True)
         except Exception:
             pass
         
@@ -264,7 +264,7 @@ def assistant_vocal():
             
         # Forcer l'arrêt des threads de reconnaissance vocale
         try:
-            arreter_threads_reconnaissance()
+            arreter_threads_reconnaissance(fermer_micro=True)
         except Exception as e:
             print(f"Erreur lors de l'arrêt des threads: {e}")
         
@@ -0,0 +1,257 @@
+"""
+Registre des modèles STT résidents pour Whisp Assistant
+Garde les modèles déjà chargés en mémoire sous un budget RAM configurable
+(éviction LRU), permet de les préchauffer en arrière-plan et évite de
+recharger un modèle à chaque changement de moteur
+"""
+import gc
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def _rss_mb() -> Optional[float]:
+    """Mémoire résidente du processus en Mo, si psutil est disponible."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class ModelEntry:
+    """Description d'un modèle géré par le registre."""
+
+    def __init__(self, name: str, load_func: Callable[[], bool], unload_func: Callable[[], None],
+                 is_loaded_func: Callable[[], bool], estimated_mb: float):
+        self.name = name
+        self.load_func = load_func
+        self.unload_func = unload_func
+        self.is_loaded_func = is_loaded_func
+        self.size_mb = float(estimated_mb)
+        self.load_time_ms = 0.0
+        self.loads = 0
+        self.lock = threading.Lock()
+        self.warming: Optional[threading.Thread] = None
+
+
+class ModelRegistry:
+    """
+    Modèles STT résidents avec budget mémoire.
+
+    Les modèles sont chargés par leurs fonctions setup_* habituelles ; le
+    registre se contente de suivre leur ordre d'utilisation et de décharger
+    les moins récemment utilisés lorsque le budget est dépassé. Le modèle du
+    moteur actif n'est jamais déchargé.
+    """
+
+    def __init__(self, budget_mb: float = 4096):
+        """
+        Args:
+            budget_mb: Mémoire maximale (Mo) occupée par les modèles résidents
+        """
+        self.budget_mb = float(budget_mb)
+        self.active: Optional[str] = None
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name: str, load_func: Callable[[], bool], unload_func: Callable[[], None],
+                 is_loaded_func: Callable[[], bool], estimated_mb: float) -> None:
+        """
+        Déclare un modèle.
+
+        Args:
+            name: Nom du moteur STT
+            load_func: Fonction de chargement (retourne True si le modèle est prêt)
+            unload_func: Fonction libérant la référence au modèle
+            is_loaded_func: Indique si le modèle est en mémoire
+            estimated_mb: Taille estimée, remplacée par la mesure réelle si possible
+        """
+        with self._lock:
+            self._entries[name] = ModelEntry(name, load_func, unload_func, is_loaded_func, estimated_mb)
+            if is_loaded_func():
+                self._lru[name] = None
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_ready(self, name: str) -> bool:
+        """Indique si le modèle est résident (prêt sans chargement)."""
+        entry = self._entries.get(name)
+        return entry is not None and entry.is_loaded_func()
+
+    def _touch(self, name: str) -> None:
+        with self._lock:
+            self._lru[name] = None
+            self._lru.move_to_end(name)
+
+    def ensure_loaded(self, name: str) -> bool:
+        """
+        Charge le modèle s'il n'est pas résident et le marque comme récemment utilisé.
+
+        Args:
+            name: Nom du moteur STT
+
+        Returns:
+            True si le modèle est prêt
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+
+        # Un seul chargement à la fois par modèle (préchauffage et changement de moteur)
+        with entry.lock:
+            if entry.is_loaded_func():
+                self.hits += 1
+                self._touch(name)
+                return True
+
+            self.misses += 1
+            self._evict_for(name, entry.size_mb)
+
+            rss_before = _rss_mb()
+            start = time.time()
+            try:
+                ready = entry.load_func()
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du modèle {name}: {e}")
+                ready = False
+            entry.load_time_ms = (time.time() - start) * 1000
+            if not ready:
+                return False
+
+            entry.loads += 1
+            rss_after = _rss_mb()
+            if rss_before is not None and rss_after is not None and rss_after > rss_before:
+                entry.size_mb = rss_after - rss_before
+            logger.info(f"Modèle {name} chargé en {entry.load_time_ms:.0f} ms (~{entry.size_mb:.0f} Mo)")
+            self._touch(name)
+
+        # Le budget peut être dépassé si la taille mesurée diffère de l'estimation
+        self._evict_for(None, 0.0)
+        return True
+
+    def warm(self, name: str) -> bool:
+        """
+        Précharge un modèle en arrière-plan.
+
+        Args:
+            name: Nom du moteur STT
+
+        Returns:
+            True si le préchauffage a été lancé ou si le modèle est déjà prêt
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        if entry.is_loaded_func():
+            self._touch(name)
+            return True
+        if entry.warming is not None and entry.warming.is_alive():
+            return True
+
+        entry.warming = threading.Thread(target=self.ensure_loaded, args=(name,), daemon=True,
+                                         name=f"warm_{name}")
+        entry.warming.start()
+        return True
+
+    def set_active(self, name: Optional[str]) -> None:
+        """Déclare le moteur actif, qui est protégé de l'éviction."""
+        with self._lock:
+            self.active = name
+            if name in self._entries and self._entries[name].is_loaded_func():
+                self._touch(name)
+
+    def set_budget(self, budget_mb: float) -> None:
+        """Modifie le budget mémoire et décharge les modèles en trop."""
+        self.budget_mb = float(budget_mb)
+        self._evict_for(None, 0.0)
+
+    def resident_mb(self) -> float:
+        """Mémoire estimée des modèles résidents."""
+        return sum(e.size_mb for e in self._entries.values() if e.is_loaded_func())
+
+    def _evict_for(self, incoming: Optional[str], incoming_mb: float) -> None:
+        """Décharge les modèles les moins récemment utilisés jusqu'à respecter le budget."""
+        evicted = False
+        with self._lock:
+            for name in list(self._lru):
+                if self.resident_mb() + incoming_mb <= self.budget_mb:
+                    break
+                entry = self._entries.get(name)
+                if entry is None or not entry.is_loaded_func():
+                    self._lru.pop(name, None)
+                    continue
+                if name in (self.active, incoming):
+                    continue
+                # Ne pas décharger un modèle en cours de chargement ou d'utilisation par un préchauffage
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                try:
+                    entry.unload_func()
+                finally:
+                    entry.lock.release()
+                self._lru.pop(name, None)
+                self.evictions += 1
+                evicted = True
+                logger.info(f"Modèle {name} déchargé (budget {self.budget_mb:.0f} Mo)")
+        if evicted:
+            gc.collect()
+
+    def get_stats(self) -> dict:
+        """Retourne l'état du registre."""
+        return {
+            "budget_mb": self.budget_mb,
+            "resident_mb": round(self.resident_mb(), 1),
+            "active": self.active,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "models": {
+                name: {
+                    "loaded": entry.is_loaded_func(),
+                    "size_mb": round(entry.size_mb, 1),
+                    "load_time_ms": round(entry.load_time_ms, 1),
+                    "loads": entry.loads,
+                    "warming": entry.warming is not None and entry.warming.is_alive(),
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+# Registre unique partagé par les moteurs STT
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry(budget_mb: Optional[float] = None) -> ModelRegistry:
+    """
+    Retourne le registre de modèles (créé au premier appel).
+
+    Args:
+        budget_mb: Budget mémoire utilisé à la création
+
+    Returns:
+        ModelRegistry partagé
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(budget_mb if budget_mb is not None else 4096)
+        return _registry
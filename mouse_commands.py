@@ -7,6 +7,7 @@ import time
 import re
 from screen_context import localiser_element_ecran, localiser_element_par_attributs
 from os_detection import get_os_type, is_windows, is_mac, is_linux
+from command_dispatch import declencheurs
 
 # Importation conditionnelle de mouse selon l'OS
 try:
@@ -41,6 +42,10 @@ except ImportError:
     
     mouse = MouseSubstitute()
 
+@declencheurs(mots_cles=(
+    "souris", "curseur", "clic", "cliqu", "click", "appui", "appuy", "presse", "menu contextuel",
+    "double", "relâche", "glisse jusqu", "défil", "scroll", "descend", "bas", "haut", "monte",
+    "page", "molette", "sélectionne", "va sur", "aller sur"))
 def executer_commande_souris(texte):
     """Exécute des commandes souris en fonction du texte transcrit"""
     texte = texte.lower()
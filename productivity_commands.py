@@ -13,6 +13,7 @@ import webbrowser
 from datetime import datetime
 import ctypes
 from ctypes import wintypes
+from command_dispatch import declencheurs
 
 # Fonctions pour la gestion multiécran
 def get_window_title():
@@ -60,6 +61,12 @@ def organiser_fenetres_multiscreen():
     except Exception as e:
         return f"Erreur lors de l'organisation des fenêtres: {str(e)}"
 
+@declencheurs(mots_cles=(
+    "word", "excel", "powerpoint", "outlook", "gras", "italique", "souligne", "aligne",
+    "centre le texte", "justifie", "document", "présentation", "diaporama", "diapositive",
+    "minuteur", "chronomètre", "date", "fenêtre", "bureau", "micro", "caméra", "partage", "note",
+    "pomodoro", "écran", "présentateur", "répartis", "distribue", "application", "pause",
+    "raccourci", "mode concentration", "mode focus"))
 def executer_commande_productivite(texte):
     """Exécute des commandes de productivité en fonction du texte transcrit"""
     texte = texte.lower()
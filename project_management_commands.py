@@ -8,6 +8,7 @@ import json
 import re
 import subprocess
 from text_processing import ecrire_texte_avec_accents
+from command_dispatch import declencheurs
 
 try:
     # Essayer d'abord l'import en tant que package
@@ -83,6 +84,7 @@ def save_tasks(conn, tasks_data):
     
     conn.commit()
 
+@declencheurs(mots_cles=("tâche", "projet", "documentation", "sprint"))
 def executer_commande_projet(texte):
     """Exécute des commandes de gestion de projet en fonction du texte transcrit"""
     texte = texte.lower()
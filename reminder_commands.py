@@ -10,6 +10,7 @@ import time
 import threading
 import pyautogui
 from plyer import notification
+from command_dispatch import declencheurs
 
 try:
     # Essayer d'abord l'import en tant que package
@@ -114,6 +115,7 @@ def start_reminder_checker():
     """Démarre le vérificateur de rappels en arrière-plan"""
     threading.Timer(5, check_reminders).start()
 
+@declencheurs(mots_cles=("rappel", "événement"))
 def executer_commande_rappel(texte):
     """Exécute des commandes de gestion des rappels et de l'agenda"""
     texte = texte.lower()
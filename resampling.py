@@ -0,0 +1,177 @@
+"""
+Rééchantillonnage polyphase pour Whisp Assistant
+Le rapport de taux est réduit à une fraction L/M ; un filtre passe-bas FIR
+(sinus cardinal fenêtré de Kaiser) est calculé une seule fois et découpé en L
+phases. Chaque bloc est converti d'un seul tenant (produit vectorisé phase ×
+fenêtre d'entrée) et l'état (fin du bloc précédent, position de phase) est
+conservé d'un bloc à l'autre : un flux découpé en blocs donne le même
+résultat que le signal converti d'une traite
+"""
+import math
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Passages à zéro du sinus cardinal conservés de part et d'autre du centre
+RESAMPLER_HALF_WIDTH = 8
+# Fréquence de coupure, en fraction de la fréquence de Nyquist du taux le plus bas
+RESAMPLER_CUTOFF = 0.9
+# Paramètre de la fenêtre de Kaiser (atténuation d'environ 80 dB)
+RESAMPLER_KAISER_BETA = 8.0
+
+# Bancs de filtres déjà calculés, par (L, M, demi-largeur, coupure, beta)
+_filter_banks: Dict[Tuple, np.ndarray] = {}
+
+
+def banc_polyphase(up: int, down: int, half_width: int = RESAMPLER_HALF_WIDTH,
+                   cutoff: float = RESAMPLER_CUTOFF, beta: float = RESAMPLER_KAISER_BETA) -> np.ndarray:
+    """
+    Banc de filtres polyphase d'un rapport up/down.
+
+    Args:
+        up: Facteur de suréchantillonnage L
+        down: Facteur de sous-échantillonnage M
+        half_width: Passages à zéro conservés de chaque côté
+        cutoff: Coupure en fraction de la fréquence de Nyquist du taux le plus bas
+        beta: Paramètre de la fenêtre de Kaiser
+
+    Returns:
+        Tableau (L, K) float32 ; la ligne p contient les coefficients de la
+        phase p, dans l'ordre des échantillons d'entrée (du plus ancien au plus récent)
+    """
+    key = (up, down, half_width, cutoff, beta)
+    bank = _filter_banks.get(key)
+    if bank is not None:
+        return bank
+
+    factor = max(up, down)
+    # Coupure en cycles par échantillon, au taux suréchantillonné
+    fc = 0.5 * cutoff / factor
+    length = 2 * half_width * factor + 1
+    n = np.arange(length) - (length - 1) / 2.0
+    h = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(length, beta) * up
+
+    taps = int(math.ceil(length / up))
+    h = np.concatenate([h, np.zeros(taps * up - length)])
+    # h[p + k*L] s'applique à x[i - k] ; inverser k pour un produit direct avec la fenêtre x[i-K+1 .. i]
+    bank = h.reshape(taps, up).T[:, ::-1].astype(np.float32)
+    bank = np.ascontiguousarray(bank)
+    _filter_banks[key] = bank
+    return bank
+
+
+class PolyphaseResampler:
+    """
+    Convertisseur de taux d'échantillonnage à état, pour un flux découpé en blocs.
+
+    Le filtre introduit un retard constant d'environ half_width échantillons
+    au taux le plus bas (0,5 ms pour une conversion 48 kHz -> 16 kHz).
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, half_width: int = RESAMPLER_HALF_WIDTH):
+        """
+        Args:
+            input_rate: Taux d'échantillonnage d'entrée
+            output_rate: Taux d'échantillonnage de sortie
+            half_width: Passages à zéro conservés de chaque côté (qualité / coût)
+        """
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        g = math.gcd(self.input_rate, self.output_rate)
+        self.up = self.output_rate // g
+        self.down = self.input_rate // g
+        self.passthrough = self.up == self.down
+
+        self.bank = banc_polyphase(self.up, self.down, half_width) if not self.passthrough else None
+        self.taps = self.bank.shape[1] if self.bank is not None else 1
+        self.reset()
+
+    def reset(self) -> None:
+        """Oublie l'historique (début d'un nouveau flux)."""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        # Position (au taux suréchantillonné) de la prochaine sortie, relative au début du bloc suivant
+        self._next = 0
+        self.samples_in = 0
+        self.samples_out = 0
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Convertit un bloc.
+
+        Args:
+            chunk: Échantillons d'entrée (float)
+
+        Returns:
+            Échantillons de sortie float32 (le nombre varie d'un bloc à l'autre
+            selon la position de phase)
+        """
+        x = np.asarray(chunk, dtype=np.float32)
+        n_in = len(x)
+        self.samples_in += n_in
+        if self.passthrough:
+            self.samples_out += n_in
+            return x
+        if n_in == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        up, down = self.up, self.down
+        span = n_in * up
+        if self._next >= span:
+            count = 0
+        else:
+            count = (span - self._next + down - 1) // down
+
+        extended = np.concatenate([self._history, x])
+        if count:
+            positions = self._next + np.arange(count, dtype=np.int64) * down
+            phases = positions % up
+            starts = positions // up
+            # Fenêtre x[i-K+1 .. i] de chaque sortie, sans copie
+            windows = np.lib.stride_tricks.sliding_window_view(extended, self.taps)[starts]
+            out = np.einsum("ij,ij->i", windows, self.bank[phases])
+        else:
+            out = np.zeros(0, dtype=np.float32)
+
+        self._next += count * down - span
+        self._history = extended[len(extended) - (self.taps - 1):].copy()
+        self.samples_out += count
+        return out.astype(np.float32, copy=False)
+
+    def process_int16(self, data: bytes) -> bytes:
+        """Convertit un bloc PCM int16 (bytes) en PCM int16 au taux de sortie."""
+        if self.passthrough:
+            self.samples_in += len(data) // 2
+            self.samples_out += len(data) // 2
+            return data
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        out = self.process(samples)
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+    def get_stats(self) -> dict:
+        """Retourne la configuration et les compteurs du convertisseur."""
+        return {
+            "input_rate": self.input_rate,
+            "output_rate": self.output_rate,
+            "ratio": f"{self.up}/{self.down}",
+            "taps_per_phase": self.taps,
+            "samples_in": self.samples_in,
+            "samples_out": self.samples_out,
+        }
+
+
+def resample_polyphase(audio_data: np.ndarray, original_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Rééchantillonne un signal complet (équivalent sans état de PolyphaseResampler).
+
+    Args:
+        audio_data: Données audio
+        original_rate: Taux d'échantillonnage original
+        target_rate: Taux d'échantillonnage cible
+
+    Returns:
+        Données audio rééchantillonnées (float32)
+    """
+    return PolyphaseResampler(original_rate, target_rate).process(audio_data)
@@ -4,6 +4,7 @@ Module de gestion des commandes de lecture d'écran pour l'assistant Whisp
 
 import re
 from screen_reader import lire_ecran_intelligemment, lire_ecran_a_partir_de
+from command_dispatch import declencheurs
 
 def est_commande_lecture_ecran(texte):
     """
@@ -129,6 +130,8 @@ COMMANDES_LECTURE_COMPLETE = [
     "lecture d'écran", "lecture de l'écran"
 ]
 
+@declencheurs(mots_cles=("lis", "lit", "lire", "lecture"),
+              commandes=("screen_read", "screen_read_from"))
 def executer_commande_lecture_ecran(texte):
     """
     Exécute une commande de lecture d'écran
@@ -7,7 +7,9 @@ import re
 import urllib.parse
 import pyperclip
 import pyautogui
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=("recherche", "trouve fichier", "traduis", "définis", "définition de"))
 def executer_commande_recherche(texte):
     """Exécute des commandes de recherche rapide"""
     texte = texte.lower()
@@ -4,6 +4,7 @@ Base de données des raccourcis clavier pour l'assistant Whisp
 
 import json
 from os_detection import get_os_type, adapt_shortcut
+from fuzzy_index import create_fuzzy_index
 
 try:
     # Essayer d'abord l'import en tant que package
@@ -621,6 +622,41 @@ def refresh_shortcuts_cache():
     _shortcuts_cache = get_all_shortcuts()
     return _shortcuts_cache is not None
 
+# Index approximatif des commandes vocales des raccourcis personnalisés
+_custom_shortcut_fuzzy_index = None
+# Phrases (commande vocale, id) à partir desquelles l'index a été construit
+_custom_shortcut_phrases = None
+
+def _rechercher_raccourci_approximatif(voice_command, shortcuts):
+    """
+    Cherche le raccourci dont la commande vocale est la plus proche du texte
+    
+    Args:
+        voice_command: Commande vocale nettoyée
+        shortcuts: Raccourcis personnalisés (get_custom_shortcuts)
+        
+    Returns:
+        dict: Raccourci trouvé ou None
+    """
+    global _custom_shortcut_fuzzy_index, _custom_shortcut_phrases
+    
+    phrases = tuple((s["voice_command"], s["id"]) for s in shortcuts)
+    # Reconstruire l'index uniquement si les raccourcis ont changé
+    if _custom_shortcut_fuzzy_index is None or phrases != _custom_shortcut_phrases:
+        _custom_shortcut_fuzzy_index = create_fuzzy_index(phrases, "custom_shortcuts")
+        _custom_shortcut_phrases = phrases
+    
+    match = _custom_shortcut_fuzzy_index.search(voice_command)
+    if match is None:
+        return None
+    
+    for s in shortcuts:
+        if s["id"] == match["value"]:
+            print(f"Raccourci trouvé par correspondance approximative: {s['name']} "
+                  f"(distance {match['distance']}, confiance {match['confidence']})")
+            return s
+    return None
+
 # Fonction pour exécuter un raccourci personnalisé
 def executer_raccourci_personnalise(voice_command):
     """
@@ -660,6 +696,10 @@ def executer_raccourci_personnalise(voice_command):
                         shortcut = s
                         print(f"Raccourci trouvé par correspondance exacte: {s['name']}")
                         break
+                
+                # Sinon, tolérer les erreurs de transcription
+                if not shortcut:
+                    shortcut = _rechercher_raccourci_approximatif(voice_command, all_shortcuts)
             except Exception as e:
                 print(f"Erreur lors de la recherche étendue de raccourcis: {e}")
                 
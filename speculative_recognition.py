@@ -0,0 +1,209 @@
+"""
+Reconnaissance spéculative à deux moteurs pour Whisp Assistant
+Chaque commande est décodée en même temps par un moteur rapide (Vosk, contraint
+à la grammaire des commandes) et par le moteur précis (Whisper CT2). Si le
+moteur rapide reconnaît une commande connue avec une confiance suffisante,
+elle est exécutée sans attendre le moteur précis ; sinon le texte du moteur
+précis est retenu. Les deux résultats sont comparés pour mesurer l'accord des
+moteurs et la latence économisée
+"""
+import time
+import logging
+import threading
+import collections
+import concurrent.futures
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Reconnaisseurs spéculatifs actifs, par nom (pour les statistiques)
+_speculateurs: Dict[str, "SpeculativeRecognizer"] = {}
+_speculateurs_lock = threading.Lock()
+
+
+def texte_et_confiance(resultat: Optional[dict]) -> tuple:
+    """
+    Texte et confiance d'un résultat Vosk obtenu avec SetWords(True).
+
+    Returns:
+        Tuple (texte, confiance minimale des mots), ("", 0.0) sans résultat
+    """
+    if not resultat:
+        return "", 0.0
+    texte = resultat.get("text", "").strip()
+    mots = resultat.get("result") or []
+    if not texte or not mots:
+        return texte, 0.0
+    return texte, min(mot.get("conf", 0.0) for mot in mots)
+
+
+def commande_connue(texte: str) -> Optional[str]:
+    """Commande normalisée correspondant au texte, None si le texte n'est pas une commande connue."""
+    if not texte:
+        return None
+    try:
+        from whisp_assistant.text_processing import normaliser_commande
+    except ImportError:
+        from text_processing import normaliser_commande
+    commande, _ = normaliser_commande(texte)
+    return commande
+
+
+def _normaliser(texte: str) -> str:
+    try:
+        from whisp_assistant.vosk_grammar import normaliser_phrase
+    except ImportError:
+        from vosk_grammar import normaliser_phrase
+    return normaliser_phrase(texte)
+
+
+class SpeculativeRecognizer:
+    """
+    Décodage simultané par un moteur rapide et un moteur précis.
+
+    Le moteur précis tourne dans un worker dédié pendant que le moteur rapide
+    décode l'énoncé dans le thread appelant. Lorsque le résultat rapide est
+    retenu, le décodage précis est annulé s'il n'a pas encore commencé ; sinon
+    il se termine en arrière-plan et sert uniquement à la comparaison.
+    """
+
+    def __init__(self, decoder_rapide: Callable, min_confidence: float = 0.9,
+                 name: str = "whisper_ct2_speculatif", history: int = 50):
+        """
+        Args:
+            decoder_rapide: Fonction (audio int16 -> résultat Vosk en dict, ou None)
+            min_confidence: Confiance minimale des mots pour exécuter la commande rapide
+            name: Nom du reconnaisseur
+            history: Nombre de comparaisons récentes conservées
+        """
+        self.decoder_rapide = decoder_rapide
+        self.min_confidence = min_confidence
+        self.name = name
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.recent = collections.deque(maxlen=history)
+
+        self.fast_hits = 0
+        self.fallbacks = 0
+        self.cancelled = 0
+        self.compared = 0
+        self.command_agreements = 0
+        self.text_agreements = 0
+        self.wrong_hits = 0
+        self.fast_time_ms = 0.0
+        self.accurate_time_ms = 0.0
+        self.latency_saved_ms = 0.0
+
+        with _speculateurs_lock:
+            _speculateurs[self.name] = self
+
+    def reconnaitre(self, audio_int16, decoder_precis: Callable[[], str]) -> tuple:
+        """
+        Reconnaît un énoncé de commande.
+
+        Args:
+            audio_int16: Audio int16 de l'énoncé, pour le moteur rapide
+            decoder_precis: Fonction sans argument renvoyant le texte du moteur précis
+                (elle ne doit pas dépendre d'un tampon réutilisé après le retour)
+
+        Returns:
+            Tuple (texte, source) où source vaut "rapide" ou "precis"
+        """
+        start = time.time()
+        future = self._executor.submit(self._chronometrer, decoder_precis)
+
+        try:
+            texte_rapide, conf = texte_et_confiance(self.decoder_rapide(audio_int16))
+        except Exception as e:
+            logger.warning(f"Échec du décodage rapide, attente du moteur précis: {e}")
+            texte_rapide, conf = "", 0.0
+        fin_rapide = time.time()
+        self.fast_time_ms += (fin_rapide - start) * 1000
+
+        commande = commande_connue(texte_rapide) if conf >= self.min_confidence else None
+        if commande is not None:
+            self.fast_hits += 1
+            print(f"Commande spéculative ({texte_rapide}, confiance {conf:.2f}) exécutée sans attendre Whisper")
+            if future.cancel():
+                self.cancelled += 1
+            else:
+                future.add_done_callback(
+                    lambda f: self._comparer(texte_rapide, conf, commande, f, start, fin_rapide, "rapide")
+                )
+            return texte_rapide, "rapide"
+
+        self.fallbacks += 1
+        texte_precis, _ = future.result()
+        self._comparer(texte_rapide, conf, commande_connue(texte_rapide), future, start, fin_rapide, "precis")
+        return texte_precis, "precis"
+
+    @staticmethod
+    def _chronometrer(decoder_precis: Callable[[], str]) -> tuple:
+        texte = decoder_precis()
+        return texte, time.time()
+
+    def _comparer(self, texte_rapide: str, conf: float, commande_rapide: Optional[str],
+                  future: concurrent.futures.Future, start: float, fin_rapide: float, source: str) -> None:
+        """Enregistre l'accord des deux moteurs une fois le décodage précis terminé."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        texte_precis, fin_precis = future.result()
+        commande_precise = commande_connue(texte_precis)
+        accord_commande = commande_rapide is not None and commande_rapide == commande_precise
+        accord_texte = _normaliser(texte_rapide) == _normaliser(texte_precis)
+
+        with self._lock:
+            self.compared += 1
+            self.accurate_time_ms += (fin_precis - start) * 1000
+            if accord_commande:
+                self.command_agreements += 1
+            if accord_texte:
+                self.text_agreements += 1
+            if source == "rapide":
+                self.latency_saved_ms += max(0.0, (fin_precis - fin_rapide) * 1000)
+                if not accord_commande:
+                    self.wrong_hits += 1
+            self.recent.append({
+                "rapide": texte_rapide,
+                "precis": texte_precis,
+                "confiance": round(conf, 3),
+                "source": source,
+                "accord": accord_commande,
+            })
+
+        logger.info(f"Spéculation {source}: rapide='{texte_rapide}' ({conf:.2f}) précis='{texte_precis}' "
+                    f"accord={'oui' if accord_commande else 'non'}")
+
+    def stop(self) -> None:
+        """Libère le worker du moteur précis."""
+        self._executor.shutdown(wait=False)
+        with _speculateurs_lock:
+            if _speculateurs.get(self.name) is self:
+                del _speculateurs[self.name]
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de la reconnaissance spéculative."""
+        total = self.fast_hits + self.fallbacks
+        return {
+            "min_confidence": self.min_confidence,
+            "utterances": total,
+            "fast_hits": self.fast_hits,
+            "fast_hit_rate": self.fast_hits / total if total else 0.0,
+            "fallbacks": self.fallbacks,
+            "cancelled": self.cancelled,
+            "compared": self.compared,
+            "command_agreement_rate": self.command_agreements / self.compared if self.compared else 0.0,
+            "text_agreement_rate": self.text_agreements / self.compared if self.compared else 0.0,
+            "wrong_hits": self.wrong_hits,
+            "avg_fast_ms": self.fast_time_ms / total if total else 0.0,
+            "avg_accurate_ms": self.accurate_time_ms / self.compared if self.compared else 0.0,
+            "avg_latency_saved_ms": self.latency_saved_ms / self.fast_hits if self.fast_hits else 0.0,
+            "recent": list(self.recent)[-10:],
+        }
+
+
+def get_speculative_stats() -> dict:
+    """Retourne les statistiques de tous les reconnaisseurs spéculatifs actifs."""
+    with _speculateurs_lock:
+        speculateurs = dict(_speculateurs)
+    return {name: speculateur.get_stats() for name, speculateur in speculateurs.items()}
@@ -18,6 +18,25 @@ from collections import OrderedDict
 from pathlib import Path
 from config import get_dictation_mode, get_running, get_stt_engine, set_stt_engine, get_openai_api_key, get_translation_mode
 from error_handler import get_error_handler, ErrorCategory, ErrorSeverity, catch_errors
+from audio_pipeline import AudioPipeline, stop_all_pipelines
+from audio_buffer import AudioRingBuffer
+from audio_capture import CaptureRingBuffer
+from audio_hub import get_audio_hub, stop_all_hubs, calibrer_microphone, taux_natif_entree
+from voice_activity import create_voice_activity_detector
+from streaming_transcription import StreamingTranscriber, StreamingUpdate
+from long_dictation import LongDictationChunker
+from batched_transcription import BatchedTranscriber
+from speculative_recognition import SpeculativeRecognizer
+from vosk_grammar import vosk_grammar, UNK as VOSK_UNK
+from decode_profiles import choisir_profil, options_profil, confiance, confiance_insuffisante, options_escalade
+from model_registry import get_model_registry
+from acoustic_cache import AcousticCache
+from keyword_spotting import WakeGate
+from whisper_api_client import get_whisper_api_client
+from inference_server import (
+    get_inference_server, stop_all_inference_servers, get_inference_server_stats,
+    RemoteWhisperModel, RemoteKaldiRecognizer, SUPPORTED_ENGINES as INFERENCE_PROCESS_ENGINES
+)
 
 # Imports audio pour fallback (sounddevice pour ARM64)
 try:
@@ -30,12 +49,19 @@ except ImportError:
 
 # Import des optimisations Numba
 try:
-    from audio_optimization import optimize_audio_processing, is_speech_active, audio_optimizer
+    from audio_optimization import optimize_audio_processing, is_speech_active, audio_optimizer, create_dsp_chain, get_dsp_chain_stats
     NUMBA_AVAILABLE = True
 except ImportError as e:
     print(f"Numba non disponible, utilisation des fonctions standards: {e}")
     NUMBA_AVAILABLE = False
 
+# Touche push-to-talk globale (optionnelle)
+try:
+    import keyboard
+    KEYBOARD_AVAILABLE = True
+except ImportError:
+    KEYBOARD_AVAILABLE = False
+
 # Configurer les chemins CUDA pour les packages installés via pip
 def set_cuda_paths():
     """Configure les chemins CUDA/cuDNN pour les packages installés via pip"""
@@ -173,6 +199,9 @@ class SoundDeviceInputStream:
         self.channels = channels
         self.stream = None
         self.is_open = False
+        # Tampon alimenté par le callback PortAudio (mode callback uniquement)
+        self.capture = None
+        self.last_capture_time = None
 
     def __enter__(self):
         """Ouvre le flux audio (compatibilité avec context manager)"""
@@ -204,13 +233,14 @@ class SoundDeviceInputStream:
             if device_id is not None:
                 stream_config['device'] = device_id
 
-            self.stream = sd.InputStream(**stream_config)
+            self.stream = sd.InputStream(**stream_config, **self._callback_config())
             self.stream.start()
             self.is_open = True
 
             print(f"Vosk Debug: Flux audio démarré sur {platform_config['system']} "
                   f"(taux: {self.sample_rate}, canaux: {self.channels}, "
-                  f"chunk: {stream_config['block_size']})")
+                  f"chunk: {stream_config['blocksize']}, "
+                  f"mode: {'callback' if self.capture is not None else 'bloquant'})")
 
         except Exception as e:
             print(f"Erreur lors de l'ouverture du flux sounddevice: {e}")
@@ -221,7 +251,8 @@ class SoundDeviceInputStream:
                     samplerate=16000,
                     channels=1,
                     dtype='int16',
-                    blocksize=1024
+                    blocksize=1024,
+                    **self._callback_config()
                 )
                 self.stream.start()
                 self.is_open = True
@@ -230,6 +261,19 @@ class SoundDeviceInputStream:
                 print(f"Échec du fallback: {e2}")
                 raise
 
+    def _callback_config(self):
+        """Paramètres du flux en mode callback (capture indépendante du thread consommateur)"""
+        if not stt_settings.get("audio_callback_capture", True):
+            return {}
+        if self.capture is None:
+            self.capture = CaptureRingBuffer(
+                sample_rate=self.sample_rate,
+                channels=self.channels,
+                capacity_s=stt_settings.get("audio_capture_buffer_s", 2.0),
+                name=f"sounddevice_{self.sample_rate}"
+            )
+        return {'callback': self.capture.callback}
+
     def _select_best_device(self, devices, platform_config):
         """Sélectionne le meilleur appareil audio selon la plateforme"""
         try:
@@ -267,6 +311,9 @@ class SoundDeviceInputStream:
 
         try:
             chunk_size = chunk_size or self.chunk_size
+            if self.capture is not None:
+                data, self.last_capture_time = self.capture.lire(chunk_size)
+                return data.tobytes()
             data, overflowed = self.stream.read(chunk_size)
             if overflowed:
                 print("Avertissement: Buffer overflow audio")
@@ -287,6 +334,36 @@ class SoundDeviceInputStream:
             finally:
                 self.stream = None
                 self.is_open = False
+                if self.capture is not None:
+                    self.capture.fermer()
+                    self.capture = None
+
+def _microphone_moteur(sample_rate, engine, open_func=None):
+    """
+    Microphone d'un moteur STT
+    
+    Avec le hub audio, le moteur s'abonne au flux partagé (le périphérique reste
+    ouvert et calibré d'un moteur à l'autre) ; sinon un nouveau microphone est créé.
+    Avec audio_native_rate, le hub capture au taux natif du périphérique et
+    chaque moteur reçoit le flux converti à son propre taux.
+    
+    Args:
+        sample_rate: Taux d'échantillonnage
+        engine: Nom du moteur STT
+        open_func: Création du microphone hors hub (sr.Microphone par défaut)
+    """
+    if stt_settings["audio_hub"]:
+        capture_rate = taux_natif_entree(sample_rate) if stt_settings["audio_native_rate"] else sample_rate
+        # Un seul hub tient le périphérique : celui d'un moteur précédent à un autre taux est fermé
+        stop_all_hubs(keep_rate=capture_rate)
+        hub = get_audio_hub(
+            capture_rate,
+            lambda: create_microphone_alternative(capture_rate) or sr.Microphone(sample_rate=capture_rate)
+        )
+        return hub.microphone(f"stt_{engine}", sample_rate=sample_rate)
+    if open_func is not None:
+        return open_func()
+    return sr.Microphone(sample_rate=sample_rate)
 
 def create_microphone_alternative(sample_rate=16000):
     """Crée un microphone compatible multiplateformes avec fallbacks automatiques"""
@@ -570,7 +647,57 @@ DEFAULT_STT_SETTINGS = {
     "vosk_silence_threshold": 0.04,  # Seuil d'énergie pour détecter le silence (Vosk)
     "vosk_silence_chunks": 15,  # Nombre de chunks silencieux pour terminer l'enregistrement (Vosk)
     "whisper_ct2_silence_threshold": 0.04,  # Seuil d'énergie pour détecter le silence (Whisper CT2)
-    "whisper_ct2_silence_chunks": 4  # Nombre de chunks silencieux pour terminer l'enregistrement (Whisper CT2)
+    "whisper_ct2_silence_chunks": 4,  # Nombre de chunks silencieux pour terminer l'enregistrement (Whisper CT2)
+    "vad_backend": "energy",  # Backend de détection de parole: energy, spectral ou webrtc
+    "vad_hangover_chunks": 1,  # Chunks de silence tolérés après la parole avant de compter le silence
+    "vad_preroll_chunks": 2,  # Chunks conservés avant le début de la parole
+    "vad_adaptive_threshold": True,  # Seuil de la VAD suivant le plancher de bruit estimé en continu
+    "vad_noise_window_s": 5.0,  # Durée de la fenêtre d'estimation du plancher de bruit (secondes)
+    "vad_noise_margin_db": 10.0,  # Marge du seuil au-dessus du plancher de bruit (dB)
+    "vad_min_threshold": 0.01,  # Seuil minimal de la VAD adaptative
+    "whisper_ct2_streaming": False,  # Transcription partielle pendant la parole (Whisper CT2)
+    "whisper_ct2_streaming_interval_ms": 500,  # Audio nouveau (ms) entre deux décodages partiels
+    "whisper_ct2_early_commands": True,  # Exécuter une commande dès que le préfixe validé est complet
+    "whisper_ct2_dictation_segment_s": 15.0,  # Durée à partir de laquelle une dictée est découpée à la prochaine pause
+    "whisper_ct2_dictation_overlap_s": 1.0,  # Recouvrement audio entre deux segments de dictée
+    "vosk_streaming": False,  # Décoder chaque chunk à son arrivée et terminer les énoncés par l'endpointing de Kaldi
+    "vosk_endpoint_silence_s": 0.5,  # Silence de fin d'énoncé pour l'endpointing Kaldi (si supporté par Vosk)
+    "vosk_command_grammar": True,  # Hors dictée, contraindre Vosk aux phrases de commande connues
+    "whisper_ct2_fast_command_max_s": 2.0,  # Durée maximale d'une commande décodée en mode glouton
+    "whisper_ct2_dictation_beam_size": 5,  # Taille du faisceau en dictée
+    "whisper_ct2_escalation_beam_size": 8,  # Taille du faisceau de relance en cas de faible confiance
+    "whisper_ct2_min_avg_logprob": -0.8,  # Log-probabilité moyenne en dessous de laquelle on relance
+    "whisper_ct2_max_no_speech_prob": 0.6,  # Probabilité d'absence de parole au-dessus de laquelle on relance
+    "whisper_ct2_batching": True,  # Décoder ensemble les segments de dictée en attente
+    "whisper_ct2_batch_size": 8,  # Nombre maximal de segments par lot
+    "whisper_ct2_batch_wait_ms": 50,  # Attente maximale pour compléter un lot
+    "whisper_ct2_speculative_vosk": False,  # Décoder aussi les commandes avec Vosk et exécuter sans attendre si sûr
+    "whisper_ct2_speculative_min_confidence": 0.9,  # Confiance Vosk minimale pour exécuter la commande sans Whisper
+    "audio_callback_capture": True,  # Capture sounddevice en mode callback (tampon circulaire préalloué)
+    "audio_capture_buffer_s": 2.0,  # Durée d'audio conservée en attendant le thread de reconnaissance
+    "audio_hub": False,  # Ouvrir le micro une seule fois et le partager entre moteurs et consommateurs
+    "audio_native_rate": True,  # Avec le hub, capturer au taux natif du micro et convertir pour chaque moteur
+    "audio_dsp_chain": False,  # Traiter le flux (filtres à état) avant la VAD et le STT
+    "audio_dsp_stages": ["highpass", "noise_gate", "agc"],  # Étages de la chaîne, dans l'ordre
+    "audio_dsp_highpass_hz": 80.0,  # Fréquence de coupure du passe-haut
+    "audio_dsp_gate_threshold": 0.01,  # Niveau d'enveloppe sous lequel la porte de bruit atténue
+    "audio_dsp_gate_floor_db": -20.0,  # Atténuation de la porte de bruit fermée
+    "audio_dsp_agc_target_rms": 0.1,  # Niveau RMS visé par le contrôle automatique de gain
+    "audio_dsp_agc_max_gain": 10.0,  # Gain maximal du contrôle automatique de gain
+    "stt_model_budget_mb": 4096,  # Mémoire maximale des modèles STT gardés résidents
+    "stt_inference_process": False,  # Décoder Whisper CT2 / Whisper French / Vosk dans un processus séparé
+    "stt_cache_enabled": True,  # Réutiliser le texte des commandes courtes déjà reconnues
+    "stt_cache_similarity": 0.97,  # Similarité minimale des empreintes acoustiques
+    "stt_cache_ttl_days": 30.0,  # Durée de validité des entrées du cache
+    "stt_cache_max_entries": 500,  # Nombre maximal d'entrées par moteur
+    "stt_cache_max_duration": 4.0,  # Durée maximale (s) des énoncés mis en cache
+    "whisper_api_hedging": False,  # Couvrir l'API Whisper par un décodage local en parallèle
+    "whisper_api_hedge_deadline_ms": 1500,  # Délai après lequel le résultat local est accepté
+    "whisper_api_hedge_engine": "whisper_ct2",  # Moteur local de secours (whisper_ct2 ou vosk)
+    "stt_gate_mode": "off",  # Porte d'activation des commandes : off, wake_word ou push_to_talk
+    "stt_wake_threshold": 0.25,  # Distance maximale à la phrase d'activation enregistrée
+    "stt_wake_session_s": 8.0,  # Durée d'ouverture de la porte après activation
+    "stt_push_to_talk_key": ""  # Raccourci clavier push-to-talk (ex: ctrl+alt+space)
 }
 
 # Variables globales pour les paramètres de reconnaissance vocale
@@ -608,6 +735,8 @@ def load_stt_settings():
         
         # Mettre à jour les paramètres globaux
         stt_settings.update(loaded_settings)
+        stt_cache.configure(stt_settings)
+        configurer_porte_activation()
         
         print(f"Paramètres STT chargés: {stt_settings}")
         return True
@@ -672,6 +801,22 @@ def update_stt_setting(key, value):
         # Mettre à jour le paramètre
         stt_settings[key] = value
         
+        # Appliquer immédiatement le nouveau budget mémoire des modèles
+        if key == "stt_model_budget_mb":
+            get_model_registry().set_budget(value)
+        
+        # Appliquer les paramètres du cache acoustique
+        if key.startswith("stt_cache_"):
+            stt_cache.configure(stt_settings)
+        
+        # Appliquer les paramètres de la porte d'activation
+        if key.startswith("stt_gate_") or key.startswith("stt_wake_") or key == "stt_push_to_talk_key":
+            configurer_porte_activation()
+        
+        # Libérer les processus d'inférence lorsque le mode est désactivé
+        if key == "stt_inference_process" and not value:
+            stop_all_inference_servers()
+        
         # Sauvegarder les paramètres
         save_stt_settings()
         
@@ -715,7 +860,6 @@ WHISPER_MIN_AUDIO_DURATION = 0.2  # Réduit pour capturer des commandes plus cou
 WHISPER_MAX_AUDIO_DURATION = 5.0  # Réduit pour un traitement plus rapide
 WHISPER_COST_PER_MINUTE = 0.006  # $0.006 par minute d'audio
 WHISPER_PARALLEL_REQUESTS = True  # Activer le traitement parallèle
-WHISPER_CACHE_SIZE = 10  # Nombre d'entrées de cache pour éviter de retraiter des audios similaires
 
 # Constantes pour Vosk
 VOSK_SAMPLE_RATE = 16000
@@ -1408,6 +1552,151 @@ def setup_vosk_model():
         print("Modèle Vosk déjà chargé")
         return True
 
+
+# Taille estimée des modèles en mémoire (Mo), corrigée par la mesure au premier chargement
+MODEL_MEMORY_ESTIMATES_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 900,
+    "medium": 2000,
+    "large": 3500,
+}
+
+
+def _liberer_modele(nom_variable):
+    """Libère la référence globale d'un modèle évincé du registre"""
+    globals()[nom_variable] = None
+    print(f"Modèle déchargé de la mémoire: {nom_variable}")
+
+
+def _enregistrer_modeles_stt():
+    """Déclare les modèles locaux auprès du registre des modèles résidents"""
+    registry = get_model_registry(stt_settings.get("stt_model_budget_mb", 4096))
+    if registry.is_registered("whisper_ct2"):
+        return registry
+    
+    registry.register(
+        "whisper_ct2", setup_whisper_ct2_model,
+        lambda: _liberer_modele("whisper_ct2_model"),
+        lambda: whisper_ct2_model is not None,
+        MODEL_MEMORY_ESTIMATES_MB.get(WHISPER_CT2_MODEL_SIZE, 2000)
+    )
+    registry.register(
+        "whisper_french", setup_whisper_french_model,
+        lambda: _liberer_modele("whisper_french_model"),
+        lambda: whisper_french_model is not None,
+        MODEL_MEMORY_ESTIMATES_MB["large"]
+    )
+    registry.register(
+        "vosk", setup_vosk_model,
+        lambda: _liberer_modele("vosk_model"),
+        lambda: vosk_model is not None,
+        2000
+    )
+    return registry
+
+
+def charger_modele_stt(engine):
+    """
+    Charge le modèle d'un moteur STT ou le retrouve parmi les modèles résidents
+    
+    Args:
+        engine: Nom du moteur STT
+        
+    Returns:
+        bool: True si le modèle est prêt
+    """
+    if stt_settings.get("stt_inference_process") and engine in INFERENCE_PROCESS_ENGINES:
+        if _serveur_inference(engine) is not None:
+            return True
+        print(f"Processus d'inférence indisponible pour {engine}, chargement du modèle en local")
+    
+    registry = _enregistrer_modeles_stt()
+    if not registry.is_registered(engine):
+        # Moteurs sans modèle local (SpeechRecognition, API Whisper)
+        return True
+    return registry.ensure_loaded(engine)
+
+
+def prechauffer_modele_stt(engine):
+    """
+    Précharge en arrière-plan le modèle d'un moteur STT avant de basculer dessus
+    
+    Args:
+        engine: Nom du moteur STT
+        
+    Returns:
+        bool: True si le préchauffage est lancé ou si le modèle est déjà prêt
+    """
+    registry = _enregistrer_modeles_stt()
+    if not registry.is_registered(engine):
+        return True
+    return registry.warm(engine)
+
+
+def get_model_registry_stats():
+    """Retourne l'état des modèles STT résidents"""
+    return _enregistrer_modeles_stt().get_stats()
+
+
+def _config_serveur_inference(engine):
+    """Paramètres de chargement du modèle dans le processus d'inférence"""
+    if engine == "vosk":
+        if not os.path.exists(VOSK_MODEL_PATH):
+            return None
+        return {"model_path": VOSK_MODEL_PATH}
+    
+    if engine == "whisper_french":
+        model_path = os.path.join(WHISPER_FRENCH_MODEL_DIR, "ctranslate2")
+        if not os.path.exists(model_path):
+            return None
+        use_cpu = WHISPER_FRENCH_FORCE_CPU or not is_cuda_available()
+        return {
+            "model": model_path,
+            "device": "cpu" if use_cpu else "auto",
+            "compute_type": "float32" if use_cpu else WHISPER_FRENCH_COMPUTE_TYPE,
+            "cpu_threads": 8 if use_cpu else 4,
+        }
+    
+    use_cpu = WHISPER_CT2_FORCE_CPU or not is_cuda_available()
+    return {
+        "model": WHISPER_CT2_MODEL_SIZE,
+        "device": "cpu" if use_cpu else "auto",
+        "compute_type": "float32" if use_cpu else WHISPER_CT2_COMPUTE_TYPE,
+        "download_root": WHISPER_CT2_MODEL_DIR,
+        "cpu_threads": 8 if use_cpu else 4,
+    }
+
+
+def _serveur_inference(engine):
+    """
+    Retourne le processus d'inférence du moteur si le mode processus séparé est actif
+    
+    Args:
+        engine: Nom du moteur STT
+        
+    Returns:
+        InferenceServer prêt, ou None pour décoder dans le processus principal
+    """
+    if not stt_settings.get("stt_inference_process") or engine not in INFERENCE_PROCESS_ENGINES:
+        return None
+    
+    config = _config_serveur_inference(engine)
+    if config is None:
+        # Le modèle doit d'abord être téléchargé par le chargement local
+        print(f"Modèle {engine} absent du disque, décodage dans le processus principal")
+        return None
+    
+    server = get_inference_server(engine, config)
+    if not server.start():
+        error_msg = f"Échec du démarrage du processus d'inférence {engine}"
+        print(error_msg)
+        if 'web_interface' in sys.modules:
+            from web_interface import log_to_web
+            log_to_web(error_msg, "error")
+        return None
+    return server
+
 def setup_whisper_french_recognition():
     """Configure et initialise le système de reconnaissance vocale avec Whisper French"""
     global whisper_french_model
@@ -1431,7 +1720,7 @@ def setup_whisper_french_recognition():
         # Vérifier si le modèle est déjà chargé
         if whisper_french_model is None:
             print("Modèle Whisper French non chargé, tentative de chargement...")
-            if not setup_whisper_french_model():
+            if not charger_modele_stt("whisper_french"):
                 error_msg = "Échec du chargement du modèle Whisper French, utilisation de SpeechRecognition comme solution de repli"
                 print(error_msg)
                 if 'web_interface' in sys.modules:
@@ -1499,7 +1788,7 @@ def setup_whisper_ct2_recognition():
         # Vérifier si le modèle est déjà chargé
         if whisper_ct2_model is None:
             print("Modèle Whisper CT2 non chargé, tentative de chargement...")
-            if not setup_whisper_ct2_model():
+            if not charger_modele_stt("whisper_ct2"):
                 error_msg = "Échec du chargement du modèle Whisper CT2, utilisation de SpeechRecognition comme solution de repli"
                 print(error_msg)
                 if 'web_interface' in sys.modules:
@@ -1528,7 +1817,7 @@ def setup_whisper_ct2_recognition():
                 return setup_speechrecognition()
         
         # Charger le modèle Whisper CT2
-        if not setup_whisper_ct2_model():
+        if not charger_modele_stt("whisper_ct2"):
             error_msg = "Échec du chargement du modèle Whisper CT2, utilisation de SpeechRecognition comme solution de repli"
             print(error_msg)
             if 'web_interface' in sys.modules:
@@ -1595,7 +1884,7 @@ def setup_vosk_recognition():
                 return setup_speechrecognition()
         
         # Charger le modèle Vosk
-        if not setup_vosk_model():
+        if not charger_modele_stt("vosk"):
             error_msg = "Échec du chargement du modèle Vosk, utilisation de SpeechRecognition comme solution de repli"
             print(error_msg)
             if 'web_interface' in sys.modules:
@@ -1621,47 +1910,74 @@ def setup_vosk_recognition():
         set_stt_engine("speechrecognition")
         return setup_speechrecognition()
 
-# Cache pour les requêtes Whisper
-class WhisperCache:
-    def __init__(self, max_size=WHISPER_CACHE_SIZE):
-        self.cache = OrderedDict()
-        self.max_size = max_size
-    
-    def get_hash(self, audio_data):
-        """Génère un hash pour les données audio"""
-        # Utiliser un sous-échantillonnage pour accélérer le hachage
-        if len(audio_data) > 16000:  # Si plus d'une seconde
-            # Prendre des échantillons à intervalles réguliers
-            step = len(audio_data) // 16000
-            samples = audio_data[::step][:16000]
-        else:
-            samples = audio_data
-        
-        # Calculer le hash
-        return hashlib.md5(samples).hexdigest()
-    
-    def get(self, audio_data):
-        """Récupère un résultat du cache s'il existe"""
-        audio_hash = self.get_hash(audio_data)
-        if audio_hash in self.cache:
-            # Déplacer l'élément à la fin (le plus récemment utilisé)
-            self.cache.move_to_end(audio_hash)
-            return self.cache[audio_hash]
-        return None
+# Cache acoustique persistant partagé par les moteurs STT
+stt_cache = AcousticCache()
+stt_cache.configure(stt_settings)
+
+# Porte d'activation (phrase d'activation ou push-to-talk) devant les moteurs STT
+wake_gate = WakeGate()
+_push_to_talk_hotkey = None
+
+def configurer_porte_activation():
+    """Applique les paramètres de la porte d'activation et enregistre la touche push-to-talk"""
+    global _push_to_talk_hotkey
+    wake_gate.configure(stt_settings)
+    if not KEYBOARD_AVAILABLE:
+        return
     
-    def set(self, audio_data, result):
-        """Ajoute un résultat au cache"""
-        audio_hash = self.get_hash(audio_data)
-        
-        # Si le cache est plein, supprimer l'élément le plus ancien
-        if len(self.cache) >= self.max_size:
-            self.cache.popitem(last=False)
+    if _push_to_talk_hotkey is not None:
+        try:
+            keyboard.remove_hotkey(_push_to_talk_hotkey)
+        except (KeyError, ValueError):
+            pass
+        _push_to_talk_hotkey = None
+    
+    touche = stt_settings["stt_push_to_talk_key"]
+    if touche and wake_gate.mode == "push_to_talk":
+        try:
+            _push_to_talk_hotkey = keyboard.add_hotkey(touche, wake_gate.ouvrir, args=("push_to_talk",))
+        except Exception as e:
+            print(f"Impossible d'enregistrer la touche push-to-talk {touche}: {e}")
+
+def filtrer_par_porte(audio, sample_rate):
+    """
+    Passe un énoncé de commande par la porte d'activation
+    
+    Args:
+        audio: Audio int16 (bytes ou tableau) de l'énoncé
+        sample_rate: Taux d'échantillonnage
         
-        # Ajouter le nouvel élément
-        self.cache[audio_hash] = result
+    Returns:
+        Audio à décoder (sans la phrase d'activation), ou None si l'énoncé est écarté
+    """
+    # La dictée est déjà un mode explicite : elle n'est jamais filtrée
+    if get_dictation_mode():
+        return audio
+    # L'enregistrement de la phrase d'activation passe par la porte même désactivée
+    if not wake_gate.active and not wake_gate.enrolement_en_cours:
+        return audio
+    return wake_gate.filtrer(audio, sample_rate)
 
-# Initialiser le cache
-whisper_cache = WhisperCache()
+configurer_porte_activation()
+
+def creer_chaine_dsp(sample_rate, chunk_size, engine):
+    """
+    Chaîne de traitement en flux placée avant la VAD et le STT d'un moteur
+    
+    Returns:
+        StreamingDSPChain, ou None si la chaîne est désactivée ou Numba absent
+    """
+    if not NUMBA_AVAILABLE:
+        return None
+    try:
+        return create_dsp_chain(stt_settings, sample_rate, chunk_size, name=engine)
+    except Exception as e:
+        print(f"Chaîne de traitement audio désactivée pour {engine}: {e}")
+        return None
+
+def get_dsp_stats():
+    """Retourne les statistiques des chaînes de traitement audio actives"""
+    return get_dsp_chain_stats() if NUMBA_AVAILABLE else {}
 
 # Métriques de performance STT
 stt_metrics = {
@@ -1903,6 +2219,36 @@ def reset_stt_metrics():
         import traceback
         traceback.print_exc()
 
+def update_decode_profile_metrics(engine, profil, latency, escalade=False):
+    """
+    Enregistre la latence d'un décodage par profil
+    
+    Args:
+        engine: Nom du moteur STT
+        profil: Nom du profil de décodage
+        latency: Latence du décodage en millisecondes (relance comprise)
+        escalade: True si le décodage a été relancé avec un faisceau plus large
+    """
+    if engine not in stt_metrics:
+        return
+    
+    profils = stt_metrics[engine].setdefault("profiles", {})
+    metrics = profils.setdefault(profil, {
+        "requests": 0,
+        "escalations": 0,
+        "latencies": [],
+        "avg_latency": 0,
+        "last_latency": 0
+    })
+    metrics["requests"] += 1
+    if escalade:
+        metrics["escalations"] += 1
+    metrics["latencies"].append(latency)
+    del metrics["latencies"][:-100]  # Garder les 100 dernières latences
+    metrics["last_latency"] = latency
+    metrics["avg_latency"] = statistics.mean(metrics["latencies"])
+    metrics["escalation_rate"] = metrics["escalations"] / metrics["requests"]
+
 def update_stt_metrics(engine, success=True, latency=0, audio_duration=0, text=""):
     """Met à jour les métriques de performance STT"""
     # Vérifier que le moteur existe dans les métriques
@@ -1933,6 +2279,10 @@ def update_stt_metrics(engine, success=True, latency=0, audio_duration=0, text="
     # Obtenir les métriques pour le moteur spécifié
     metrics = stt_metrics[engine]
     
+    # Une session ouverte par la phrase d'activation sans texte reconnu est un faux déclenchement
+    if success and text.strip():
+        wake_gate.signaler_resultat(True)
+    
     # Incrémenter les compteurs
     metrics["requests"] += 1
     if success:
@@ -2529,22 +2879,105 @@ def setup_whisper_recognition():
     print("Système de reconnaissance Whisper API prêt!")
     return recognizer, microphone, stop_listening
 
+def _decoder_profil(modele, audio_samples, engine, profil, **options):
+    """
+    Décode un énoncé avec un profil et relance avec un faisceau plus large si la confiance est faible
+    
+    Args:
+        modele: Modèle faster-whisper (local ou processus d'inférence)
+        audio_samples: Audio float32 de l'énoncé
+        engine: Nom du moteur STT (clé des métriques)
+        profil: Nom du profil de décodage
+        **options: Paramètres de transcribe() du profil
+        
+    Returns:
+        str: Texte brut reconnu
+    """
+    start_time = time.time()
+    segments, _ = modele.transcribe(audio_samples, **options)
+    segments = list(segments)
+    
+    escalade = False
+    beam_escalade = stt_settings["whisper_ct2_escalation_beam_size"]
+    if options.get("beam_size", 1) < beam_escalade and confiance_insuffisante(
+            segments, stt_settings["whisper_ct2_min_avg_logprob"], stt_settings["whisper_ct2_max_no_speech_prob"]):
+        escalade = True
+        segments_relance, _ = modele.transcribe(audio_samples, **options_escalade(options, beam_escalade))
+        segments_relance = list(segments_relance)
+        # Garder le décodage le plus sûr
+        if confiance(segments_relance)[0] >= confiance(segments)[0]:
+            segments = segments_relance
+        print(f"Confiance faible (profil {profil}), relance avec un faisceau de {beam_escalade}")
+    
+    update_decode_profile_metrics(engine, profil, (time.time() - start_time) * 1000, escalade)
+    return " ".join(segment.text for segment in segments)
+
+
+def _transcrire_texte(modele, audio_samples, engine, sample_rate, utiliser_cache, profil=None, **options):
+    """
+    Transcrit un énoncé avec faster-whisper en réutilisant le cache acoustique
+    
+    Args:
+        modele: Modèle faster-whisper (local ou processus d'inférence)
+        audio_samples: Audio float32 de l'énoncé
+        engine: Nom du moteur STT (clé du cache)
+        sample_rate: Taux d'échantillonnage
+        utiliser_cache: False pour la dictée, dont le texte ne se répète pas
+        profil: Profil de décodage (relance sur confiance faible et latence par profil), ou None
+        **options: Paramètres de transcribe()
+        
+    Returns:
+        str: Texte brut reconnu
+    """
+    if utiliser_cache:
+        texte = stt_cache.get(audio_samples, engine, sample_rate=sample_rate)
+        if texte is not None:
+            print(f"Résultat trouvé dans le cache acoustique ({engine}), décodage évité")
+            return texte
+    
+    if profil is not None:
+        texte = _decoder_profil(modele, audio_samples, engine, profil, **options)
+    else:
+        segments, _ = modele.transcribe(audio_samples, **options)
+        texte = " ".join([segment.text for segment in segments])
+    
+    if utiliser_cache:
+        stt_cache.set(audio_samples, texte, engine, sample_rate=sample_rate)
+    return texte
+
+
+def _executer_commande(command_processor, texte):
+    """Exécute une commande reconnue (appelé depuis le worker de commandes du pipeline)"""
+    resultat = command_processor.process_command(texte)
+    print(f"Résultat : {resultat}")
+    return resultat
+
+def _publier_transcription_partielle(moteur, update):
+    """Affiche une transcription partielle dans la console et l'interface web"""
+    message = f"Partiel ({moteur}): {update.committed}"
+    if update.tentative:
+        message += f" [{update.tentative}]"
+    print(message)
+    if 'web_interface' in sys.modules:
+        from web_interface import log_to_web
+        log_to_web(message, "info")
+
 def start_whisper_french_listening(recognizer, microphone, command_processor):
     """Démarre l'écoute continue avec Whisper French"""
     global active_threads, whisper_french_model, whisper_french_running, whisper_french_thread
     
     print("Démarrage de l'écoute Whisper French...")
     
-    # S'assurer que tous les autres threads sont arrêtés
+    # S'assurer que tous les autres threads sont arrêtés (attend leur fin)
     arreter_threads_reconnaissance()
     
-    # Attendre un court instant pour s'assurer que tous les threads sont arrêtés
-    time.sleep(0.5)
+    # Décodage dans un processus séparé si le mode est activé
+    serveur = _serveur_inference("whisper_french")
     
     # Vérifier si le modèle Whisper French est chargé
-    if whisper_french_model is None:
+    if serveur is None and whisper_french_model is None:
         print("Erreur: Le modèle Whisper French n'est pas chargé, tentative de chargement...")
-        if not setup_whisper_french_model():
+        if not charger_modele_stt("whisper_french"):
             error_msg = "Échec du chargement du modèle Whisper French, utilisation de SpeechRecognition comme solution de repli"
             print(error_msg)
             if 'web_interface' in sys.modules:
@@ -2564,6 +2997,9 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
         whisper_french_running = False
         whisper_french_thread.join(timeout=1.0)
     
+    # Le modèle du moteur actif reste résident (protégé de l'éviction)
+    _enregistrer_modeles_stt().set_active("whisper_french")
+    
     # Variable pour contrôler l'exécution du thread
     whisper_french_running = True
     
@@ -2574,29 +3010,38 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
             microphone.stream.close()
         
         # Créer un nouveau microphone avec le taux d'échantillonnage approprié
-        new_microphone = sr.Microphone(sample_rate=WHISPER_FRENCH_SAMPLE_RATE)
+        new_microphone = _microphone_moteur(WHISPER_FRENCH_SAMPLE_RATE, "whisper_french")
     except Exception as e:
         print(f"Erreur lors de la création d'un nouveau microphone: {e}")
         new_microphone = microphone  # Utiliser l'ancien microphone en cas d'erreur
     
+    # Pipeline capture / inférence / commandes
+    pipeline = AudioPipeline("whisper_french")
+    
     # Thread de traitement audio en continu avec Whisper French
     def whisper_french_processing_thread():
         print("Thread de traitement audio Whisper French démarré")
+        modele = RemoteWhisperModel(serveur) if serveur is not None else whisper_french_model
         
         # Ouvrir le flux audio avec le nouveau microphone
         with new_microphone as source:
             try:
                 # Ajuster pour le bruit ambiant
                 print("Calibrage du microphone pour Whisper French...")
-                recognizer.adjust_for_ambient_noise(source, duration=1)
+                calibrer_microphone(recognizer, source, duration=1)
                 
                 # Créer un stream audio
                 audio_stream = source.stream
                 
+                # La capture tourne dans son propre thread pour que le flux soit
+                # lu en continu pendant le décodage et l'exécution des commandes
+                pipeline.start(audio_stream.read, WHISPER_FRENCH_CHUNK_SIZE)
+                
                 # Variables pour le traitement en continu
-                audio_buffer = []
-                silence_counter = 0
-                is_speaking = False
+                # Tampon préalloué réutilisé d'un énoncé à l'autre
+                audio_buffer = AudioRingBuffer(int(WHISPER_FRENCH_DICTATION_MAX_DURATION * 2 * WHISPER_FRENCH_SAMPLE_RATE))
+                vad = create_voice_activity_detector(stt_settings, WHISPER_FRENCH_SAMPLE_RATE, name="whisper_french")
+                dsp = creer_chaine_dsp(WHISPER_FRENCH_SAMPLE_RATE, WHISPER_FRENCH_CHUNK_SIZE, "whisper_french")
                 
                 while whisper_french_running and get_running():
                     # Vérifier si le moteur STT actuel est toujours Whisper French
@@ -2605,53 +3050,49 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                         break
                         
                     try:
-                        # Lire un chunk audio
-                        audio_chunk = audio_stream.read(WHISPER_FRENCH_CHUNK_SIZE)
-                        
-                        # Convertir en numpy array pour analyse d'énergie
-                        audio_data = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32)
-                        
-                        # Calculer l'énergie du signal
-                        energy = np.sqrt(np.mean(audio_data**2)) / 32768.0
+                        # Récupérer le prochain chunk capturé
+                        audio_chunk = pipeline.read_frame(timeout=0.1)
+                        if audio_chunk is None:
+                            continue
+                        if dsp is not None:
+                            audio_chunk = dsp.process(audio_chunk)
                         
                         # Détecter si l'utilisateur parle
-                        if energy > stt_settings["whisper_ct2_silence_threshold"]:  # Réutiliser le même paramètre que CT2
-                            if not is_speaking:
-                                print(f"Parole détectée (Whisper French) - Énergie: {energy:.6f}")
-                            silence_counter = 0
-                            is_speaking = True
-                        else:
-                            silence_counter += 1
+                        vad.process(audio_chunk, stt_settings["whisper_ct2_silence_threshold"])  # Réutiliser le même paramètre que CT2
+                        if vad.speech_started:
+                            print(f"Parole détectée (Whisper French) - Énergie: {vad.last_energy:.6f}")
+                            # Reprendre les chunks qui précèdent la détection pour ne pas couper l'attaque
+                            for preroll_chunk in vad.drain_preroll():
+                                audio_buffer.append(preroll_chunk)
                         
                         # Si l'utilisateur parle ou vient de parler, ajouter à la mémoire tampon
-                        if is_speaking:
+                        if vad.is_speaking:
                             audio_buffer.append(audio_chunk)
                         
                         # Si suffisamment de silence après la parole, traiter l'audio accumulé
-                        if is_speaking and silence_counter >= stt_settings["whisper_ct2_silence_chunks"]:
+                        if vad.end_of_speech(stt_settings["whisper_ct2_silence_chunks"]):
                             # Vérifier si l'enregistrement est assez long pour être significatif
-                            audio_duration = len(audio_buffer) * WHISPER_FRENCH_CHUNK_SIZE / WHISPER_FRENCH_SAMPLE_RATE
+                            audio_duration = audio_buffer.duration(WHISPER_FRENCH_SAMPLE_RATE)
                                 
                             # Vérifier si l'audio est trop court
-                            if len(audio_buffer) < WHISPER_FRENCH_MIN_SPEAKING_CHUNKS or audio_duration < WHISPER_FRENCH_MIN_AUDIO_DURATION:
+                            if audio_buffer.num_chunks < WHISPER_FRENCH_MIN_SPEAKING_CHUNKS or audio_duration < WHISPER_FRENCH_MIN_AUDIO_DURATION:
                                 print(f"Audio trop court ({audio_duration:.2f}s), minimum requis: {WHISPER_FRENCH_MIN_AUDIO_DURATION}s - Ignoré")
                                 # Réinitialiser
-                                audio_buffer = []
-                                is_speaking = False
-                                silence_counter = 0
+                                audio_buffer.reset()
+                                vad.reset()
                                 continue
                                 
                             # En mode dictée, on peut avoir des pauses plus longues
-                            if get_dictation_mode() and silence_counter < WHISPER_FRENCH_SILENCE_CHUNKS * 2:
+                            if get_dictation_mode() and vad.silence_counter < WHISPER_FRENCH_SILENCE_CHUNKS * 2:
                                 # Si l'audio n'est pas encore très long, attendre plus longtemps
                                 if audio_duration < 10.0:
                                     print(f"Possible pause en dictée (durée actuelle: {audio_duration:.2f}s), attente prolongée")
-                                    silence_counter = max(0, silence_counter - 2)
+                                    vad.extend_silence(2)
                                     continue
                             # Pour les commandes normales, on peut être plus agressif sur la détection de fin
                             elif not get_dictation_mode() and audio_duration > 1.5:
                                 # Si on a déjà enregistré plus de 1.5s, terminer plus rapidement
-                                if silence_counter >= WHISPER_FRENCH_SILENCE_CHUNKS // 2:
+                                if vad.silence_counter >= WHISPER_FRENCH_SILENCE_CHUNKS // 2:
                                     print(f"Commande suffisamment longue ({audio_duration:.2f}s), fin anticipée")
                             
                             # Limiter la durée maximale de l'audio (différente selon le mode)
@@ -2666,26 +3107,28 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                                 if chunks_to_keep > 20 and get_dictation_mode():
                                     start_chunks = int(chunks_to_keep * 0.7)
                                     end_chunks = chunks_to_keep - start_chunks
-                                    audio_buffer = audio_buffer[:start_chunks] + audio_buffer[-end_chunks:]
+                                    audio_buffer.keep_chunks(start_chunks, end_chunks)
                                 else:
                                     # Pour les commandes courtes, garder le début
-                                    audio_buffer = audio_buffer[:chunks_to_keep]
+                                    audio_buffer.keep_chunks(chunks_to_keep)
                                 
                                 audio_duration = max_duration
                             
-                            # Concaténer tous les chunks audio
-                            full_audio = b''.join(audio_buffer)
-                            
-                            # Vérifier si l'audio contient des données significatives
-                            audio_values = np.frombuffer(full_audio, dtype=np.int16).astype(np.float32)
-                            audio_energy = np.sqrt(np.mean(audio_values**2)) / 32768.0
+                            # Énergie de l'énoncé, tenue à jour au fil des ajouts
+                            audio_energy = audio_buffer.energy()
                             
                             if audio_energy < WHISPER_FRENCH_MIN_AUDIO_ENERGY:
                                 print(f"Audio trop silencieux, énergie: {audio_energy:.6f} - Ignoré")
                                 # Réinitialiser
-                                audio_buffer = []
-                                is_speaking = False
-                                silence_counter = 0
+                                audio_buffer.reset()
+                                vad.reset()
+                                continue
+                            
+                            # Hors dictée, seuls les énoncés admis par la porte d'activation sont décodés
+                            audio_enonce = filtrer_par_porte(audio_buffer.int16_view(), WHISPER_FRENCH_SAMPLE_RATE)
+                            if audio_enonce is None:
+                                audio_buffer.reset()
+                                vad.reset()
                                 continue
                             
                             print(f"Traitement audio Whisper French - Durée: {audio_duration:.2f}s, Énergie: {audio_energy:.6f}")
@@ -2693,14 +3136,15 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                             # Marquer le temps de début du traitement
                             process_start_time = time.time()
                             
-                            # Convertir les données audio en format approprié pour Whisper French
-                            audio_samples = np.frombuffer(full_audio, dtype=np.int16).astype(np.float32) / 32768.0
+                            # Vue float32 normalisée, sans copie supplémentaire (ni phrase d'activation)
+                            audio_samples = audio_buffer.float32_view()[-len(audio_enonce):]
                             
                             # Traiter avec Whisper French
                             try:
                                 # Transcription avec Whisper French
-                                segments, info = whisper_french_model.transcribe(
-                                    audio_samples, 
+                                texte = _transcrire_texte(
+                                    modele, audio_samples, "whisper_french", WHISPER_FRENCH_SAMPLE_RATE,
+                                    not get_dictation_mode(),
                                     language="fr",
                                     beam_size=5,
                                     word_timestamps=False,
@@ -2712,9 +3156,6 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                                                   ("Dictée de texte." if get_dictation_mode() else "Commandes vocales courtes.")
                                 )
                                 
-                                # Extraire le texte de tous les segments
-                                texte = " ".join([segment.text for segment in segments])
-                                
                                 # Nettoyer le texte
                                 try:
                                     from text_processing import nettoyer_commande
@@ -2729,7 +3170,7 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                                 process_latency = (process_end_time - process_start_time) * 1000  # en millisecondes
                                 
                                 # Enregistrer l'audio et le texte pour fine tuning
-                                save_audio_for_fine_tuning(full_audio, texte, "whisper_french", sample_rate=WHISPER_FRENCH_SAMPLE_RATE)
+                                save_audio_for_fine_tuning(audio_enonce, texte, "whisper_french", sample_rate=WHISPER_FRENCH_SAMPLE_RATE)
                                 
                                 # Traiter le texte reconnu
                                 if texte.strip():
@@ -2750,11 +3191,10 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                                         
                                         if texte_lower in phrases_arret:
                                             print(f"Commande de fin détectée: {texte}")
-                                            command_processor.process_command(texte)
+                                            pipeline.submit_command(command_processor.process_command, texte)
                                             # Réinitialiser
-                                            audio_buffer = []
-                                            is_speaking = False
-                                            silence_counter = 0
+                                            audio_buffer.reset()
+                                            vad.reset()
                                             continue
                                     
                                     # Affichage différent selon le mode
@@ -2763,9 +3203,8 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                                     else:
                                         print(f"Vous avez dit (Whisper French): {texte} (latence: {process_latency:.0f}ms, durée audio: {audio_duration:.2f}s)")
                                     
-                                    # Exécution de la commande via le processeur de commandes
-                                    resultat = command_processor.process_command(texte)
-                                    print(f"Résultat : {resultat}")
+                                    # Exécution de la commande par le worker de commandes
+                                    pipeline.submit_command(_executer_commande, command_processor, texte)
                                 else:
                                     # Mettre à jour les métriques en cas d'échec
                                     update_stt_metrics(
@@ -2784,9 +3223,8 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                                 print(f"Erreur lors du traitement audio Whisper French: {e}")
                             
                             # Réinitialiser
-                            audio_buffer = []
-                            is_speaking = False
-                            silence_counter = 0
+                            audio_buffer.reset()
+                            vad.reset()
                             
                     except Exception as e:
                         print(f"Erreur dans le thread Whisper French: {e}")
@@ -2794,6 +3232,9 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
                             break
             except Exception as e:
                 print(f"Erreur lors de l'initialisation du microphone Whisper French: {e}")
+            finally:
+                # Arrêter la capture avant de fermer le microphone
+                pipeline.stop(wait=True)
     
     # Démarrer le thread Whisper French
     whisper_french_thread = threading.Thread(
@@ -2810,6 +3251,7 @@ def start_whisper_french_listening(recognizer, microphone, command_processor):
     def stop_whisper_french_listening(wait_for_stop=False):
         global whisper_french_running
         whisper_french_running = False
+        pipeline.stop(wait=wait_for_stop)
         
         # Si wait_for_stop est True, attendre que le thread se termine
         if wait_for_stop and whisper_french_thread is not None and whisper_french_thread.is_alive():
@@ -2823,16 +3265,16 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
     
     print("Démarrage de l'écoute Whisper CT2...")
     
-    # S'assurer que tous les autres threads sont arrêtés
+    # S'assurer que tous les autres threads sont arrêtés (attend leur fin)
     arreter_threads_reconnaissance()
     
-    # Attendre un court instant pour s'assurer que tous les threads sont arrêtés
-    time.sleep(0.5)
+    # Décodage dans un processus séparé si le mode est activé
+    serveur = _serveur_inference("whisper_ct2")
     
     # Vérifier si le modèle Whisper CT2 est chargé
-    if whisper_ct2_model is None:
+    if serveur is None and whisper_ct2_model is None:
         print("Erreur: Le modèle Whisper CT2 n'est pas chargé, tentative de chargement...")
-        if not setup_whisper_ct2_model():
+        if not charger_modele_stt("whisper_ct2"):
             error_msg = "Échec du chargement du modèle Whisper CT2, utilisation de SpeechRecognition comme solution de repli"
             print(error_msg)
             if 'web_interface' in sys.modules:
@@ -2852,6 +3294,9 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
         whisper_ct2_running = False
         whisper_ct2_thread.join(timeout=1.0)
     
+    # Le modèle du moteur actif reste résident (protégé de l'éviction)
+    _enregistrer_modeles_stt().set_active("whisper_ct2")
+    
     # Variable pour contrôler l'exécution du thread
     whisper_ct2_running = True
     
@@ -2862,29 +3307,129 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
             microphone.stream.close()
         
         # Créer un nouveau microphone avec le taux d'échantillonnage approprié
-        new_microphone = sr.Microphone(sample_rate=WHISPER_CT2_SAMPLE_RATE)
+        new_microphone = _microphone_moteur(WHISPER_CT2_SAMPLE_RATE, "whisper_ct2")
     except Exception as e:
         print(f"Erreur lors de la création d'un nouveau microphone: {e}")
         new_microphone = microphone  # Utiliser l'ancien microphone en cas d'erreur
     
+    # Pipeline capture / inférence / commandes
+    pipeline = AudioPipeline("whisper_ct2")
+    
     # Thread de traitement audio en continu avec Whisper CT2
     def whisper_ct2_processing_thread():
         print("Thread de traitement audio Whisper CT2 démarré")
+        modele = RemoteWhisperModel(serveur) if serveur is not None else whisper_ct2_model
         
         # Ouvrir le flux audio avec le nouveau microphone
         with new_microphone as source:
+            # Lus par le bloc finally, même si le calibrage ou l'ouverture du flux échoue
+            long_dictation = None
+            batcher = None
+            speculation = None
             try:
                 # Ajuster pour le bruit ambiant
                 print("Calibrage du microphone pour Whisper CT2...")
-                recognizer.adjust_for_ambient_noise(source, duration=1)
+                calibrer_microphone(recognizer, source, duration=1)
                 
                 # Créer un stream audio
                 audio_stream = source.stream
                 
+                # La capture tourne dans son propre thread pour que le flux soit
+                # lu en continu pendant le décodage et l'exécution des commandes
+                pipeline.start(audio_stream.read, WHISPER_CT2_CHUNK_SIZE)
+                
                 # Variables pour le traitement en continu
-                audio_buffer = []
-                silence_counter = 0
-                is_speaking = False
+                # Tampon préalloué réutilisé d'un énoncé à l'autre
+                audio_buffer = AudioRingBuffer(int(WHISPER_CT2_DICTATION_MAX_DURATION * 2 * WHISPER_CT2_SAMPLE_RATE))
+                vad = create_voice_activity_detector(stt_settings, WHISPER_CT2_SAMPLE_RATE, name="whisper_ct2")
+                dsp = creer_chaine_dsp(WHISPER_CT2_SAMPLE_RATE, WHISPER_CT2_CHUNK_SIZE, "whisper_ct2")
+                
+                # Transcription partielle pendant la parole (optionnelle)
+                streaming = None
+                if stt_settings.get("whisper_ct2_streaming", False):
+                    def decoder_partiel(samples):
+                        # Décodage glouton, sans VAD interne : seule la vitesse compte ici
+                        segments, _ = modele.transcribe(
+                            samples,
+                            language=WHISPER_CT2_LANGUAGE,
+                            beam_size=1,
+                            word_timestamps=False,
+                            vad_filter=False,
+                            condition_on_previous_text=False,
+                            temperature=0.0,
+                            initial_prompt="Transcription en français. " +
+                                          ("Dictée de texte." if get_dictation_mode() else "Commandes vocales courtes.")
+                        )
+                        return " ".join(segment.text for segment in segments)
+                    
+                    streaming = StreamingTranscriber(
+                        decoder_partiel,
+                        sample_rate=WHISPER_CT2_SAMPLE_RATE,
+                        interval_ms=stt_settings["whisper_ct2_streaming_interval_ms"]
+                    )
+                    print("Transcription partielle Whisper CT2 activée")
+                
+                # Dictée longue : les segments sont transcrits en arrière-plan, découpés aux pauses
+                options_dictee = options_profil(
+                    "dictee", WHISPER_CT2_LANGUAGE, beam_size=stt_settings["whisper_ct2_dictation_beam_size"]
+                )
+                
+                def decoder_segment(samples):
+                    return _decoder_profil(modele, samples, "whisper_ct2", "dictee", **options_dictee)
+                
+                # Les segments qui s'accumulent pendant une dictée rapide sont décodés par lots
+                batcher = None
+                if stt_settings["whisper_ct2_batching"]:
+                    batcher = BatchedTranscriber(
+                        modele,
+                        max_batch=stt_settings["whisper_ct2_batch_size"],
+                        max_wait_ms=stt_settings["whisper_ct2_batch_wait_ms"],
+                        sample_rate=WHISPER_CT2_SAMPLE_RATE,
+                        name="whisper_ct2"
+                    )
+                
+                # Commandes décodées en parallèle par Vosk, exécutées sans attendre Whisper si Vosk est sûr
+                if stt_settings["whisper_ct2_speculative_vosk"]:
+                    speculation = SpeculativeRecognizer(
+                        _decodeur_vosk_speculatif(),
+                        min_confidence=stt_settings["whisper_ct2_speculative_min_confidence"]
+                    )
+                
+                def publier_segment(texte, samples, texte_brut, latency):
+                    from text_processing import nettoyer_commande
+                    texte = nettoyer_commande(texte)
+                    if not texte:
+                        return
+                    segment_duration = len(samples) / WHISPER_CT2_SAMPLE_RATE
+                    save_audio_for_fine_tuning(samples, nettoyer_commande(texte_brut), "whisper_ct2", sample_rate=WHISPER_CT2_SAMPLE_RATE)
+                    update_stt_metrics(
+                        engine="whisper_ct2",
+                        success=True,
+                        latency=latency,
+                        audio_duration=segment_duration,
+                        text=texte
+                    )
+                    print(f"Dictée (Whisper CT2, segment de {segment_duration:.1f}s): {texte}")
+                    pipeline.submit_command(_executer_commande, command_processor, texte)
+                
+                long_dictation = LongDictationChunker(
+                    decoder_segment, publier_segment, name="whisper_ct2_dictation",
+                    submit_func=(lambda samples: batcher.submit(samples, **options_dictee)) if batcher is not None else None
+                )
+                segment_chunks = int(stt_settings["whisper_ct2_dictation_segment_s"] * WHISPER_CT2_SAMPLE_RATE / WHISPER_CT2_CHUNK_SIZE)
+                overlap_chunks = max(1, int(stt_settings["whisper_ct2_dictation_overlap_s"] * WHISPER_CT2_SAMPLE_RATE / WHISPER_CT2_CHUNK_SIZE))
+                max_dictation_chunks = int(WHISPER_CT2_DICTATION_MAX_DURATION * WHISPER_CT2_SAMPLE_RATE / WHISPER_CT2_CHUNK_SIZE)
+                
+                def reinitialiser():
+                    """Prépare l'écoute de l'énoncé suivant"""
+                    audio_buffer.reset()
+                    vad.reset()
+                    if streaming is not None:
+                        streaming.reset()
+                    # Les segments en cours doivent être livrés avant l'énoncé suivant
+                    if long_dictation.active:
+                        long_dictation.wait()
+                        long_dictation.reset()
                 
                 while whisper_ct2_running and get_running():
                     # Vérifier si le moteur STT actuel est toujours Whisper CT2
@@ -2893,55 +3438,80 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                         break
                         
                     try:
-                        # Lire un chunk audio
-                        audio_chunk = audio_stream.read(WHISPER_CT2_CHUNK_SIZE)
-                        
-                        # Convertir en numpy array pour analyse d'énergie
-                        audio_data = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32)
-                        
-                        # Calculer l'énergie du signal
-                        energy = np.sqrt(np.mean(audio_data**2)) / 32768.0
+                        # Récupérer le prochain chunk capturé
+                        audio_chunk = pipeline.read_frame(timeout=0.1)
+                        if audio_chunk is None:
+                            continue
+                        if dsp is not None:
+                            audio_chunk = dsp.process(audio_chunk)
                         
                         # Détecter si l'utilisateur parle
-                        if energy > stt_settings["whisper_ct2_silence_threshold"]:
-                            if not is_speaking:
-                                print(f"Parole détectée (Whisper CT2) - Énergie: {energy:.6f}")
-                            silence_counter = 0
-                            is_speaking = True
-                        else:
-                            silence_counter += 1
+                        vad.process(audio_chunk, stt_settings["whisper_ct2_silence_threshold"])
+                        if vad.speech_started:
+                            print(f"Parole détectée (Whisper CT2) - Énergie: {vad.last_energy:.6f}")
+                            # Reprendre les chunks qui précèdent la détection pour ne pas couper l'attaque
+                            for preroll_chunk in vad.drain_preroll():
+                                audio_buffer.append(preroll_chunk)
                         
                         # Si l'utilisateur parle ou vient de parler, ajouter à la mémoire tampon
-                        if is_speaking:
+                        if vad.is_speaking:
                             audio_buffer.append(audio_chunk)
+                            
+                            # Redécoder la fenêtre en cours et publier le texte partiel
+                            if streaming is not None:
+                                update = streaming.maybe_update(audio_buffer.float32_view())
+                                if update is not None:
+                                    _publier_transcription_partielle("Whisper CT2", update)
+                                    
+                                    # Déclencher la commande dès que tout le texte est validé et forme une commande complète
+                                    if (stt_settings["whisper_ct2_early_commands"] and streaming.fired_text is None
+                                            and not get_dictation_mode() and update.committed and not update.tentative
+                                            and hasattr(command_processor, "est_commande_complete")
+                                            and command_processor.est_commande_complete(update.committed)):
+                                        from text_processing import nettoyer_commande
+                                        streaming.fired_text = nettoyer_commande(update.committed)
+                                        streaming.early_commands += 1
+                                        print(f"Commande anticipée (Whisper CT2): {streaming.fired_text}")
+                                        pipeline.submit_command(_executer_commande, command_processor, streaming.fired_text)
+                            
+                            # Dictée longue : envoyer un segment à la première pause, ou au point le plus calme à la durée maximale
+                            if get_dictation_mode() and audio_buffer.num_chunks >= segment_chunks:
+                                cut = 0
+                                if vad.silence_counter > 0:
+                                    cut = audio_buffer.num_chunks
+                                elif audio_buffer.num_chunks >= max_dictation_chunks:
+                                    cut = audio_buffer.quietest_chunk(overlap_chunks * 3) + 1
+                                if cut > overlap_chunks:
+                                    print(f"Dictée longue: segment de {cut * WHISPER_CT2_CHUNK_SIZE / WHISPER_CT2_SAMPLE_RATE:.1f}s envoyé à la transcription")
+                                    long_dictation.submit(audio_buffer.pop_head(cut, overlap_chunks))
+                                    if streaming is not None:
+                                        streaming.reset()
                         
                         # Si suffisamment de silence après la parole, traiter l'audio accumulé
-                        if is_speaking and silence_counter >= stt_settings["whisper_ct2_silence_chunks"]:
+                        if vad.end_of_speech(stt_settings["whisper_ct2_silence_chunks"]):
                             # Vérifier si l'enregistrement est assez long pour être significatif
-                            audio_duration = len(audio_buffer) * WHISPER_CT2_CHUNK_SIZE / WHISPER_CT2_SAMPLE_RATE
+                            audio_duration = audio_buffer.duration(WHISPER_CT2_SAMPLE_RATE)
                                 
                             # Vérifier si l'audio est trop court
-                            if len(audio_buffer) < WHISPER_CT2_MIN_SPEAKING_CHUNKS or audio_duration < WHISPER_CT2_MIN_AUDIO_DURATION:
+                            if audio_buffer.num_chunks < WHISPER_CT2_MIN_SPEAKING_CHUNKS or audio_duration < WHISPER_CT2_MIN_AUDIO_DURATION:
                                 print(f"Audio trop court ({audio_duration:.2f}s), minimum requis: {WHISPER_CT2_MIN_AUDIO_DURATION}s - Ignoré")
                                 # Réinitialiser
-                                audio_buffer = []
-                                is_speaking = False
-                                silence_counter = 0
+                                reinitialiser()
                                 continue
                                 
                             # En mode dictée, on peut avoir des pauses plus longues
-                            if get_dictation_mode() and silence_counter < WHISPER_CT2_SILENCE_CHUNKS * 2:
+                            if get_dictation_mode() and vad.silence_counter < WHISPER_CT2_SILENCE_CHUNKS * 2:
                                 # Vérifier si l'utilisateur fait juste une pause dans sa dictée
                                 # Si l'audio n'est pas encore très long, attendre plus longtemps
                                 if audio_duration < 10.0:  # Pour les dictées courtes, attendre plus de silence
                                     print(f"Possible pause en dictée (durée actuelle: {audio_duration:.2f}s), attente prolongée")
-                                    silence_counter = max(0, silence_counter - 2)  # Réduire le compteur de silence
+                                    vad.extend_silence(2)  # Réduire le compteur de silence
                                     continue
                             # Pour les commandes normales, on peut être plus agressif sur la détection de fin
                             elif not get_dictation_mode() and audio_duration > 1.5:
                                 # Si on a déjà enregistré plus de 1.5s, on peut considérer que c'est suffisant
                                 # pour une commande courte et terminer plus rapidement
-                                if silence_counter >= WHISPER_CT2_SILENCE_CHUNKS // 2:
+                                if vad.silence_counter >= WHISPER_CT2_SILENCE_CHUNKS // 2:
                                     print(f"Commande suffisamment longue ({audio_duration:.2f}s), fin anticipée")
                                     # On ne réduit pas le compteur, on continue pour traiter l'audio
                             
@@ -2949,52 +3519,35 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                             # Analyser les derniers chunks pour voir s'ils contiennent encore de la parole
                             # Seulement pour le mode dictée ou les audios courts
                             if get_dictation_mode() or audio_duration < 1.0:
-                                last_chunks = audio_buffer[-min(WHISPER_CT2_SILENCE_CHUNKS, len(audio_buffer)):]
-                                last_chunks_energy = 0
-                                if last_chunks:
-                                    last_audio = b''.join(last_chunks)
-                                    last_values = np.frombuffer(last_audio, dtype=np.int16).astype(np.float32)
-                                    last_chunks_energy = np.sqrt(np.mean(last_values**2)) / 32768.0
+                                last_chunks_energy = audio_buffer.tail_energy(WHISPER_CT2_SILENCE_CHUNKS)
                                 
                                 # Si les derniers chunks contiennent encore de la parole significative, attendre plus longtemps
                                 if last_chunks_energy > WHISPER_CT2_SILENCE_THRESHOLD * 1.5:
                                     print(f"Parole encore détectée à la fin (énergie: {last_chunks_energy:.6f}), attente prolongée")
-                                    silence_counter = max(0, silence_counter - 2)  # Réduire le compteur de silence
+                                    vad.extend_silence(2)  # Réduire le compteur de silence
                                     continue
                             
-                            # Limiter la durée maximale de l'audio (différente selon le mode)
-                            max_duration = WHISPER_CT2_DICTATION_MAX_DURATION if get_dictation_mode() else WHISPER_CT2_MAX_AUDIO_DURATION
+                            # Limiter la durée maximale des commandes (les dictées longues sont découpées en segments)
+                            if not get_dictation_mode() and audio_duration > WHISPER_CT2_MAX_AUDIO_DURATION:
+                                print(f"Audio trop long ({audio_duration:.2f}s), tronqué à {WHISPER_CT2_MAX_AUDIO_DURATION}s")
+                                # Pour les commandes courtes, garder le début qui contient généralement la commande
+                                chunks_to_keep = int(WHISPER_CT2_MAX_AUDIO_DURATION * WHISPER_CT2_SAMPLE_RATE / WHISPER_CT2_CHUNK_SIZE)
+                                audio_buffer.keep_chunks(chunks_to_keep)
+                                audio_duration = WHISPER_CT2_MAX_AUDIO_DURATION
                             
-                            if audio_duration > max_duration:
-                                print(f"Audio trop long ({audio_duration:.2f}s), tronqué à {max_duration}s")
-                                # Calculer combien de chunks garder
-                                chunks_to_keep = int(max_duration * WHISPER_CT2_SAMPLE_RATE / WHISPER_CT2_CHUNK_SIZE)
-                                
-                                # Conserver le début et la fin de l'audio, qui sont généralement les plus importants
-                                # Garder 70% du début et 30% de la fin pour les commandes longues
-                                if chunks_to_keep > 20 and get_dictation_mode():  # Seulement pour les dictées longues
-                                    start_chunks = int(chunks_to_keep * 0.7)
-                                    end_chunks = chunks_to_keep - start_chunks
-                                    audio_buffer = audio_buffer[:start_chunks] + audio_buffer[-end_chunks:]
-                                else:
-                                    # Pour les commandes courtes, garder le début qui contient généralement la commande
-                                    audio_buffer = audio_buffer[:chunks_to_keep]
-                                
-                                audio_duration = max_duration
-                            
-                            # Concaténer tous les chunks audio
-                            full_audio = b''.join(audio_buffer)
-                            
-                            # Vérifier si l'audio contient des données significatives
-                            audio_values = np.frombuffer(full_audio, dtype=np.int16).astype(np.float32)
-                            audio_energy = np.sqrt(np.mean(audio_values**2)) / 32768.0
+                            # Énergie de l'énoncé, tenue à jour au fil des ajouts
+                            audio_energy = audio_buffer.energy()
                             
                             if audio_energy < WHISPER_CT2_MIN_AUDIO_ENERGY:
                                 print(f"Audio trop silencieux, énergie: {audio_energy:.6f} - Ignoré")
                                 # Réinitialiser
-                                audio_buffer = []
-                                is_speaking = False
-                                silence_counter = 0
+                                reinitialiser()
+                                continue
+                            
+                            # Hors dictée, seuls les énoncés admis par la porte d'activation sont décodés
+                            audio_enonce = filtrer_par_porte(audio_buffer.int16_view(), WHISPER_CT2_SAMPLE_RATE)
+                            if audio_enonce is None:
+                                reinitialiser()
                                 continue
                             
                             print(f"Traitement audio Whisper CT2 - Durée: {audio_duration:.2f}s, Énergie: {audio_energy:.6f}")
@@ -3002,27 +3555,39 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                             # Marquer le temps de début du traitement
                             process_start_time = time.time()
                             
-                            # Convertir les données audio en format approprié pour Whisper CT2
-                            audio_samples = np.frombuffer(full_audio, dtype=np.int16).astype(np.float32) / 32768.0
+                            # Vue float32 normalisée, sans copie supplémentaire (ni phrase d'activation)
+                            audio_samples = audio_buffer.float32_view()[-len(audio_enonce):]
                             
                             # Traiter avec Whisper CT2
                             try:
-                                # Transcription avec Whisper CT2
-                                segments, info = whisper_ct2_model.transcribe(
-                                    audio_samples, 
-                                    language=WHISPER_CT2_LANGUAGE,
-                                    beam_size=5,
-                                    word_timestamps=False,
-                                    vad_filter=True,
-                                    vad_parameters={"min_silence_duration_ms": 300},  # Réduit pour être plus réactif
-                                    condition_on_previous_text=True,  # Améliore la cohérence
-                                    temperature=0.0,  # Réduit la créativité pour plus de précision
-                                    initial_prompt="Transcription en français. " + 
-                                                  ("Dictée de texte." if get_dictation_mode() else "Commandes vocales courtes.")  # Adapte le prompt selon le mode
-                                )
+                                # La fin d'une dictée longue rejoint le lot des segments encore en attente
+                                if long_dictation.active and batcher is not None:
+                                    texte = batcher.transcrire(audio_samples, **options_dictee)
+                                else:
+                                    # Profil choisi selon le mode et la durée : glouton pour les commandes courtes
+                                    profil = choisir_profil(get_dictation_mode(), audio_duration,
+                                                            stt_settings["whisper_ct2_fast_command_max_s"])
+                                    options = options_dictee if profil == "dictee" else options_profil(profil, WHISPER_CT2_LANGUAGE)
+                                    
+                                    if speculation is not None and profil != "dictee":
+                                        # Le tampon est réutilisé dès le retour : Whisper décode une copie
+                                        samples = audio_samples.copy()
+                                        texte, _ = speculation.reconnaitre(
+                                            audio_enonce,
+                                            lambda: _transcrire_texte(modele, samples, "whisper_ct2", WHISPER_CT2_SAMPLE_RATE,
+                                                                      True, profil=profil, **options)
+                                        )
+                                    else:
+                                        # Transcription avec Whisper CT2
+                                        texte = _transcrire_texte(
+                                            modele, audio_samples, "whisper_ct2", WHISPER_CT2_SAMPLE_RATE,
+                                            not get_dictation_mode(), profil=profil, **options
+                                        )
                                 
-                                # Extraire le texte de tous les segments
-                                texte = " ".join([segment.text for segment in segments])
+                                # Recoller la fin d'une dictée longue au dernier segment transcrit
+                                if long_dictation.active:
+                                    long_dictation.wait()
+                                    texte = long_dictation.assembler(texte)
                                 
                                 # Nettoyer le texte (supprimer le point final et autres ponctuations qui peuvent perturber les commandes)
                                 try:
@@ -3038,7 +3603,7 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                                 process_latency = (process_end_time - process_start_time) * 1000  # en millisecondes
                                 
                                 # Enregistrer l'audio et le texte pour fine tuning
-                                save_audio_for_fine_tuning(full_audio, texte, "whisper_ct2", sample_rate=WHISPER_CT2_SAMPLE_RATE)
+                                save_audio_for_fine_tuning(audio_enonce, texte, "whisper_ct2", sample_rate=WHISPER_CT2_SAMPLE_RATE)
                                 
                                 # Traiter le texte reconnu
                                 if texte.strip():
@@ -3062,11 +3627,9 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                                         
                                         if texte_lower in phrases_arret:
                                             print(f"Commande de fin détectée: {texte}")
-                                            command_processor.process_command(texte)
+                                            pipeline.submit_command(command_processor.process_command, texte)
                                             # Réinitialiser
-                                            audio_buffer = []
-                                            is_speaking = False
-                                            silence_counter = 0
+                                            reinitialiser()
                                             continue
                                     
                                     # Affichage différent selon le mode
@@ -3075,9 +3638,15 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                                     else:
                                         print(f"Vous avez dit (Whisper CT2): {texte} (latence: {process_latency:.0f}ms, durée audio: {audio_duration:.2f}s)")
                                     
-                                    # Exécution de la commande via le processeur de commandes
-                                    resultat = command_processor.process_command(texte)
-                                    print(f"Résultat : {resultat}")
+                                    # Ne pas réexécuter une commande déjà lancée pendant la parole
+                                    if streaming is not None and streaming.fired_text:
+                                        if texte != streaming.fired_text:
+                                            print(f"Transcription finale différente de la commande anticipée ('{texte}' / '{streaming.fired_text}'), pas de nouvelle exécution")
+                                        texte = ""
+                                    
+                                    # Exécution de la commande par le worker de commandes
+                                    if texte:
+                                        pipeline.submit_command(_executer_commande, command_processor, texte)
                                 else:
                                     # Mettre à jour les métriques en cas d'échec
                                     update_stt_metrics(
@@ -3096,9 +3665,7 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                                 print(f"Erreur lors du traitement audio Whisper CT2: {e}")
                             
                             # Réinitialiser
-                            audio_buffer = []
-                            is_speaking = False
-                            silence_counter = 0
+                            reinitialiser()
                             
                     except Exception as e:
                         print(f"Erreur dans le thread Whisper CT2: {e}")
@@ -3106,6 +3673,15 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
                             break
             except Exception as e:
                 print(f"Erreur lors de l'initialisation du microphone Whisper CT2: {e}")
+            finally:
+                # Arrêter la capture avant de fermer le microphone
+                pipeline.stop(wait=True)
+                if long_dictation is not None:
+                    long_dictation.stop()
+                if batcher is not None:
+                    batcher.stop()
+                if speculation is not None:
+                    speculation.stop()
     
     # Démarrer le thread Whisper CT2
     whisper_ct2_thread = threading.Thread(
@@ -3122,6 +3698,7 @@ def start_whisper_ct2_listening(recognizer, microphone, command_processor):
     def stop_whisper_ct2_listening(wait_for_stop=False):
         global whisper_ct2_running
         whisper_ct2_running = False
+        pipeline.stop(wait=wait_for_stop)
         
         # Si wait_for_stop est True, attendre que le thread se termine
         if wait_for_stop and whisper_ct2_thread is not None and whisper_ct2_thread.is_alive():
@@ -3149,8 +3726,6 @@ def start_continuous_listening(recognizer, microphone, command_processor):
     print("Arrêt de tous les threads de reconnaissance vocale existants...")
     arreter_threads_reconnaissance()
     
-    # Attendre un court instant pour s'assurer que tous les threads sont arrêtés
-    time.sleep(1.0)  # Augmenter le délai d'attente pour s'assurer que tous les threads sont arrêtés
     print("Démarrage du nouveau moteur de reconnaissance vocale...")
     
     # Vérifier si nous sommes en mode dictée ou traduction
@@ -3455,6 +4030,94 @@ def normalize_text(text_input):
         
     return text_input
 
+def retranscrire_enregistrements(engine=None, split="train", limit=None):
+    """
+    Re-transcrit par lots les enregistrements du dossier records avec Whisper CT2
+    
+    Les fichiers ne sont pas modifiés : les nouveaux textes sont retournés pour
+    être relus puis appliqués (par exemple via /api/finetune/batch_update).
+    
+    Args:
+        engine: Sous-dossier du moteur d'origine (tous les moteurs si None)
+        split: Split à re-transcrire (train, validation, test)
+        limit: Nombre maximal de fichiers
+        
+    Returns:
+        list: Dictionnaires {"audio_path", "old_text", "new_text"}
+    """
+    records_dir = os.path.join(os.getcwd(), "records")
+    if not os.path.exists(records_dir):
+        print(f"Dossier records non trouvé: {records_dir}")
+        return []
+    
+    if not charger_modele_stt("whisper_ct2"):
+        print("Modèle Whisper CT2 indisponible, re-transcription impossible")
+        return []
+    serveur = _serveur_inference("whisper_ct2") if stt_settings.get("stt_inference_process") else None
+    modele = RemoteWhisperModel(serveur) if serveur is not None else whisper_ct2_model
+    
+    engines = [engine] if engine else sorted(os.listdir(records_dir))
+    chemins = []
+    for eng in engines:
+        split_dir = os.path.join(records_dir, eng, split)
+        if os.path.isdir(split_dir):
+            chemins.extend(os.path.join(split_dir, f) for f in sorted(os.listdir(split_dir)) if f.endswith(".wav"))
+    if limit:
+        chemins = chemins[:limit]
+    
+    # Tous les fichiers sont soumis d'un coup : le décodeur les regroupe en lots complets
+    batcher = BatchedTranscriber(
+        modele,
+        max_batch=stt_settings["whisper_ct2_batch_size"],
+        max_wait_ms=0,
+        sample_rate=WHISPER_CT2_SAMPLE_RATE,
+        name="whisper_ct2_records"
+    )
+    options = dict(
+        language=WHISPER_CT2_LANGUAGE,
+        beam_size=5,
+        word_timestamps=False,
+        vad_filter=True,
+        temperature=0.0,
+        initial_prompt="Transcription en français."
+    )
+    
+    resultats = []
+    futures = []
+    start_time = time.time()
+    try:
+        for chemin in chemins:
+            try:
+                with wave.open(chemin, 'rb') as wf:
+                    if wf.getframerate() != WHISPER_CT2_SAMPLE_RATE or wf.getsampwidth() != 2:
+                        print(f"Format non supporté, ignoré: {chemin}")
+                        continue
+                    samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+            except Exception as e:
+                print(f"Impossible de lire {chemin}: {e}")
+                continue
+            futures.append((chemin, batcher.submit(samples, **options)))
+        
+        for chemin, future in futures:
+            try:
+                nouveau = future.result().strip()
+            except Exception as e:
+                print(f"Erreur lors de la re-transcription de {chemin}: {e}")
+                continue
+            ancien = ""
+            text_path = os.path.splitext(chemin)[0] + ".txt"
+            if os.path.exists(text_path):
+                with open(text_path, 'r', encoding='utf-8') as f:
+                    ancien = f.read().strip()
+            resultats.append({"audio_path": chemin, "old_text": ancien, "new_text": nouveau})
+    finally:
+        batcher.stop()
+    
+    stats = batcher.get_stats()
+    print(f"Re-transcription de {len(resultats)} enregistrements en {time.time() - start_time:.1f}s "
+          f"(lots de {stats['avg_batch_size']:.1f} en moyenne)")
+    return resultats
+
 def generate_huggingface_dataset():
     """
     Génère un dataset compatible avec Hugging Face à partir des enregistrements existants
@@ -3701,8 +4364,14 @@ _command_processor = None
 _stop_listening_func = None
 
 
-def arreter_threads_reconnaissance():
-    """Arrête tous les threads de reconnaissance vocale"""
+def arreter_threads_reconnaissance(fermer_micro=False):
+    """
+    Arrête tous les threads de reconnaissance vocale
+    
+    Args:
+        fermer_micro: True à l'arrêt de l'écoute, pour fermer aussi le hub audio
+            (laissé ouvert lors d'un changement de moteur)
+    """
     global active_threads, audio_queue, vosk_running, vosk_thread, whisper_ct2_running, whisper_ct2_thread, whisper_french_running, whisper_french_thread, _stop_listening_func, _recognizer, _microphone
     
     # Arrêter la fonction d'écoute si elle existe
@@ -3722,6 +4391,9 @@ def arreter_threads_reconnaissance():
     # Arrêter Whisper French si actif
     whisper_french_running = False
     
+    # Arrêter les threads de capture et de commandes des pipelines audio
+    stop_all_pipelines()
+    
     # Arrêter Whisper si actif (en modifiant les variables de contrôle des threads Whisper)
     for t in threading.enumerate():
         if t.name == "whisper_processing_thread":
@@ -3747,7 +4419,20 @@ def arreter_threads_reconnaissance():
         except Exception:
             pass
     
-    # Vider la liste des threads sans attendre leur terminaison
+    # Libérer le périphérique partagé et arrêter le vumètre
+    if fermer_micro:
+        stop_all_hubs()
+    
+    # Attendre la fin des threads d'inférence : ils s'arrêtent à la trame suivante,
+    # ce qui évite un délai fixe avant de redémarrer un moteur
+    threads_a_attendre = [t for t in list(active_threads) + [vosk_thread, whisper_ct2_thread, whisper_french_thread]
+                          if isinstance(t, threading.Thread) and t is not threading.current_thread()]
+    deadline = time.time() + 1.0
+    for t in threads_a_attendre:
+        if t.is_alive():
+            t.join(timeout=max(0.0, deadline - time.time()))
+    
+    # Vider la liste des threads
     active_threads.clear()
     
     # Réinitialiser le thread Vosk
@@ -3768,11 +4453,15 @@ def start_whisper_listening(recognizer, microphone, command_processor):
             microphone.stream.close()
         
         # Créer un nouveau microphone avec le taux d'échantillonnage approprié
-        new_microphone = sr.Microphone(sample_rate=WHISPER_SAMPLE_RATE)
+        new_microphone = _microphone_moteur(WHISPER_SAMPLE_RATE, "whisper")
     except Exception as e:
         print(f"Erreur lors de la création d'un nouveau microphone: {e}")
         new_microphone = microphone  # Utiliser l'ancien microphone en cas d'erreur
     
+    # Précharger le moteur local qui couvre les réponses lentes de l'API
+    if stt_settings["whisper_api_hedging"]:
+        prechauffer_modele_stt(stt_settings["whisper_api_hedge_engine"])
+    
     # Thread de traitement audio en continu avec Whisper
     def whisper_processing_thread():
         print("Thread de traitement audio Whisper API démarré")
@@ -3782,7 +4471,7 @@ def start_whisper_listening(recognizer, microphone, command_processor):
             try:
                 # Ajuster pour le bruit ambiant
                 print("Calibrage du microphone pour Whisper...")
-                recognizer.adjust_for_ambient_noise(source, duration=1)
+                calibrer_microphone(recognizer, source, duration=1)
                 
                 # Créer un stream audio
                 audio_stream = source.stream
@@ -3791,6 +4480,7 @@ def start_whisper_listening(recognizer, microphone, command_processor):
                 audio_buffer = []
                 silence_counter = 0
                 is_speaking = False
+                dsp = creer_chaine_dsp(WHISPER_SAMPLE_RATE, WHISPER_CHUNK_SIZE, "whisper")
                 
                 # Stocker la référence à whisper_running dans une variable locale
                 # pour que les autres threads puissent la modifier
@@ -3804,6 +4494,8 @@ def start_whisper_listening(recognizer, microphone, command_processor):
                     try:
                         # Lire un chunk audio
                         audio_chunk = audio_stream.read(WHISPER_CHUNK_SIZE)
+                        if dsp is not None:
+                            audio_chunk = dsp.process(audio_chunk)
                         
                         # Convertir en tableau d'octets pour analyse
                         audio_data = sr.AudioData(
@@ -3868,10 +4560,18 @@ def start_whisper_listening(recognizer, microphone, command_processor):
                                 silence_counter = 0
                                 continue
                             
+                            # Hors dictée, seuls les énoncés admis par la porte d'activation sont envoyés à l'API
+                            full_audio = filtrer_par_porte(full_audio, WHISPER_SAMPLE_RATE)
+                            if full_audio is None:
+                                audio_buffer = []
+                                is_speaking = False
+                                silence_counter = 0
+                                continue
+                            
                             print(f"Traitement audio Whisper - Durée: {audio_duration:.2f}s, Énergie: {audio_energy:.6f}")
                             
                             # Vérifier d'abord si un résultat similaire existe dans le cache
-                            cached_result = whisper_cache.get(full_audio)
+                            cached_result = None if get_dictation_mode() else stt_cache.get(full_audio, "whisper", sample_rate=WHISPER_SAMPLE_RATE)
                             if cached_result:
                                 print("Résultat trouvé dans le cache, traitement évité")
                                 # Traiter directement le résultat mis en cache
@@ -3911,29 +4611,8 @@ def start_whisper_listening(recognizer, microphone, command_processor):
                                 print(f"Erreur lors du prétraitement audio: {e}")
                                 processed_audio = full_audio
                             
-                            # Créer un fichier WAV temporaire dans un répertoire accessible
-                            temp_dir = os.path.join(tempfile.gettempdir(), "whisp_audio")
-                            os.makedirs(temp_dir, exist_ok=True)
-                            temp_filename = os.path.join(temp_dir, f"whisp_audio_{int(time.time())}.wav")
-                            
-                            # Écrire les données audio dans le fichier WAV
-                            with wave.open(temp_filename, 'wb') as wf:
-                                wf.setnchannels(1)  # Mono
-                                wf.setsampwidth(2)  # 16 bits
-                                wf.setframerate(WHISPER_SAMPLE_RATE)
-                                wf.writeframes(processed_audio)
-                                
-                            print(f"Fichier audio temporaire créé: {temp_filename}")
-                            
-                            # Traiter avec Whisper API
-                            try:
-                                process_whisper_audio(temp_filename, command_processor)
-                            finally:
-                                # Supprimer le fichier temporaire
-                                try:
-                                    os.unlink(temp_filename)
-                                except:
-                                    pass
+                            # Traiter avec Whisper API (WAV encodé en mémoire, sans fichier temporaire)
+                            process_whisper_audio(processed_audio, command_processor, sample_rate=WHISPER_SAMPLE_RATE)
                             
                             # Réinitialiser
                             audio_buffer = []
@@ -3964,134 +4643,149 @@ def start_whisper_listening(recognizer, microphone, command_processor):
     
     return stop_whisper_listening
 
-def process_whisper_audio(audio_file_path, command_processor):
-    """Traite l'audio avec l'API Whisper d'OpenAI"""
+def _decodeur_local_secours():
+    """
+    Retourne une fonction de décodage local servant de secours à l'API Whisper
+    
+    Seuls les modèles déjà résidents (ou servis par un processus d'inférence)
+    sont utilisés, afin de ne jamais charger un modèle pendant une requête.
+    
+    Returns:
+        Callable (audio float32 -> texte) ou None
+    """
+    engine = stt_settings["whisper_api_hedge_engine"]
+    
+    if engine == "whisper_ct2":
+        serveur = _serveur_inference("whisper_ct2") if stt_settings.get("stt_inference_process") else None
+        modele = RemoteWhisperModel(serveur) if serveur is not None else whisper_ct2_model
+        if modele is None:
+            return None
+        
+        def decoder(samples):
+            segments, _ = modele.transcribe(
+                samples,
+                language=WHISPER_CT2_LANGUAGE,
+                beam_size=1,
+                vad_filter=False,
+                condition_on_previous_text=False,
+                temperature=0.0
+            )
+            return " ".join(segment.text for segment in segments).strip()
+        return decoder
+    
+    if engine == "vosk" and vosk_model is not None:
+        def decoder(samples):
+            recognizer = KaldiRecognizer(vosk_model, WHISPER_SAMPLE_RATE)
+            recognizer.AcceptWaveform((samples * 32768.0).astype(np.int16).tobytes())
+            return json.loads(recognizer.FinalResult()).get("text", "").strip()
+        return decoder
+    
+    return None
+
+
+def _decodeur_vosk_speculatif():
+    """
+    Retourne le décodeur Vosk des commandes utilisé par la reconnaissance spéculative
+    
+    Le modèle Vosk est préchargé en arrière-plan ; tant qu'il n'est pas résident,
+    les commandes sont décodées par Whisper CT2 seul.
+    
+    Returns:
+        Callable (audio int16 -> résultat Vosk avec la confiance des mots, ou None)
+    """
+    prechauffer_modele_stt("vosk")
+    
+    def decoder(audio_int16):
+        modele_vosk = vosk_model
+        if modele_vosk is None or KaldiRecognizer is None:
+            return None
+        if stt_settings["vosk_command_grammar"]:
+            recognizer = KaldiRecognizer(modele_vosk, WHISPER_CT2_SAMPLE_RATE, vosk_grammar.get())
+        else:
+            recognizer = KaldiRecognizer(modele_vosk, WHISPER_CT2_SAMPLE_RATE)
+        recognizer.SetWords(True)
+        recognizer.AcceptWaveform(np.asarray(audio_int16, dtype=np.int16).tobytes())
+        return json.loads(recognizer.FinalResult())
+    return decoder
+
+
+def process_whisper_audio(audio_data, command_processor, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Traite l'audio avec l'API Whisper d'OpenAI
+    
+    Args:
+        audio_data: Audio PCM int16 mono (bytes), envoyé depuis la mémoire
+        command_processor: Processeur de commandes
+        sample_rate: Taux d'échantillonnage de l'audio
+    """
     api_key = get_openai_api_key()
     if not api_key:
         print("Erreur: Clé API OpenAI non configurée")
         return
     
     start_time = time.time()
+    full_audio = audio_data
     
     # Obtenir la durée de l'audio et vérifier sa qualité (optimisé)
     try:
-        with wave.open(audio_file_path, 'rb') as wf:
-            frames = wf.getnframes()
-            rate = wf.getframerate()
-            audio_duration = frames / float(rate)
-            
-            # Vérification rapide de la durée
-            if audio_duration < WHISPER_MIN_AUDIO_DURATION:
-                print(f"Audio trop court: {audio_duration:.2f}s < {WHISPER_MIN_AUDIO_DURATION}s")
-                return
-            
-            # Lecture optimisée pour vérifier l'énergie
-            wf.setpos(0)
-            # Lire seulement un petit échantillon pour accélérer la vérification
-            sample_size = min(frames, int(rate * 0.2))  # Réduit à 0.2s
-            sample_frames = wf.readframes(sample_size)
-            audio_values = np.frombuffer(sample_frames, dtype=np.int16).astype(np.float32)
-            sample_energy = np.sqrt(np.mean(audio_values**2)) / 32768.0
-            
-            if sample_energy < WHISPER_MIN_AUDIO_ENERGY:
-                print(f"Énergie audio insuffisante: {sample_energy:.6f}")
-                return
+        audio_duration = len(full_audio) / 2 / float(sample_rate)
+        
+        # Vérification rapide de la durée
+        if audio_duration < WHISPER_MIN_AUDIO_DURATION:
+            print(f"Audio trop court: {audio_duration:.2f}s < {WHISPER_MIN_AUDIO_DURATION}s")
+            return
+        
+        # Vérifier seulement un petit échantillon pour accélérer la vérification
+        sample_size = min(len(full_audio) // 2, int(sample_rate * 0.2))  # Réduit à 0.2s
+        audio_values = np.frombuffer(full_audio[:sample_size * 2], dtype=np.int16).astype(np.float32)
+        sample_energy = np.sqrt(np.mean(audio_values**2)) / 32768.0
+        
+        if sample_energy < WHISPER_MIN_AUDIO_ENERGY:
+            print(f"Énergie audio insuffisante: {sample_energy:.6f}")
+            return
+        
+        # Vérifier le cache (commandes courtes uniquement, pas en dictée)
+        cached_result = None if get_dictation_mode() else stt_cache.get(full_audio, "whisper", sample_rate=sample_rate)
+        if cached_result:
+            print("Résultat trouvé dans le cache, utilisation directe")
+            end_time = time.time()
+            latency = (end_time - start_time) * 1000
             
-            # Lire tout le contenu du fichier pour le cache
-            wf.setpos(0)
-            full_audio = wf.readframes(frames)
+            # Mettre à jour les métriques
+            update_stt_metrics(
+                engine="whisper",
+                success=True,
+                latency=latency,
+                audio_duration=audio_duration,
+                text=cached_result
+            )
             
-            # Vérifier le cache
-            cached_result = whisper_cache.get(full_audio)
-            if cached_result:
-                print("Résultat trouvé dans le cache, utilisation directe")
-                # Simuler le temps de traitement pour les métriques
-                time.sleep(0.1)
-                end_time = time.time()
-                latency = (end_time - start_time) * 1000
-                
-                # Mettre à jour les métriques
-                update_stt_metrics(
-                    engine="whisper",
-                    success=True,
-                    latency=latency,
-                    audio_duration=audio_duration,
-                    text=cached_result
-                )
-                
-                print(f"Vous avez dit (Whisper/cache): {cached_result} (latence: {latency:.0f}ms)")
-                command_processor.process_command(cached_result)
-                return
+            print(f"Vous avez dit (Whisper/cache): {cached_result} (latence: {latency:.0f}ms)")
+            command_processor.process_command(cached_result)
+            return
             
     except Exception as e:
         print(f"Erreur lors de la lecture audio: {e}")
         return
     
-    # Fonction pour envoyer la requête API dans un thread séparé
-    def send_whisper_request():
-        try:
-            # Préparer les en-têtes avec la clé API
-            headers = {
-                "Authorization": f"Bearer {api_key}"
-            }
-            
-            # Vérifier que le fichier existe
-            if not os.path.exists(audio_file_path):
-                print(f"Erreur: Fichier audio {audio_file_path} introuvable")
-                return None
-                
-            # Vérifier la taille du fichier (rapide)
-            file_size = os.path.getsize(audio_file_path)
-            if file_size == 0:
-                print("Erreur: Fichier audio vide")
-                return None
-                
-            # Préparer les données pour la requête
-            with open(audio_file_path, "rb") as audio_file:
-                files = {
-                    "file": (os.path.basename(audio_file_path), audio_file, "audio/wav")
-                }
-                
-                data = {
-                    "model": WHISPER_MODEL,
-                    "language": "fr",
-                    "response_format": "json",
-                    "temperature": 0.0
-                }
-                
-                # Envoyer la requête avec un timeout réduit
-                print(f"Envoi requête API Whisper ({file_size} octets)")
-                response = requests.post(
-                    WHISPER_API_URL,
-                    headers=headers,
-                    files=files,
-                    data=data,
-                    timeout=15  # Timeout réduit
-                )
-                
-                return response
-        except Exception as e:
-            print(f"Erreur requête Whisper: {e}")
-            return None
-    
-    # Utiliser un thread séparé ou un pool d'exécuteurs pour la requête API
-    if WHISPER_PARALLEL_REQUESTS:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(send_whisper_request)
-            try:
-                response = future.result(timeout=20)
-            except concurrent.futures.TimeoutError:
-                print("Timeout lors de la requête Whisper API")
-                return
-    else:
-        response = send_whisper_request()
+    # Envoyer la requête via la session HTTP persistante, couverte par un décodage local si activé
+    client = get_whisper_api_client(WHISPER_API_URL, WHISPER_MODEL)
+    local_decode = _decodeur_local_secours() if stt_settings["whisper_api_hedging"] else None
+    print(f"Envoi requête API Whisper ({len(full_audio)} octets)" + (" avec décodage local de secours" if local_decode else ""))
+    response = client.transcribe_hedged(
+        full_audio,
+        sample_rate,
+        api_key,
+        local_decode=local_decode,
+        hedge_after_s=stt_settings["whisper_api_hedge_deadline_ms"] / 1000.0,
+        timeout=15
+    )
     
     # Traiter la réponse
     try:
         # Vérifier si la requête a réussi
-        if response and response.status_code == 200:
-            result = response.json()
-            texte = result.get("text", "").strip()
+        if response.success:
+            texte = response.text
             
             # Nettoyer le texte (supprimer le point final et autres ponctuations qui peuvent perturber les commandes)
             try:
@@ -4106,11 +4800,11 @@ def process_whisper_audio(audio_file_path, command_processor):
             end_time = time.time()
             latency = (end_time - start_time) * 1000  # en millisecondes
             
-            # Calculer le coût approximatif
+            # Calculer le coût approximatif (la requête API est facturée même si le décodage local l'emporte)
             cost = (audio_duration / 60.0) * WHISPER_COST_PER_MINUTE
             
             # Enregistrer l'audio et le texte pour fine tuning
-            save_audio_for_fine_tuning(audio_file_path, texte, "whisper")
+            save_audio_for_fine_tuning(full_audio, texte, "whisper", sample_rate=sample_rate)
             
             # Mettre à jour les métriques
             update_stt_metrics(
@@ -4132,7 +4826,8 @@ def process_whisper_audio(audio_file_path, command_processor):
                     return command_processor.process_command(texte)
             
             # Affichage optimisé
-            print(f"Vous avez dit (Whisper): {texte} (latence: {latency:.0f}ms, durée audio: {audio_duration:.2f}s, coût: ${cost:.6f})")
+            source = "" if response.source == "api" else f", source: {response.source}"
+            print(f"Vous avez dit (Whisper): {texte} (latence: {latency:.0f}ms, durée audio: {audio_duration:.2f}s, coût: ${cost:.6f}{source})")
             
             # Vérifications rapides
             if not texte or any(fragment in texte.lower() for fragment in ["transcris cet audio", "l'audio contient"]):
@@ -4181,9 +4876,8 @@ def process_whisper_audio(audio_file_path, command_processor):
                     return
             
             # Ajouter au cache pour les futures requêtes
-            with wave.open(audio_file_path, 'rb') as wf:
-                full_audio = wf.readframes(wf.getnframes())
-                whisper_cache.set(full_audio, texte)
+            if not get_dictation_mode():
+                stt_cache.set(full_audio, texte, "whisper", sample_rate=sample_rate)
             
             # Exécution de la commande
             resultat = command_processor.process_command(texte)
@@ -4196,33 +4890,25 @@ def process_whisper_audio(audio_file_path, command_processor):
                 audio_duration=audio_duration
             )
             
-            error_message = f"Erreur API Whisper: {response.status_code} - {response.text}" if response else "Pas de réponse de l'API Whisper"
+            error_message = f"Erreur API Whisper: {response.status_code} - {response.error}" if response.status_code else f"Pas de réponse de l'API Whisper ({response.error})"
             print(error_message)
             
             # Afficher plus de détails pour le débogage
             print(f"Détails de la requête: URL={WHISPER_API_URL}, Modèle={WHISPER_MODEL}, Durée audio={audio_duration:.2f}s")
             
             # Vérifier si c'est une erreur d'authentification
-            if response and response.status_code == 401:
+            if response.status_code == 401:
                 print("Erreur d'authentification - Vérifiez votre clé API OpenAI")
                 # Vérifier si la clé API est correctement formatée
                 api_key_prefix = api_key[:4] + "..." if len(api_key) > 4 else ""
                 print(f"Préfixe de la clé API: {api_key_prefix}")
                 print("La clé API doit commencer par 'sk-' et avoir une longueur d'environ 51 caractères")
-            elif response and response.status_code == 400:
+            elif response.status_code == 400:
                 print("Erreur de requête - Vérifiez le format de l'audio")
-                # Essayer de diagnostiquer le problème avec le fichier audio
-                try:
-                    with wave.open(audio_file_path, 'rb') as wf:
-                        print(f"Détails du fichier audio: canaux={wf.getnchannels()}, "
-                              f"largeur={wf.getsampwidth()}, "
-                              f"taux={wf.getframerate()}, "
-                              f"frames={wf.getnframes()}")
-                except Exception as e:
-                    print(f"Impossible d'analyser le fichier audio: {e}")
-            elif response and response.status_code == 429:
+                print(f"Détails de l'audio: canaux=1, largeur=2, taux={sample_rate}, frames={len(full_audio) // 2}")
+            elif response.status_code == 429:
                 print("Limite de requêtes atteinte - Attendez avant de réessayer")
-            elif response and response.status_code >= 500:
+            elif response.status_code and response.status_code >= 500:
                 print("Erreur serveur OpenAI - Réessayez plus tard")
     except Exception as e:
         # Mettre à jour les métriques en cas d'erreur
@@ -4239,16 +4925,16 @@ def start_vosk_listening(recognizer, microphone, command_processor):
     
     print("Démarrage de l'écoute Vosk...")
     
-    # S'assurer que tous les autres threads sont arrêtés
+    # S'assurer que tous les autres threads sont arrêtés (attend leur fin)
     arreter_threads_reconnaissance()
     
-    # Attendre un court instant pour s'assurer que tous les threads sont arrêtés
-    time.sleep(0.5)
+    # Décodage dans un processus séparé si le mode est activé
+    serveur = _serveur_inference("vosk")
     
     # Vérifier si le modèle Vosk est chargé
-    if vosk_model is None:
+    if serveur is None and vosk_model is None:
         print("Erreur: Le modèle Vosk n'est pas chargé, tentative de chargement...")
-        if not setup_vosk_model():
+        if not charger_modele_stt("vosk"):
             error_msg = "Échec du chargement du modèle Vosk, utilisation de SpeechRecognition comme solution de repli"
             print(error_msg)
             if 'web_interface' in sys.modules:
@@ -4268,12 +4954,15 @@ def start_vosk_listening(recognizer, microphone, command_processor):
         vosk_running = False
         vosk_thread.join(timeout=1.0)
     
+    # Le modèle du moteur actif reste résident (protégé de l'éviction)
+    _enregistrer_modeles_stt().set_active("vosk")
+    
     # Variable pour contrôler l'exécution du thread
     vosk_running = True
     
     # Créer un nouveau microphone pour éviter les problèmes de context manager
     # Essayer d'abord l'alternative sounddevice (pour Windows ARM64)
-    new_microphone = create_microphone_alternative(sample_rate=VOSK_SAMPLE_RATE)
+    new_microphone = _microphone_moteur(VOSK_SAMPLE_RATE, "vosk", lambda: create_microphone_alternative(sample_rate=VOSK_SAMPLE_RATE))
 
     if new_microphone is None:
         # Fallback sur PyAudio si sounddevice n'est pas disponible
@@ -4298,10 +4987,113 @@ def start_vosk_listening(recognizer, microphone, command_processor):
             log_to_web(error_msg, "error")
         return
     
+    # Pipeline capture / inférence / commandes
+    pipeline = AudioPipeline("vosk")
+    
     # Thread de traitement audio en continu avec Vosk
     def vosk_processing_thread():
         print("Thread de traitement audio Vosk démarré")
         
+        # Mode streaming : Kaldi décode pendant la parole et détecte lui-même la fin des énoncés
+        vosk_streaming = stt_settings["vosk_streaming"]
+        
+        # Grammaire de commandes hors dictée, décodage libre en dictée
+        etat_recognizer = {"cle": None}
+        
+        def cle_recognizer():
+            if get_dictation_mode() or not stt_settings["vosk_command_grammar"]:
+                return None
+            return vosk_grammar.version
+        
+        def creer_recognizer(libre=False, temporaire=False):
+            """
+            Crée un recognizer (grammaire de commandes, ou décodage libre si libre=True)
+            
+            Un recognizer temporaire (redécodage d'un énoncé) ne devient pas le
+            recognizer principal et doit être libéré par liberer_recognizer()
+            """
+            grammaire = None
+            if not libre:
+                cle = cle_recognizer()
+                if cle is not None:
+                    try:
+                        grammaire = vosk_grammar.get()
+                        cle = vosk_grammar.version
+                    except Exception as e:
+                        print(f"Vosk: grammaire de commandes indisponible, décodage libre: {e}")
+                        cle = None
+                if not temporaire:
+                    etat_recognizer["cle"] = cle
+            if serveur is not None:
+                rec = RemoteKaldiRecognizer(serveur, grammar=grammaire)
+                if not (libre or temporaire):
+                    # Le recognizer principal remplacé est libéré dans le processus d'inférence
+                    liberer_recognizer(etat_recognizer.get("principal"))
+                    etat_recognizer["principal"] = rec
+                return rec
+            if grammaire is not None:
+                rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE, grammaire)
+            else:
+                rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+            # Délais d'endpointing (versions récentes de Vosk uniquement)
+            if vosk_streaming and hasattr(rec, "SetEndpointerDelays"):
+                rec.SetEndpointerDelays(5.0, stt_settings["vosk_endpoint_silence_s"], VOSK_MAX_AUDIO_DURATION)
+            return rec
+        
+        def liberer_recognizer(rec):
+            """Libère un recognizer distant (sans effet sur un recognizer local)"""
+            if serveur is not None and rec is not None:
+                rec.close()
+        
+        def recognizer_obsolete():
+            """Le mode (dictée/commande) ou la grammaire ont changé depuis la création du recognizer"""
+            return etat_recognizer["cle"] != cle_recognizer()
+        
+        def texte_reconnu(result_json):
+            """Texte d'un résultat Vosk, redécodé librement s'il contient des mots hors grammaire"""
+            texte = json.loads(result_json).get("text", "").strip()
+            if etat_recognizer["cle"] is None:
+                return texte
+            if VOSK_UNK not in texte.split():
+                if texte:
+                    vosk_grammar.constrained += 1
+                return texte
+            # Hors grammaire (dictée implicite, paramètre libre) : décodage libre de l'énoncé
+            vosk_grammar.fallbacks += 1
+            recognizer_libre = creer_recognizer(libre=True, temporaire=True)
+            recognizer_libre.AcceptWaveform(audio_buffer.to_bytes())
+            texte = json.loads(recognizer_libre.FinalResult()).get("text", "").strip()
+            liberer_recognizer(recognizer_libre)
+            if serveur is not None:
+                # Recréer aussi le recognizer contraint, sans quoi un recognizer distant
+                # resté dans un état inattendu décoderait les énoncés suivants sans grammaire
+                etat_recognizer["cle"] = "redecodage"
+            print(f"Vosk: énoncé hors grammaire, décodage libre: '{texte}'")
+            return texte
+        
+        def enonce_admis(result_json):
+            """
+            Passe l'énoncé par la porte d'activation avant d'en lire le texte
+            
+            Returns:
+                Tuple (texte, audio int16 sans la phrase d'activation), ("", None) si l'énoncé est écarté
+            """
+            audio = audio_buffer.int16_view()
+            admis = filtrer_par_porte(audio, VOSK_SAMPLE_RATE)
+            if admis is None:
+                return "", None
+            if len(admis) == len(audio):
+                return texte_reconnu(result_json), admis
+            # La commande suit la phrase d'activation : seule la fin de l'énoncé est redécodée
+            recognizer_commande = creer_recognizer(temporaire=True)
+            recognizer_commande.AcceptWaveform(admis.tobytes())
+            mots = json.loads(recognizer_commande.FinalResult()).get("text", "").split()
+            liberer_recognizer(recognizer_commande)
+            if serveur is not None:
+                # Repartir d'un recognizer distant neuf pour l'énoncé suivant
+                etat_recognizer["cle"] = "redecodage"
+            return " ".join(mot for mot in mots if mot != VOSK_UNK), admis
+        
         # Ouvrir le flux audio avec le nouveau microphone
         with new_microphone as source:
             try:
@@ -4310,7 +5102,7 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                 try:
                     # Cette étape fonctionne seulement avec PyAudio/sr.Microphone
                     if hasattr(source, 'stream') and hasattr(source.stream, 'read'):
-                        recognizer.adjust_for_ambient_noise(source, duration=1)
+                        calibrer_microphone(recognizer, source, duration=1)
                     else:
                         print("Microphone alternatif détecté, saut du calibrage du bruit ambiant")
                 except Exception as e:
@@ -4330,7 +5122,7 @@ def start_vosk_listening(recognizer, microphone, command_processor):
 
                 # Créer un recognizer Vosk
                 try:
-                    vosk_rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+                    vosk_rec = creer_recognizer()
                     print("KaldiRecognizer créé avec succès")
                 except Exception as e:
                     error_msg = f"Erreur lors de la création du KaldiRecognizer: {e}"
@@ -4340,10 +5132,18 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                         log_to_web(error_msg, "error")
                     return
                 
+                # La capture tourne dans son propre thread pour que le flux soit
+                # lu en continu pendant le décodage et l'exécution des commandes
+                pipeline.start(audio_stream.read, VOSK_CHUNK_SIZE)
+                
                 # Variables pour le traitement en continu
-                audio_buffer = []
-                silence_counter = 0
-                is_speaking = False
+                # Tampon préalloué réutilisé d'un énoncé à l'autre
+                audio_buffer = AudioRingBuffer(int(VOSK_MAX_AUDIO_DURATION * 2 * VOSK_SAMPLE_RATE))
+                vad = create_voice_activity_detector(stt_settings, VOSK_SAMPLE_RATE, name="vosk")
+                dsp = creer_chaine_dsp(VOSK_SAMPLE_RATE, VOSK_CHUNK_SIZE, "vosk")
+                dernier_partiel = ""
+                if vosk_streaming:
+                    print("Vosk: mode streaming activé (résultats partiels et endpointing Kaldi)")
                 
                 while vosk_running and get_running():
                     # Vérifier si le moteur STT actuel est toujours Vosk
@@ -4352,8 +5152,12 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                         break
                         
                     try:
-                        # Lire un chunk audio
-                        audio_chunk = audio_stream.read(VOSK_CHUNK_SIZE)
+                        # Récupérer le prochain chunk capturé
+                        audio_chunk = pipeline.read_frame(timeout=0.1)
+                        if audio_chunk is None:
+                            continue
+                        if dsp is not None:
+                            audio_chunk = dsp.process(audio_chunk)
 
                         # Debug: montrer que la boucle continue (une fois par seconde environ)
                         if hasattr(start_vosk_listening, '_debug_counter'):
@@ -4401,49 +5205,86 @@ def start_vosk_listening(recognizer, microphone, command_processor):
 
                         # Debug: afficher l'énergie périodiquement (tous les 50 chunks)
                         if start_vosk_listening._debug_counter % 50 == 0:
-                            print(f"Vosk Debug: Énergie={energy:.6f}, Seuil={threshold:.6f}, Speaking={is_speaking}")
-
+                            print(f"Vosk Debug: Énergie={energy:.6f}, Seuil={threshold:.6f}, Speaking={vad.is_speaking}")
+
+                        # Mode streaming : chaque chunk est décodé à son arrivée, la fin de
+                        # l'énoncé est donnée par l'endpointing de Kaldi (AcceptWaveform -> True)
+                        if vosk_streaming:
+                            vad.process(audio_chunk, threshold)
+                            if audio_buffer.num_chunks == 0 and not vad.is_speaking and recognizer_obsolete():
+                                vosk_rec = creer_recognizer()
+                            if vad.speech_started:
+                                # Kaldi a déjà reçu ces chunks, ils ne vont qu'au tampon
+                                for preroll_chunk in vad.drain_preroll():
+                                    audio_buffer.append(preroll_chunk)
+                            # Le tampon ne sert qu'à la sauvegarde et au décodage libre de repli
+                            if vad.is_speaking or audio_buffer.num_chunks:
+                                audio_buffer.append(audio_chunk)
+                            
+                            if vosk_rec.AcceptWaveform(audio_chunk):
+                                texte, audio_enonce = enonce_admis(vosk_rec.Result())
+                                if texte:
+                                    audio_duration = len(audio_enonce) / VOSK_SAMPLE_RATE
+                                    save_audio_for_fine_tuning(audio_enonce, texte, "vosk", sample_rate=VOSK_SAMPLE_RATE)
+                                    print(f"Vosk (streaming): Traitement du texte final: '{texte}'")
+                                    pipeline.submit_command(process_vosk_result, texte, audio_duration, command_processor)
+                                audio_buffer.reset()
+                                vad.reset()
+                                dernier_partiel = ""
+                                if recognizer_obsolete():
+                                    vosk_rec = creer_recognizer()
+                            else:
+                                partiel = json.loads(vosk_rec.PartialResult()).get("partial", "").strip()
+                                if partiel and partiel != dernier_partiel:
+                                    dernier_partiel = partiel
+                                    _publier_transcription_partielle("Vosk", StreamingUpdate("", partiel, ""))
+                            continue
+                        
                         # Détecter si l'utilisateur parle
-                        if energy > threshold:
-                            if not is_speaking:
+                        if vad.process(audio_chunk, threshold):
+                            if vad.speech_started:
                                 print(f"Parole détectée (Vosk) - Énergie: {energy:.6f} > Seuil: {threshold:.6f}")
-                            silence_counter = 0
-                            is_speaking = True
-                        else:
-                            if is_speaking and start_vosk_listening._debug_counter % 50 == 0:
-                                print(f"Silence détecté - Énergie: {energy:.6f} <= Seuil: {threshold:.6f}")
-                            silence_counter += 1
+                                # Le mode dictée a pu changer pendant l'exécution de la dernière commande
+                                if recognizer_obsolete():
+                                    vosk_rec = creer_recognizer()
+                                # Reprendre les chunks qui précèdent la détection pour ne pas couper l'attaque
+                                for preroll_chunk in vad.drain_preroll():
+                                    audio_buffer.append(preroll_chunk)
+                                    vosk_rec.AcceptWaveform(preroll_chunk)
+                        elif vad.is_speaking and start_vosk_listening._debug_counter % 50 == 0:
+                            print(f"Silence détecté - Énergie: {energy:.6f} <= Seuil: {threshold:.6f}")
                         
                         # Si l'utilisateur parle ou vient de parler, ajouter à la mémoire tampon
-                        if is_speaking:
+                        if vad.is_speaking:
                             audio_buffer.append(audio_chunk)
                             
                             # Traiter le chunk avec Vosk en temps réel
                             if vosk_rec.AcceptWaveform(audio_chunk):
                                 # Récupérer le résultat partiel
-                                result_json = vosk_rec.Result()
-                                result = json.loads(result_json)
+                                texte, audio_enonce = enonce_admis(vosk_rec.Result())
                                 
-                                if "text" in result and result["text"].strip():
-                                    texte = result["text"].strip()
+                                if texte:
                                     
                                     # Calculer la durée audio
-                                    audio_duration = len(audio_buffer) * VOSK_CHUNK_SIZE / VOSK_SAMPLE_RATE
+                                    audio_duration = len(audio_enonce) / VOSK_SAMPLE_RATE
                                     
                                     # Traiter le texte reconnu
                                     print(f"Vosk: Traitement du texte reconnu: '{texte}'")
-                                    process_vosk_result(texte, audio_duration, command_processor)
+                                    pipeline.submit_command(process_vosk_result, texte, audio_duration, command_processor)
 
                                     # Réinitialiser pour continuer l'écoute
                                     print("Vosk: Réinitialisation pour continuer l'écoute...")
-                                    audio_buffer = []
-                                    is_speaking = False
-                                    silence_counter = 0
+                                    audio_buffer.reset()
+                                    vad.reset()
 
                                     # Tenter de réinitialiser et si nécessaire recréer le flux audio
                                     try:
-                                        # D'abord essayer Reset() du recognizer
-                                        if hasattr(vosk_rec, 'Reset'):
+                                        # Grammaire reconstruite ou mode changé : nouveau recognizer
+                                        if recognizer_obsolete():
+                                            vosk_rec = creer_recognizer()
+                                            print("Vosk: recognizer recréé (grammaire ou mode modifié)")
+                                        # Sinon essayer Reset() du recognizer
+                                        elif hasattr(vosk_rec, 'Reset'):
                                             vosk_rec.Reset()
                                             print("Vosk: Reset() effectué, test du flux audio...")
 
@@ -4452,40 +5293,37 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                                                 start_vosk_listening._debug_counter = 24
                                         else:
                                             print("Vosk: Reset() non disponible")
-                                            vosk_rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+                                            vosk_rec = creer_recognizer()
 
                                     except Exception as e:
                                         print(f"Vosk: Erreur lors de la réinitialisation: {e}")
                                         try:
-                                            vosk_rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+                                            vosk_rec = creer_recognizer()
                                             print("Vosk: Reconnaissance recréée en urgence")
                                         except Exception as e2:
                                             print(f"Vosk: Erreur critique: {e2}")
                                             break
                         
                         # Si suffisamment de silence après la parole, traiter l'audio accumulé
-                        if is_speaking and silence_counter >= stt_settings["vosk_silence_chunks"]:
+                        if vad.end_of_speech(stt_settings["vosk_silence_chunks"]):
                             # Vérifier si l'enregistrement est assez long pour être significatif
-                            audio_duration = len(audio_buffer) * VOSK_CHUNK_SIZE / VOSK_SAMPLE_RATE
+                            audio_duration = audio_buffer.duration(VOSK_SAMPLE_RATE)
                             
-                            if len(audio_buffer) < VOSK_MIN_SPEAKING_CHUNKS or audio_duration < VOSK_MIN_AUDIO_DURATION:
+                            if audio_buffer.num_chunks < VOSK_MIN_SPEAKING_CHUNKS or audio_duration < VOSK_MIN_AUDIO_DURATION:
                                 print(f"Audio trop court ({audio_duration:.2f}s), minimum requis: {VOSK_MIN_AUDIO_DURATION}s - Ignoré")
                                 # Réinitialiser
-                                audio_buffer = []
-                                is_speaking = False
-                                silence_counter = 0
-                                vosk_rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+                                audio_buffer.reset()
+                                vad.reset()
+                                vosk_rec = creer_recognizer()
                                 continue
                             
                             # Marquer le temps de début du traitement
                             process_start_time = time.time()
                             
-                            # Récupérer le résultat final
-                            result_json = vosk_rec.FinalResult()
-                            result = json.loads(result_json)
+                            # Récupérer le résultat final (hors dictée, seulement si la porte d'activation l'admet)
+                            texte, audio_enonce = enonce_admis(vosk_rec.FinalResult())
                             
-                            if "text" in result and result["text"].strip():
-                                texte = result["text"].strip()
+                            if texte:
                                 
                                 # Nettoyer le texte (supprimer le point final et autres ponctuations qui peuvent perturber les commandes)
                                 try:
@@ -4500,29 +5338,28 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                                 process_end_time = time.time()
                                 process_latency = (process_end_time - process_start_time) * 1000  # en millisecondes
                                 
-                                # Concaténer tous les chunks audio
-                                full_audio = b''.join(audio_buffer)
-                                
                                 # Enregistrer l'audio et le texte pour fine tuning
-                                save_audio_for_fine_tuning(full_audio, texte, "vosk", sample_rate=VOSK_SAMPLE_RATE)
+                                save_audio_for_fine_tuning(audio_enonce, texte, "vosk", sample_rate=VOSK_SAMPLE_RATE)
                                 
                                 # Traiter le texte reconnu avec la latence réelle
                                 print(f"Vosk: Traitement du texte final: '{texte}'")
-                                process_vosk_result(texte, audio_duration, command_processor)
+                                pipeline.submit_command(process_vosk_result, texte, audio_duration, command_processor)
 
                             # Réinitialiser pour continuer l'écoute
                             print("Vosk: Réinitialisation finale pour continuer l'écoute...")
-                            audio_buffer = []
-                            is_speaking = False
-                            silence_counter = 0
+                            audio_buffer.reset()
+                            vad.reset()
 
                             # Essayer de réinitialiser le recognizer
                             try:
-                                if hasattr(vosk_rec, 'Reset'):
+                                if recognizer_obsolete():
+                                    vosk_rec = creer_recognizer()
+                                    print("Vosk: recognizer recréé (grammaire ou mode modifié)")
+                                elif hasattr(vosk_rec, 'Reset'):
                                     vosk_rec.Reset()
                                     print("Vosk: Reset() final effectué...")
                                 else:
-                                    vosk_rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+                                    vosk_rec = creer_recognizer()
                                     print("Vosk: Nouveau recognizer final créé (fallback)...")
 
                                 # IMPORTANT: Réinitialiser le compteur debug pour voir les chunks juste après
@@ -4532,7 +5369,7 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                             except Exception as e:
                                 print(f"Vosk: Erreur lors de la réinitialisation finale: {e}")
                                 try:
-                                    vosk_rec = KaldiRecognizer(vosk_model, VOSK_SAMPLE_RATE)
+                                    vosk_rec = creer_recognizer()
                                     print("Vosk: Reconnaissance finale recréée en urgence")
                                 except Exception as e2:
                                     print(f"Vosk: Erreur critique finale: {e2}")
@@ -4544,6 +5381,9 @@ def start_vosk_listening(recognizer, microphone, command_processor):
                             break
             except Exception as e:
                 print(f"Erreur lors de l'initialisation du microphone Vosk: {e}")
+            finally:
+                # Arrêter la capture avant de fermer le microphone
+                pipeline.stop(wait=True)
     
     # Démarrer le thread Vosk
     vosk_thread = threading.Thread(
@@ -4560,6 +5400,7 @@ def start_vosk_listening(recognizer, microphone, command_processor):
     def stop_vosk_listening():
         global vosk_running
         vosk_running = False
+        pipeline.stop()
     
     return stop_vosk_listening
 
@@ -4705,8 +5546,6 @@ def redemarrer_reconnaissance_vocale(command_processor=None):
         )
         # Continuer malgré l'erreur
     
-    # Attendre un court instant pour s'assurer que tous les threads sont arrêtés
-    time.sleep(0.5)
     print("Préparation du redémarrage de la reconnaissance vocale...")
     
     # Créer un nouveau recognizer pour éviter les problèmes
@@ -4773,7 +5612,7 @@ def redemarrer_reconnaissance_vocale(command_processor=None):
         # Forcer le rechargement du modèle Vosk
         try:
             print("Préchargement du modèle Vosk avant redémarrage...")
-            if not setup_vosk_model():
+            if not charger_modele_stt("vosk"):
                 error_msg = "Échec du chargement du modèle Vosk, utilisation de SpeechRecognition comme solution de repli"
                 print(error_msg)
                 error_handler.handle_error(
@@ -4801,7 +5640,7 @@ def redemarrer_reconnaissance_vocale(command_processor=None):
         # Forcer le rechargement du modèle Whisper CT2
         try:
             print("Préchargement du modèle Whisper CT2 avant redémarrage...")
-            if not setup_whisper_ct2_model():
+            if not charger_modele_stt("whisper_ct2"):
                 error_msg = "Échec du chargement du modèle Whisper CT2, utilisation de SpeechRecognition comme solution de repli"
                 print(error_msg)
                 error_handler.handle_error(
@@ -4826,7 +5665,7 @@ def redemarrer_reconnaissance_vocale(command_processor=None):
         # Forcer le rechargement du modèle Whisper French
         try:
             print("Préchargement du modèle Whisper French avant redémarrage...")
-            if not setup_whisper_french_model():
+            if not charger_modele_stt("whisper_french"):
                 error_msg = "Échec du chargement du modèle Whisper French, utilisation de SpeechRecognition comme solution de repli"
                 print(error_msg)
                 error_handler.handle_error(
@@ -4872,14 +5711,14 @@ def redemarrer_reconnaissance_vocale(command_processor=None):
                 # S'assurer que le modèle est chargé avant de démarrer l'écoute
                 if whisper_ct2_model is None:
                     print("Chargement du modèle Whisper CT2 avant démarrage...")
-                    setup_whisper_ct2_model()
+                    charger_modele_stt("whisper_ct2")
                 _stop_listening_func = start_whisper_ct2_listening(new_recognizer, new_microphone, _command_processor)
             elif current_engine == "whisper_french" and WHISPER_CT2_AVAILABLE:
                 print("Démarrage direct de l'écoute avec Whisper French...")
                 # S'assurer que le modèle est chargé avant de démarrer l'écoute
                 if whisper_french_model is None:
                     print("Chargement du modèle Whisper French avant démarrage...")
-                    setup_whisper_french_model()
+                    charger_modele_stt("whisper_french")
                 _stop_listening_func = start_whisper_french_listening(new_recognizer, new_microphone, _command_processor)
             else:
                 print("Démarrage de l'écoute via start_continuous_listening...")
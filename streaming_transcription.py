@@ -0,0 +1,180 @@
+"""
+Transcription en continu (résultats partiels) pour Whisp Assistant
+Redécode une fenêtre croissante pendant que l'utilisateur parle et valide
+les préfixes stables selon une politique d'accord local (local agreement)
+"""
+import re
+import time
+import logging
+from collections import deque
+from typing import Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Ponctuation ignorée lors de la comparaison des mots entre hypothèses
+_PUNCTUATION_RE = re.compile(r"[^\w'’-]+", re.UNICODE)
+
+
+def _normaliser_mot(mot: str) -> str:
+    """Forme de comparaison d'un mot (minuscules, sans ponctuation)."""
+    return _PUNCTUATION_RE.sub("", mot.lower())
+
+
+class LocalAgreement:
+    """
+    Politique d'accord local entre hypothèses successives.
+
+    Un mot n'est validé que lorsqu'il apparaît à la même position dans les
+    n dernières hypothèses. Les mots validés ne sont plus jamais remis en
+    cause ; le reste de la dernière hypothèse est considéré comme provisoire.
+    """
+
+    def __init__(self, n: int = 2):
+        self.n = max(2, int(n))
+        self.reset()
+
+    def reset(self) -> None:
+        """Réinitialise l'état pour un nouvel énoncé."""
+        self.committed: List[str] = []
+        self._history = deque(maxlen=self.n)
+
+    def insert(self, words: List[str]) -> List[str]:
+        """
+        Ajoute une hypothèse complète (depuis le début de l'énoncé).
+
+        Args:
+            words: Mots de la nouvelle hypothèse
+
+        Returns:
+            Liste des mots nouvellement validés
+        """
+        # Retirer la partie déjà validée de l'hypothèse
+        hypothesis = list(words[len(self.committed):])
+        self._history.append(hypothesis)
+        if len(self._history) < self.n:
+            return []
+
+        newly_committed = []
+        for position in range(min(len(h) for h in self._history)):
+            candidates = {_normaliser_mot(h[position]) for h in self._history}
+            if len(candidates) != 1:
+                break
+            newly_committed.append(self._history[-1][position])
+
+        if newly_committed:
+            self.committed.extend(newly_committed)
+            count = len(newly_committed)
+            self._history = deque((h[count:] for h in self._history), maxlen=self.n)
+        return newly_committed
+
+    @property
+    def tentative(self) -> List[str]:
+        """Mots provisoires de la dernière hypothèse."""
+        return list(self._history[-1]) if self._history else []
+
+
+class StreamingUpdate:
+    """Résultat d'un redécodage partiel."""
+
+    def __init__(self, committed: str, tentative: str, newly_committed: str):
+        self.committed = committed
+        self.tentative = tentative
+        self.newly_committed = newly_committed
+
+    @property
+    def text(self) -> str:
+        """Texte complet affichable (validé + provisoire)."""
+        return f"{self.committed} {self.tentative}".strip()
+
+
+class StreamingTranscriber:
+    """
+    Redécode périodiquement l'audio accumulé pendant la parole.
+
+    Le déclenchement est basé sur la quantité d'audio reçue depuis le dernier
+    décodage (et non sur l'horloge), ce qui reste cohérent même si des
+    frames sont en attente dans le pipeline.
+    """
+
+    def __init__(self, decode_func: Callable[[np.ndarray], str], sample_rate: int = 16000,
+                 interval_ms: int = 500, min_audio_s: float = 0.5, max_window_s: float = 10.0,
+                 agreement_n: int = 2):
+        """
+        Args:
+            decode_func: Fonction de décodage rapide (audio float32 -> texte)
+            sample_rate: Taux d'échantillonnage de l'audio
+            interval_ms: Quantité d'audio nouvelle (ms) entre deux décodages
+            min_audio_s: Durée minimale avant le premier décodage
+            max_window_s: Au-delà de cette durée, les partiels sont suspendus
+            agreement_n: Nombre d'hypothèses devant concorder pour valider un mot
+        """
+        self.decode_func = decode_func
+        self.sample_rate = sample_rate
+        self.interval_samples = int(sample_rate * interval_ms / 1000)
+        self.min_samples = int(sample_rate * min_audio_s)
+        self.max_samples = int(sample_rate * max_window_s)
+        self.agreement = LocalAgreement(agreement_n)
+
+        self.decodes = 0
+        self.decode_time_ms = 0.0
+        self.early_commands = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Réinitialise l'état pour un nouvel énoncé."""
+        self.agreement.reset()
+        self._last_decoded_samples = 0
+        self._last_text = ""
+        self.fired_text: Optional[str] = None
+
+    @property
+    def committed_text(self) -> str:
+        """Texte validé jusqu'ici."""
+        return " ".join(self.agreement.committed)
+
+    def maybe_update(self, audio: np.ndarray) -> Optional[StreamingUpdate]:
+        """
+        Redécode l'audio si assez de nouvelles données sont disponibles.
+
+        Args:
+            audio: Audio float32 de l'énoncé en cours (depuis son début)
+
+        Returns:
+            StreamingUpdate si le texte affiché a changé, None sinon
+        """
+        n = len(audio)
+        if n < self.min_samples or n > self.max_samples:
+            return None
+        if n - self._last_decoded_samples < self.interval_samples:
+            return None
+        self._last_decoded_samples = n
+
+        start = time.time()
+        try:
+            text = self.decode_func(audio)
+        except Exception as e:
+            logger.warning(f"Erreur lors du décodage partiel: {e}")
+            return None
+        self.decodes += 1
+        self.decode_time_ms += (time.time() - start) * 1000
+
+        newly = self.agreement.insert(text.split())
+        update = StreamingUpdate(
+            committed=self.committed_text,
+            tentative=" ".join(self.agreement.tentative),
+            newly_committed=" ".join(newly),
+        )
+        if update.text == self._last_text:
+            return None
+        self._last_text = update.text
+        return update
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de la transcription continue."""
+        return {
+            "decodes": self.decodes,
+            "avg_decode_ms": self.decode_time_ms / self.decodes if self.decodes else 0.0,
+            "early_commands": self.early_commands,
+        }
@@ -8,7 +8,13 @@ import platform
 import subprocess
 import pyautogui
 from config import set_running
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=(
+    "heure", "date", "jour", "veille", "système", "capture d'écran", "bloc-notes", "notepad",
+    "éditeur de texte", "calc", "explorateur", "mes documents", "fichiers", "arrêt", "au revoir",
+    "ferme", "termin", "stop", "fin", "bye", "ciao", "à plus tard", "à bientôt", "à la prochaine",
+    "éteins", "éteindre", "désactiv", "quitt", "aide", "quelles sont les commandes"))
 def executer_commande_systeme(texte):
     """Exécute des commandes système en fonction du texte transcrit"""
     texte = texte.lower()
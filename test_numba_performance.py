@@ -117,6 +117,76 @@ def test_audio_optimization():
         traceback.print_exc()
         return False
 
+def test_resampling_benchmark():
+    """Compare le rééchantillonnage polyphase au noyau Numba par interpolation linéaire."""
+    print("\n" + "="*60)
+    print("🔁 BENCHMARK DU RÉÉCHANTILLONNAGE (POLYPHASE vs NUMBA)")
+    print("="*60)
+
+    try:
+        from audio_optimization import resample_audio_numba
+        from resampling import PolyphaseResampler
+
+        conversions = [(48000, 16000), (44100, 16000), (22050, 16000)]
+        duration = 5.0  # secondes
+        chunk_size = 1024
+        repeats = 5
+
+        for original_rate, target_rate in conversions:
+            n_samples = int(original_rate * duration)
+            t = np.arange(n_samples) / original_rate
+            # Parole simulée : 440 Hz + composante au-dessus de la nouvelle fréquence de Nyquist
+            audio_data = (0.5 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 9500 * t)).astype(np.float32)
+
+            print(f"\n🔍 Test: {original_rate}Hz -> {target_rate}Hz, {duration}s")
+
+            # Compilation JIT hors chronométrage
+            resample_audio_numba(audio_data[:chunk_size], original_rate, target_rate)
+
+            start_time = time.time()
+            for _ in range(repeats):
+                numba_out = resample_audio_numba(audio_data, original_rate, target_rate)
+            numba_time = (time.time() - start_time) / repeats
+            print(f"   ✅ Numba (signal entier): {numba_time:.4f}s")
+
+            start_time = time.time()
+            for _ in range(repeats):
+                poly_out = PolyphaseResampler(original_rate, target_rate).process(audio_data)
+            poly_time = (time.time() - start_time) / repeats
+            print(f"   ✅ Polyphase (signal entier): {poly_time:.4f}s")
+
+            start_time = time.time()
+            for _ in range(repeats):
+                resampler = PolyphaseResampler(original_rate, target_rate)
+                chunks = [resampler.process(audio_data[i:i + chunk_size])
+                          for i in range(0, n_samples, chunk_size)]
+            chunk_time = (time.time() - start_time) / repeats
+            chunked_out = np.concatenate(chunks)
+            print(f"   ✅ Polyphase (blocs de {chunk_size}): {chunk_time:.4f}s")
+
+            # Le traitement par blocs doit reproduire exactement le signal converti d'une traite
+            ecart = float(np.max(np.abs(chunked_out - poly_out)))
+            print(f"   ✅ Écart blocs / signal entier: {ecart:.2e}")
+            if ecart > 1e-5:
+                print("   ❌ L'état du convertisseur n'est pas conservé entre les blocs")
+                return False
+
+            # Repliement de la composante à 9500 Hz (au-delà de 8 kHz après conversion)
+            for name, out in (("Numba", numba_out), ("Polyphase", poly_out)):
+                spectrum = np.abs(np.fft.rfft(out * np.hanning(len(out))))
+                freqs = np.fft.rfftfreq(len(out), 1.0 / target_rate)
+                signal = spectrum[np.argmin(np.abs(freqs - 440))]
+                alias = spectrum[np.argmin(np.abs(freqs - (target_rate - 9500)))]
+                print(f"   📈 {name}: repliement à {target_rate - 9500}Hz = {20 * np.log10(alias / signal + 1e-12):.1f} dB")
+
+        print(f"\n✅ Benchmark du rééchantillonnage terminé avec succès!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Erreur dans le benchmark du rééchantillonnage: {e}")
+        traceback.print_exc()
+        return False
+
 def test_math_optimization():
     """Test les optimisations mathématiques."""
     print("\n" + "="*60)
@@ -301,6 +371,107 @@ def test_command_optimization():
         traceback.print_exc()
         return False
 
+def test_dispatch_benchmark():
+    """Compare l'index de répartition compilé à l'essai séquentiel des gestionnaires."""
+    print("\n" + "="*60)
+    print("🧭 BENCHMARK DE LA RÉPARTITION DES COMMANDES (INDEX vs CHAÎNE)")
+    print("="*60)
+
+    try:
+        import re
+        from command_dispatch import DispatchIndex, declencheurs
+
+        # Gestionnaires simulés : chacun teste une longue liste de phrases comme les
+        # modules de commandes réels, et ne répond qu'à sa propre famille de verbes
+        familles = [
+            ("accessibilite", ("grill", "narrateur"), ()),
+            ("traduction", None, ()),
+            ("analyse", None, ()),
+            ("navigateur", None, ()),
+            ("souris", ("souris", "cliqu"), (r"^clique sur (.+)$",)),
+            ("recherche", ("recherche",), ()),
+            ("lecture", ("lis", "lecture"), ()),
+            ("clavier", None, ()),
+            ("systeme", ("heure", "veille", "volume"), ()),
+            ("git", ("git",), ()),
+            ("dev", ("docker", "venv"), ()),
+            ("projet", ("tâche", "sprint"), ()),
+            ("web_dev", ("serveur", "react"), ()),
+            ("database", ("sqlite", "mysql"), ()),
+            ("rappel", ("rappel",), ()),
+            ("fichier", ("dossier", "fichier"), ()),
+        ]
+
+        def creer_gestionnaire(nom, mots_cles, motifs):
+            phrases = [f"{verbe} {mot} {i}" for mot in (mots_cles or (nom,))
+                       for verbe in ("ouvre", "ferme", "affiche") for i in range(10)]
+            regex = [re.compile(m) for m in motifs]
+
+            def gestionnaire(texte):
+                texte = texte.lower()
+                if any(p in texte for p in phrases) or any(r.search(texte) for r in regex):
+                    return f"{nom}: {texte}"
+                return None
+            gestionnaire.__name__ = f"executer_commande_{nom}"
+            if mots_cles is None:
+                return gestionnaire
+            return declencheurs(mots_cles=mots_cles, motifs=motifs)(gestionnaire)
+
+        handlers = [creer_gestionnaire(*f) for f in familles]
+        index = DispatchIndex(handlers, "benchmark")
+
+        utterances = [
+            "affiche fichier 3", "ouvre rappel 7", "ferme mysql 2", "affiche react 5",
+            "clique sur le bouton valider", "ouvre heure 1", "affiche souris 4",
+            "ferme clavier 9", "bonjour comment vas-tu", "ouvre git 0",
+        ]
+        repeats = 2000
+
+        def sequentiel(texte):
+            for handler in handlers:
+                resultat = handler(texte)
+                if resultat:
+                    return resultat
+            return None
+
+        def indexe(texte):
+            for handler in index.candidats(texte):
+                resultat = handler(texte)
+                if resultat:
+                    return resultat
+            return None
+
+        # Les deux stratégies doivent donner exactement les mêmes réponses
+        for texte in utterances:
+            if sequentiel(texte) != indexe(texte):
+                print(f"   ❌ Réponse différente pour '{texte}'")
+                return False
+        index.reset_stats()
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            for texte in utterances:
+                sequentiel(texte)
+        seq_time = (time.perf_counter() - start_time) / (repeats * len(utterances))
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            for texte in utterances:
+                indexe(texte)
+        idx_time = (time.perf_counter() - start_time) / (repeats * len(utterances))
+
+        stats = index.get_stats()
+        print(f"   ✅ Chaîne séquentielle: {seq_time * 1e6:.1f} µs par énoncé")
+        print(f"   ✅ Index compilé: {idx_time * 1e6:.1f} µs par énoncé "
+              f"(balayage {stats['avg_scan_us']} µs, {stats['avg_candidates']} candidats sur {stats['handlers']})")
+        print(f"   📈 Speedup: {seq_time / idx_time:.2f}x")
+        return True
+
+    except Exception as e:
+        print(f"❌ Erreur dans le benchmark de répartition: {e}")
+        traceback.print_exc()
+        return False
+
 def test_integration():
     """Test d'intégration complet avec tous les modules Numba."""
     print("\n" + "="*60)
@@ -382,8 +553,10 @@ def main():
     # Exécution des tests
     tests = [
         ("Audio", test_audio_optimization),
+        ("Rééchantillonnage", test_resampling_benchmark),
         ("Mathématique", test_math_optimization),
         ("Commandes", test_command_optimization),
+        ("Répartition", test_dispatch_benchmark),
         ("Intégration", test_integration)
     ]
 
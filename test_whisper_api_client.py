@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Script de test du client API Whisper
+Mesure la latence de queue (p50/p95) avec et sans couverture locale, à l'aide
+d'un faux serveur HTTP local dont le temps de réponse est configurable
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Délais simulés de l'API : la plupart rapides, quelques réponses très lentes
+FAST_DELAY_S = 0.05
+SLOW_DELAY_S = 2.5
+SLOW_RATIO = 0.2
+LOCAL_DECODE_S = 0.3
+N_REQUESTS = 20
+
+connections = set()
+
+
+class FakeWhisperHandler(BaseHTTPRequestHandler):
+    """Réponse JSON façon API Whisper après un délai aléatoire."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        time.sleep(SLOW_DELAY_S if random.random() < SLOW_RATIO else FAST_DELAY_S)
+
+        if self.headers.get("Authorization") != "Bearer sk-test":
+            payload = json.dumps({"error": "clé invalide"}).encode()
+            self.send_response(401)
+        elif b"RIFF" not in body:
+            payload = json.dumps({"error": "audio invalide"}).encode()
+            self.send_response(400)
+        else:
+            payload = json.dumps({"text": "ouvre le navigateur"}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWhisperHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, p):
+    return float(np.percentile(values, p)) if values else 0.0
+
+
+def mesurer(client, pcm, local_decode=None):
+    latencies = []
+    sources = {"api": 0, "local": 0}
+    random.seed(42)
+    for _ in range(N_REQUESTS):
+        start = time.time()
+        result = client.transcribe_hedged(pcm, 16000, "sk-test", local_decode=local_decode, hedge_after_s=0.5)
+        latencies.append((time.time() - start) * 1000)
+        if result.success:
+            sources[result.source] += 1
+    return latencies, sources
+
+
+def test_connection_reuse(url, pcm):
+    """Vérifie que la session réutilise la même connexion."""
+    from whisper_api_client import WhisperAPIClient
+
+    global SLOW_RATIO
+    ratio, SLOW_RATIO = SLOW_RATIO, 0.0
+    connections.clear()
+    client = WhisperAPIClient(url, timeout=5)
+    try:
+        for _ in range(5):
+            result = client.transcribe(pcm, 16000, "sk-test")
+            if not result.success:
+                print(f"[ERREUR] Requête échouée: {result.status_code} {result.error}")
+                return False
+    finally:
+        client.close()
+        SLOW_RATIO = ratio
+
+    print(f"Connexions ouvertes pour 5 requêtes: {len(connections)}")
+    if len(connections) != 1:
+        print("[ERREUR] La connexion n'est pas réutilisée")
+        return False
+    print("[OK] Connexion persistante réutilisée")
+    return True
+
+
+def test_tail_latency(url, pcm):
+    """Compare la latence de queue avec et sans couverture locale."""
+    from whisper_api_client import WhisperAPIClient
+
+    def local_decode(samples):
+        time.sleep(LOCAL_DECODE_S)
+        return "ouvre le navigateur"
+
+    client = WhisperAPIClient(url, timeout=5)
+    try:
+        sans, sources_sans = mesurer(client, pcm)
+        avec, sources_avec = mesurer(client, pcm, local_decode)
+    finally:
+        client.close()
+
+    print(f"Sans couverture: p50={percentile(sans, 50):.0f}ms p95={percentile(sans, 95):.0f}ms {sources_sans}")
+    print(f"Avec couverture: p50={percentile(avec, 50):.0f}ms p95={percentile(avec, 95):.0f}ms {sources_avec}")
+
+    if percentile(avec, 95) >= percentile(sans, 95):
+        print("[ERREUR] La couverture locale ne réduit pas la latence de queue")
+        return False
+    if sources_avec["local"] == 0:
+        print("[ERREUR] Le décodage local n'a jamais été retenu")
+        return False
+    print("[OK] Latence p95 réduite par la couverture locale")
+    return True
+
+
+def test_error_status(url, pcm):
+    """Vérifie la remontée des erreurs HTTP."""
+    from whisper_api_client import WhisperAPIClient
+
+    client = WhisperAPIClient(url, timeout=5)
+    try:
+        result = client.transcribe(pcm, 16000, "sk-invalide")
+    finally:
+        client.close()
+
+    if result.success or result.status_code != 401:
+        print(f"[ERREUR] Statut inattendu: {result.status_code}")
+        return False
+    print("[OK] Erreur 401 remontée")
+    return True
+
+
+def main():
+    """Fonction principale de test"""
+    print("Test du client API Whisper - Whisp Assistant")
+    print("=" * 50)
+
+    try:
+        import whisper_api_client
+    except Exception as e:
+        print(f"[ERREUR] Module whisper_api_client non importable: {e}")
+        return False
+    if not whisper_api_client.REQUESTS_AVAILABLE:
+        print("[ERREUR] La bibliothèque requests n'est pas disponible")
+        return False
+
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/audio/transcriptions"
+    pcm = (np.sin(np.linspace(0, 2000, 16000)) * 8000).astype(np.int16).tobytes()
+
+    try:
+        results = [
+            test_connection_reuse(url, pcm),
+            test_tail_latency(url, pcm),
+            test_error_status(url, pcm),
+        ]
+    finally:
+        server.shutdown()
+
+    print(f"\nResultat: {sum(results)}/{len(results)} tests réussis")
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,509 @@
+"""
+Détection d'activité vocale (VAD) commune à tous les moteurs STT de Whisp Assistant
+Remplace les détecteurs d'énergie dupliqués dans les boucles d'écoute
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Caractéristiques audio optimisées (optionnel)
+try:
+    from audio_optimization import calculate_audio_features_numba
+    NUMBA_FEATURES_AVAILABLE = True
+except ImportError:
+    NUMBA_FEATURES_AVAILABLE = False
+
+# Classifieur de trames webrtcvad (optionnel)
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    webrtcvad = None
+    WEBRTCVAD_AVAILABLE = False
+
+VAD_BACKENDS = ("energy", "spectral", "webrtc")
+
+# Correction du biais de l'estimateur par minimum (le minimum sous-estime la moyenne du bruit)
+NOISE_FLOOR_BIAS = 1.5
+# Fraction de l'écart comblée à chaque sous-fenêtre quand le bruit augmente
+NOISE_FLOOR_RISE = 0.5
+# Seuil adaptatif maximal (au-delà, la parole normale ne serait plus détectée)
+MAX_ADAPTIVE_THRESHOLD = 0.3
+# Écart relatif du plancher justifiant une nouvelle sauvegarde
+NOISE_FLOOR_SAVE_CHANGE = 0.1
+
+# Estimateurs de bruit actifs, par moteur (pour les statistiques)
+_noise_trackers: Dict[str, "NoiseFloorTracker"] = {}
+_noise_trackers_lock = threading.Lock()
+
+
+def chunk_to_float32(chunk: Any) -> np.ndarray:
+    """
+    Convertit un chunk audio int16 (bytes ou numpy array) en float32 normalisé.
+
+    Args:
+        chunk: Chunk audio brut
+
+    Returns:
+        Tableau float32 à plat dans [-1, 1]
+    """
+    if isinstance(chunk, np.ndarray):
+        if np.issubdtype(chunk.dtype, np.floating):
+            return chunk.astype(np.float32, copy=False).reshape(-1)
+        return chunk.reshape(-1).astype(np.float32) / 32768.0
+    return np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _features_numpy(samples: np.ndarray, sample_rate: float) -> tuple:
+    """Équivalent NumPy de calculate_audio_features_numba (rms, zcr, centroïde)."""
+    if len(samples) == 0:
+        return (0.0, 0.0, 0.0)
+    rms = float(np.sqrt(np.mean(samples ** 2)))
+    zcr = float(np.mean(np.abs(np.diff(np.sign(samples)))))
+    magnitude = np.abs(np.fft.rfft(samples))
+    freqs = np.fft.rfftfreq(len(samples), 1.0 / sample_rate)
+    total = float(np.sum(magnitude))
+    centroid = float(np.sum(freqs * magnitude) / total) if total > 0 else 0.0
+    return (rms, zcr, centroid)
+
+
+class EnergyBackend:
+    """Classification par énergie RMS au-dessus d'un seuil."""
+
+    name = "energy"
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+
+    def is_speech(self, samples: np.ndarray, chunk: Any, energy: float, threshold: float) -> bool:
+        return energy > threshold
+
+    def reset(self) -> None:
+        pass
+
+
+class SpectralBackend:
+    """
+    Classification par énergie, taux de passage par zéro et flux spectral.
+
+    Le bruit large bande (ventilation, souffle) a un taux de passage par zéro
+    élevé et un flux spectral faible : il est rejeté même au-dessus du seuil.
+    """
+
+    name = "spectral"
+
+    def __init__(self, sample_rate: int, max_zcr: float = 0.6, min_flux: float = 0.15):
+        self.sample_rate = sample_rate
+        self.max_zcr = max_zcr
+        self.min_flux = min_flux
+        self._previous_spectrum: Optional[np.ndarray] = None
+
+    def is_speech(self, samples: np.ndarray, chunk: Any, energy: float, threshold: float) -> bool:
+        if NUMBA_FEATURES_AVAILABLE:
+            try:
+                _, zcr, _ = calculate_audio_features_numba(samples, float(self.sample_rate))
+            except Exception:
+                _, zcr, _ = _features_numpy(samples, self.sample_rate)
+        else:
+            _, zcr, _ = _features_numpy(samples, self.sample_rate)
+
+        # Flux spectral positif normalisé par rapport à la trame précédente
+        spectrum = np.abs(np.fft.rfft(samples))
+        flux = 0.0
+        if self._previous_spectrum is not None and len(self._previous_spectrum) == len(spectrum):
+            total = float(np.sum(spectrum))
+            if total > 0:
+                flux = float(np.sum(np.maximum(spectrum - self._previous_spectrum, 0.0)) / total)
+        self._previous_spectrum = spectrum
+
+        if energy <= threshold:
+            return False
+        return zcr < self.max_zcr or flux > self.min_flux
+
+    def reset(self) -> None:
+        self._previous_spectrum = None
+
+
+class WebRTCBackend:
+    """
+    Classification trame par trame avec webrtcvad (trames de 30 ms).
+
+    Un chunk est considéré comme de la parole si au moins speech_ratio de
+    ses trames le sont. Sans webrtcvad, on se replie sur l'énergie.
+    """
+
+    name = "webrtc"
+
+    def __init__(self, sample_rate: int, aggressiveness: int = 2, speech_ratio: float = 0.3):
+        self.sample_rate = sample_rate
+        self.speech_ratio = speech_ratio
+        self.frame_samples = int(sample_rate * 0.03)
+        self._vad = None
+        if WEBRTCVAD_AVAILABLE and sample_rate in (8000, 16000, 32000, 48000):
+            self._vad = webrtcvad.Vad(aggressiveness)
+        else:
+            logger.warning("webrtcvad indisponible, repli sur la détection par énergie")
+
+    def is_speech(self, samples: np.ndarray, chunk: Any, energy: float, threshold: float) -> bool:
+        if self._vad is None:
+            return energy > threshold
+
+        if isinstance(chunk, np.ndarray):
+            pcm = chunk.reshape(-1).astype(np.int16, copy=False).tobytes()
+        else:
+            pcm = bytes(chunk)
+
+        frame_bytes = self.frame_samples * 2
+        n_frames = len(pcm) // frame_bytes
+        if n_frames == 0:
+            return energy > threshold
+
+        voiced = 0
+        for i in range(n_frames):
+            if self._vad.is_speech(pcm[i * frame_bytes:(i + 1) * frame_bytes], self.sample_rate):
+                voiced += 1
+        return voiced / n_frames >= self.speech_ratio
+
+    def reset(self) -> None:
+        pass
+
+
+class NoiseFloorTracker:
+    """
+    Estimation continue du plancher de bruit par statistiques minimales.
+
+    L'énergie minimale est relevée sur des sous-fenêtres successives ; le
+    plancher est le minimum des sous-fenêtres couvrant window_s secondes
+    (corrigé de son biais). La parole, même longue, ne remonte donc pas le
+    plancher, alors qu'un bruit de fond durable le remonte en quelques
+    secondes. Le seuil de la VAD est le plancher augmenté de margin_db.
+    """
+
+    def __init__(self, sample_rate: int = 16000, window_s: float = 5.0, n_subwindows: int = 8,
+                 margin_db: float = 10.0, min_threshold: float = 0.01,
+                 initial_floor: Optional[float] = None, device: str = "default", name: str = "stt",
+                 save_interval_s: float = 60.0):
+        """
+        Args:
+            sample_rate: Taux d'échantillonnage
+            window_s: Durée couverte par l'estimation du minimum
+            n_subwindows: Nombre de sous-fenêtres de cette durée
+            margin_db: Marge du seuil au-dessus du plancher
+            min_threshold: Seuil minimal, même dans un silence parfait
+            initial_floor: Plancher appris lors d'une session précédente
+            device: Nom du périphérique d'entrée (clé de sauvegarde)
+            name: Nom du moteur
+            save_interval_s: Intervalle minimal entre deux sauvegardes du plancher
+        """
+        self.sub_samples = max(1, int(window_s * sample_rate / n_subwindows))
+        self.margin = 10 ** (margin_db / 20.0)
+        self.min_threshold = min_threshold
+        self.device = device
+        self.name = name
+        self.save_interval_s = save_interval_s
+
+        self.floor = initial_floor
+        self._minima = deque(maxlen=n_subwindows)
+        self._current_min = float("inf")
+        self._current_samples = 0
+        self._saved_floor = initial_floor
+        self._last_save = time.time()
+
+        self.frames = 0
+        self.updates = 0
+
+        with _noise_trackers_lock:
+            _noise_trackers[self.name] = self
+
+    def update(self, energy: float, n_samples: int) -> Optional[float]:
+        """
+        Intègre l'énergie d'une trame.
+
+        Args:
+            energy: Énergie RMS normalisée de la trame
+            n_samples: Nombre d'échantillons de la trame
+
+        Returns:
+            Plancher de bruit courant (None avant la première estimation)
+        """
+        self.frames += 1
+        self._current_min = min(self._current_min, max(energy, 1e-6))
+        self._current_samples += n_samples
+        if self._current_samples < self.sub_samples:
+            return self.floor
+
+        self._minima.append(self._current_min)
+        self._current_min = float("inf")
+        self._current_samples = 0
+
+        estimate = min(self._minima) * NOISE_FLOOR_BIAS
+        # Descente immédiate, montée amortie
+        if self.floor is None or estimate < self.floor:
+            self.floor = estimate
+        else:
+            self.floor += NOISE_FLOOR_RISE * (estimate - self.floor)
+        self.updates += 1
+        self._sauvegarder_si_necessaire()
+        return self.floor
+
+    def threshold(self, fallback: float) -> float:
+        """Seuil d'énergie de la VAD (fallback tant que le plancher est inconnu)."""
+        if self.floor is None:
+            return fallback
+        return float(min(max(self.floor * self.margin, self.min_threshold), MAX_ADAPTIVE_THRESHOLD))
+
+    def _sauvegarder_si_necessaire(self) -> None:
+        if time.time() - self._last_save < self.save_interval_s:
+            return
+        if self._saved_floor is not None and abs(self.floor - self._saved_floor) <= NOISE_FLOOR_SAVE_CHANGE * self._saved_floor:
+            return
+        self._last_save = time.time()
+        if sauvegarder_plancher_bruit(self.device, self.floor):
+            self._saved_floor = self.floor
+
+    def get_stats(self) -> dict:
+        """Retourne l'état de l'estimateur."""
+        return {
+            "device": self.device,
+            "floor": self.floor,
+            "floor_dbfs": float(20 * np.log10(self.floor)) if self.floor else None,
+            "threshold": self.threshold(0.0) if self.floor is not None else None,
+            "frames": self.frames,
+            "updates": self.updates,
+            "saved_floor": self._saved_floor,
+        }
+
+
+def nom_peripherique_entree() -> str:
+    """Nom du périphérique d'entrée par défaut (clé du plancher de bruit sauvegardé)."""
+    try:
+        import sounddevice as sd
+        return sd.query_devices(kind="input")["name"]
+    except Exception:
+        return "default"
+
+
+def _cle_plancher(device: str) -> str:
+    return f"noise_floor:{device}"
+
+
+def charger_plancher_bruit(device: str) -> Optional[float]:
+    """Plancher de bruit appris pour un périphérique lors des sessions précédentes."""
+    try:
+        try:
+            from whisp_assistant.database_manager import load_user_preferences
+        except ImportError:
+            from database_manager import load_user_preferences
+        value = load_user_preferences(_cle_plancher(device))
+        return float(value) if value is not None else None
+    except Exception as e:
+        logger.warning(f"Plancher de bruit de {device} non chargé: {e}")
+        return None
+
+
+def sauvegarder_plancher_bruit(device: str, floor: float) -> bool:
+    """Mémorise le plancher de bruit d'un périphérique."""
+    try:
+        try:
+            from whisp_assistant.database_manager import save_user_preference
+        except ImportError:
+            from database_manager import save_user_preference
+        save_user_preference(_cle_plancher(device), float(floor))
+        return True
+    except Exception as e:
+        logger.warning(f"Plancher de bruit de {device} non sauvegardé: {e}")
+        return False
+
+
+def get_noise_floor_stats() -> dict:
+    """Retourne l'état des estimateurs de bruit actifs."""
+    with _noise_trackers_lock:
+        trackers = dict(_noise_trackers)
+    return {name: tracker.get_stats() for name, tracker in trackers.items()}
+
+
+def create_vad_backend(name: str, sample_rate: int):
+    """
+    Crée un backend de classification.
+
+    Args:
+        name: "energy", "spectral" ou "webrtc"
+        sample_rate: Taux d'échantillonnage
+
+    Returns:
+        Instance du backend (énergie par défaut si le nom est inconnu)
+    """
+    if name == "spectral":
+        return SpectralBackend(sample_rate)
+    if name == "webrtc":
+        return WebRTCBackend(sample_rate)
+    if name != "energy":
+        logger.warning(f"Backend VAD inconnu '{name}', utilisation de l'énergie")
+    return EnergyBackend(sample_rate)
+
+
+class VoiceActivityDetector:
+    """
+    Machine à états de détection de parole partagée par les moteurs STT.
+
+    - Backend de classification interchangeable (énergie, spectral, webrtc)
+    - Hangover : après une trame de parole, les hangover_chunks trames
+      suivantes ne comptent pas comme silence (évite de couper les fins de mots)
+    - Pré-roll : les derniers chunks précédant le début de la parole sont
+      conservés et peuvent être récupérés avec drain_preroll()
+
+    Usage dans une boucle d'écoute :
+        vad.process(chunk, threshold)
+        if vad.speech_started:
+            for c in vad.drain_preroll():
+                audio_buffer.append(c)
+        if vad.is_speaking:
+            audio_buffer.append(chunk)
+        if vad.end_of_speech(silence_chunks):
+            ...
+    """
+
+    def __init__(self, backend: str = "energy", sample_rate: int = 16000,
+                 threshold: float = 0.04, hangover_chunks: int = 1, preroll_chunks: int = 2,
+                 name: str = "stt", noise_floor: Optional[NoiseFloorTracker] = None):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        # Seuil adaptatif : le seuil transmis ne sert que tant que le plancher est inconnu
+        self.noise_floor = noise_floor
+        self.hangover_chunks = max(0, int(hangover_chunks))
+        self.backend = create_vad_backend(backend, sample_rate)
+        self._preroll = deque(maxlen=max(0, int(preroll_chunks)) or None)
+        self._preroll_enabled = int(preroll_chunks) > 0
+
+        self.frames_processed = 0
+        self.speech_frames = 0
+        self.utterances = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Réinitialise l'état entre deux énoncés."""
+        self.is_speaking = False
+        self.speech_started = False
+        self.silence_counter = 0
+        self.last_energy = 0.0
+        self._hangover = 0
+        self.backend.reset()
+
+    def process(self, chunk: Any, threshold: Optional[float] = None) -> bool:
+        """
+        Analyse un chunk et met à jour l'état.
+
+        Args:
+            chunk: Chunk audio int16 (bytes ou numpy array)
+            threshold: Seuil d'énergie à utiliser (self.threshold par défaut)
+
+        Returns:
+            True si le chunk est classé comme parole
+        """
+        if threshold is not None:
+            self.threshold = threshold
+
+        samples = chunk_to_float32(chunk)
+        energy = float(np.sqrt(np.mean(samples ** 2))) if len(samples) else 0.0
+        self.last_energy = energy
+        self.frames_processed += 1
+
+        if self.noise_floor is not None:
+            self.noise_floor.update(energy, len(samples))
+            self.threshold = self.noise_floor.threshold(self.threshold)
+
+        try:
+            speech = self.backend.is_speech(samples, chunk, energy, self.threshold)
+        except Exception as e:
+            logger.warning(f"Erreur du backend VAD {self.backend.name}: {e}")
+            speech = energy > self.threshold
+
+        self.speech_started = False
+        if speech:
+            self.speech_frames += 1
+            if not self.is_speaking:
+                self.speech_started = True
+                self.utterances += 1
+            self.is_speaking = True
+            self.silence_counter = 0
+            self._hangover = self.hangover_chunks
+        elif self._hangover > 0 and self.is_speaking:
+            self._hangover -= 1
+        else:
+            self.silence_counter += 1
+
+        if not self.is_speaking and self._preroll_enabled:
+            self._preroll.append(chunk)
+
+        return speech
+
+    def drain_preroll(self) -> List[Any]:
+        """Retourne et vide les chunks mémorisés avant le début de la parole."""
+        chunks = list(self._preroll)
+        self._preroll.clear()
+        return chunks
+
+    def end_of_speech(self, silence_chunks: int) -> bool:
+        """Indique si assez de silence a suivi la parole pour clore l'énoncé."""
+        return self.is_speaking and self.silence_counter >= silence_chunks
+
+    def extend_silence(self, chunks: int = 2) -> None:
+        """Prolonge l'attente de fin d'énoncé (pauses en dictée)."""
+        self.silence_counter = max(0, self.silence_counter - chunks)
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs du détecteur."""
+        return {
+            "backend": self.backend.name,
+            "threshold": self.threshold,
+            "frames_processed": self.frames_processed,
+            "speech_frames": self.speech_frames,
+            "utterances": self.utterances,
+            "last_energy": self.last_energy,
+            "noise_floor": self.noise_floor.floor if self.noise_floor is not None else None,
+        }
+
+
+def create_voice_activity_detector(settings: dict, sample_rate: int, name: str = "stt",
+                                   threshold: float = 0.04) -> VoiceActivityDetector:
+    """
+    Crée un détecteur configuré à partir des paramètres STT.
+
+    Args:
+        settings: Dictionnaire stt_settings
+        sample_rate: Taux d'échantillonnage du flux
+        name: Nom du moteur (pour les logs)
+        threshold: Seuil d'énergie initial
+
+    Returns:
+        Instance de VoiceActivityDetector
+    """
+    noise_floor = None
+    if settings.get("vad_adaptive_threshold", False):
+        device = nom_peripherique_entree()
+        noise_floor = NoiseFloorTracker(
+            sample_rate=sample_rate,
+            window_s=settings.get("vad_noise_window_s", 5.0),
+            margin_db=settings.get("vad_noise_margin_db", 10.0),
+            min_threshold=settings.get("vad_min_threshold", 0.01),
+            initial_floor=charger_plancher_bruit(device),
+            device=device,
+            name=name,
+        )
+
+    return VoiceActivityDetector(
+        backend=settings.get("vad_backend", "energy"),
+        sample_rate=sample_rate,
+        threshold=threshold,
+        hangover_chunks=settings.get("vad_hangover_chunks", 1),
+        preroll_chunks=settings.get("vad_preroll_chunks", 2),
+        name=name,
+        noise_floor=noise_floor,
+    )
@@ -0,0 +1,172 @@
+"""
+Grammaire de commandes Vosk pour Whisp Assistant
+Compile les alias de commandes (par défaut et base de données), les raccourcis
+personnalisés et les valeurs des paramètres connus (sites, langues, nombres)
+en une grammaire Vosk. Hors dictée, le décodage contraint à ces phrases est
+plus rapide et plus précis qu'un décodage libre
+"""
+import re
+import json
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Mot produit par Vosk pour un segment hors grammaire
+UNK = "[unk]"
+
+# Valeurs des paramètres, ajoutées comme phrases : Vosk enchaîne les phrases de
+# la grammaire, ce qui permet « va sur » suivi de « youtube »
+LANGUES = [
+    "anglais", "français", "espagnol", "allemand", "italien", "portugais",
+    "néerlandais", "russe", "chinois", "japonais", "arabe",
+]
+NOMBRES = [
+    "un", "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf", "dix",
+    "onze", "douze", "quinze", "vingt", "trente", "quarante", "cinquante", "soixante",
+]
+MOTEURS_STT = ["vosk", "whisper", "google", "local", "api"]
+
+_NON_MOT_RE = re.compile(r"[^\w' ]+", re.UNICODE)
+_ESPACES_RE = re.compile(r"\s+")
+
+
+def normaliser_phrase(phrase: str) -> str:
+    """Forme d'une phrase dans la grammaire (minuscules, sans ponctuation ni traits d'union)."""
+    phrase = phrase.lower().replace("’", "'").replace("-", " ")
+    phrase = _NON_MOT_RE.sub(" ", phrase)
+    return _ESPACES_RE.sub(" ", phrase).strip()
+
+
+def _sites_connus() -> List[str]:
+    """Noms des sites web reconnus par les commandes de navigateur."""
+    try:
+        from browser_commands import SITES_POPULAIRES
+        return list(SITES_POPULAIRES)
+    except Exception:
+        # browser_commands dépend de pyautogui (indisponible sans affichage)
+        return ["google", "youtube", "facebook", "twitter", "instagram", "linkedin", "github", "wikipedia"]
+
+
+def _raccourcis_personnalises() -> List[str]:
+    """Commandes vocales des raccourcis personnalisés."""
+    try:
+        try:
+            from whisp_assistant.database_manager import get_custom_shortcuts
+        except ImportError:
+            from database_manager import get_custom_shortcuts
+        return [raccourci["voice_command"] for raccourci in get_custom_shortcuts()]
+    except Exception as e:
+        logger.warning(f"Raccourcis personnalisés indisponibles pour la grammaire Vosk: {e}")
+        return []
+
+
+def construire_phrases(aliases: Dict[str, Iterable[str]], raccourcis: Iterable[str],
+                       slots: Optional[Dict[str, Iterable[str]]] = None) -> List[str]:
+    """
+    Construit la liste des phrases de la grammaire.
+
+    Args:
+        aliases: Alias par commande
+        raccourcis: Commandes vocales personnalisées
+        slots: Valeurs des paramètres par commande (les alias de la commande servent de préfixe)
+
+    Returns:
+        Phrases normalisées, sans doublon, terminées par [unk]
+    """
+    phrases = {}
+    for alias_list in aliases.values():
+        for alias in alias_list:
+            phrase = normaliser_phrase(alias)
+            if phrase:
+                phrases[phrase] = None
+    for raccourci in raccourcis:
+        phrase = normaliser_phrase(raccourci)
+        if phrase:
+            phrases[phrase] = None
+    for valeurs in (slots or {}).values():
+        for valeur in valeurs:
+            phrase = normaliser_phrase(valeur)
+            if phrase:
+                phrases[phrase] = None
+    # [unk] absorbe les mots hors grammaire au lieu de les forcer vers une commande
+    return list(phrases) + [UNK]
+
+
+class VoskGrammar:
+    """
+    Grammaire de commandes Vosk, reconstruite à la demande.
+
+    La grammaire est invalidée quand les alias ou les raccourcis changent ;
+    chaque reconstruction incrémente version, ce qui permet aux threads Vosk de
+    recréer leur recognizer entre deux énoncés.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._json: Optional[str] = None
+        self._n_phrases = 0
+        self._lock = threading.Lock()
+
+        self.constrained = 0
+        self.fallbacks = 0
+
+    def _slots(self) -> Dict[str, List[str]]:
+        return {
+            "go_to_website": _sites_connus(),
+            "start_translation": LANGUES,
+            "switch_tab": NOMBRES,
+            "change_stt_engine": MOTEURS_STT,
+        }
+
+    def construire(self) -> str:
+        """Compile la grammaire à partir des alias et raccourcis courants."""
+        try:
+            from whisp_assistant.command_aliases import command_aliases
+        except ImportError:
+            from command_aliases import command_aliases
+
+        phrases = construire_phrases(command_aliases.aliases, _raccourcis_personnalises(), self._slots())
+        grammaire = json.dumps(phrases, ensure_ascii=False)
+        with self._lock:
+            self._json = grammaire
+            self._n_phrases = len(phrases) - 1
+            self.version += 1
+        logger.info(f"Grammaire Vosk construite: {self._n_phrases} phrases (version {self.version})")
+        return grammaire
+
+    def get(self) -> str:
+        """Retourne la grammaire JSON, construite au premier appel ou après invalidation."""
+        with self._lock:
+            grammaire = self._json
+        return grammaire if grammaire is not None else self.construire()
+
+    def invalider(self) -> None:
+        """Marque la grammaire comme obsolète : elle sera reconstruite immédiatement."""
+        with self._lock:
+            self._json = None
+        try:
+            self.construire()
+        except Exception as e:
+            logger.error(f"Erreur lors de la reconstruction de la grammaire Vosk: {e}")
+
+    def get_stats(self) -> dict:
+        """Retourne l'état de la grammaire."""
+        total = self.constrained + self.fallbacks
+        return {
+            "version": self.version,
+            "phrases": self._n_phrases,
+            "constrained": self.constrained,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallbacks / total if total else 0.0,
+        }
+
+
+# Grammaire partagée par les threads Vosk
+vosk_grammar = VoskGrammar()
+
+
+def invalider_grammaire_vosk() -> None:
+    """Reconstruit la grammaire après une modification des alias ou des raccourcis."""
+    vosk_grammar.invalider()
@@ -10,7 +10,9 @@ import webbrowser
 import json
 import datetime
 from text_processing import ecrire_texte_avec_accents
+from command_dispatch import declencheurs
 
+@declencheurs(mots_cles=("serveur", "react", "html", "css", "javascript", "api rest"))
 def executer_commande_web_dev(texte):
     """Exécute des commandes liées au développement web"""
     texte = texte.lower()
@@ -20,7 +20,18 @@ from config import (
     get_mistral_api_key, set_mistral_api_key
 )
 from tts_module import obtenir_moteur_tts, definir_moteur_tts
-from speech_recognition_module import get_stt_metrics, reset_stt_metrics
+from speech_recognition_module import get_stt_metrics, reset_stt_metrics, get_model_registry_stats, stt_cache, wake_gate, get_dsp_stats
+from audio_pipeline import get_pipeline_stats
+from inference_server import get_inference_server_stats
+from whisper_api_client import get_whisper_api_client
+from batched_transcription import get_batched_transcription_stats
+from speculative_recognition import get_speculative_stats
+from audio_capture import get_capture_stats
+from audio_hub import get_audio_hub_stats
+from voice_activity import get_noise_floor_stats
+from command_dispatch import get_dispatch_stats
+from fuzzy_index import get_fuzzy_index_stats
+from vosk_grammar import invalider_grammaire_vosk, vosk_grammar
 from error_handler import get_error_handler, ErrorCategory, ErrorSeverity, catch_errors
 
 # Importer les modules de sécurité
@@ -358,7 +369,7 @@ def change_stt_engine_route():
         # Vérifier si Vosk est disponible
         if engine == 'vosk':
             try:
-                from speech_recognition_module import VOSK_AVAILABLE, setup_vosk_model
+                from speech_recognition_module import VOSK_AVAILABLE, charger_modele_stt
                 if not VOSK_AVAILABLE:
                     return jsonify({
                         "success": False, 
@@ -367,7 +378,7 @@ def change_stt_engine_route():
                 
                 # Vérifier si le modèle Vosk est disponible ou peut être téléchargé
                 add_log("Vérification du modèle Vosk...", "info")
-                model_ready = setup_vosk_model()
+                model_ready = charger_modele_stt("vosk")
                 if not model_ready:
                     return jsonify({
                         "success": False,
@@ -384,7 +395,7 @@ def change_stt_engine_route():
         # Vérifier si Whisper CT2 est disponible
         if engine == 'whisper_ct2':
             try:
-                from speech_recognition_module import WHISPER_CT2_AVAILABLE, setup_whisper_ct2_model
+                from speech_recognition_module import WHISPER_CT2_AVAILABLE, charger_modele_stt
                 if not WHISPER_CT2_AVAILABLE:
                     return jsonify({
                         "success": False, 
@@ -393,7 +404,7 @@ def change_stt_engine_route():
                 
                 # Vérifier si le modèle Whisper CT2 est disponible ou peut être téléchargé
                 add_log("Vérification du modèle Whisper CT2...", "info")
-                model_ready = setup_whisper_ct2_model()
+                model_ready = charger_modele_stt("whisper_ct2")
                 if not model_ready:
                     return jsonify({
                         "success": False,
@@ -409,7 +420,7 @@ def change_stt_engine_route():
         # Vérifier si Whisper French est disponible
         if engine == 'whisper_french':
             try:
-                from speech_recognition_module import WHISPER_CT2_AVAILABLE, setup_whisper_french_model
+                from speech_recognition_module import WHISPER_CT2_AVAILABLE, charger_modele_stt
                 if not WHISPER_CT2_AVAILABLE:
                     return jsonify({
                         "success": False, 
@@ -418,7 +429,7 @@ def change_stt_engine_route():
                 
                 # Vérifier si le modèle Whisper French est disponible ou peut être téléchargé
                 add_log("Vérification du modèle Whisper French...", "info")
-                model_ready = setup_whisper_french_model()
+                model_ready = charger_modele_stt("whisper_french")
                 if not model_ready:
                     return jsonify({
                         "success": False,
@@ -434,7 +445,7 @@ def change_stt_engine_route():
         # Vérifier si Whisper French est disponible
         if engine == 'whisper_french':
             try:
-                from speech_recognition_module import WHISPER_CT2_AVAILABLE, setup_whisper_french_model
+                from speech_recognition_module import WHISPER_CT2_AVAILABLE, charger_modele_stt
                 if not WHISPER_CT2_AVAILABLE:
                     return jsonify({
                         "success": False, 
@@ -443,7 +454,7 @@ def change_stt_engine_route():
                 
                 # Vérifier si le modèle Whisper French est disponible ou peut être téléchargé
                 add_log("Vérification du modèle Whisper French...", "info")
-                model_ready = setup_whisper_french_model()
+                model_ready = charger_modele_stt("whisper_french")
                 if not model_ready:
                     return jsonify({
                         "success": False,
@@ -571,6 +582,60 @@ def change_stt_engine_route():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/clear_stt_cache', methods=['POST'])
+def clear_stt_cache_route():
+    """Vide le cache acoustique des transcriptions"""
+    try:
+        removed = stt_cache.purge(expired_only=False)
+        add_log(f"Cache acoustique STT vidé ({removed} entrées)", "info")
+        return jsonify({"success": True, "removed": removed})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/wake_gate', methods=['POST'])
+def wake_gate_route():
+    """Pilote la porte d'activation : enregistrement de la phrase, push-to-talk, signalement d'erreurs"""
+    try:
+        data = request.json or {}
+        action = data.get('action')
+        
+        if action == 'enroll':
+            count = int(data.get('count', 3))
+            wake_gate.enroler_prochains(count)
+            add_log(f"Prononcez {count} fois la phrase d'activation", "info")
+        elif action == 'clear':
+            wake_gate.spotter.effacer()
+            add_log("Modèles de la phrase d'activation supprimés", "info")
+        elif action == 'push_to_talk':
+            wake_gate.ouvrir("push_to_talk")
+        elif action in ('false_accept', 'false_reject'):
+            wake_gate.signaler_erreur(action)
+        else:
+            return jsonify({"success": False, "error": "Action non valide"})
+        
+        return jsonify({"success": True, "wake_gate": wake_gate.get_stats()})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/warm_stt_engine', methods=['POST'])
+def warm_stt_engine_route():
+    """Précharge en arrière-plan le modèle d'un moteur STT pour un changement de moteur instantané"""
+    try:
+        data = request.json or {}
+        engine = data.get('engine')
+        
+        if engine not in ['speechrecognition', 'whisper', 'vosk', 'whisper_ct2', 'whisper_french']:
+            return jsonify({"success": False, "error": "Moteur STT non valide"})
+        
+        from speech_recognition_module import prechauffer_modele_stt
+        if not prechauffer_modele_stt(engine):
+            return jsonify({"success": False, "error": f"Impossible de précharger le modèle {engine}"})
+        
+        add_log(f"Préchargement du modèle {engine} en arrière-plan...", "info")
+        return jsonify({"success": True, "engine": engine, "models": get_model_registry_stats()})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
 @app.route('/set_api_key', methods=['POST'])
 def set_api_key():
     """Configure une clé API"""
@@ -708,7 +773,22 @@ def get_stt_metrics_route():
             metrics = get_stt_metrics(from_db=True)
             return jsonify({
                 "success": True,
-                "metrics": metrics
+                "metrics": metrics,
+                "pipelines": get_pipeline_stats(),
+                "capture": get_capture_stats(),
+                "audio_hub": get_audio_hub_stats(),
+                "noise_floor": get_noise_floor_stats(),
+                "dsp": get_dsp_stats(),
+                "models": get_model_registry_stats(),
+                "inference_servers": get_inference_server_stats(),
+                "stt_cache": stt_cache.get_stats(),
+                "whisper_api": get_whisper_api_client().get_stats(),
+                "batching": get_batched_transcription_stats(),
+                "speculative": get_speculative_stats(),
+                "vosk_grammar": vosk_grammar.get_stats(),
+                "wake_gate": wake_gate.get_stats(),
+                "dispatch": get_dispatch_stats(),
+                "fuzzy": get_fuzzy_index_stats()
             })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -1640,6 +1720,7 @@ def add_custom_shortcut_route():
         
         if shortcut_id:
             add_log(f"Raccourci personnalisé '{name}' ajouté avec la commande '{voice_command}'", "info")
+            invalider_grammaire_vosk()
             return jsonify({
                 "success": True,
                 "id": shortcut_id,
@@ -1695,6 +1776,7 @@ def update_custom_shortcut_route():
         
         if success:
             add_log(f"Raccourci personnalisé mis à jour: ID {shortcut_id}", "info")
+            invalider_grammaire_vosk()
             return jsonify({
                 "success": True,
                 "id": shortcut_id
@@ -1738,6 +1820,7 @@ def delete_custom_shortcut_route():
         
         if success:
             add_log(f"Raccourci personnalisé supprimé: ID {shortcut_id}", "info")
+            invalider_grammaire_vosk()
             return jsonify({
                 "success": True,
                 "id": shortcut_id
@@ -1850,6 +1933,7 @@ def add_command_alias_route():
         
         if success:
             add_log(f"Alias '{alias}' ajouté pour la commande '{command}'", "info")
+            invalider_grammaire_vosk()
             # Sauvegarder les modifications dans la base de données
             command_aliases.save_to_database()
             return jsonify({
@@ -1907,6 +1991,7 @@ def remove_command_alias_route():
         
         if success:
             add_log(f"Alias '{alias}' supprimé pour la commande '{command}'", "info")
+            invalider_grammaire_vosk()
             # Sauvegarder les modifications dans la base de données
             command_aliases.save_to_database()
             return jsonify({
@@ -1945,6 +2030,8 @@ def reload_command_aliases_route():
         
         if success:
             add_log("Alias de commandes rechargés avec succès", "info")
+            # Recompiler la grammaire Vosk à partir des alias rechargés
+            invalider_grammaire_vosk()
             return jsonify({
                 "success": True,
                 "message": "Alias rechargés avec succès",
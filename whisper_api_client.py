@@ -0,0 +1,255 @@
+"""
+Client de l'API Whisper d'OpenAI pour Whisp Assistant
+Session HTTP unique avec connexions persistantes (keep-alive), envoi du WAV
+depuis la mémoire et couverture (hedging) par un décodage local lorsque
+l'API tarde à répondre
+"""
+import io
+import time
+import wave
+import logging
+import threading
+import concurrent.futures
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+WHISPER_API_URL = "https://api.openai.com/v1/audio/transcriptions"
+
+# Pool partagé pour les requêtes API et les décodages locaux de secours
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="whisper_api")
+
+
+def encoder_wav(pcm: bytes, sample_rate: int = 16000) -> bytes:
+    """
+    Encode un audio PCM int16 mono en WAV, en mémoire.
+
+    Args:
+        pcm: Audio PCM int16 mono
+        sample_rate: Taux d'échantillonnage
+
+    Returns:
+        Contenu du fichier WAV
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class TranscriptionResult:
+    """Résultat d'une transcription (API ou décodage local)."""
+
+    def __init__(self, text: Optional[str], source: str, latency_ms: float,
+                 status_code: Optional[int] = None, error: Optional[str] = None):
+        self.text = text
+        self.source = source
+        self.latency_ms = latency_ms
+        self.status_code = status_code
+        self.error = error
+
+    @property
+    def success(self) -> bool:
+        return self.text is not None and self.error is None
+
+
+class WhisperAPIClient:
+    """
+    Client HTTP réutilisable pour l'API de transcription Whisper.
+
+    Une seule session requests est conservée : la connexion TLS est réutilisée
+    d'une requête à l'autre au lieu d'être renégociée à chaque énoncé.
+    """
+
+    def __init__(self, api_url: str = WHISPER_API_URL, model: str = "whisper-1", timeout: float = 15.0,
+                 pool_size: int = 4):
+        """
+        Args:
+            api_url: URL de l'API de transcription
+            model: Modèle Whisper à utiliser
+            timeout: Délai maximal d'une requête (secondes)
+            pool_size: Nombre de connexions conservées dans le pool
+        """
+        self.api_url = api_url
+        self.model = model
+        self.timeout = timeout
+        self._session = None
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+
+        self.requests_sent = 0
+        self.errors = 0
+        self.hedged_wins = 0
+        self.api_latency_ms = 0.0
+
+    @property
+    def session(self):
+        """Session HTTP persistante (créée au premier usage)."""
+        with self._lock:
+            if self._session is None:
+                if not REQUESTS_AVAILABLE:
+                    raise RuntimeError("La bibliothèque requests n'est pas disponible")
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self) -> None:
+        """Ferme la session et ses connexions."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def transcribe(self, pcm: bytes, sample_rate: int, api_key: str, language: str = "fr",
+                   timeout: Optional[float] = None) -> TranscriptionResult:
+        """
+        Envoie un énoncé à l'API Whisper.
+
+        Args:
+            pcm: Audio PCM int16 mono
+            sample_rate: Taux d'échantillonnage
+            api_key: Clé API OpenAI
+            language: Langue de l'audio
+            timeout: Délai maximal de la requête (défaut du client sinon)
+
+        Returns:
+            TranscriptionResult (source "api")
+        """
+        start = time.time()
+        wav_data = encoder_wav(pcm, sample_rate)
+        try:
+            response = self.session.post(
+                self.api_url,
+                headers={"Authorization": f"Bearer {api_key}"},
+                files={"file": ("audio.wav", wav_data, "audio/wav")},
+                data={
+                    "model": self.model,
+                    "language": language,
+                    "response_format": "json",
+                    "temperature": 0.0,
+                },
+                timeout=timeout or self.timeout,
+            )
+        except Exception as e:
+            self.errors += 1
+            return TranscriptionResult(None, "api", (time.time() - start) * 1000, error=str(e))
+
+        latency_ms = (time.time() - start) * 1000
+        self.requests_sent += 1
+        self.api_latency_ms += latency_ms
+        if response.status_code != 200:
+            self.errors += 1
+            return TranscriptionResult(None, "api", latency_ms, status_code=response.status_code,
+                                       error=response.text)
+        try:
+            text = response.json().get("text", "").strip()
+        except ValueError as e:
+            self.errors += 1
+            return TranscriptionResult(None, "api", latency_ms, status_code=response.status_code, error=str(e))
+        return TranscriptionResult(text, "api", latency_ms, status_code=response.status_code)
+
+    def transcribe_hedged(self, pcm: bytes, sample_rate: int, api_key: str,
+                          local_decode: Optional[Callable[[np.ndarray], str]] = None,
+                          hedge_after_s: float = 1.5, language: str = "fr",
+                          timeout: Optional[float] = None) -> TranscriptionResult:
+        """
+        Transcrit avec l'API, couverte par un décodage local lancé en parallèle.
+
+        Tant que le délai de couverture n'est pas écoulé, seule la réponse de
+        l'API est acceptée. Au-delà, le premier résultat valide (API ou local)
+        est retenu.
+
+        Args:
+            pcm: Audio PCM int16 mono
+            sample_rate: Taux d'échantillonnage
+            api_key: Clé API OpenAI
+            local_decode: Décodage local (audio float32 -> texte), ou None
+            hedge_after_s: Délai après lequel le résultat local est accepté
+            language: Langue de l'audio
+            timeout: Délai maximal de la requête API
+
+        Returns:
+            TranscriptionResult (source "api" ou "local")
+        """
+        start = time.time()
+        api_future = _executor.submit(self.transcribe, pcm, sample_rate, api_key, language, timeout)
+        if local_decode is None:
+            return api_future.result()
+
+        def decoder_local():
+            samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+            text = local_decode(samples)
+            return TranscriptionResult(text, "local", (time.time() - start) * 1000)
+
+        local_future = _executor.submit(decoder_local)
+
+        # Avant l'échéance, seule l'API peut répondre
+        try:
+            result = api_future.result(timeout=hedge_after_s)
+            if result.success:
+                return result
+        except concurrent.futures.TimeoutError:
+            pass
+
+        pending = {api_future, local_future}
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Échec du décodage de secours: {e}")
+                    continue
+                if result.success and (result.source == "api" or result.text):
+                    if result.source == "local":
+                        self.hedged_wins += 1
+                        logger.info(f"API Whisper trop lente, résultat local utilisé ({result.latency_ms:.0f} ms)")
+                    return result
+        return api_future.result()
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs du client."""
+        return {
+            "requests": self.requests_sent,
+            "errors": self.errors,
+            "hedged_wins": self.hedged_wins,
+            "avg_api_latency_ms": self.api_latency_ms / self.requests_sent if self.requests_sent else 0.0,
+        }
+
+
+# Client unique partagé (une seule session HTTP pour tout le processus)
+_client: Optional[WhisperAPIClient] = None
+_client_lock = threading.Lock()
+
+
+def get_whisper_api_client(api_url: str = WHISPER_API_URL, model: str = "whisper-1") -> WhisperAPIClient:
+    """
+    Retourne le client API Whisper partagé.
+
+    Args:
+        api_url: URL de l'API (utilisée à la création)
+        model: Modèle Whisper (utilisé à la création)
+
+    Returns:
+        WhisperAPIClient partagé
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WhisperAPIClient(api_url, model)
+        return _client